@@ -6,211 +6,127 @@ from scapy.all import *
 
 # %%
 #######################################
-def scapyget_tcp_port(packet_list: scapy.plist.PacketList, port: int, sport=False, dport=False, notin=False):
-    if notin:
-        if sport and dport:
-            print("The defaults of this tool will search for the given port in both the [TCP].sport and the [TCP].dport fields.  If you only want to search for 'sport' field OR the 'dport' field use, sport=True or dport=True, respectively (but don't turn them both on).")
-        elif sport:
-            result_list = [ pckt for pckt in packet_list if pckt.haslayer('TCP') and ( (pckt['TCP'].sport != port) ) ]
-        elif dport:
-            result_list = [ pckt for pckt in packet_list if pckt.haslayer('TCP') and ( (pckt['TCP'].dport != port) ) ]
-        else:
-            result_list = [ pckt for pckt in packet_list if pckt.haslayer('TCP') and ( (pckt['TCP'].sport != port) and (pckt['TCP'].dport != port) ) ]
+def scapyget_tcp_port(packet_list: scapy.plist.PacketList, port, sport=False, dport=False, notin=False, split=False):
+    """Takes a PacketList and a port, or a set of ports, and returns every TCP packet that has one of the ports in the sport or dport field (or that has none of them, if the notin=True switch is turned on).  The ports can be a list, ranges and named groups such as 'well-known' or 'ephemeral' (see 'scapyport_compile_set'); they are compiled into a 65536 entry bitmap once, and each packet is checked against it in a single pass.
+
+    Example:
+        >>> temp_pcap = rdpcap('temp.pcap')\n
+        >>> scapyget_tcp_port(temp_pcap, [22, 80, 443], dport=True)\n
+        <PacketList: TCP:268 UDP:0 ICMP:0 Other:0>
+        >>> scapyget_tcp_port(temp_pcap, [22, 80, 443], dport=True, split=True)\n
+        {22: <PacketList: TCP:56 UDP:0 ICMP:0 Other:0>, 80: <PacketList: TCP:12 UDP:0 ICMP:0 Other:0>, 443: <PacketList: TCP:200 UDP:0 ICMP:0 Other:0>}
+
+    Args:
+        packet_list (scapy.plist.PacketList): Reference an existing PacketList object
+        port (int | str | range | iterable): Reference a port number, or a set of ports, ranges and named groups (see 'scapyport_compile_set')
+        sport (bool, optional): If you want to only search the [TCP].sport field, set sport=True. Defaults to False.
+        dport (bool, optional): If you want to only search the [TCP].dport field, set dport=True. Defaults to False.
+        notin (bool, optional): If you want to get every TCP packet that DOES NOT contain any of the given ports, set notin=True. Defaults to False.
+        split (bool, optional): If you want the matching packets split per port, set split=True (a packet whose sport and dport both match is in both lists; ignored with notin=True). Defaults to False.
+
+    Returns:
+        scapy.plist.PacketList: Returns a PacketList object (or a dict of each matched port to a PacketList object, with split=True)
+    """
+    if sport and dport:
+        print("The defaults of this tool will search for the given port in both the [TCP].sport and the [TCP].dport fields.  If you only want to search for 'sport' field OR the 'dport' field use, sport=True or dport=True, respectively (but don't turn them both on).")
+        return PacketList([])
+#    
+    port_bitmap = scapyport_compile_set(port)
+    if sport:
+        fields = ('sport',)
+    elif dport:
+        fields = ('dport',)
     else:
-        if sport and dport:
-            print("The defaults of this tool will search for the given port in both the [TCP].sport and the [TCP].dport fields.  If you only want to search for 'sport' field OR the 'dport' field use, sport=True or dport=True, respectively (but don't turn them both on).")
-        elif sport:
-            result_list = [ pckt for pckt in packet_list if pckt.haslayer('TCP') and ( (pckt['TCP'].sport == port) ) ]
-        elif dport:
-            result_list = [ pckt for pckt in packet_list if pckt.haslayer('TCP') and ( (pckt['TCP'].dport == port) ) ]
-        else:
-            result_list = [ pckt for pckt in packet_list if pckt.haslayer('TCP') and ( (pckt['TCP'].sport == port) or (pckt['TCP'].dport == port) ) ]
+        fields = ('sport', 'dport')
+#    
+    result_list = []
+    split_lists = {}
+    for pckt in packet_list:
+        layers = [ pckt[proto] for proto in ('TCP',) if pckt.haslayer(proto) ]
+        if not layers:
+            continue
+        matched_ports = [ getattr(layer, f) for layer in layers for f in fields if port_bitmap[getattr(layer, f)] ]
+        if bool(matched_ports) != notin:
+            result_list.append(pckt)
+            if split and not notin:
+                for matched_port in dict.fromkeys(matched_ports):
+                    split_lists.setdefault(matched_port, []).append(pckt)
 #            
+    if split and not notin:
+        return { matched_port: PacketList(split_lists[matched_port]) for matched_port in sorted(split_lists) }
     return PacketList(result_list)
 
 # %%
 #######################################
-def scapyremove_duplicate_packets(packet_list: scapy.plist.PacketList):
-    """Takes a given PacketList, evaluates each packet, looks for TCP packets that have duplicate sequence numbers, and omits the TCP packets with the duplicate sequence numbers from the returned PacketList.
+def scapyremove_duplicate_packets(packet_list: scapy.plist.PacketList, window=None, tcp_only=True):
+    """Takes a given PacketList, evaluates each packet, looks for TCP packets that are duplicates of an earlier packet (the same flow, TCP sequence number, acknowledgment number, flags and payload), and omits the duplicate TCP packets from the returned PacketList.  The first copy of each packet is kept, and the packets stay in their original order.  Packets from unrelated flows that happen to share a sequence number are not duplicates.  See 'scapystream_remove_duplicates' for streaming over a PcapReader.
     
     Examples:
         >>> from pprint import pprint
-        
-        >>> frag3_pcap = rdpcap('fragments3.pcap')\n
-        >>> frag3_pcap_badsum_removed = scapyremove_bad_checksum_packets(frag3_pcap)\n
-        >>> frag3_pcap_badsum_duplicates_removed = scapyremove_duplicate_packets(frag3_pcap_badsum_removed)\n
-
-        >>> frag3_pcap_badsum_removed\n
-        <PacketList: TCP:9 UDP:0 ICMP:0 Other:114>
-        >>> frag3_pcap_badsum_duplicates_removed\n
-        <PacketList: TCP:6 UDP:0 ICMP:0 Other:114>
-
-        >>> pprint([p[TCP].seq for p in frag3_pcap_badsum_removed if p.haslayer(TCP)])\n
-        [1611997371,\n
-        703601939,\n
-        1611997372,\n
-        703601940,\n
-        703601940,\n
-        1611997826,\n
-        703601940,\n
-        703601940,\n
-        1611997827]\n
-        
-        >>> pprint([p[TCP].seq for p in frag3_pcap_badsum_duplicates_removed if p.haslayer(TCP)])\n
-        [1611997371, 703601939, 1611997372, 1611997826, 703601940, 1611997827]\n
-
-        >>> pprint([scapy_convert_time(p) for p in frag3_pcap_badsum_removed if p.haslayer(TCP)])\n
-        ['2012-05-01 02:37:47.858950',\n
-        '2012-05-01 02:37:47.859186',\n
-        '2012-05-01 02:37:47.859270',\n
-        '2012-05-01 02:37:47.859354',\n
-        '2012-05-01 02:37:47.866939',\n
-        '2012-05-01 02:37:51.519281',\n
-        '2012-05-01 02:37:51.519904',\n
-        '2012-05-01 02:37:51.520007',\n
-        '2012-05-01 02:37:51.520196']\n
-        
-        >>> pprint([scapy_convert_time(p) for p in frag3_pcap_badsum_duplicates_removed if p.haslayer(TCP)])\n
-        ['2012-05-01 02:37:47.858950',\n
-        '2012-05-01 02:37:47.859186',\n
-        '2012-05-01 02:37:47.859270',\n
-        '2012-05-01 02:37:51.519281',\n
-        '2012-05-01 02:37:51.520007',\n
-        '2012-05-01 02:37:51.520196']\n
+
+        >>> packet_list = PacketList([Ether()/IP(src='10.1.1.1', dst='10.1.1.100')/TCP(sport=1046, dport=22, seq=100)/b'hello',\n
+        ...                           Ether()/IP(src='10.1.1.2', dst='10.1.1.100')/TCP(sport=1047, dport=22, seq=100)/b'hello',\n
+        ...                           Ether()/IP(src='10.1.1.1', dst='10.1.1.100')/TCP(sport=1046, dport=22, seq=100)/b'hello',\n
+        ...                           Ether()/IP(src='10.1.1.1', dst='10.1.1.100')/UDP(sport=53, dport=53)])\n
+        >>> deduplicated = scapyremove_duplicate_packets(packet_list)\n
+        >>> deduplicated\n
+        <PacketList: TCP:2 UDP:1 ICMP:0 Other:0>
+        >>> pprint([p.summary() for p in deduplicated])\n
+        ['Ether / IP / TCP 10.1.1.1:1046 > 10.1.1.100:ssh S / Raw',\n
+        'Ether / IP / TCP 10.1.1.2:1047 > 10.1.1.100:ssh S / Raw',\n
+        'Ether / IP / UDP 10.1.1.1:domain > 10.1.1.100:domain']\n
 
     Args:
         packet_list (scapy.plist.PacketList): Reference a given PacketList object
+        window (float, optional): Reference how many seconds apart two copies of a packet can be and still be duplicates. Defaults to None (anywhere in the PacketList).
+        tcp_only (bool, optional): Set this to False to also remove duplicates of non-TCP packets. Defaults to True.
         
     Returns:
         scapy.plist.PacketList: Returns a PacketList object
     """
-    temp_dict = {}
-    non_tcp_packets = []
-#    
-    for pckt in packet_list:
-        if pckt.haslayer(TCP):
-            temp_dict[pckt[TCP].seq] = pckt
-        else:
-            non_tcp_packets.append(pckt)
-#        
-    deduplicated_tcp_packets = list(temp_dict.values())
+    deduplicated_array = list(scapystream_remove_duplicates(packet_list, window=window, max_entries=len(packet_list) + 1, tcp_only=tcp_only))
 #    
-    rejoin_deduplicated = non_tcp_packets + deduplicated_tcp_packets
-    packetlist_obj = PacketList(rejoin_deduplicated)
-    time_sorted_deduplicated_array = sorted(packetlist_obj, key=lambda x: x.time)
-#    
-    return PacketList(time_sorted_deduplicated_array)
+    return PacketList(deduplicated_array)
 
 # %%
 #######################################
-def scapyremove_duplicate_and_badsum_packets(packet_list: scapy.plist.PacketList):
-    """Takes a given PacketList, evaluates each packet, looks for TCP packets that have bad checksums and the TCP packets that have duplicate sequence numbers, and omits the bad checksum and duplicate TCP packets from the returned PacketList.  This tool is simply a combination of "scapyremove_bad_checksum_packets" and then "scapyremove_duplicate_packets".
+def scapyremove_duplicate_and_badsum_packets(packet_list: scapy.plist.PacketList, window=None, tcp_only=True):
+    """Takes a given PacketList, evaluates each packet, looks for TCP packets that have bad checksums and the TCP packets that are duplicates of an earlier packet, and omits the bad checksum and duplicate TCP packets from the returned PacketList.  This tool gives the same results as "scapyremove_bad_checksum_packets" and then "scapyremove_duplicate_packets" (a bad IPv4 header checksum is dropped too, see 'scapyraw_checksum_valid'), but in a single pass: each packet is converted to bytes once, for both checks, and the packets stay in their original order.  See 'scapyclean_pcap' to clean a .pcap file straight to disk.
     
     Examples:
-        >>> from pprint import pprint
-        
-        >>> frag3_pcap = rdpcap('fragments3.pcap')\n
-        >>> frag3_pcap_badsum_removed = scapyremove_bad_checksum_packets(frag3_pcap)\n
-        >>> frag3_pcap_badsum_duplicates_removed = scapyremove_duplicate_packets(frag3_pcap_badsum_removed)\n
-
-        >>> frag3_pcap_badsum_removed\n
-        <PacketList: TCP:9 UDP:0 ICMP:0 Other:114>
-        >>> frag3_pcap_badsum_duplicates_removed\n
-        <PacketList: TCP:6 UDP:0 ICMP:0 Other:114>
-
-        >>> pprint([p[TCP].seq for p in frag3_pcap_badsum_removed if p.haslayer(TCP)])\n
-        [1611997371,\n
-        703601939,\n
-        1611997372,\n
-        703601940,\n
-        703601940,\n
-        1611997826,\n
-        703601940,\n
-        703601940,\n
-        1611997827]\n
-        
-        >>> pprint([p[TCP].seq for p in frag3_pcap_badsum_duplicates_removed if p.haslayer(TCP)])\n
-        [1611997371, 703601939, 1611997372, 1611997826, 703601940, 1611997827]\n
-
-        >>> pprint([scapy_convert_time(p) for p in frag3_pcap_badsum_removed if p.haslayer(TCP)])\n
-        ['2012-05-01 02:37:47.858950',\n
-        '2012-05-01 02:37:47.859186',\n
-        '2012-05-01 02:37:47.859270',\n
-        '2012-05-01 02:37:47.859354',\n
-        '2012-05-01 02:37:47.866939',\n
-        '2012-05-01 02:37:51.519281',\n
-        '2012-05-01 02:37:51.519904',\n
-        '2012-05-01 02:37:51.520007',\n
-        '2012-05-01 02:37:51.520196']\n
-        
-        >>> pprint([scapy_convert_time(p) for p in frag3_pcap_badsum_duplicates_removed if p.haslayer(TCP)])\n
-        ['2012-05-01 02:37:47.858950',\n
-        '2012-05-01 02:37:47.859186',\n
-        '2012-05-01 02:37:47.859270',\n
-        '2012-05-01 02:37:51.519281',\n
-        '2012-05-01 02:37:51.520007',\n
-        '2012-05-01 02:37:51.520196']\n
+        >>> packet_list = PacketList([Ether()/IP(src='10.1.1.1', dst='10.1.1.100')/TCP(sport=1046, dport=22, seq=100)/b'hello',\n
+        ...                           Ether()/IP(src='10.1.1.1', dst='10.1.1.100')/TCP(sport=1046, dport=22, seq=100)/b'hello',\n
+        ...                           Ether()/IP(src='10.1.1.1', dst='10.1.1.100')/TCP(sport=1046, dport=22, seq=105, chksum=0x1234)/b'world',\n
+        ...                           Ether()/IP(src='10.1.1.1', dst='10.1.1.100')/UDP(sport=53, dport=53)])\n
+        >>> cleaned = scapyremove_duplicate_and_badsum_packets(packet_list)\n
+        >>> cleaned\n
+        <PacketList: TCP:1 UDP:1 ICMP:0 Other:0>
+        >>> [p.summary() for p in cleaned]\n
+        ['Ether / IP / TCP 10.1.1.1:1046 > 10.1.1.100:ssh S / Raw', 'Ether / IP / UDP 10.1.1.1:domain > 10.1.1.100:domain']
 
     Args:
         packet_list (scapy.plist.PacketList): Reference a given PacketList object
+        window (float, optional): Reference how many seconds apart two copies of a packet can be and still be duplicates. Defaults to None (anywhere in the PacketList).
+        tcp_only (bool, optional): Set this to False to also remove the bad checksum and duplicate packets of other protocols. Defaults to True.
         
     Returns:
         scapy.plist.PacketList: Returns a PacketList object
-    """    
-    my_packet_list = packet_list
-#    
-    def scapyremove_bad_checksum_packets(packet_list: scapy.plist.PacketList):
-#        
-        def return_good_checksum_packets_only(packet):
-            from copy import deepcopy
-#            
-            temp_packet = deepcopy(packet)
-            orig_checksum = temp_packet['TCP'].chksum
-            del temp_packet['TCP'].chksum
-            temp_packet = IP(bytes(temp_packet[IP]))
-            recalc_checksum = temp_packet['TCP'].chksum
-            comparison = orig_checksum == recalc_checksum
-            if comparison:
-                return packet
-#                
-        final_packet_array = []
-#                
+    """
+    # Each record is yielded (or dropped) by 'scapyraw_remove_duplicates' as soon as it is read, so the packet checked last is the one a yielded record came from
+    current_packet = [None]
+    def checked_records():
         for eachpacket in packet_list:
-            if eachpacket.haslayer('TCP'):
-                temp_results = return_good_checksum_packets_only(eachpacket)
-                if temp_results:
-                    final_packet_array.append( eachpacket )
-            else:
-                final_packet_array.append( eachpacket )
-#                
-        return PacketList(final_packet_array)
-#    
-#
-    def scapyremove_duplicate_packets(packet_list: scapy.plist.PacketList):
-#    
-        temp_dict = {}
-        non_tcp_packets = []
-#        
-        for pckt in packet_list:
-            if pckt.haslayer(TCP):
-                temp_dict[pckt[TCP].seq] = pckt
-            else:
-                non_tcp_packets.append(pckt)
-#            
-        deduplicated_tcp_packets = list(temp_dict.values())
-#        
-        rejoin_deduplicated = non_tcp_packets + deduplicated_tcp_packets
-        packetlist_obj = PacketList(rejoin_deduplicated)
-        time_sorted_deduplicated_array = sorted(packetlist_obj, key=lambda x: x.time)
-#        
-        return PacketList(time_sorted_deduplicated_array)
-#
-#
-    packet_list_no_bad_checksum = scapyremove_bad_checksum_packets(my_packet_list)
+            linktype = conf.l2types.layer2num.get(type(eachpacket), 1)
+            frame = bytes(eachpacket)
+            headers = scapyraw_parse_headers(frame, linktype)
+            if (headers['ip_proto'] == 6 or not tcp_only) and not scapyraw_checksum_valid(frame, linktype, headers):
+                continue
+            current_packet[0] = eachpacket
+            yield (int(Decimal(str(eachpacket.time)) * 1000000000), None, frame, None, linktype)
 #    
-    packet_list_deduped_no_badsum = scapyremove_duplicate_packets(packet_list_no_bad_checksum)
+    final_packet_array = [ current_packet[0] for record in scapyraw_remove_duplicates(checked_records(), window=window, max_entries=len(packet_list) + 1, tcp_only=tcp_only) ]
 #    
-    return packet_list_deduped_no_badsum
+    return PacketList(final_packet_array)
 
 # %%
 #######################################
@@ -243,26 +159,54 @@ def scapy_orderby_seqnum(packet_list: scapy.plist.PacketList):
 
 # %%
 #######################################
-def scapyget_udp_port(packet_list: scapy.plist.PacketList, port: int, sport=False, dport=False, notin=False):
-    if notin:
-        if sport and dport:
-            print("The defaults of this tool will search for the given port in both the [UDP].sport and the [UDP].dport fields.  If you only want to search for 'sport' field OR the 'dport' field use, sport=True or dport=True, respectively (but don't turn them both on).")
-        elif sport:
-            result_list = [ pckt for pckt in packet_list if pckt.haslayer('UDP') and ( (pckt['UDP'].sport != port) ) ]
-        elif dport:
-            result_list = [ pckt for pckt in packet_list if pckt.haslayer('UDP') and ( (pckt['UDP'].dport != port) ) ]
-        else:
-            result_list = [ pckt for pckt in packet_list if pckt.haslayer('UDP') and ( (pckt['UDP'].sport != port) and (pckt['UDP'].dport != port) ) ]
+def scapyget_udp_port(packet_list: scapy.plist.PacketList, port, sport=False, dport=False, notin=False, split=False):
+    """Takes a PacketList and a port, or a set of ports, and returns every UDP packet that has one of the ports in the sport or dport field (or that has none of them, if the notin=True switch is turned on).  The ports can be a list, ranges and named groups such as 'well-known' or 'ephemeral' (see 'scapyport_compile_set'); they are compiled into a 65536 entry bitmap once, and each packet is checked against it in a single pass.
+
+    Example:
+        >>> temp_pcap = rdpcap('temp.pcap')\n
+        >>> scapyget_udp_port(temp_pcap, [53, 123, 'ephemeral'], dport=True)\n
+        <PacketList: TCP:0 UDP:58 ICMP:0 Other:0>
+        >>> scapyget_udp_port(temp_pcap, [53, 123, 'ephemeral'], dport=True, split=True)\n
+        {53: <PacketList: TCP:0 UDP:36 ICMP:0 Other:0>, 123: <PacketList: TCP:0 UDP:4 ICMP:0 Other:0>, 58429: <PacketList: TCP:0 UDP:18 ICMP:0 Other:0>}
+
+    Args:
+        packet_list (scapy.plist.PacketList): Reference an existing PacketList object
+        port (int | str | range | iterable): Reference a port number, or a set of ports, ranges and named groups (see 'scapyport_compile_set')
+        sport (bool, optional): If you want to only search the [UDP].sport field, set sport=True. Defaults to False.
+        dport (bool, optional): If you want to only search the [UDP].dport field, set dport=True. Defaults to False.
+        notin (bool, optional): If you want to get every UDP packet that DOES NOT contain any of the given ports, set notin=True. Defaults to False.
+        split (bool, optional): If you want the matching packets split per port, set split=True (a packet whose sport and dport both match is in both lists; ignored with notin=True). Defaults to False.
+
+    Returns:
+        scapy.plist.PacketList: Returns a PacketList object (or a dict of each matched port to a PacketList object, with split=True)
+    """
+    if sport and dport:
+        print("The defaults of this tool will search for the given port in both the [UDP].sport and the [UDP].dport fields.  If you only want to search for 'sport' field OR the 'dport' field use, sport=True or dport=True, respectively (but don't turn them both on).")
+        return PacketList([])
+#    
+    port_bitmap = scapyport_compile_set(port)
+    if sport:
+        fields = ('sport',)
+    elif dport:
+        fields = ('dport',)
     else:
-        if sport and dport:
-            print("The defaults of this tool will search for the given port in both the [UDP].sport and the [UDP].dport fields.  If you only want to search for 'sport' field OR the 'dport' field use, sport=True or dport=True, respectively (but don't turn them both on).")
-        elif sport:
-            result_list = [ pckt for pckt in packet_list if pckt.haslayer('UDP') and ( (pckt['UDP'].sport == port) ) ]
-        elif dport:
-            result_list = [ pckt for pckt in packet_list if pckt.haslayer('UDP') and ( (pckt['UDP'].dport == port) ) ]
-        else:
-            result_list = [ pckt for pckt in packet_list if pckt.haslayer('UDP') and ( (pckt['UDP'].sport == port) or (pckt['UDP'].dport == port) ) ]
+        fields = ('sport', 'dport')
+#    
+    result_list = []
+    split_lists = {}
+    for pckt in packet_list:
+        layers = [ pckt[proto] for proto in ('UDP',) if pckt.haslayer(proto) ]
+        if not layers:
+            continue
+        matched_ports = [ getattr(layer, f) for layer in layers for f in fields if port_bitmap[getattr(layer, f)] ]
+        if bool(matched_ports) != notin:
+            result_list.append(pckt)
+            if split and not notin:
+                for matched_port in dict.fromkeys(matched_ports):
+                    split_lists.setdefault(matched_port, []).append(pckt)
 #            
+    if split and not notin:
+        return { matched_port: PacketList(split_lists[matched_port]) for matched_port in sorted(split_lists) }
     return PacketList(result_list)
 
 # %%
@@ -343,25 +287,24 @@ def scapypayload_joinall(packet_list: scapy.plist.PacketList):
 # %%
 #######################################
 def scapyrdpcap_tcp_payloads(pcap_file: str):
-    def scapy_orderby_seqnum(packet_list: scapy.plist.PacketList):
-        tcp_only_packetlist = PacketList([ pckt for pckt in packet_list if pckt.haslayer('TCP') ])
-        seq_num_sorted = sorted(tcp_only_packetlist, key=lambda x: x.seq)
-        return PacketList(seq_num_sorted)
-#
-    def scapyget_payload(packet_list: scapy.plist.PacketList):
-        payload_only_list = [pack.load for pack in packet_list if pack.haslayer("Raw")]
-        combined_byte_strings = b"".join(payload_only_list)
-        convert_to_strings = combined_byte_strings.decode()
-        return convert_to_strings
-#    
+    """Returns the reassembled payload of every TCP stream in a .pcap file, as one string per direction of each connection (in the order the streams were first seen).  Built on 'scapystream_tcp_reassemble', so retransmissions, overlaps, out-of-order segments and sequence number wraparound are handled, and the .pcap is streamed rather than loaded with rdpcap.
+
+    Examples:
+        >>> payloads = scapyrdpcap_tcp_payloads('ncat.pcap')\n
+        >>> payloads\n
+        ['Hello\\nHowareyou\\nhaveyoubeenalright\\n', 'Hi\\nGood\\n']
+
+    Args:
+        pcap_file (str): Reference a .pcap file
+
+    Returns:
+        list: Returns a list of strings, one per direction of each TCP stream (bytes that are not valid utf-8 are replaced)
+    """
     def main():
-        full_pcap_packet_list = rdpcap(pcap_file)
-        payload_array = []
-        for sess_key in full_pcap_packet_list.sessions().keys():
-            orderedby_seqnum = scapy_orderby_seqnum(full_pcap_packet_list.sessions()[sess_key])
-            # print( scapyget_payload(orderedby_seqnum) )
-            payload_array.append( scapyget_payload(orderedby_seqnum) )
-        # print(''.join(payload_array))
+        stream_chunks = {}
+        for session_key, direction_key, stream_offset, data in scapystream_tcp_reassemble(pcap_file):
+            stream_chunks.setdefault(direction_key, []).append(data)
+        payload_array = [ b"".join(chunks).decode(errors='replace') for chunks in stream_chunks.values() ]
         return payload_array
 #        
     finalresults = main()
@@ -468,26 +411,54 @@ def scapyconvert_packet_to_bytes(the_packet: scapy.layers.l2.Ether):
 
 # %%
 #######################################
-def scapyget_port(packet_list: scapy.plist.PacketList, port: int, sport=False, dport=False, notin=False):
-    if notin:
-        if sport and dport:
-            print("The defaults of this tool will search for the given port in both the [TCP/UDP].sport and the [TCP/UDP].dport fields.  If you only want to search for 'sport' field OR the 'dport' field use, sport=True or dport=True, respectively (but don't turn them both on).")
-        elif sport:
-            result_list = [ pckt for pckt in packet_list if ( pckt.haslayer('TCP') and pckt['TCP'].sport != port ) or ( pckt.haslayer('UDP') and pckt['UDP'].sport != port ) ]
-        elif dport:
-            result_list = [ pckt for pckt in packet_list if ( pckt.haslayer('TCP') and pckt['TCP'].dport != port ) or ( pckt.haslayer('UDP') and pckt['UDP'].dport != port ) ]
-        else:
-            result_list = [ pckt for pckt in packet_list if ( pckt.haslayer('TCP') and ( pckt['TCP'].sport != port and pckt['TCP'].dport != port ) ) or ( pckt.haslayer('UDP') and ( pckt['UDP'].sport != port and pckt['UDP'].dport != port ) ) ]
+def scapyget_port(packet_list: scapy.plist.PacketList, port, sport=False, dport=False, notin=False, split=False):
+    """Takes a PacketList and a port, or a set of ports, and returns every TCP or UDP packet that has one of the ports in the sport or dport field (or that has none of them, if the notin=True switch is turned on).  The ports can be a list, ranges and named groups such as 'well-known' or 'ephemeral' (see 'scapyport_compile_set'); they are compiled into a 65536 entry bitmap once, and each packet is checked against it in a single pass.
+
+    Example:
+        >>> temp_pcap = rdpcap('temp.pcap')\n
+        >>> scapyget_port(temp_pcap, [53, 80, 443], dport=True)\n
+        <PacketList: TCP:212 UDP:36 ICMP:0 Other:0>
+        >>> scapyget_port(temp_pcap, [53, 80, 443], dport=True, split=True)\n
+        {53: <PacketList: TCP:0 UDP:36 ICMP:0 Other:0>, 80: <PacketList: TCP:12 UDP:0 ICMP:0 Other:0>, 443: <PacketList: TCP:200 UDP:0 ICMP:0 Other:0>}
+
+    Args:
+        packet_list (scapy.plist.PacketList): Reference an existing PacketList object
+        port (int | str | range | iterable): Reference a port number, or a set of ports, ranges and named groups (see 'scapyport_compile_set')
+        sport (bool, optional): If you want to only search the [TCP/UDP].sport field, set sport=True. Defaults to False.
+        dport (bool, optional): If you want to only search the [TCP/UDP].dport field, set dport=True. Defaults to False.
+        notin (bool, optional): If you want to get every TCP or UDP packet that DOES NOT contain any of the given ports, set notin=True. Defaults to False.
+        split (bool, optional): If you want the matching packets split per port, set split=True (a packet whose sport and dport both match is in both lists; ignored with notin=True). Defaults to False.
+
+    Returns:
+        scapy.plist.PacketList: Returns a PacketList object (or a dict of each matched port to a PacketList object, with split=True)
+    """
+    if sport and dport:
+        print("The defaults of this tool will search for the given port in both the [TCP/UDP].sport and the [TCP/UDP].dport fields.  If you only want to search for 'sport' field OR the 'dport' field use, sport=True or dport=True, respectively (but don't turn them both on).")
+        return PacketList([])
+#    
+    port_bitmap = scapyport_compile_set(port)
+    if sport:
+        fields = ('sport',)
+    elif dport:
+        fields = ('dport',)
     else:
-        if sport and dport:
-            print("The defaults of this tool will search for the given port in both the [TCP/UDP].sport and the [TCP/UDP].dport fields.  If you only want to search for 'sport' field OR the 'dport' field use, sport=True or dport=True, respectively (but don't turn them both on).")
-        elif sport:
-            result_list = [ pckt for pckt in packet_list if ( pckt.haslayer('TCP') and pckt['TCP'].sport == port ) or ( pckt.haslayer('UDP') and pckt['UDP'].sport == port ) ]
-        elif dport:
-            result_list = [ pckt for pckt in packet_list if ( pckt.haslayer('TCP') and pckt['TCP'].dport == port ) or ( pckt.haslayer('UDP') and pckt['UDP'].dport == port ) ]
-        else:
-            result_list = [ pckt for pckt in packet_list if ( pckt.haslayer('TCP') and ( pckt['TCP'].sport == port or pckt['TCP'].dport == port ) ) or ( pckt.haslayer('UDP') and ( pckt['UDP'].sport == port or pckt['UDP'].dport == port ) ) ]
+        fields = ('sport', 'dport')
+#    
+    result_list = []
+    split_lists = {}
+    for pckt in packet_list:
+        layers = [ pckt[proto] for proto in ('TCP', 'UDP') if pckt.haslayer(proto) ]
+        if not layers:
+            continue
+        matched_ports = [ getattr(layer, f) for layer in layers for f in fields if port_bitmap[getattr(layer, f)] ]
+        if bool(matched_ports) != notin:
+            result_list.append(pckt)
+            if split and not notin:
+                for matched_port in dict.fromkeys(matched_ports):
+                    split_lists.setdefault(matched_port, []).append(pckt)
 #            
+    if split and not notin:
+        return { matched_port: PacketList(split_lists[matched_port]) for matched_port in sorted(split_lists) }
     return PacketList(result_list)
 
 # %%
@@ -530,23 +501,29 @@ def scapytest_checksum(packet_list: scapy.plist.PacketList):
     Returns:
         tuple: Returns a tuple of the results
     """
-    from copy import deepcopy
-    
+    # Reading the checksums straight from the raw bytes of each packet (see 'scapyraw_transport_checksum'), instead of a deepcopy and a re-dissection of every packet
     def verify_checksum(packet):
+        # Falling back to scapy's recalculation on a copy of the packet (e.g. for IP fragments or truncated frames)
+        packet = packet.copy()
         orig_checksum = packet['TCP'].chksum
         del packet['TCP'].chksum
         packet = IP(bytes(packet[IP]))
         recalc_checksum = packet['TCP'].chksum
         comparison = orig_checksum == recalc_checksum
         return (orig_checksum, recalc_checksum, comparison)
-        
-    temp_copy = deepcopy(packet_list)
-    temp_copy = PacketList([p for p in temp_copy if p.haslayer(TCP)])
     
     results_array = []
     
-    for eachpacket in temp_copy:
-        results_array.append(verify_checksum(eachpacket))
+    for eachpacket in packet_list:
+        if eachpacket.haslayer(TCP):
+            frame = bytes(eachpacket)
+            linktype = conf.l2types.layer2num.get(type(eachpacket), 1)
+            checksum_result = scapyraw_transport_checksum(frame, linktype)
+            if checksum_result and checksum_result[0] == 'TCP':
+                protocol_name, orig_checksum, recalc_checksum = checksum_result
+                results_array.append((orig_checksum, recalc_checksum, orig_checksum == recalc_checksum))
+            else:
+                results_array.append(verify_checksum(eachpacket))
     
     return results_array
 
@@ -792,13 +769,12 @@ def scapyremove_bad_checksum_packets(packet_list: scapy.plist.PacketList):
         scapy.plist.PacketList: Returns a PacketList object
     """
     def return_good_checksum_packets_only(packet):
-        from copy import deepcopy
-#        
-        temp_packet = deepcopy(packet)
-        orig_checksum = temp_packet['TCP'].chksum
-        del temp_packet['TCP'].chksum
-        temp_packet = IP(bytes(temp_packet[IP]))
-        recalc_checksum = temp_packet['TCP'].chksum
+        # Comparing the checksum in the raw bytes of the packet with the correct one (see 'scapyraw_transport_checksum'), without copying or re-dissecting the packet
+        linktype = conf.l2types.layer2num.get(type(packet), 1)
+        checksum_result = scapyraw_transport_checksum(bytes(packet), linktype)
+        if checksum_result is None:
+            return packet
+        protocol_name, orig_checksum, recalc_checksum = checksum_result
         comparison = orig_checksum == recalc_checksum
         if comparison:
             return packet
@@ -814,7 +790,6 @@ def scapyremove_bad_checksum_packets(packet_list: scapy.plist.PacketList):
             final_packet_array.append( eachpacket )
 #            
     return PacketList(final_packet_array)
-
 # %%
 #######################################
 def scapyconvert_packets_to_bytesarray(packet_list: scapy.plist.PacketList):
@@ -899,52 +874,30 @@ def scapysessions_overview(packet_list: scapy.plist.PacketList):
 # %%
 #######################################
 def scapypayload_content_between_patterns(packet_list: scapy.plist.PacketList, left_pattern: str, right_pattern: str, return_packetlist=False, ignorecase=True):
-    import re
-    
-    def scapypayload_contains_pattern(packet_list: scapy.plist.PacketList, thepattern: str, return_packetlist=False, ignorecase=True):
-        import re
-        
-        # Converting the string pattern to bytes for proper pattern matching of the payload in the packets
-        thepattern_bytes = thepattern.encode()
-        
-        # Specifying case-sensitive or case-insensitive matching, along with the pattern to match
-        if ignorecase:
-            match_syntax = re.compile(thepattern_bytes, re.IGNORECASE)
-        else:
-            match_syntax = re.compile(thepattern_bytes)
-        
-        # For each packet, where the packet has a Raw layer (i.e. the payload exists), get the packets w/ payload that match our pattern within the payload
-        keep_list = [p for p in packet_list if p.haslayer(Raw) and re.findall(match_syntax, p.load)]
-        
-        # If the option of 'return_packetlist' = True, then this function returns the complete list of packets as a PacketList object
-        if return_packetlist:
-            results = PacketList(keep_list)
-        else:
-            # Otherwise, the payload of each packet is decoded as a single string and returned in a list
-            results = [pl.load.decode() for pl in keep_list]
-        
-        return results
-    
-    initial_results = scapypayload_contains_pattern(packet_list, left_pattern)
-    
-    # Specifying case-sensitive or case-insensitive matching, along with the pattern to match
-    if ignorecase:
-        match_syntax = re.compile(left_pattern + r'(.*?)' + right_pattern, re.IGNORECASE)
-    else:
-        match_syntax = re.compile(left_pattern + r'(.*?)' + right_pattern)
-    
-    # For each item find the matches of the Reg Ex compiled pattern above
-    keep_list = []
-    [keep_list.extend(re.findall(match_syntax, theresults)) for theresults in initial_results]
+    """Returns the content between a left and a right pattern (regular expressions) in the payloads of a PacketList (or of a .pcap file), as a list of strings.  Built on 'scapypayload_extract_between_patterns', so the payloads are searched as bytes in a single pass, and content that is not valid utf-8 is replaced rather than raising an error.
 
-    # Otherwise, the payload of each packet is decoded as a single string and returned in a list
-    results = keep_list
-    
+    Example:
+        >>> temp_pcap = rdpcap('web.pcap')\n
+        >>> scapypayload_content_between_patterns(temp_pcap, 'Host: ', '\\r\\n')\n
+        ['www.bbc.co.uk', 'www.google.com']
+
+    Args:
+        packet_list (scapy.plist.PacketList): Reference an existing PacketList object, or a .pcap file
+        left_pattern (str): Reference the regular expression before the content
+        right_pattern (str): Reference the regular expression after the content
+        return_packetlist (bool, optional): Unused, kept for compatibility. Defaults to False.
+        ignorecase (bool, optional): If you want to have a case-sensitive pattern match set this to False. Defaults to True.
+
+    Returns:
+        list: Returns a list of strings, one per extracted content
+    """
+    results = [ content.decode(errors='replace') for packet_number, payload_offset, content in scapypayload_extract_between_patterns(packet_list, left_pattern, right_pattern, ignorecase=ignorecase) ]
+#    
     return results
 
 # %%
 #######################################
-def scapypcapreader_mac_address(pcap_file: str, mac: str, dst=False, src=False, notin=False):
+def scapypcapreader_mac_address(pcap_file: str, mac: str, dst=False, src=False, notin=False, use_index=False):
     """Takes a given .pcap file and a partial/full string of a mac address (in the form aa:bb:cc:dd:11:22:33:44) and returns each packet that contains that mac address (or that DOES NOT contain that mac address if the notin=True switch is turned on).
 
     Example:
@@ -960,33 +913,40 @@ def scapypcapreader_mac_address(pcap_file: str, mac: str, dst=False, src=False,
         dst (bool, optional): If you want to only search the [Ether].dst field, set dst=True. Defaults to False.
         src (bool, optional): If you want to only search the [Ether].src field, set src=True. Defaults to False.
         notin (bool, optional): If you want to get every packet that DOES NOT contain a given mac address, set notin=True. Defaults to False.
+        use_index (bool, optional): If you will be running several queries against the same capture, set use_index=True to build (once) and use the sidecar index from 'scapyindex_build' instead of scanning the whole capture on every query. Defaults to False.
 
     Returns:
         scapy.plist.PacketList: Returns a PacketList of the matching packets.
     """
-    import pathlib
+    if dst and src:
+        print("The defaults of this tool will search for the given mac address in both the [Ether].dst and the [Ether].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return PacketList([])
+#
+    if dst:
+        fields = ['dst']
+    elif src:
+        fields = ['src']
+    else:
+        fields = ['src', 'dst']
 #    
-    path_obj = pathlib.Path(pcap_file).resolve().as_posix()
-    pcap_reader = PcapReader(path_obj)
+    if use_index:
+        return scapyindex_mac_address(pcap_file, mac, dst=dst, src=src, notin=notin)
 #    
-    if notin:
-        if dst and src:
-            print("The defaults of this tool will search for the given mac address in both the [Ether].dst and the [Ether].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
-        elif dst:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('Ether') and ( (mac not in pckt['Ether'].dst) ) ]
-        elif src:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('Ether') and ( (mac not in pckt['Ether'].src) ) ]
-        else:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('Ether') and ( (mac not in pckt['Ether'].src) and (mac not in pckt['Ether'].dst) ) ]
-    else:
-        if dst and src:
-            print("The defaults of this tool will search for the given mac address in both the [Ether].dst and the [Ether].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
-        elif dst:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('Ether') and ( (mac in pckt['Ether'].dst) ) ]
-        elif src:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('Ether') and ( (mac in pckt['Ether'].src) ) ]
-        else:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('Ether') and ( (mac in pckt['Ether'].src) or (mac in pckt['Ether'].dst) ) ]
+    # Fast path: match against the raw header bytes, so only the matching packets are dissected by scapy
+    def raw_predicate(headers):
+        if headers['eth_src'] is None:
+            return False
+        is_match = any( mac in scapyraw_format_address(headers['eth_' + f]) for f in fields )
+        return is_match != notin
+#    
+    # Slow path for the packets the raw decoder cannot follow (e.g. MPLS, PPPoE, tunnels)
+    def scapy_predicate(pckt):
+        if not pckt.haslayer('Ether'):
+            return False
+        is_match = any( mac in getattr(pckt['Ether'], f) for f in fields )
+        return is_match != notin
+#    
+    result_list = list( scapyraw_filter(pcap_file, raw_predicate, fallback=scapy_predicate) )
 #
     return PacketList(result_list)
 
@@ -1038,7 +998,7 @@ def scapyget_mac_address(packet_list: scapy.plist.PacketList, mac: str, dst=Fals
 
 # %%
 #######################################
-def scapypcapreader_ip_address(pcap_file: str, ip: str, dst=False, src=False, notin=False):
+def scapypcapreader_ip_address(pcap_file: str, ip: str, dst=False, src=False, notin=False, use_index=False):
     """Takes a given .pcap file and a partial/full string of an ip address and returns each packet that contains that ip address (or that DOES NOT contain that ip address if the notin=True switch is turned on).
 
     Example:
@@ -1054,33 +1014,40 @@ def scapypcapreader_ip_address(pcap_file: str, ip: str, dst=False, src=False, no
         dst (bool, optional): If you want to only search the [IP].dst field, set dst=True. Defaults to False.
         src (bool, optional): If you want to only search the [IP].src field, set src=True. Defaults to False.
         notin (bool, optional): If you want to get every packet that DOES NOT contain a given ip address, set notin=True. Defaults to False.
+        use_index (bool, optional): If you will be running several queries against the same capture, set use_index=True to build (once) and use the sidecar index from 'scapyindex_build' instead of scanning the whole capture on every query. Defaults to False.
 
     Returns:
         scapy.plist.PacketList: Returns a PacketList of the matching packets.
     """
-    import pathlib
+    if dst and src:
+        print("The defaults of this tool will search for the given ip address in both the [IP].dst and the [IP].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return PacketList([])
+#
+    if dst:
+        fields = ['dst']
+    elif src:
+        fields = ['src']
+    else:
+        fields = ['src', 'dst']
 #    
-    path_obj = pathlib.Path(pcap_file).resolve().as_posix()
-    pcap_reader = PcapReader(path_obj)
+    if use_index:
+        return scapyindex_ip_address(pcap_file, ip, dst=dst, src=src, notin=notin)
 #    
-    if notin:
-        if dst and src:
-            print("The defaults of this tool will search for the given ip address in both the [IP].dst and the [IP].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
-        elif dst:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('IP') and ( (ip not in pckt['IP'].dst) ) ]
-        elif src:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('IP') and ( (ip not in pckt['IP'].src) ) ]
-        else:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('IP') and ( (ip not in pckt['IP'].src) and (ip not in pckt['IP'].dst) ) ]
-    else:
-        if dst and src:
-            print("The defaults of this tool will search for the given ip address in both the [IP].dst and the [IP].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
-        elif dst:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('IP') and ( (ip in pckt['IP'].dst) ) ]
-        elif src:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('IP') and ( (ip in pckt['IP'].src) ) ]
-        else:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('IP') and ( (ip in pckt['IP'].src) or (ip in pckt['IP'].dst) ) ]
+    # Fast path: match against the raw header bytes, so only the matching packets are dissected by scapy
+    def raw_predicate(headers):
+        if headers['ip_version'] != 4:
+            return False
+        is_match = any( ip in scapyraw_format_address(headers['ip_' + f]) for f in fields )
+        return is_match != notin
+#    
+    # Slow path for the packets the raw decoder cannot follow (e.g. MPLS, PPPoE, tunnels)
+    def scapy_predicate(pckt):
+        if not pckt.haslayer('IP'):
+            return False
+        is_match = any( ip in getattr(pckt['IP'], f) for f in fields )
+        return is_match != notin
+#    
+    result_list = list( scapyraw_filter(pcap_file, raw_predicate, fallback=scapy_predicate) )
 #
     return PacketList(result_list)
 
@@ -1100,8 +1067,8 @@ def scapysessions_iterator(packet_list: scapy.plist.PacketList):
     Args:
         packet_list (scapy.plist.PacketList): Reference an existing PacketList object
     """
-    for sess_key in packet_list.sessions().keys():
-        session_packet_list = packet_list.sessions()[sess_key]
+    # Calling sessions() once, as every call re-groups the whole PacketList
+    for sess_key, session_packet_list in packet_list.sessions().items():
         print(session_packet_list)
 
 # %%
@@ -1138,7 +1105,5102 @@ def scapysessions_iterator_pcktsummary(packet_list: scapy.plist.PacketList):
     Args:
         packet_list (scapy.plist.PacketList): Reference an existing PacketList object.
     """
-    for sess_key in packet_list.sessions().keys():
-        session_packet_list = packet_list.sessions()[sess_key]
+    # Calling sessions() once, as every call re-groups the whole PacketList
+    for sess_key, session_packet_list in packet_list.sessions().items():
         [print(pckt.summary()) for pckt in session_packet_list]
 
+# %%
+#######################################
+def scapystream_filter(packets, *predicates):
+    """Lazily yields each packet from a given iterable of packets (a PacketList, a PcapReader, or another 'scapystream_*' generator) where every one of the given predicate functions returns True.  The predicates are evaluated in the order given and stop at the first one that returns False.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> packet_stream = scapystream_pcapreader('temp.pcap')\n
+        >>> udp_from_66 = scapystream_filter(packet_stream, lambda p: p.haslayer('UDP'), lambda p: p['IP'].src.startswith('66.'))\n
+        >>> PacketList(list(udp_from_66))\n
+        <PacketList: TCP:0 UDP:1 ICMP:0 Other:0>
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> # Chaining stages, and streaming the results to a new .pcap file\n
+        >>> packet_stream = scapystream_pcapreader('huge.pcap')\n
+        >>> packet_stream = scapystream_filter(packet_stream, lambda p: p.haslayer('TCP'))\n
+        >>> packet_stream = scapystream_ip_address(packet_stream, '10.1.1.1', src=True)\n
+        >>> scapystream_pcapwriter(packet_stream, 'filtered.pcap')\n
+        1523
+
+    Args:
+        packets (iterable): Reference an iterable of packets
+        *predicates (function): Reference one or more functions that take a packet and return True (keep) or False (discard)
+
+    Yields:
+        scapy.layers.l2.Ether: Yields each packet that satisfies all of the predicates
+    """
+    for pckt in packets:
+        if all(predicate(pckt) for predicate in predicates):
+            yield pckt
+
+# %%
+#######################################
+def scapystream_ip_address(packets, ip: str, dst=False, src=False, notin=False):
+    """Streaming version of 'scapyget_ip_address'.  Takes an iterable of packets and a partial/full string of an ip address and lazily yields each packet that contains that ip address (or that DOES NOT contain that ip address if the notin=True switch is turned on).
+
+    Example:
+        >>> packet_stream = scapystream_pcapreader('temp.pcap')\n
+        >>> example = scapystream_ip_address(packet_stream, '185.34.210')\n
+        >>> next(example)\n
+        <Ether  dst=b4:38:91:24:c9:d9 src=a8:81:71:e3:22:61 type=IPv4 |<IP  version=4 ihl=5 tos=0x0 len=32 id=52361 flags=DF frag=0 ttl=1 proto=udp chksum=0xf6a1 src=66.17.1.2 dst=185.34.210.1 |<UDP  sport=58429 dport=10001 len=12 chksum=0x3ce5 |<Raw  load='\x01\x00\x00\x00' |<Padding  load='\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00' |>>>>>
+
+    Args:
+        packets (iterable): Reference an iterable of packets (PacketList, PcapReader, or another 'scapystream_*' generator)
+        ip (str): Reference an ip address
+        dst (bool, optional): If you want to only search the [IP].dst field, set dst=True. Defaults to False.
+        src (bool, optional): If you want to only search the [IP].src field, set src=True. Defaults to False.
+        notin (bool, optional): If you want to get every packet that DOES NOT contain a given ip address, set notin=True. Defaults to False.
+
+    Yields:
+        scapy.layers.l2.Ether: Yields each matching packet
+    """
+    if dst and src:
+        print("The defaults of this tool will search for the given ip address in both the [IP].dst and the [IP].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return
+#    
+    if dst:
+        def is_match(pckt):
+            return ip in pckt['IP'].dst
+    elif src:
+        def is_match(pckt):
+            return ip in pckt['IP'].src
+    else:
+        def is_match(pckt):
+            return (ip in pckt['IP'].src) or (ip in pckt['IP'].dst)
+#    
+    for pckt in packets:
+        if pckt.haslayer('IP') and ( is_match(pckt) != notin ):
+            yield pckt
+
+# %%
+#######################################
+def scapystream_mac_address(packets, mac: str, dst=False, src=False, notin=False):
+    """Streaming version of 'scapyget_mac_address'.  Takes an iterable of packets and a partial/full string of a mac address (in the form aa:bb:cc:dd:11:22) and lazily yields each packet that contains that mac address (or that DOES NOT contain that mac address if the notin=True switch is turned on).
+
+    Example:
+        >>> packet_stream = scapystream_pcapreader('temp.pcap')\n
+        >>> example = scapystream_mac_address(packet_stream, '64:5a', notin=True)\n
+        >>> PacketList(list(example))\n
+        <PacketList: TCP:0 UDP:2 ICMP:0 Other:0>
+
+    Args:
+        packets (iterable): Reference an iterable of packets (PacketList, PcapReader, or another 'scapystream_*' generator)
+        mac (str): Reference a mac address
+        dst (bool, optional): If you want to only search the [Ether].dst field, set dst=True. Defaults to False.
+        src (bool, optional): If you want to only search the [Ether].src field, set src=True. Defaults to False.
+        notin (bool, optional): If you want to get every packet that DOES NOT contain a given mac address, set notin=True. Defaults to False.
+
+    Yields:
+        scapy.layers.l2.Ether: Yields each matching packet
+    """
+    if dst and src:
+        print("The defaults of this tool will search for the given mac address in both the [Ether].dst and the [Ether].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return
+#    
+    if dst:
+        def is_match(pckt):
+            return mac in pckt['Ether'].dst
+    elif src:
+        def is_match(pckt):
+            return mac in pckt['Ether'].src
+    else:
+        def is_match(pckt):
+            return (mac in pckt['Ether'].src) or (mac in pckt['Ether'].dst)
+#    
+    for pckt in packets:
+        if pckt.haslayer('Ether') and ( is_match(pckt) != notin ):
+            yield pckt
+
+# %%
+#######################################
+def scapystream_pcapreader(pcap_file: str):
+    """Lazily yields each packet from a given .pcap file, one at a time, using a PcapReader.  Nothing is held in memory other than the current packet, so this is the starting point for a streaming filter pipeline (see the 'scapystream_*' functions) over very large capture files.
+
+    Example:
+        >>> packet_stream = scapystream_pcapreader('temp.pcap')\n
+        >>> next(packet_stream)\n
+        <Ether  dst=b4:38:91:24:c9:d9 src=a8:81:71:e3:22:61 type=IPv4 |<IP  version=4 ihl=5 tos=0x0 len=32 id=52361 flags=DF frag=0 ttl=1 proto=udp chksum=0xf6a1 src=66.17.1.2 dst=185.34.210.1 |<UDP  sport=58429 dport=10001 len=12 chksum=0x3ce5 |<Raw  load='\x01\x00\x00\x00' |<Padding  load='\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00' |>>>>>
+
+    Args:
+        pcap_file (str): Reference a .pcap file
+
+    Yields:
+        scapy.layers.l2.Ether: Yields each packet in the .pcap file
+    """
+    import pathlib
+#    
+    path_obj = pathlib.Path(pcap_file).resolve().as_posix()
+    pcap_reader = PcapReader(path_obj)
+#    
+    try:
+        for pckt in pcap_reader:
+            yield pckt
+    finally:
+        pcap_reader.close()
+
+# %%
+#######################################
+def scapystream_pcapwriter(packets, output_file: str, append=False):
+    """Writes each packet from a given iterable of packets (such as the generators returned by the 'scapystream_*' functions) to a .pcap file as the packets arrive, so the full set of results never has to be held in memory.
+
+    Example:
+        >>> packet_stream = scapystream_pcapreader('huge.pcap')\n
+        >>> packet_stream = scapystream_tcp_port(packet_stream, 443)\n
+        >>> scapystream_pcapwriter(packet_stream, 'https_only.pcap')\n
+        88412
+
+    Args:
+        packets (iterable): Reference an iterable of packets
+        output_file (str): Reference the path of the .pcap file to write
+        append (bool, optional): If you want to append to an existing .pcap file instead of overwriting it, set append=True. Defaults to False.
+
+    Returns:
+        int: Returns the number of packets written
+    """
+    import pathlib
+#    
+    path_obj = pathlib.Path(output_file).resolve().as_posix()
+    pcap_writer = PcapWriter(path_obj, append=append, sync=False)
+#    
+    packet_count = 0
+    try:
+        for pckt in packets:
+            if isinstance(pckt, ScapyLazyPacket):
+                pckt = pckt.packet
+            pcap_writer.write(pckt)
+            packet_count += 1
+    finally:
+        pcap_writer.close()
+#    
+    return packet_count
+
+# %%
+#######################################
+def scapystream_port(packets, port: int, sport=False, dport=False, notin=False):
+    """Streaming version of 'scapyget_port'.  Takes an iterable of packets and a port number and lazily yields each TCP or UDP packet that has that port in the sport or dport field (or that DOES NOT have that port if the notin=True switch is turned on).
+
+    Example:
+        >>> packet_stream = scapystream_pcapreader('huge.pcap')\n
+        >>> packet_stream = scapystream_ip_address(packet_stream, '10.1.1.1')\n
+        >>> packet_stream = scapystream_port(packet_stream, 53)\n
+        >>> scapystream_pcapwriter(packet_stream, 'dns_for_host.pcap')\n
+        318
+
+    Args:
+        packets (iterable): Reference an iterable of packets (PacketList, PcapReader, or another 'scapystream_*' generator)
+        port (int): Reference a port number
+        sport (bool, optional): If you want to only search the [TCP/UDP].sport field, set sport=True. Defaults to False.
+        dport (bool, optional): If you want to only search the [TCP/UDP].dport field, set dport=True. Defaults to False.
+        notin (bool, optional): If you want to get every TCP/UDP packet that DOES NOT contain the given port, set notin=True. Defaults to False.
+
+    Yields:
+        scapy.layers.l2.Ether: Yields each matching packet
+    """
+    if sport and dport:
+        print("The defaults of this tool will search for the given port in both the [TCP/UDP].sport and the [TCP/UDP].dport fields.  If you only want to search for 'sport' field OR the 'dport' field use, sport=True or dport=True, respectively (but don't turn them both on).")
+        return
+#    
+    if sport:
+        def is_match(layer):
+            return layer.sport == port
+    elif dport:
+        def is_match(layer):
+            return layer.dport == port
+    else:
+        def is_match(layer):
+            return (layer.sport == port) or (layer.dport == port)
+#    
+    for pckt in packets:
+        for proto in ('TCP', 'UDP'):
+            if pckt.haslayer(proto) and ( is_match(pckt[proto]) != notin ):
+                yield pckt
+                break
+
+# %%
+#######################################
+def scapystream_tcp_port(packets, port: int, sport=False, dport=False, notin=False):
+    """Streaming version of 'scapyget_tcp_port'.  Takes an iterable of packets and a port number and lazily yields each TCP packet that has that port in the [TCP].sport or [TCP].dport field (or that DOES NOT have that port if the notin=True switch is turned on).
+
+    Example:
+        >>> packet_stream = scapystream_pcapreader('huge.pcap')\n
+        >>> packet_stream = scapystream_tcp_port(packet_stream, 53, dport=True)\n
+        >>> scapystream_pcapwriter(packet_stream, 'tcp_53.pcap')\n
+        1207
+
+    Args:
+        packets (iterable): Reference an iterable of packets (PacketList, PcapReader, or another 'scapystream_*' generator)
+        port (int): Reference a port number
+        sport (bool, optional): If you want to only search the [TCP].sport field, set sport=True. Defaults to False.
+        dport (bool, optional): If you want to only search the [TCP].dport field, set dport=True. Defaults to False.
+        notin (bool, optional): If you want to get every TCP packet that DOES NOT contain the given port, set notin=True. Defaults to False.
+
+    Yields:
+        scapy.layers.l2.Ether: Yields each matching packet
+    """
+    if sport and dport:
+        print("The defaults of this tool will search for the given port in both the [TCP].sport and the [TCP].dport fields.  If you only want to search for 'sport' field OR the 'dport' field use, sport=True or dport=True, respectively (but don't turn them both on).")
+        return
+#    
+    if sport:
+        def is_match(pckt):
+            return pckt['TCP'].sport == port
+    elif dport:
+        def is_match(pckt):
+            return pckt['TCP'].dport == port
+    else:
+        def is_match(pckt):
+            return (pckt['TCP'].sport == port) or (pckt['TCP'].dport == port)
+#    
+    for pckt in packets:
+        if pckt.haslayer('TCP') and ( is_match(pckt) != notin ):
+            yield pckt
+
+# %%
+#######################################
+def scapystream_udp_port(packets, port: int, sport=False, dport=False, notin=False):
+    """Streaming version of 'scapyget_udp_port'.  Takes an iterable of packets and a port number and lazily yields each UDP packet that has that port in the [UDP].sport or [UDP].dport field (or that DOES NOT have that port if the notin=True switch is turned on).
+
+    Example:
+        >>> packet_stream = scapystream_pcapreader('huge.pcap')\n
+        >>> packet_stream = scapystream_udp_port(packet_stream, 53, dport=True)\n
+        >>> scapystream_pcapwriter(packet_stream, 'udp_53.pcap')\n
+        1207
+
+    Args:
+        packets (iterable): Reference an iterable of packets (PacketList, PcapReader, or another 'scapystream_*' generator)
+        port (int): Reference a port number
+        sport (bool, optional): If you want to only search the [UDP].sport field, set sport=True. Defaults to False.
+        dport (bool, optional): If you want to only search the [UDP].dport field, set dport=True. Defaults to False.
+        notin (bool, optional): If you want to get every UDP packet that DOES NOT contain the given port, set notin=True. Defaults to False.
+
+    Yields:
+        scapy.layers.l2.Ether: Yields each matching packet
+    """
+    if sport and dport:
+        print("The defaults of this tool will search for the given port in both the [UDP].sport and the [UDP].dport fields.  If you only want to search for 'sport' field OR the 'dport' field use, sport=True or dport=True, respectively (but don't turn them both on).")
+        return
+#    
+    if sport:
+        def is_match(pckt):
+            return pckt['UDP'].sport == port
+    elif dport:
+        def is_match(pckt):
+            return pckt['UDP'].dport == port
+    else:
+        def is_match(pckt):
+            return (pckt['UDP'].sport == port) or (pckt['UDP'].dport == port)
+#    
+    for pckt in packets:
+        if pckt.haslayer('UDP') and ( is_match(pckt) != notin ):
+            yield pckt
+
+# %%
+#######################################
+def scapyraw_filter(pcap_file: str, predicate, fallback=None):
+    """Fast path filter for large .pcap files.  Reads the raw records of the file, decodes only the header fields with 'scapyraw_parse_headers', and passes that dict of fields to the given predicate.  Only the packets where the predicate returns True are dissected by scapy and yielded, which avoids paying for a full dissection of every packet in the file.
+
+    If a 'fallback' function is given, it is used for the frames the raw decoder could not follow (headers['unparsed'] is True, e.g. MPLS, PPPoE or tunnelled traffic).  Those packets are dissected by scapy and passed to the fallback, which should return True or False the same way a 'scapyget_*' style comprehension would.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> https_packets = scapyraw_filter('huge.pcap', lambda h: h['ip_proto'] == 6 and 443 in (h['sport'], h['dport']))\n
+        >>> PacketList(list(https_packets))\n
+        <PacketList: TCP:88412 UDP:0 ICMP:0 Other:0>
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> # Streaming the survivors straight to a new .pcap file\n
+        >>> scapystream_pcapwriter(scapyraw_filter('huge.pcap', lambda h: h['vlan'] == (5,)), 'vlan5.pcap')\n
+        1420
+
+    Args:
+        pcap_file (str): Reference a .pcap file
+        predicate (function): Reference a function that receives the dict returned by 'scapyraw_parse_headers' and returns True (keep) or False (discard)
+        fallback (function, optional): Reference a function that receives a scapy packet for the frames the raw decoder could not follow. Defaults to None (those frames are judged by the predicate alone).
+
+    Yields:
+        scapy.packet.Packet: Yields each matching packet as a scapy packet
+    """
+    for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(pcap_file):
+        headers = scapyraw_parse_headers(frame, linktype)
+        if fallback and headers['unparsed']:
+            pckt = scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen)
+            if fallback(pckt):
+                yield pckt
+        elif predicate(headers):
+            yield scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen)
+
+# %%
+#######################################
+def scapyraw_format_address(address: bytes):
+    """Converts the raw bytes of an address, as returned by 'scapyraw_parse_headers', to the same string form scapy uses: dotted-quad for a 4 byte IPv4 address, compressed hex for a 16 byte IPv6 address, and lowercase colon separated hex for a 6 byte mac address.
+
+    Examples:
+        >>> scapyraw_format_address(b'B\\x11\\x01\\x02')\n
+        '66.17.1.2'
+        >>> scapyraw_format_address(b'\\xb48\\x91$\\xc9\\xd9')\n
+        'b4:38:91:24:c9:d9'
+
+    Args:
+        address (bytes): Reference the raw bytes of an ip or mac address
+
+    Returns:
+        str: Returns the address as a string (or None if no address was given)
+    """
+    import socket
+#    
+    if address is None:
+        return None
+    if len(address) == 4:
+        return socket.inet_ntop(socket.AF_INET, address)
+    if len(address) == 16:
+        return socket.inet_ntop(socket.AF_INET6, address)
+    return address.hex(':')
+
+# %%
+#######################################
+def scapyraw_frame_to_packet(frame: bytes, timestamp_ns=None, linktype=1, wirelen=None):
+    """Turns a raw frame (such as one yielded by 'scapyraw_pcap_records') into a fully dissected scapy packet, with the packet.time and packet.wirelen set the same way a PcapReader would set them.  Use this only on the packets that survive a raw filter, so that the cost of the scapy dissection is only paid for the packets you keep.
+
+    Example:
+        >>> ts_ns, offset, frame, wirelen, linktype = next(scapyraw_pcap_records('temp.pcap'))\n
+        >>> pckt = scapyraw_frame_to_packet(frame, ts_ns, linktype, wirelen)\n
+        >>> pckt.summary()\n
+        'Ether / IP / UDP 66.17.1.2:58429 > 185.34.210.1:10001 / Raw / Padding'
+        >>> pckt.time\n
+        1629217872.080297
+
+    Args:
+        frame (bytes): Reference the raw bytes of a frame
+        timestamp_ns (int, optional): Reference the epoch timestamp of the frame in nanoseconds. Defaults to None.
+        linktype (int, optional): Reference the pcap linktype of the frame. Defaults to 1 (Ethernet).
+        wirelen (int, optional): Reference the original length of the packet on the wire. Defaults to None.
+
+    Returns:
+        scapy.packet.Packet: Returns a scapy packet
+    """
+    try:
+        layer_class = conf.l2types[linktype]
+    except KeyError:
+        layer_class = conf.raw_layer
+#    
+    pckt = layer_class(bytes(frame))
+    if timestamp_ns is not None:
+        pckt.time = EDecimal(timestamp_ns) / 1000000000
+    pckt.wirelen = wirelen
+    return pckt
+
+# %%
+#######################################
+def scapyraw_parse_headers(frame: bytes, linktype=1):
+    """Decodes only the header fields of a raw frame that the filters need (Ethernet / 802.1Q VLAN / IPv4 / IPv6 / TCP / UDP / ICMP), using struct on the raw bytes instead of a full scapy dissection.  Returns a dict with every key always present (fields of layers that are not in the frame are None).
+
+    The 'unparsed' key is True when the frame uses an encapsulation this decoder does not follow (an unknown linktype or ethertype, or an IP tunnel), meaning a full scapy dissection might still find an IP layer deeper in the packet.
+
+    Example:
+        >>> ts_ns, offset, frame, wirelen, linktype = next(scapyraw_pcap_records('temp.pcap'))\n
+        >>> headers = scapyraw_parse_headers(frame, linktype)\n
+        >>> scapyraw_format_address(headers['ip_src']), scapyraw_format_address(headers['ip_dst']), headers['sport'], headers['dport']\n
+        ('66.17.1.2', '185.34.210.1', 58429, 10001)
+
+    Args:
+        frame (bytes): Reference the raw bytes of a frame (bytes, bytearray or memoryview)
+        linktype (int, optional): Reference the pcap linktype of the frame (1 = Ethernet, 101 = Raw IP, 228 = IPv4, 229 = IPv6). Defaults to 1.
+
+    Returns:
+        dict: Returns a dict of the decoded header fields
+    """
+    import struct
+#    
+    headers = {
+        'linktype': linktype, 'unparsed': False,
+        'eth_dst': None, 'eth_src': None, 'ethertype': None, 'vlan': (),
+        'ip_version': None, 'ip_offset': None, 'ip_end': None, 'ip_src': None, 'ip_dst': None, 'ip_proto': None, 'ip_fragment': False,
+        'l4_offset': None, 'sport': None, 'dport': None, 'tcp_seq': None, 'tcp_ack': None, 'tcp_flags': None, 'icmp_type': None, 'icmp_code': None,
+        'payload_offset': None, 'payload_len': 0,
+    }
+    frame_len = len(frame)
+#    
+    # Link layer
+    if linktype == 1:
+        if frame_len < 14:
+            return headers
+        headers['eth_dst'] = bytes(frame[0:6])
+        headers['eth_src'] = bytes(frame[6:12])
+        ethertype = struct.unpack_from('!H', frame, 12)[0]
+        offset = 14
+        vlan_ids = []
+        while ethertype in (0x8100, 0x88A8, 0x9100) and frame_len >= offset + 4:
+            tci, ethertype = struct.unpack_from('!HH', frame, offset)
+            vlan_ids.append(tci & 0x0FFF)
+            offset += 4
+        headers['vlan'] = tuple(vlan_ids)
+        headers['ethertype'] = ethertype
+        if ethertype == 0x0800:
+            ip_version = 4
+        elif ethertype == 0x86DD:
+            ip_version = 6
+        else:
+            # ARP (and anything else with no IP layer) is fully handled here, other ethertypes (MPLS, PPPoE, ...) are not
+            headers['unparsed'] = ethertype not in (0x0806, 0x8035, 0x88CC)
+            return headers
+    elif linktype in (101, 228, 229, 12, 14):
+        if frame_len < 1:
+            return headers
+        offset = 0
+        ip_version = frame[0] >> 4
+    else:
+        headers['unparsed'] = True
+        return headers
+#    
+    # Network layer
+    if ip_version == 4:
+        if frame_len < offset + 20:
+            return headers
+        ver_ihl, total_length, frag_field, ip_proto = struct.unpack_from('!BxHxxHxB', frame, offset)
+        ihl = (ver_ihl & 0x0F) * 4
+        headers['ip_src'] = bytes(frame[offset + 12:offset + 16])
+        headers['ip_dst'] = bytes(frame[offset + 16:offset + 20])
+        ip_end = min(offset + total_length, frame_len) if total_length >= ihl else frame_len
+        l4_offset = offset + ihl
+        # Only the first fragment carries the transport header
+        is_fragment = bool(frag_field & 0x3FFF)
+        first_fragment = (frag_field & 0x1FFF) == 0
+    elif ip_version == 6:
+        if frame_len < offset + 40:
+            return headers
+        payload_length, ip_proto = struct.unpack_from('!HB', frame, offset + 4)
+        headers['ip_src'] = bytes(frame[offset + 8:offset + 24])
+        headers['ip_dst'] = bytes(frame[offset + 24:offset + 40])
+        ip_end = min(offset + 40 + payload_length, frame_len)
+        l4_offset = offset + 40
+        is_fragment = False
+        first_fragment = True
+        # Walk the extension headers: hop-by-hop, routing, fragment, destination options, authentication
+        while ip_proto in (0, 43, 44, 51, 60) and ip_end >= l4_offset + 8:
+            next_header, ext_len = struct.unpack_from('!BB', frame, l4_offset)
+            if ip_proto == 44:
+                is_fragment = True
+                first_fragment = (struct.unpack_from('!H', frame, l4_offset + 2)[0] & 0xFFF8) == 0
+                ext_size = 8
+            elif ip_proto == 51:
+                ext_size = (ext_len + 2) * 4
+            else:
+                ext_size = (ext_len + 1) * 8
+            ip_proto = next_header
+            l4_offset += ext_size
+    else:
+        headers['unparsed'] = True
+        return headers
+#    
+    headers['ip_version'] = ip_version
+    headers['ip_offset'] = offset
+    headers['ip_end'] = ip_end
+    headers['ip_proto'] = ip_proto
+    headers['ip_fragment'] = is_fragment
+    if ip_proto in (4, 41, 47):
+        # IP-in-IP, IPv6-in-IP and GRE tunnels
+        headers['unparsed'] = True
+    if not first_fragment:
+        return headers
+#    
+    # Transport layer
+    if ip_proto == 6 and ip_end >= l4_offset + 20:
+        sport, dport, seq, ack, dataofs, flags = struct.unpack_from('!HHIIBB', frame, l4_offset)
+        headers['sport'] = sport
+        headers['dport'] = dport
+        headers['tcp_seq'] = seq
+        headers['tcp_ack'] = ack
+        headers['tcp_flags'] = flags
+        payload_offset = l4_offset + (dataofs >> 4) * 4
+    elif ip_proto == 17 and ip_end >= l4_offset + 8:
+        sport, dport = struct.unpack_from('!HH', frame, l4_offset)
+        headers['sport'] = sport
+        headers['dport'] = dport
+        payload_offset = l4_offset + 8
+    elif ip_proto in (1, 58) and ip_end >= l4_offset + 8:
+        headers['icmp_type'], headers['icmp_code'] = struct.unpack_from('!BB', frame, l4_offset)
+        payload_offset = l4_offset + 8
+    else:
+        return headers
+    headers['l4_offset'] = l4_offset
+    headers['payload_offset'] = payload_offset
+    headers['payload_len'] = max(ip_end - payload_offset, 0)
+#    
+    return headers
+
+# %%
+#######################################
+def scapyraw_pcap_records(pcap_file: str, start_offset=None, end_offset=None):
+    """Lazily yields the raw records of a given .pcap file without handing any of the bytes to scapy for dissection.  Each record is returned as a tuple of: (timestamp_ns, file_offset, frame, wirelen, linktype), where 'timestamp_ns' is the integer epoch time in nanoseconds, 'file_offset' is the byte offset of the record header in the file, and 'frame' is the captured bytes of the packet.
+
+    pcapng files are decoded natively (see 'scapyraw_pcapng_walk'), with every interface's linktype and timestamp resolution, in which case the 'file_offset' is None and passing a start_offset or end_offset raises a ValueError.  See 'scapyraw_mmap_records' for a memory-mapped version, and 'scapyraw_mmap_open' for random access by record index.
+
+    This is the fast path used by the 'scapyraw_*' functions.  The frames can be decoded with 'scapyraw_parse_headers', and only the packets of interest turned into scapy objects with 'scapyraw_frame_to_packet'.
+
+    Example:
+        >>> records = scapyraw_pcap_records('temp.pcap')\n
+        >>> next(records)\n
+        (1629217872080297000, 24, b'\\xb48\\x91$\\xc9\\xd9\\xa8\\x81q\\xe3"a\\x08\\x00E\\x00\\x00 \\xcc\\x89@\\x00\\x01\\x11\\xf6\\xa1B\\x11\\x01\\x02\\xb9"\\xd2\\x01\\xe4=\\'\\x11\\x00\\x0c<\\xe5\\x01\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00', 60, 1)
+
+    Reference:
+        https://wiki.wireshark.org/Development/LibpcapFileFormat
+
+    Args:
+        pcap_file (str): Reference a .pcap file
+        start_offset (int, optional): Reference the file offset of a record to start reading from (e.g. where a previous pass stopped on a capture that is still growing). Defaults to None (the first record).
+        end_offset (int, optional): Reference the file offset to stop reading at, so that a byte range of the file (see 'scapyraw_pcap_shards') can be read on its own. Defaults to None (the end of the file).
+
+    Yields:
+        tuple: Yields a tuple of (timestamp_ns, file_offset, frame, wirelen, linktype) for each record
+    """
+    import pathlib
+    import struct
+#    
+    path_obj = pathlib.Path(pcap_file).resolve()
+#    
+    with path_obj.open('rb', buffering=1 << 20) as f:
+        global_header = f.read(24)
+        if len(global_header) < 24:
+            return
+#        
+        if global_header[:4] == b'\x0a\x0d\x0d\x0a':
+            if start_offset or end_offset is not None:
+                raise ValueError(f"'{pcap_file}' is a pcapng file, which cannot be read from or to a record offset (start_offset / end_offset are only for libpcap files)")
+            for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_mmap_records(path_obj.as_posix()):
+                yield (timestamp_ns, None, bytes(frame), wirelen, linktype)
+            return
+        pcap_header = scapyraw_pcap_global_header(global_header)
+        endian = pcap_header['endian']
+        ns_multiplier = pcap_header['ns_multiplier']
+        linktype = pcap_header['linktype']
+#        
+        record_header = struct.Struct(endian + 'IIII')
+        read = f.read
+        file_offset = 24
+        if start_offset:
+            f.seek(start_offset)
+            file_offset = start_offset
+        while end_offset is None or file_offset < end_offset:
+            header_bytes = read(16)
+            if len(header_bytes) < 16:
+                break
+            ts_sec, ts_frac, caplen, wirelen = record_header.unpack(header_bytes)
+            frame = read(caplen)
+            if len(frame) < caplen:
+                # Truncated final record (e.g. a capture that is still being written)
+                break
+            yield (ts_sec * 1000000000 + ts_frac * ns_multiplier, file_offset, frame, wirelen, linktype)
+            file_offset += 16 + caplen
+
+# %%
+#######################################
+def scapyconvert_packets_to_numpy_table(packet_source):
+    """Converts a PacketList (or a .pcap file) to a columnar NumPy structured array with one row per packet, so that queries over the whole capture can be run as vectorized masks and sorts (see the 'scapynumpy_*' functions) instead of Python loops over scapy objects.
+
+    Columns:
+        timestamp (float64), timestamp_ns (int64), src_ip / dst_ip (uint32, IPv4 only, 0 otherwise), ip_version (uint8), protocol (uint8, the IP protocol number), sport / dport (uint16), length (uint32, the original length of the packet), tcp_seq / tcp_ack (uint32), tcp_flags (uint8), file_offset (int64, the byte offset of the record in the .pcap file, or -1 if unknown)
+
+    When given a .pcap file, the headers are decoded straight from the raw records with 'scapyraw_parse_headers', so no scapy dissection happens at all.
+
+    Example:
+        >>> table = scapyconvert_packets_to_numpy_table('temp.pcap')\n
+        >>> table.shape\n
+        (118,)
+        >>> table[0]['sport'], table[0]['dport'], table[0]['protocol'], table[0]['length']\n
+        (np.uint16(22), np.uint16(1046), np.uint8(6), np.uint32(178))
+
+    Args:
+        packet_source (scapy.plist.PacketList | str): Reference an existing PacketList object, or the path of a .pcap file
+
+    Returns:
+        numpy.ndarray: Returns a NumPy structured array with one row per packet
+    """
+    import numpy as np
+    from decimal import Decimal
+#    
+    table_dtype = np.dtype([
+        ('timestamp', 'f8'), ('timestamp_ns', 'i8'),
+        ('src_ip', 'u4'), ('dst_ip', 'u4'), ('ip_version', 'u1'), ('protocol', 'u1'),
+        ('sport', 'u2'), ('dport', 'u2'), ('length', 'u4'),
+        ('tcp_seq', 'u4'), ('tcp_ack', 'u4'), ('tcp_flags', 'u1'),
+        ('file_offset', 'i8'),
+    ])
+#    
+    if isinstance(packet_source, str):
+        records = scapyraw_pcap_records(packet_source)
+    else:
+        # Re-using the bytes of the already dissected packets, and the linktype of the first layer of each packet
+        def packetlist_records(packet_list):
+            for pckt in packet_list:
+                frame = bytes(pckt)
+                linktype = conf.l2types.layer2num.get(type(pckt), 1)
+                timestamp_ns = int(Decimal(str(pckt.time)) * 1000000000)
+                yield (timestamp_ns, None, frame, getattr(pckt, 'wirelen', None) or len(frame), linktype)
+        records = packetlist_records(packet_source)
+#    
+    rows = []
+    for timestamp_ns, file_offset, frame, wirelen, linktype in records:
+        headers = scapyraw_parse_headers(frame, linktype)
+        if headers['ip_version'] == 4:
+            src_ip = int.from_bytes(headers['ip_src'], 'big')
+            dst_ip = int.from_bytes(headers['ip_dst'], 'big')
+        else:
+            src_ip = dst_ip = 0
+        rows.append((
+            timestamp_ns / 1e9, timestamp_ns,
+            src_ip, dst_ip, headers['ip_version'] or 0, headers['ip_proto'] or 0,
+            headers['sport'] or 0, headers['dport'] or 0, wirelen or len(frame),
+            headers['tcp_seq'] or 0, headers['tcp_ack'] or 0, headers['tcp_flags'] or 0,
+            -1 if file_offset is None else file_offset,
+        ))
+#    
+    return np.array(rows, dtype=table_dtype)
+
+# %%
+#######################################
+def scapynumpy_ip_address(table, ip: str, dst=False, src=False, notin=False):
+    """Vectorized ip address filter for a packet table (from 'scapyconvert_packets_to_numpy_table' or 'scapynumpy_load_table').  Takes a full IPv4 address or a CIDR network and returns the rows of the IPv4 packets that contain that address (or that DO NOT contain that address if the notin=True switch is turned on).
+
+    Examples:
+        >>> table = scapynumpy_load_table('temp.pcap')\n
+        >>> len(scapynumpy_ip_address(table, '185.34.210.1'))\n
+        1
+        >>> len(scapynumpy_ip_address(table, '185.34.210.0/24'))\n
+        1
+
+    Args:
+        table (numpy.ndarray): Reference a packet table
+        ip (str): Reference an IPv4 address, or an IPv4 network in CIDR notation
+        dst (bool, optional): If you want to only search the dst_ip column, set dst=True. Defaults to False.
+        src (bool, optional): If you want to only search the src_ip column, set src=True. Defaults to False.
+        notin (bool, optional): If you want to get every packet that DOES NOT contain a given ip address, set notin=True. Defaults to False.
+
+    Returns:
+        numpy.ndarray: Returns the matching rows of the packet table
+    """
+    import ipaddress
+    import numpy as np
+#    
+    if dst and src:
+        print("The defaults of this tool will search for the given ip address in both the [IP].dst and the [IP].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return table[:0]
+#    
+    network = ipaddress.IPv4Network(ip, strict=False)
+    netmask = np.uint32(int(network.netmask))
+    network_address = np.uint32(int(network.network_address))
+#    
+    if dst:
+        ip_mask = (table['dst_ip'] & netmask) == network_address
+    elif src:
+        ip_mask = (table['src_ip'] & netmask) == network_address
+    else:
+        ip_mask = ((table['src_ip'] & netmask) == network_address) | ((table['dst_ip'] & netmask) == network_address)
+#    
+    if notin:
+        ip_mask = ~ip_mask
+    return table[ (table['ip_version'] == 4) & ip_mask ]
+
+# %%
+#######################################
+def scapynumpy_load_table(pcap_file: str, npz_file=None, rebuild=False):
+    """Returns the packet table for a given .pcap file, loading it from the .npz cache next to the .pcap file when that cache is still valid (same file size and modification time), and otherwise building it with 'scapyconvert_packets_to_numpy_table' and saving a fresh cache with 'scapynumpy_save_table'.  The first call on a capture pays for one pass over the file, and the calls after that only cost the time to load the table.
+
+    Example:
+        >>> table = scapynumpy_load_table('huge.pcap')\n
+        >>> https_rows = scapynumpy_tcp_port(table, 443)\n
+        >>> len(https_rows)\n
+        88412
+
+    Args:
+        pcap_file (str): Reference a .pcap file
+        npz_file (str, optional): Reference the path of the cache file. Defaults to None (the .pcap file path + '.npz').
+        rebuild (bool, optional): If you want to ignore any existing cache and rebuild the table, set rebuild=True. Defaults to False.
+
+    Returns:
+        numpy.ndarray: Returns a NumPy structured array with one row per packet
+    """
+    import pathlib
+    import numpy as np
+#    
+    pcap_path_obj = pathlib.Path(pcap_file).resolve()
+    if npz_file:
+        npz_path_obj = pathlib.Path(npz_file).resolve()
+    else:
+        npz_path_obj = pcap_path_obj.with_name(pcap_path_obj.name + '.npz')
+#    
+    if npz_path_obj.is_file() and not rebuild:
+        pcap_stat = pcap_path_obj.stat()
+        with np.load(npz_path_obj.as_posix()) as cache:
+            if int(cache['pcap_size']) == pcap_stat.st_size and int(cache['pcap_mtime_ns']) == pcap_stat.st_mtime_ns:
+                return cache['table']
+#    
+    table = scapyconvert_packets_to_numpy_table(pcap_path_obj.as_posix())
+    scapynumpy_save_table(table, pcap_path_obj.as_posix(), npz_path_obj.as_posix())
+    return table
+
+# %%
+#######################################
+def scapynumpy_min_timestamp(table):
+    """Vectorized version of 'scapyget_min_timestamp' for a packet table.  Returns the smallest timestamp in the table.
+
+    Example:
+        >>> table = scapynumpy_load_table('temp.pcap')\n
+        >>> scapynumpy_min_timestamp(table)\n
+        1629217872.080297
+
+    Args:
+        table (numpy.ndarray): Reference a packet table
+
+    Returns:
+        float: Returns the smallest epoch timestamp in the table
+    """
+    smallest_timestamp_ns = int(table['timestamp_ns'].min())
+    return smallest_timestamp_ns / 1e9
+
+# %%
+#######################################
+def scapynumpy_orderby_timestamp(table):
+    """Vectorized version of 'scapy_orderby_timestamp' for a packet table.  Returns the rows of the table sorted by their nanosecond timestamp (packets with the same timestamp keep their original order).
+
+    Example:
+        >>> table = scapynumpy_load_table('temp.pcap')\n
+        >>> ordered = scapynumpy_orderby_timestamp(table)\n
+        >>> bool((ordered['timestamp_ns'][1:] >= ordered['timestamp_ns'][:-1]).all())\n
+        True
+
+    Args:
+        table (numpy.ndarray): Reference a packet table
+
+    Returns:
+        numpy.ndarray: Returns the rows of the packet table in timestamp order
+    """
+    import numpy as np
+#    
+    return table[ np.argsort(table['timestamp_ns'], kind='stable') ]
+
+# %%
+#######################################
+def scapynumpy_port(table, port: int, sport=False, dport=False, notin=False):
+    """Vectorized version of 'scapyget_port' for a packet table (from 'scapyconvert_packets_to_numpy_table' or 'scapynumpy_load_table').  Returns the rows of the TCP/UDP packets that have the given port in the sport or dport column (or that DOES NOT have that port if the notin=True switch is turned on).
+
+    Example:
+        >>> table = scapynumpy_load_table('temp.pcap')\n
+        >>> scapynumpy_port(table, 22)['length']\n
+        array([178,  60, 146, ...,  60, 146,  60], dtype=uint32)
+
+    Args:
+        table (numpy.ndarray): Reference a packet table
+        port (int): Reference a port number
+        sport (bool, optional): If you want to only search the sport column, set sport=True. Defaults to False.
+        dport (bool, optional): If you want to only search the dport column, set dport=True. Defaults to False.
+        notin (bool, optional): If you want to get every TCP/UDP packet that DOES NOT contain the given port, set notin=True. Defaults to False.
+
+    Returns:
+        numpy.ndarray: Returns the matching rows of the packet table
+    """
+    import numpy as np
+#    
+    if sport and dport:
+        print("The defaults of this tool will search for the given port in both the [TCP/UDP].sport and the [TCP/UDP].dport fields.  If you only want to search for 'sport' field OR the 'dport' field use, sport=True or dport=True, respectively (but don't turn them both on).")
+        return table[:0]
+#    
+    if sport:
+        port_mask = table['sport'] == port
+    elif dport:
+        port_mask = table['dport'] == port
+    else:
+        port_mask = (table['sport'] == port) | (table['dport'] == port)
+#    
+    if notin:
+        port_mask = ~port_mask
+    return table[ np.isin(table['protocol'], (6, 17)) & port_mask ]
+
+# %%
+#######################################
+def scapynumpy_save_table(table, pcap_file: str, npz_file=None):
+    """Saves a packet table (from 'scapyconvert_packets_to_numpy_table') as an .npz cache file next to the .pcap file it was built from.  The size and modification time of the .pcap file are stored with the table, so that 'scapynumpy_load_table' can tell when the cache is stale.
+
+    Example:
+        >>> table = scapyconvert_packets_to_numpy_table('temp.pcap')\n
+        >>> scapynumpy_save_table(table, 'temp.pcap')\n
+        '/home/user/pcaps/temp.pcap.npz'
+
+    Args:
+        table (numpy.ndarray): Reference a packet table
+        pcap_file (str): Reference the .pcap file the table was built from
+        npz_file (str, optional): Reference the path of the cache file. Defaults to None (the .pcap file path + '.npz').
+
+    Returns:
+        str: Returns the path of the .npz cache file
+    """
+    import pathlib
+    import numpy as np
+#    
+    pcap_path_obj = pathlib.Path(pcap_file).resolve()
+    if npz_file:
+        npz_path_obj = pathlib.Path(npz_file).resolve()
+    else:
+        npz_path_obj = pcap_path_obj.with_name(pcap_path_obj.name + '.npz')
+#    
+    pcap_stat = pcap_path_obj.stat()
+    # Writing through a file handle, so that numpy does not add a second '.npz' to the name
+    with npz_path_obj.open('wb') as f:
+        np.savez(f, table=table, pcap_size=pcap_stat.st_size, pcap_mtime_ns=pcap_stat.st_mtime_ns)
+#    
+    return npz_path_obj.as_posix()
+
+# %%
+#######################################
+def scapynumpy_tcp_port(table, port: int, sport=False, dport=False, notin=False):
+    """Vectorized version of 'scapyget_tcp_port' for a packet table (from 'scapyconvert_packets_to_numpy_table' or 'scapynumpy_load_table').  Returns the rows of the TCP packets that have the given port in the sport or dport column (or that DOES NOT have that port if the notin=True switch is turned on).
+
+    Example:
+        >>> table = scapynumpy_load_table('temp.pcap')\n
+        >>> scapynumpy_tcp_port(table, 22)['length']\n
+        array([178,  60, 146, ...,  60, 146,  60], dtype=uint32)
+
+    Args:
+        table (numpy.ndarray): Reference a packet table
+        port (int): Reference a port number
+        sport (bool, optional): If you want to only search the sport column, set sport=True. Defaults to False.
+        dport (bool, optional): If you want to only search the dport column, set dport=True. Defaults to False.
+        notin (bool, optional): If you want to get every TCP packet that DOES NOT contain the given port, set notin=True. Defaults to False.
+
+    Returns:
+        numpy.ndarray: Returns the matching rows of the packet table
+    """
+    if sport and dport:
+        print("The defaults of this tool will search for the given port in both the [TCP].sport and the [TCP].dport fields.  If you only want to search for 'sport' field OR the 'dport' field use, sport=True or dport=True, respectively (but don't turn them both on).")
+        return table[:0]
+#    
+    if sport:
+        port_mask = table['sport'] == port
+    elif dport:
+        port_mask = table['dport'] == port
+    else:
+        port_mask = (table['sport'] == port) | (table['dport'] == port)
+#    
+    if notin:
+        port_mask = ~port_mask
+    return table[ (table['protocol'] == 6) & port_mask ]
+
+# %%
+#######################################
+def scapynumpy_udp_port(table, port: int, sport=False, dport=False, notin=False):
+    """Vectorized version of 'scapyget_udp_port' for a packet table (from 'scapyconvert_packets_to_numpy_table' or 'scapynumpy_load_table').  Returns the rows of the UDP packets that have the given port in the sport or dport column (or that DOES NOT have that port if the notin=True switch is turned on).
+
+    Example:
+        >>> table = scapynumpy_load_table('temp.pcap')\n
+        >>> scapynumpy_udp_port(table, 22)['length']\n
+        array([178,  60, 146, ...,  60, 146,  60], dtype=uint32)
+
+    Args:
+        table (numpy.ndarray): Reference a packet table
+        port (int): Reference a port number
+        sport (bool, optional): If you want to only search the sport column, set sport=True. Defaults to False.
+        dport (bool, optional): If you want to only search the dport column, set dport=True. Defaults to False.
+        notin (bool, optional): If you want to get every UDP packet that DOES NOT contain the given port, set notin=True. Defaults to False.
+
+    Returns:
+        numpy.ndarray: Returns the matching rows of the packet table
+    """
+    if sport and dport:
+        print("The defaults of this tool will search for the given port in both the [UDP].sport and the [UDP].dport fields.  If you only want to search for 'sport' field OR the 'dport' field use, sport=True or dport=True, respectively (but don't turn them both on).")
+        return table[:0]
+#    
+    if sport:
+        port_mask = table['sport'] == port
+    elif dport:
+        port_mask = table['dport'] == port
+    else:
+        port_mask = (table['sport'] == port) | (table['dport'] == port)
+#    
+    if notin:
+        port_mask = ~port_mask
+    return table[ (table['protocol'] == 17) & port_mask ]
+
+# %%
+#######################################
+def scapyindex_build(pcap_file: str, index_file=None, rebuild=False):
+    """Builds (or updates) a sidecar index for a .pcap file that records, for every IP address, mac address and 5-tuple flow, the byte offsets of the pcap records that contain it.  Later queries (see 'scapyindex_ip_address', 'scapyindex_mac_address' and 'scapyindex_flow') can then seek straight to the matching records instead of re-scanning the whole capture.
+
+    The records are grouped by their (mac_src, mac_dst, ip_src, ip_dst, flow), and the byte offsets of each group are stored once, in a binary offsets file next to the capture ('<pcap_file>.index.offsets').  The index itself ('<pcap_file>.index.json') only maps each address and flow to the ids of its groups, so a query reads the small JSON index and then just the offsets of the groups it matched (see 'scapyindex_offsets').  If the capture has not changed, the saved index is returned as-is.  If the capture has grown (e.g. it is still being written) and its first and last indexed records are unchanged, only the new records are scanned and added to the index.  Anything else (a capture that shrank or was replaced) triggers a full rebuild.
+
+    Example:
+        >>> index = scapyindex_build('temp.pcap')\n
+        >>> index['packet_count']\n
+        118
+        >>> list(index['flows'])[:2]\n
+        ['TCP 27.72.5.247:22 > 84.67.6.14:1046', 'TCP 84.67.6.14:1046 > 27.72.5.247:22']
+        >>> scapyindex_offsets(index, index['ip_dst']['185.34.210.1'])\n
+        [10411]
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        index_file (str, optional): Reference the path of the index file. Defaults to None (the .pcap file path + '.index.json').
+        rebuild (bool, optional): If you want to ignore any existing index and rebuild it, set rebuild=True. Defaults to False.
+
+    Returns:
+        dict: Returns the index
+    """
+    import array
+    import json
+    import pathlib
+    import zlib
+#    
+    pcap_path_obj = pathlib.Path(pcap_file).resolve()
+    if index_file:
+        index_path_obj = pathlib.Path(index_file).resolve()
+    else:
+        index_path_obj = pcap_path_obj.with_name(pcap_path_obj.name + '.index.json')
+    offsets_path_obj = index_path_obj.with_name(index_path_obj.name.rsplit('.json', 1)[0] + '.offsets')
+#    
+    def record_check(f, file_offset):
+        # The crc32 of a record's header and frame, to tell whether the bytes at an indexed offset are still the same record
+        f.seek(file_offset)
+        record_header = f.read(16)
+        if len(record_header) < 16:
+            return None
+        caplen = int.from_bytes(record_header[8:12], 'little' if pcap_global_header[:8] in ('d4c3b2a1', '4d3cb2a1') else 'big')
+        return zlib.crc32(record_header + f.read(caplen))
+#    
+    pcap_stat = pcap_path_obj.stat()
+    with pcap_path_obj.open('rb') as f:
+        pcap_global_header = f.read(24).hex()
+#    
+        index = None
+        if index_path_obj.is_file() and offsets_path_obj.is_file() and not rebuild:
+            index = json.loads(index_path_obj.read_text())
+            index['offsets_path'] = offsets_path_obj.as_posix()
+            if index.get('groups') is None or index.get('check_records') is None:
+                # An index in an older layout
+                index = None
+            elif index['pcap_size'] == pcap_stat.st_size and index['pcap_mtime_ns'] == pcap_stat.st_mtime_ns:
+                return index
+            # Only a capture that has grown (same global header, same first and last indexed records) can be indexed incrementally
+            elif index['pcap_global_header'] != pcap_global_header or index['indexed_until'] > pcap_stat.st_size:
+                index = None
+            elif any( record_check(f, file_offset) != checksum for file_offset, checksum in index['check_records'] ):
+                index = None
+#    
+        if index is None:
+            index = {
+                'pcap_global_header': pcap_global_header, 'pcap_size': 0, 'pcap_mtime_ns': 0, 'indexed_until': 24, 'packet_count': 0, 'check_records': [],
+                'groups': [], 'ip_src': {}, 'ip_dst': {}, 'ipv6_src': {}, 'ipv6_dst': {}, 'mac_src': {}, 'mac_dst': {}, 'flows': {},
+            }
+            index['offsets_path'] = offsets_path_obj.as_posix()
+            offsets_mode = 'wb'
+        else:
+            offsets_mode = 'ab'
+#    
+        proto_names = {1: 'ICMP', 6: 'TCP', 17: 'UDP', 58: 'ICMPv6'}
+        group_ids = { (g['mac_src'], g['mac_dst'], g['ip_version'], g['ip_src'], g['ip_dst'], g['flow'], g['unparsed']): group_id for group_id, g in enumerate(index['groups']) }
+        new_offsets = {}
+        first_offset = None
+        last_offset = None
+#    
+        for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(pcap_path_obj.as_posix(), start_offset=index['indexed_until']):
+            if file_offset is None:
+                raise ValueError(f"'{pcap_file}' is not a libpcap formatted file, which is required for indexing by file offset")
+            headers = scapyraw_parse_headers(frame, linktype)
+            index['packet_count'] += 1
+            index['indexed_until'] = file_offset + 16 + len(frame)
+            if first_offset is None:
+                first_offset = file_offset
+            last_offset = file_offset
+#            
+            mac_src = scapyraw_format_address(headers['eth_src'])
+            mac_dst = scapyraw_format_address(headers['eth_dst'])
+            ip_src = scapyraw_format_address(headers['ip_src'])
+            ip_dst = scapyraw_format_address(headers['ip_dst'])
+            flow_key = None
+            if headers['ip_version'] is not None:
+                proto_name = proto_names.get(headers['ip_proto'], f"IP proto={headers['ip_proto']}")
+                if headers['sport'] is not None:
+                    flow_key = f"{proto_name} {ip_src}:{headers['sport']} > {ip_dst}:{headers['dport']}"
+                else:
+                    flow_key = f"{proto_name} {ip_src} > {ip_dst}"
+#            
+            group_key = (mac_src, mac_dst, headers['ip_version'], ip_src, ip_dst, flow_key, bool(headers['unparsed']))
+            group_id = group_ids.get(group_key)
+            if group_id is None:
+                group_id = len(index['groups'])
+                group_ids[group_key] = group_id
+                index['groups'].append({'mac_src': mac_src, 'mac_dst': mac_dst, 'ip_version': headers['ip_version'], 'ip_src': ip_src, 'ip_dst': ip_dst, 'flow': flow_key, 'unparsed': bool(headers['unparsed']), 'chunks': []})
+                if mac_src is not None:
+                    index['mac_src'].setdefault(mac_src, []).append(group_id)
+                    index['mac_dst'].setdefault(mac_dst, []).append(group_id)
+                if headers['ip_version'] == 4:
+                    index['ip_src'].setdefault(ip_src, []).append(group_id)
+                    index['ip_dst'].setdefault(ip_dst, []).append(group_id)
+                elif headers['ip_version'] == 6:
+                    index['ipv6_src'].setdefault(ip_src, []).append(group_id)
+                    index['ipv6_dst'].setdefault(ip_dst, []).append(group_id)
+                if flow_key is not None:
+                    index['flows'].setdefault(flow_key, []).append(group_id)
+            new_offsets.setdefault(group_id, array.array('q')).append(file_offset)
+#    
+        if first_offset is not None:
+            if not index['check_records']:
+                index['check_records'] = [[first_offset, record_check(f, first_offset)]]
+            index['check_records'] = [index['check_records'][0], [last_offset, record_check(f, last_offset)]]
+#    
+    # Appending the offsets of the new records, one contiguous chunk of (position, count) per group; a full rebuild goes through a temporary file
+    offsets_temp_obj = offsets_path_obj.with_name(offsets_path_obj.name + '.tmp')
+    offsets_write_obj = offsets_temp_obj if offsets_mode == 'wb' else offsets_path_obj
+    with offsets_write_obj.open(offsets_mode) as offsets_f:
+        position = offsets_f.tell() // 8
+        for group_id, group_offsets in new_offsets.items():
+            group_offsets.tofile(offsets_f)
+            index['groups'][group_id]['chunks'].append([position, len(group_offsets)])
+            position += len(group_offsets)
+    if offsets_mode == 'wb':
+        offsets_temp_obj.replace(offsets_path_obj)
+#    
+    index['pcap_size'] = pcap_stat.st_size
+    index['pcap_mtime_ns'] = pcap_stat.st_mtime_ns
+#    
+    # Writing to a temporary file first, so that an interrupted write never leaves a corrupt index behind
+    temp_path_obj = index_path_obj.with_name(index_path_obj.name + '.tmp')
+    temp_path_obj.write_text(json.dumps({ k: v for k, v in index.items() if k != 'offsets_path' }))
+    temp_path_obj.replace(index_path_obj)
+#    
+    return index
+
+# %%
+#######################################
+def scapyindex_flow(pcap_file: str, flow_key: str, bidirectional=False):
+    """Returns the packets of a single 5-tuple flow from a .pcap file, using the sidecar index from 'scapyindex_build' (built on the first call, and updated when the capture grows) to read only the records of that flow.  The flow keys use the same form as the keys of PacketList.sessions(), e.g. 'TCP 10.1.1.1:1046 > 10.1.1.100:22'.
+
+    Example:
+        >>> index = scapyindex_build('temp.pcap')\n
+        >>> list(index['flows'])[0]\n
+        'TCP 27.72.5.247:22 > 84.67.6.14:1046'
+        >>> scapyindex_flow('temp.pcap', 'TCP 27.72.5.247:22 > 84.67.6.14:1046')\n
+        <PacketList: TCP:53 UDP:0 ICMP:0 Other:0>
+        >>> scapyindex_flow('temp.pcap', 'TCP 27.72.5.247:22 > 84.67.6.14:1046', bidirectional=True)\n
+        <PacketList: TCP:113 UDP:0 ICMP:0 Other:0>
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        flow_key (str): Reference a flow key, in the form 'PROTO src_ip:sport > dst_ip:dport' (or 'PROTO src_ip > dst_ip' for protocols without ports)
+        bidirectional (bool, optional): If you want the packets of the reverse direction of the flow as well, set bidirectional=True. Defaults to False.
+
+    Returns:
+        scapy.plist.PacketList: Returns a PacketList of the packets in the flow
+    """
+    index = scapyindex_build(pcap_file)
+#    
+    flow_groups = set(index['flows'].get(flow_key, []))
+    if bidirectional:
+        proto_name, src_endpoint, _, dst_endpoint = flow_key.rsplit(' ', 3)
+        reverse_flow_key = f"{proto_name} {dst_endpoint} > {src_endpoint}"
+        flow_groups.update(index['flows'].get(reverse_flow_key, []))
+#    
+    result_list = [ scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen) for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records_at(pcap_file, scapyindex_offsets(index, flow_groups)) ]
+    return PacketList(result_list)
+
+# %%
+#######################################
+def scapyindex_ip_address(pcap_file: str, ip: str, dst=False, src=False, notin=False):
+    """Indexed version of 'scapypcapreader_ip_address'.  Takes a given .pcap file and a partial/full string of an ip address and returns each packet that contains that ip address (or that DOES NOT contain that ip address if the notin=True switch is turned on).  The matching is done against the keys of the sidecar index from 'scapyindex_build' (built on the first call, and updated when the capture grows), and only the matching records are read from the capture.
+
+    Example:
+        >>> example = scapyindex_ip_address('temp.pcap', '185.34.210')\n
+        >>> example\n
+        <PacketList: TCP:0 UDP:1 ICMP:0 Other:0>
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        ip (str): Reference an ip address
+        dst (bool, optional): If you want to only search the [IP].dst field, set dst=True. Defaults to False.
+        src (bool, optional): If you want to only search the [IP].src field, set src=True. Defaults to False.
+        notin (bool, optional): If you want to get every packet that DOES NOT contain a given ip address, set notin=True. Defaults to False.
+
+    Returns:
+        scapy.plist.PacketList: Returns a PacketList of the matching packets.
+    """
+    if dst and src:
+        print("The defaults of this tool will search for the given ip address in both the [IP].dst and the [IP].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return PacketList([])
+#
+    if dst:
+        fields = ['dst']
+    elif src:
+        fields = ['src']
+    else:
+        fields = ['src', 'dst']
+#    
+    index = scapyindex_build(pcap_file)
+#    
+    matching_groups = set()
+    for f in fields:
+        for address, group_ids in index['ip_' + f].items():
+            if ip in address:
+                matching_groups.update(group_ids)
+    if notin:
+        matching_groups = set([ group_id for group_id, g in enumerate(index['groups']) if g['ip_version'] == 4 ]) - matching_groups
+    matching_offsets = set(scapyindex_offsets(index, matching_groups))
+#    
+    # The packets the raw decoder could not follow are checked the slow way, with a full scapy dissection
+    def scapy_predicate(pckt):
+        if not pckt.haslayer('IP'):
+            return False
+        is_match = any( ip in getattr(pckt['IP'], f) for f in fields )
+        return is_match != notin
+#    
+    unparsed_offsets = set(scapyindex_offsets(index, [ group_id for group_id, g in enumerate(index['groups']) if g['unparsed'] ]))
+    result_list = []
+    for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records_at(pcap_file, sorted(matching_offsets | unparsed_offsets)):
+        pckt = scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen)
+        if file_offset in unparsed_offsets and not scapy_predicate(pckt):
+            continue
+        result_list.append(pckt)
+#
+    return PacketList(result_list)
+
+# %%
+#######################################
+def scapyindex_mac_address(pcap_file: str, mac: str, dst=False, src=False, notin=False):
+    """Indexed version of 'scapypcapreader_mac_address'.  Takes a given .pcap file and a partial/full string of a mac address (in the form aa:bb:cc:dd:11:22) and returns each packet that contains that mac address (or that DOES NOT contain that mac address if the notin=True switch is turned on).  The matching is done against the keys of the sidecar index from 'scapyindex_build' (built on the first call, and updated when the capture grows), and only the matching records are read from the capture.
+
+    Example:
+        >>> example = scapyindex_mac_address('temp.pcap', '64:5a', notin=True)\n
+        >>> example\n
+        <PacketList: TCP:0 UDP:2 ICMP:0 Other:0>
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        mac (str): Reference a mac address
+        dst (bool, optional): If you want to only search the [Ether].dst field, set dst=True. Defaults to False.
+        src (bool, optional): If you want to only search the [Ether].src field, set src=True. Defaults to False.
+        notin (bool, optional): If you want to get every packet that DOES NOT contain a given mac address, set notin=True. Defaults to False.
+
+    Returns:
+        scapy.plist.PacketList: Returns a PacketList of the matching packets.
+    """
+    if dst and src:
+        print("The defaults of this tool will search for the given mac address in both the [Ether].dst and the [Ether].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return PacketList([])
+#
+    if dst:
+        fields = ['dst']
+    elif src:
+        fields = ['src']
+    else:
+        fields = ['src', 'dst']
+#    
+    index = scapyindex_build(pcap_file)
+#    
+    matching_groups = set()
+    for f in fields:
+        for address, group_ids in index['mac_' + f].items():
+            if mac in address:
+                matching_groups.update(group_ids)
+    if notin:
+        matching_groups = set([ group_id for group_id, g in enumerate(index['groups']) if g['mac_src'] is not None ]) - matching_groups
+    matching_offsets = set(scapyindex_offsets(index, matching_groups))
+#    
+    # The packets the raw decoder could not follow are checked the slow way, with a full scapy dissection
+    def scapy_predicate(pckt):
+        if not pckt.haslayer('Ether'):
+            return False
+        is_match = any( mac in getattr(pckt['Ether'], f) for f in fields )
+        return is_match != notin
+#    
+    unparsed_offsets = set(scapyindex_offsets(index, [ group_id for group_id, g in enumerate(index['groups']) if g['unparsed'] ]))
+    result_list = []
+    for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records_at(pcap_file, sorted(matching_offsets | unparsed_offsets)):
+        pckt = scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen)
+        if file_offset in unparsed_offsets and not scapy_predicate(pckt):
+            continue
+        result_list.append(pckt)
+#
+    return PacketList(result_list)
+
+# %%
+#######################################
+def scapyraw_pcap_records_at(pcap_file: str, file_offsets):
+    """Lazily yields the raw records found at the given byte offsets of a .pcap file (such as the offsets stored by 'scapyindex_build' or in the 'file_offset' column of a packet table), seeking straight to each record instead of reading the whole file.  Each record is returned in the same (timestamp_ns, file_offset, frame, wirelen, linktype) form as 'scapyraw_pcap_records'.
+
+    Example:
+        >>> records = scapyraw_pcap_records_at('temp.pcap', [24, 2290])\n
+        >>> [ (ts_ns, offset, wirelen) for ts_ns, offset, frame, wirelen, linktype in records ]\n
+        [(1629217872080297000, 24, 178), (1629217872413309000, 2290, 60)]
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        file_offsets (iterable): Reference the byte offsets of the record headers to read
+
+    Yields:
+        tuple: Yields a tuple of (timestamp_ns, file_offset, frame, wirelen, linktype) for each record
+    """
+    import pathlib
+    import struct
+#    
+    path_obj = pathlib.Path(pcap_file).resolve()
+#    
+    with path_obj.open('rb') as f:
+        pcap_header = scapyraw_pcap_global_header(f.read(24))
+        endian = pcap_header['endian']
+        ns_multiplier = pcap_header['ns_multiplier']
+        linktype = pcap_header['linktype']
+        record_header = struct.Struct(endian + 'IIII')
+#        
+        for file_offset in file_offsets:
+            f.seek(file_offset)
+            ts_sec, ts_frac, caplen, wirelen = record_header.unpack(f.read(16))
+            frame = f.read(caplen)
+            yield (ts_sec * 1000000000 + ts_frac * ns_multiplier, file_offset, frame, wirelen, linktype)
+
+# %%
+#######################################
+def scapyparallel_filter(pcap_file: str, ip=None, port=None, output_file=None, processes=None, expression=None):
+    """Multi-core ip address / port filter for large .pcap files.  The capture is split into byte ranges which are filtered in parallel by 'scapyparallel_shard_filter', and the matching packets are returned in the original packet order.  The ip address is matched as a partial/full string against the IPv4 src and dst (like 'scapyget_ip_address') and the port against the TCP/UDP sport and dport (like 'scapyget_port').  A BPF-like filter expression (see 'scapyfilter_compile') can be given too, or instead; the expression string is sent to the workers, which each compile it once.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> scapyparallel_filter('temp.pcap', ip='185.34.210')\n
+        <PacketList: TCP:0 UDP:1 ICMP:0 Other:0>
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> scapyparallel_filter('huge.pcap', ip='10.1.1.1', port=443, output_file='host_https.pcap', processes=32)\n
+        20417
+
+        >>> ##### EXAMPLE 3 #####\n
+        >>> scapyparallel_filter('huge.pcap', expression='tcp and (port 443 or net 10.0.0.0/8) and not src host 1.2.3.4', output_file='triage.pcap')\n
+        1870221
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        ip (str, optional): Reference an ip address. Defaults to None.
+        port (int, optional): Reference a port number. Defaults to None.
+        output_file (str, optional): Reference the path of a .pcap file to write the matching packets to, instead of returning them as a PacketList. Defaults to None.
+        processes (int, optional): Reference the number of worker processes. Defaults to None (the number of CPU cores).
+        expression (str, optional): Reference a filter expression. Defaults to None.
+
+    Returns:
+        object: Returns a PacketList object, or the number of packets written if 'output_file' was given
+    """
+    shard_results = scapyparallel_map(pcap_file, scapyparallel_shard_filter, ip, port, expression, processes=processes)
+    matching_offsets = [ offset for shard_result in shard_results for offset in shard_result ]
+#    
+    matching_records = scapyraw_pcap_records_at(pcap_file, matching_offsets)
+    if output_file:
+        with open(pcap_file, 'rb') as f:
+            pcap_header = scapyraw_pcap_global_header(f.read(24))
+        return scapyraw_pcap_writer(matching_records, output_file, linktype=pcap_header['linktype'], snaplen=pcap_header['snaplen'], nanosecond=pcap_header['ns_multiplier'] == 1)
+#    
+    return PacketList([ scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen) for timestamp_ns, file_offset, frame, wirelen, linktype in matching_records ])
+
+# %%
+#######################################
+def scapyparallel_map(pcap_file: str, shard_function, *args, processes=None, shards_per_process=4):
+    """Runs a function over a .pcap file on several CPU cores.  The file is split into byte ranges on record boundaries with 'scapyraw_pcap_shards', and each range is handed to 'shard_function' in a process pool.  The results are returned in the original file order, one result per shard, so the caller can merge them by simply chaining the lists together.
+
+    The 'shard_function' is called as shard_function(pcap_file, start_offset, end_offset, *args) and must be defined at the top level of a module (so that it can be pickled and sent to the worker processes), such as the 'scapyparallel_shard_*' functions.
+
+    Example:
+        >>> shard_results = scapyparallel_map('huge.pcap', scapyparallel_shard_checksum, processes=32)\n
+        >>> good_offsets = [ offset for shard_result in shard_results for offset in shard_result ]\n
+        >>> len(good_offsets)\n
+        48133972
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        shard_function (function): Reference a top level function to run against each byte range of the file
+        *args: Reference any extra arguments to pass to the shard_function
+        processes (int, optional): Reference the number of worker processes. Defaults to None (the number of CPU cores).
+        shards_per_process (int, optional): Reference how many byte ranges to create per worker process (more, smaller ranges balance the work better). Defaults to 4.
+
+    Returns:
+        list: Returns the result of each shard, in file order
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+#    
+    processes = processes or os.cpu_count() or 1
+    shards = scapyraw_pcap_shards(pcap_file, processes * shards_per_process)
+#    
+    if processes == 1 or len(shards) <= 1:
+        return [ shard_function(pcap_file, start_offset, end_offset, *args) for start_offset, end_offset in shards ]
+#    
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [ executor.submit(shard_function, pcap_file, start_offset, end_offset, *args) for start_offset, end_offset in shards ]
+        return [ future.result() for future in futures ]
+
+# %%
+#######################################
+def scapyparallel_payload_contains_pattern(pcap_file: str, thepattern: str, return_packetlist=False, ignorecase=True, processes=None):
+    """Multi-core version of 'scapypayload_contains_pattern' for large .pcap files.  The capture is split into byte ranges which are searched in parallel by 'scapyparallel_shard_pattern', and the results are returned in the original packet order.  The payload searched is every byte after the TCP/UDP/ICMP header, so payloads that scapy would dissect further (e.g. DNS) are searched as well.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> scapyparallel_payload_contains_pattern('web.pcap', 'push%20green%20button')\n
+        ['POST /hitchhikers-guide-game/hhguide HTTP/1.1\\r\\nHost: talkback.live.bbc.co.uk\\r\\n ... <zclient><command>push%20green%20button</command><sessionid>42==</sessionid><version>0.08</version></zclient>']
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> scapyparallel_payload_contains_pattern('web.pcap', 'push%20green%20button', return_packetlist=True)\n
+        <PacketList: TCP:1 UDP:0 ICMP:0 Other:0>
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        thepattern (str): Reference a pattern you want to match
+        return_packetlist (bool, optional): If you want the full packet with the pattern found in the payload, set this to True. Defaults to False.
+        ignorecase (bool, optional): If you want to have a case-sensitive pattern match set this to False. Defaults to True.
+        processes (int, optional): Reference the number of worker processes. Defaults to None (the number of CPU cores).
+
+    Returns:
+        object: Returns a list of strings with the matching payloads by default (bytes that are not valid UTF-8 are replaced). If 'return_packetlist = True' then a PacketList of packets with the matching payloads is returned.
+    """
+    shard_results = scapyparallel_map(pcap_file, scapyparallel_shard_pattern, thepattern.encode(), ignorecase, processes=processes)
+    matches = [ match for shard_result in shard_results for match in shard_result ]
+#    
+    if return_packetlist:
+        matching_records = scapyraw_pcap_records_at(pcap_file, [ offset for offset, payload in matches ])
+        results = PacketList([ scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen) for timestamp_ns, file_offset, frame, wirelen, linktype in matching_records ])
+    else:
+        results = [ payload.decode(errors='replace') for offset, payload in matches ]
+#    
+    return results
+
+# %%
+#######################################
+def scapyparallel_remove_bad_checksum_packets(pcap_file: str, output_file=None, processes=None):
+    """Multi-core version of 'scapyremove_bad_checksum_packets' for large .pcap files.  The capture is split into byte ranges which are checked in parallel by 'scapyparallel_shard_checksum', and the TCP packets with a bad checksum are omitted from the results (which stay in the original packet order).
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> new_frag3 = scapyparallel_remove_bad_checksum_packets('fragments3.pcap')\n
+        >>> new_frag3.__len__()\n
+        123
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> # Streaming the good packets straight to a new .pcap file\n
+        >>> scapyparallel_remove_bad_checksum_packets('huge.pcap', output_file='huge_goodsum.pcap', processes=32)\n
+        48133972
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        output_file (str, optional): Reference the path of a .pcap file to write the good packets to, instead of returning them as a PacketList. Defaults to None.
+        processes (int, optional): Reference the number of worker processes. Defaults to None (the number of CPU cores).
+
+    Returns:
+        object: Returns a PacketList object, or the number of packets written if 'output_file' was given
+    """
+    shard_results = scapyparallel_map(pcap_file, scapyparallel_shard_checksum, processes=processes)
+    keep_offsets = [ offset for shard_result in shard_results for offset in shard_result ]
+#    
+    kept_records = scapyraw_pcap_records_at(pcap_file, keep_offsets)
+    if output_file:
+        with open(pcap_file, 'rb') as f:
+            pcap_header = scapyraw_pcap_global_header(f.read(24))
+        return scapyraw_pcap_writer(kept_records, output_file, linktype=pcap_header['linktype'], snaplen=pcap_header['snaplen'], nanosecond=pcap_header['ns_multiplier'] == 1)
+#    
+    return PacketList([ scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen) for timestamp_ns, file_offset, frame, wirelen, linktype in kept_records ])
+
+# %%
+#######################################
+def scapyparallel_shard_checksum(pcap_file: str, start_offset: int, end_offset: int):
+    """Worker for 'scapyparallel_map' that validates the TCP checksums of the records in one byte range of a .pcap file.  Returns the file offsets of the records to keep: the TCP packets with a correct checksum, and every packet that is not TCP (the same packets 'scapyremove_bad_checksum_packets' keeps).  The checksums are checked straight from the raw bytes with 'scapyraw_transport_checksum'.
+
+    Example:
+        >>> start_offset, end_offset = scapyraw_pcap_shards('fragments3.pcap', 1)[0]\n
+        >>> len(scapyparallel_shard_checksum('fragments3.pcap', start_offset, end_offset))\n
+        123
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        start_offset (int): Reference the file offset of the first record of the range
+        end_offset (int): Reference the file offset where the range ends
+
+    Returns:
+        list: Returns the file offsets of the records to keep
+    """
+    keep_offsets = []
+    for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(pcap_file, start_offset, end_offset):
+        headers = scapyraw_parse_headers(frame, linktype)
+        if headers['ip_proto'] == 6:
+            checksum_result = scapyraw_transport_checksum(frame, linktype, headers)
+            if checksum_result and checksum_result[1] != checksum_result[2]:
+                continue
+        keep_offsets.append(file_offset)
+    return keep_offsets
+
+# %%
+#######################################
+def scapyparallel_shard_filter(pcap_file: str, start_offset: int, end_offset: int, ip=None, port=None, expression=None):
+    """Worker for 'scapyparallel_map' that filters the records in one byte range of a .pcap file by ip address and/or port.  The ip address is matched as a partial/full string against the IPv4 src and dst (like 'scapyget_ip_address') and the port against the TCP/UDP sport and dport (like 'scapyget_port').  A BPF-like filter expression (see 'scapyfilter_compile') can be given too, or instead.  When several are given, a record has to match all of them.  Returns the file offsets of the matching records.
+
+    Example:
+        >>> start_offset, end_offset = scapyraw_pcap_shards('temp.pcap', 1)[0]\n
+        >>> scapyparallel_shard_filter('temp.pcap', start_offset, end_offset, ip='185.34.210', port=10001)\n
+        [10411]
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        start_offset (int): Reference the file offset of the first record of the range
+        end_offset (int): Reference the file offset where the range ends
+        ip (str, optional): Reference an ip address. Defaults to None.
+        port (int, optional): Reference a port number. Defaults to None.
+        expression (str, optional): Reference a filter expression. Defaults to None.
+
+    Returns:
+        list: Returns the file offsets of the matching records
+    """
+    predicate = scapyfilter_compile(expression) if expression else None
+    matching_offsets = []
+    for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(pcap_file, start_offset, end_offset):
+        headers = scapyraw_parse_headers(frame, linktype)
+        if ip is not None:
+            if headers['ip_version'] != 4:
+                continue
+            if ip not in scapyraw_format_address(headers['ip_src']) and ip not in scapyraw_format_address(headers['ip_dst']):
+                continue
+        if port is not None:
+            if headers['ip_proto'] not in (6, 17) or port not in (headers['sport'], headers['dport']):
+                continue
+        if predicate is not None and not predicate(headers):
+            continue
+        matching_offsets.append(file_offset)
+    return matching_offsets
+
+# %%
+#######################################
+def scapyparallel_shard_pattern(pcap_file: str, start_offset: int, end_offset: int, thepattern: bytes, ignorecase=True):
+    """Worker for 'scapyparallel_map' that searches the payload (the bytes after the TCP/UDP/ICMP header) of the records in one byte range of a .pcap file for a regular expression.  Returns a list of (file_offset, payload) tuples for the records where the pattern was found.
+
+    Example:
+        >>> start_offset, end_offset = scapyraw_pcap_shards('web.pcap', 1)[0]\n
+        >>> [ offset for offset, payload in scapyparallel_shard_pattern('web.pcap', start_offset, end_offset, b'push%20green%20button') ]\n
+        [52436]
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        start_offset (int): Reference the file offset of the first record of the range
+        end_offset (int): Reference the file offset where the range ends
+        thepattern (bytes): Reference a pattern you want to match
+        ignorecase (bool, optional): If you want to have a case-sensitive pattern match set this to False. Defaults to True.
+
+    Returns:
+        list: Returns a list of (file_offset, payload) tuples
+    """
+    import re
+#    
+    if ignorecase:
+        match_syntax = re.compile(thepattern, re.IGNORECASE)
+    else:
+        match_syntax = re.compile(thepattern)
+#    
+    matches = []
+    for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(pcap_file, start_offset, end_offset):
+        headers = scapyraw_parse_headers(frame, linktype)
+        if not headers['payload_len']:
+            continue
+        payload = bytes(frame[headers['payload_offset']:headers['payload_offset'] + headers['payload_len']])
+        if match_syntax.search(payload):
+            matches.append((file_offset, payload))
+    return matches
+
+# %%
+#######################################
+def scapyraw_pcap_global_header(global_header: bytes):
+    """Decodes the 24 byte global header at the start of a libpcap file.  The magic number at the start of the header tells us both the byte order of the file and whether the record timestamps are in microseconds or nanoseconds.
+
+    Example:
+        >>> with open('temp.pcap', 'rb') as f:\n
+        ...     scapyraw_pcap_global_header(f.read(24))\n
+        {'endian': '<', 'ns_multiplier': 1000, 'snaplen': 65535, 'linktype': 1}
+
+    Reference:
+        https://wiki.wireshark.org/Development/LibpcapFileFormat
+
+    Args:
+        global_header (bytes): Reference the first 24 bytes of a libpcap file
+
+    Returns:
+        dict: Returns the byte order ('<' or '>') for struct, the multiplier that converts the fractional part of a timestamp to nanoseconds, the snaplen, and the linktype of the file
+    """
+    import struct
+#    
+    magic_numbers = {
+        b'\xd4\xc3\xb2\xa1': ('<', 1000),
+        b'\xa1\xb2\xc3\xd4': ('>', 1000),
+        b'\x4d\x3c\xb2\xa1': ('<', 1),
+        b'\xa1\xb2\x3c\x4d': ('>', 1),
+    }
+    if len(global_header) < 24 or global_header[:4] not in magic_numbers:
+        raise ValueError(f"Not a libpcap formatted file (magic number: {bytes(global_header[:4]).hex()})")
+#    
+    endian, ns_multiplier = magic_numbers[global_header[:4]]
+    snaplen, linktype = struct.unpack(endian + 'II', global_header[16:24])
+#    
+    return {'endian': endian, 'ns_multiplier': ns_multiplier, 'snaplen': snaplen, 'linktype': linktype & 0x0FFFFFFF}
+
+# %%
+#######################################
+def scapyraw_pcap_shards(pcap_file: str, num_shards: int):
+    """Splits a .pcap file into (up to) 'num_shards' byte ranges of roughly equal size, where every range starts and ends on a record boundary.  Only the 16 byte record headers are read (the packet data is skipped over with a seek), so this pre-scan is much cheaper than reading the capture.  Each (start_offset, end_offset) range can then be read on its own with scapyraw_pcap_records(pcap_file, start_offset, end_offset), e.g. by one worker of a process pool (see 'scapyparallel_map').
+
+    Example:
+        >>> scapyraw_pcap_shards('temp.pcap', 4)\n
+        [(24, 2958), (2958, 5874), (5874, 8797), (8797, 11668)]
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        num_shards (int): Reference the number of byte ranges to split the file into
+
+    Returns:
+        list: Returns a list of (start_offset, end_offset) tuples, in file order
+    """
+    import pathlib
+    import struct
+#    
+    path_obj = pathlib.Path(pcap_file).resolve()
+    file_size = path_obj.stat().st_size
+    target_shard_size = max((file_size - 24) // max(num_shards, 1), 1)
+#    
+    shards = []
+    with path_obj.open('rb') as f:
+        pcap_header = scapyraw_pcap_global_header(f.read(24))
+        record_header = struct.Struct(pcap_header['endian'] + 'IIII')
+#        
+        shard_start = file_offset = 24
+        while True:
+            header_bytes = f.read(16)
+            if len(header_bytes) < 16:
+                break
+            caplen = record_header.unpack(header_bytes)[2]
+            if file_offset + 16 + caplen > file_size:
+                # Truncated final record
+                break
+            if file_offset - shard_start >= target_shard_size:
+                shards.append((shard_start, file_offset))
+                shard_start = file_offset
+            file_offset += 16 + caplen
+            f.seek(file_offset)
+#    
+    if file_offset > shard_start:
+        shards.append((shard_start, file_offset))
+    return shards
+
+# %%
+#######################################
+def scapyraw_pcap_writer(records, output_file: str, linktype=None, snaplen=262144, nanosecond=False):
+    """Writes raw records (in the (timestamp_ns, file_offset, frame, wirelen, linktype) form yielded by 'scapyraw_pcap_records') straight to a new .pcap file.  The frames are copied byte for byte, without being dissected or re-built by scapy, so this runs at close to disk speed.
+
+    Example:
+        >>> records = scapyraw_pcap_records('temp.pcap')\n
+        >>> udp_records = ( r for r in records if scapyraw_parse_headers(r[2], r[4])['ip_proto'] == 17 )\n
+        >>> scapyraw_pcap_writer(udp_records, 'udp_only.pcap')\n
+        2
+
+    Args:
+        records (iterable): Reference an iterable of raw records
+        output_file (str): Reference the path of the .pcap file to write
+        linktype (int, optional): Reference the linktype to write in the global header. Defaults to None (the linktype of the first record).
+        snaplen (int, optional): Reference the snaplen to write in the global header. Defaults to 262144.
+        nanosecond (bool, optional): If you want to keep nanosecond timestamp precision (e.g. records from a pcapng file), set nanosecond=True to write a nanosecond resolution .pcap. Defaults to False (microsecond resolution).
+
+    Returns:
+        int: Returns the number of records written
+    """
+    import itertools
+    import pathlib
+    import struct
+#    
+    path_obj = pathlib.Path(output_file).resolve()
+    if nanosecond:
+        magic_number, ns_divisor = 0xA1B23C4D, 1
+    else:
+        magic_number, ns_divisor = 0xA1B2C3D4, 1000
+#    
+    record_header = struct.Struct('<IIII')
+    record_count = 0
+    with path_obj.open('wb', buffering=1 << 20) as f:
+        records = iter(records)
+        first_record = next(records, None)
+        if linktype is None:
+            linktype = first_record[4] if first_record else 1
+        f.write(struct.pack('<IHHiIII', magic_number, 2, 4, 0, 0, snaplen, linktype))
+        if first_record is None:
+            return 0
+#        
+        write = f.write
+        for timestamp_ns, file_offset, frame, wirelen, record_linktype in itertools.chain([first_record], records):
+            ts_sec, ts_frac = divmod(timestamp_ns, 1000000000)
+            write(record_header.pack(ts_sec, ts_frac // ns_divisor, len(frame), wirelen or len(frame)))
+            write(frame)
+            record_count += 1
+#    
+    return record_count
+
+# %%
+#######################################
+def scapyraw_checksum(data: bytes, initial=0):
+    """Computes the 16 bit ones-complement Internet checksum (RFC 1071) of the given bytes, i.e. the value that belongs in the checksum field when that field is zeroed in 'data'.
+
+    The ones-complement sum of a run of 16 bit big-endian words is the same as the whole run read as one big-endian integer modulo 0xFFFF (because 2**16 is 1 modulo 0xFFFF), so the sum is done with a single int.from_bytes() in C over the buffer, without splitting it into words or copying it (a memoryview slice works too).
+
+    Examples:
+        >>> scapyraw_checksum(bytes.fromhex('450000730000400040110000c0a80001c0a800c7'))\n
+        47201
+        >>> hex(47201)\n
+        '0xb861'
+
+    Reference:
+        https://datatracker.ietf.org/doc/html/rfc1071
+
+    Args:
+        data (bytes): Reference the bytes to checksum (bytes, bytearray or memoryview)
+        initial (int, optional): Reference a partial sum to start from, e.g. the sum of a TCP/UDP pseudo header. Defaults to 0.
+
+    Returns:
+        int: Returns the 16 bit checksum
+    """
+    data_as_int = int.from_bytes(data, 'big')
+    if len(data) % 2:
+        # An odd length is padded with a zero byte at the end
+        data_as_int <<= 8
+    partial_sum = (data_as_int + initial) % 0xFFFF
+#    
+    # A partial sum of 0 here is the ones-complement 0xFFFF (for any non-zero data), whose complement is 0
+    return 0xFFFF - partial_sum if partial_sum else 0
+
+# %%
+#######################################
+def scapyraw_transport_checksum(frame: bytes, linktype=1, headers=None):
+    """Reads the TCP / UDP / ICMP / ICMPv6 checksum of a raw frame, and computes what the correct checksum should be, straight from the raw header and payload bytes (with the IPv4 or IPv6 pseudo header where the protocol uses one).  Nothing is copied or re-dissected, unlike the deepcopy / del chksum / IP(bytes(...)) approach.
+
+    Returns a tuple of (protocol_name, packet_checksum, correct_checksum), or None when the checksum cannot be verified: the packet has no TCP/UDP/ICMP layer, is an IP fragment, or was truncated by the snaplen of the capture.
+
+    Example:
+        >>> frag3_pcap = rdpcap('fragments3.pcap')\n
+        >>> [ scapyraw_transport_checksum(bytes(p)) for p in frag3_pcap if p.haslayer(TCP) ][:2]\n
+        [('TCP', 49411, 49411), ('TCP', 14704, 28667)]
+
+    Args:
+        frame (bytes): Reference the raw bytes of a frame
+        linktype (int, optional): Reference the pcap linktype of the frame. Defaults to 1 (Ethernet).
+        headers (dict, optional): Reference the already decoded headers of the frame from 'scapyraw_parse_headers'. Defaults to None (the frame is decoded here).
+
+    Returns:
+        tuple: Returns a tuple of (protocol_name, packet_checksum, correct_checksum), or None
+    """
+    if headers is None:
+        headers = scapyraw_parse_headers(frame, linktype)
+    l4_offset = headers['l4_offset']
+    if l4_offset is None or headers['ip_fragment']:
+        return None
+#    
+    ip_offset = headers['ip_offset']
+    ip_end = headers['ip_end']
+    ip_proto = headers['ip_proto']
+    if headers['ip_version'] == 4:
+        declared_end = ip_offset + int.from_bytes(frame[ip_offset + 2:ip_offset + 4], 'big')
+        address_bytes = frame[ip_offset + 12:ip_offset + 20]
+    else:
+        declared_end = ip_offset + 40 + int.from_bytes(frame[ip_offset + 4:ip_offset + 6], 'big')
+        address_bytes = frame[ip_offset + 8:ip_offset + 40]
+    if ip_end < declared_end:
+        # Truncated by the snaplen of the capture
+        return None
+#    
+    if ip_proto == 6:
+        protocol_name, checksum_offset = 'TCP', l4_offset + 16
+    elif ip_proto == 17:
+        protocol_name, checksum_offset = 'UDP', l4_offset + 6
+    elif ip_proto == 1:
+        protocol_name, checksum_offset = 'ICMP', l4_offset + 2
+    else:
+        protocol_name, checksum_offset = 'ICMPv6', l4_offset + 2
+    packet_checksum = int.from_bytes(frame[checksum_offset:checksum_offset + 2], 'big')
+#    
+    # The pseudo header (addresses, protocol and length), which ICMP over IPv4 does not use
+    segment_length = ip_end - l4_offset
+    if ip_proto == 1:
+        pseudo_header_sum = 0
+    else:
+        pseudo_header_sum = int.from_bytes(address_bytes, 'big') + ip_proto + segment_length
+#    
+    # Summing the whole segment (checksum field included) and then taking the packet's checksum back out, so the segment is never copied to zero the field
+    segment_sum = int.from_bytes(frame[l4_offset:ip_end], 'big')
+    if segment_length % 2:
+        segment_sum <<= 8
+    partial_sum = (segment_sum + pseudo_header_sum + (0xFFFF - packet_checksum)) % 0xFFFF
+    correct_checksum = 0xFFFF - partial_sum if partial_sum else 0
+    if ip_proto == 17 and correct_checksum == 0:
+        # UDP sends a computed checksum of 0 as 0xFFFF (0 means no checksum)
+        correct_checksum = 0xFFFF
+#    
+    return (protocol_name, packet_checksum, correct_checksum)
+
+# %%
+#######################################
+def scapyraw_verify_checksums(packets, linktype=1):
+    """Verifies the IPv4 header, TCP, UDP, ICMP and ICMPv6 checksums of a batch of packets, directly over their raw bytes (see 'scapyraw_transport_checksum'), and returns one boolean per packet.  A packet is False when any checksum it carries is wrong.  Checksums that cannot be verified (IP fragments, packets truncated by the snaplen) and UDP over IPv4 with no checksum (0) count as correct.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> frag3_pcap = rdpcap('fragments3.pcap')\n
+        >>> checksums_ok = scapyraw_verify_checksums(frag3_pcap)\n
+        >>> checksums_ok.sum(), len(checksums_ok)\n
+        (np.int64(123), 129)
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> # Raw records straight from a .pcap file, without any scapy dissection\n
+        >>> checksums_ok = scapyraw_verify_checksums(scapyraw_pcap_records('fragments3.pcap'))\n
+
+    Args:
+        packets (iterable): Reference an iterable of scapy packets (e.g. a PacketList), raw frames (bytes / memoryview), or raw records from 'scapyraw_pcap_records'
+        linktype (int, optional): Reference the pcap linktype of raw frames. Defaults to 1 (Ethernet).
+
+    Returns:
+        numpy.ndarray: Returns a boolean array with one entry per packet
+    """
+    import numpy as np
+#    
+    results = []
+    for pckt in packets:
+        if isinstance(pckt, tuple):
+            frame, frame_linktype = pckt[2], pckt[4]
+        elif isinstance(pckt, (bytes, bytearray, memoryview)):
+            frame, frame_linktype = pckt, linktype
+        else:
+            frame, frame_linktype = bytes(pckt), conf.l2types.layer2num.get(type(pckt), linktype)
+#        
+        is_valid = scapyraw_checksum_valid(frame, frame_linktype)
+        results.append(is_valid)
+#    
+    return np.array(results, dtype=bool)
+
+# %%
+#######################################
+def scapysessions_table(packet_list: scapy.plist.PacketList, rebuild=False):
+    """Groups the packets of a PacketList into bidirectional sessions in a single pass, and returns a dict of session key -> NumPy array of the indexes of that session's packets in the PacketList.  Both directions of a conversation share one key, written in the direction of the first packet seen, e.g. 'TCP 172.20.10.14:58662 <> 172.20.10.10:8000'.  Packets without an IP layer are grouped under 'Other'.
+
+    The table is cached on the PacketList object, so calling this again (or calling 'scapysessions_table_packets' / 'scapysessions_table_iterator') does not re-group the capture, unlike PacketList.sessions() which re-groups the whole capture on every call.  The cache is rebuilt if the PacketList has changed length.
+
+    Example:
+        >>> sessions_pcap = rdpcap('sessions.pcap')\n
+        >>> table = scapysessions_table(sessions_pcap)\n
+        >>> list(table)[:2]\n
+        ['TCP 172.20.10.14:58662 <> 172.20.10.10:8000', 'TCP 172.20.10.14:58664 <> 172.20.10.10:8000']
+        >>> table['TCP 172.20.10.14:58662 <> 172.20.10.10:8000'][:5]\n
+        array([0, 1, 2, 3, 4])
+
+    Args:
+        packet_list (scapy.plist.PacketList): Reference an existing PacketList object
+        rebuild (bool, optional): If you want to ignore the cached table and re-group the packets, set rebuild=True. Defaults to False.
+
+    Returns:
+        dict: Returns a dict of session key -> numpy.ndarray of packet indexes
+    """
+    import numpy as np
+#    
+    cached = getattr(packet_list, '_scapysessions_table', None)
+    if cached and cached[0] == len(packet_list) and not rebuild:
+        return cached[1]
+#    
+    proto_names = {1: 'ICMP', 6: 'TCP', 17: 'UDP', 58: 'ICMPv6'}
+    session_keys = {}
+    session_indexes = {}
+#    
+    for packet_index, pckt in enumerate(packet_list):
+        headers = scapyraw_parse_headers(bytes(pckt), conf.l2types.layer2num.get(type(pckt), 1))
+        if headers['ip_version'] is None:
+            session_indexes.setdefault('Other', []).append(packet_index)
+            continue
+#        
+        # The same canonical (sorted) endpoints for both directions of the conversation
+        src_endpoint = (headers['ip_src'], headers['sport'])
+        dst_endpoint = (headers['ip_dst'], headers['dport'])
+        canonical_key = (headers['ip_proto'],) + tuple(sorted((src_endpoint, dst_endpoint), key=lambda e: (e[0], e[1] or 0)))
+        session_key = session_keys.get(canonical_key)
+        if session_key is None:
+            proto_name = proto_names.get(headers['ip_proto'], f"IP proto={headers['ip_proto']}")
+            src_ip = scapyraw_format_address(headers['ip_src'])
+            dst_ip = scapyraw_format_address(headers['ip_dst'])
+            if headers['sport'] is not None:
+                session_key = f"{proto_name} {src_ip}:{headers['sport']} <> {dst_ip}:{headers['dport']}"
+            else:
+                session_key = f"{proto_name} {src_ip} <> {dst_ip}"
+            session_keys[canonical_key] = session_key
+        session_indexes.setdefault(session_key, []).append(packet_index)
+#    
+    table = { session_key: np.array(indexes, dtype=np.int64) for session_key, indexes in session_indexes.items() }
+#    
+    try:
+        packet_list._scapysessions_table = (len(packet_list), table)
+    except AttributeError:
+        # Not every PacketList-like object accepts new attributes, those simply go uncached
+        pass
+#    
+    return table
+
+# %%
+#######################################
+def scapysessions_table_iterator(packet_list: scapy.plist.PacketList):
+    """Lazily yields a (session_key, PacketList) tuple for each bidirectional session in a PacketList, using the (cached) session table from 'scapysessions_table'.  The capture is grouped once, and each session's PacketList is only built when the iteration reaches it, so iterating over a very large number of sessions stays linear in the number of packets.
+
+    Example:
+        >>> sessions_pcap = rdpcap('sessions.pcap')\n
+        >>> for session_key, session_packet_list in scapysessions_table_iterator(sessions_pcap):\n
+        ...     print(session_key, session_packet_list)\n
+        TCP 172.20.10.14:58662 <> 172.20.10.10:8000 <PacketList: TCP:27 UDP:0 ICMP:0 Other:0>
+        TCP 172.20.10.14:58664 <> 172.20.10.10:8000 <PacketList: TCP:27 UDP:0 ICMP:0 Other:0>
+
+    Args:
+        packet_list (scapy.plist.PacketList): Reference an existing PacketList object
+
+    Yields:
+        tuple: Yields a tuple of (session_key, PacketList) for each session
+    """
+    table = scapysessions_table(packet_list)
+    for session_key, indexes in table.items():
+        yield session_key, PacketList([ packet_list[i] for i in indexes ])
+
+# %%
+#######################################
+def scapysessions_table_packets(packet_list: scapy.plist.PacketList, session_key: str):
+    """Returns the packets of one bidirectional session as a PacketList, using the (cached) session table from 'scapysessions_table'.  Only this session's PacketList is built, so looking up a single session does not materialize every session in the capture.
+
+    Example:
+        >>> sessions_pcap = rdpcap('sessions.pcap')\n
+        >>> scapysessions_table_packets(sessions_pcap, 'TCP 172.20.10.14:58662 <> 172.20.10.10:8000')\n
+        <PacketList: TCP:27 UDP:0 ICMP:0 Other:0>
+
+    Args:
+        packet_list (scapy.plist.PacketList): Reference an existing PacketList object
+        session_key (str): Reference a session key from 'scapysessions_table'
+
+    Returns:
+        scapy.plist.PacketList: Returns a PacketList of the packets in the session
+    """
+    table = scapysessions_table(packet_list)
+    return PacketList([ packet_list[i] for i in table[session_key] ])
+
+# %%
+#######################################
+def scapystream_tcp_reassemble(packet_source, idle_timeout=300, max_buffer=1048576, check_every=10000, end_markers=False):
+    """Streaming, bidirectional TCP stream reassembly.  Follows every TCP connection in a .pcap file (or in an iterable of packets) and lazily yields the contiguous bytes of each direction of each stream as they become available, so multi-GB captures can be followed stream-by-stream in bounded memory.
+
+    Each direction tracks its initial sequence number and works with relative stream offsets (so sequence number wraparound is handled), drops retransmitted data, trims overlapping segments, and holds out-of-order segments in a buffer of at most 'max_buffer' bytes until the gap before them is filled.  If the buffer fills up, the missing bytes are given up on and the stream continues from the first buffered segment.  Connections are forgotten once both sides have sent a FIN (or either side a RST), or after 'idle_timeout' seconds (capture time) without a packet.
+
+    Each chunk is yielded as a tuple of (session_key, direction_key, stream_offset, data), where 'session_key' names the connection in both directions (in the direction of the first packet seen, e.g. 'TCP 10.1.1.1:1046 <> 10.1.1.100:22'), 'direction_key' names the sending side ('TCP 10.1.1.1:1046 > 10.1.1.100:22') and 'stream_offset' is the position of 'data' in that direction's stream.  With 'end_markers=True', an empty chunk (data == b'') is also yielded for each direction when its connection is flushed and forgotten, at the offset where that direction ended, so consumers holding per-direction state can let it go.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> for session_key, direction_key, stream_offset, data in scapystream_tcp_reassemble('ncat.pcap'):\n
+        ...     print(direction_key, stream_offset, data)\n
+        TCP 127.0.0.1:52253 > 127.0.0.1:9898 0 b'Hello\\n'
+        TCP 127.0.0.1:52253 > 127.0.0.1:9898 6 b'Howareyou\\n'
+        TCP 127.0.0.1:52253 > 127.0.0.1:9898 16 b'haveyoubeenalright\\n'
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> # Following the streams of an already filtered packet stream\n
+        >>> packet_stream = scapystream_tcp_port(scapystream_pcapreader('huge.pcap'), 80)\n
+        >>> http_chunks = scapystream_tcp_reassemble(packet_stream)\n
+
+    Args:
+        packet_source (str | iterable): Reference a .pcap file, or an iterable of scapy packets (PacketList, PcapReader, or a 'scapystream_*' generator)
+        idle_timeout (int, optional): Reference the number of seconds (in capture time) after which an idle connection is flushed and forgotten. Defaults to 300.
+        max_buffer (int, optional): Reference the maximum number of out-of-order bytes to hold per direction. Defaults to 1048576.
+        check_every (int, optional): Reference how many packets to process between checks for idle connections. Defaults to 10000.
+        end_markers (bool, optional): Set this to True to get an empty chunk for each direction of a connection when the connection is flushed. Defaults to False.
+
+    Yields:
+        tuple: Yields a tuple of (session_key, direction_key, stream_offset, data) for each contiguous chunk of stream data
+    """
+    import heapq
+#    
+    if isinstance(packet_source, str):
+        records = scapyraw_pcap_records(packet_source)
+    else:
+        records = ( (int(Decimal(str(pckt.time)) * 1000000000), None, bytes(pckt), None, conf.l2types.layer2num.get(type(pckt), 1)) for pckt in packet_source )
+#    
+    FIN, SYN, RST = 0x01, 0x02, 0x04
+    connections = {}
+#    
+    def new_direction():
+        return {'next_seq': None, 'next_offset': 0, 'pending': [], 'pending_bytes': 0, 'closed': False}
+#    
+    def drain(session_key, direction_key, direction, force=False):
+        # Emitting the buffered segments that are now contiguous (or, when forced, skipping any gap before them)
+        pending = direction['pending']
+        while pending and (force or pending[0][0] <= direction['next_offset']):
+            segment_start, segment_data = heapq.heappop(pending)
+            direction['pending_bytes'] -= len(segment_data)
+            if segment_start > direction['next_offset']:
+                direction['next_offset'] = segment_start
+            segment_end = segment_start + len(segment_data)
+            if segment_end <= direction['next_offset']:
+                continue
+            chunk = segment_data[direction['next_offset'] - segment_start:]
+            yield (session_key, direction_key, direction['next_offset'], chunk)
+            direction['next_offset'] = segment_end
+#    
+    def flush(connection_key):
+        connection = connections.pop(connection_key)
+        for direction_key, direction in connection['directions'].items():
+            yield from drain(connection['session_key'], direction_key, direction, force=True)
+            if end_markers:
+                yield (connection['session_key'], direction_key, direction['next_offset'], b'')
+#    
+    packet_count = 0
+    for timestamp_ns, file_offset, frame, wirelen, linktype in records:
+        headers = scapyraw_parse_headers(frame, linktype)
+        if headers['ip_proto'] != 6 or headers['sport'] is None:
+            continue
+        packet_count += 1
+#        
+        src_endpoint = (headers['ip_src'], headers['sport'])
+        dst_endpoint = (headers['ip_dst'], headers['dport'])
+        connection_key = (src_endpoint, dst_endpoint) if src_endpoint <= dst_endpoint else (dst_endpoint, src_endpoint)
+        connection = connections.get(connection_key)
+        if connection is None:
+            src_ip = scapyraw_format_address(headers['ip_src'])
+            dst_ip = scapyraw_format_address(headers['ip_dst'])
+            connection = {
+                'session_key': f"TCP {src_ip}:{headers['sport']} <> {dst_ip}:{headers['dport']}",
+                'directions': {},
+                'direction_keys': {
+                    src_endpoint: f"TCP {src_ip}:{headers['sport']} > {dst_ip}:{headers['dport']}",
+                    dst_endpoint: f"TCP {dst_ip}:{headers['dport']} > {src_ip}:{headers['sport']}",
+                },
+                'last_seen': timestamp_ns,
+            }
+            connections[connection_key] = connection
+        connection['last_seen'] = timestamp_ns
+        direction_key = connection['direction_keys'][src_endpoint]
+        direction = connection['directions'].setdefault(direction_key, new_direction())
+#        
+        tcp_seq = headers['tcp_seq']
+        tcp_flags = headers['tcp_flags']
+        payload = frame[headers['payload_offset']:headers['payload_offset'] + headers['payload_len']]
+#        
+        if tcp_flags & SYN:
+            # The SYN consumes one sequence number, the stream data starts right after it
+            if direction['next_seq'] is None:
+                direction['next_seq'] = (tcp_seq + 1) & 0xFFFFFFFF
+            tcp_seq = (tcp_seq + 1) & 0xFFFFFFFF
+        elif direction['next_seq'] is None:
+            # Joined mid-stream, the first segment seen starts the stream
+            direction['next_seq'] = tcp_seq
+#        
+        if payload:
+            # Signed 32 bit distance from the next expected sequence number, which handles wraparound
+            delta = (tcp_seq - direction['next_seq']) & 0xFFFFFFFF
+            if delta >= 0x80000000:
+                delta -= 0x100000000
+            segment_start = direction['next_offset'] + delta
+            segment_end = segment_start + len(payload)
+#            
+            if segment_end > direction['next_offset']:
+                if segment_start <= direction['next_offset']:
+                    # In order (or overlapping data already delivered, which is trimmed)
+                    chunk = bytes(payload[direction['next_offset'] - segment_start:])
+                    yield (connection['session_key'], direction_key, direction['next_offset'], chunk)
+                    direction['next_offset'] = segment_end
+                    yield from drain(connection['session_key'], direction_key, direction)
+                else:
+                    # Out of order, held until the gap before it is filled
+                    heapq.heappush(direction['pending'], (segment_start, bytes(payload)))
+                    direction['pending_bytes'] += len(payload)
+                    if direction['pending_bytes'] > max_buffer:
+                        yield from drain(connection['session_key'], direction_key, direction, force=True)
+                # Keeping next_seq in step with next_offset, whichever way the offset moved
+                direction['next_seq'] = (tcp_seq - (segment_start - direction['next_offset'])) & 0xFFFFFFFF
+#        
+        if tcp_flags & RST:
+            yield from flush(connection_key)
+            continue
+        if tcp_flags & FIN:
+            direction['closed'] = True
+            if len(connection['directions']) == 2 and all(d['closed'] for d in connection['directions'].values()):
+                yield from flush(connection_key)
+                continue
+#        
+        if packet_count % check_every == 0:
+            idle_cutoff = timestamp_ns - idle_timeout * 1000000000
+            for idle_key in [ k for k, c in connections.items() if c['last_seen'] < idle_cutoff ]:
+                yield from flush(idle_key)
+#    
+    for connection_key in list(connections):
+        yield from flush(connection_key)
+
+# %%
+#######################################
+def scapypayload_compile_patterns(patterns: list, ignorecase=True, regex=False):
+    """Compiles a list of patterns (e.g. thousands of IOC strings) into a single matcher, so every pattern can be searched for in one pass over each payload (see 'scapypayload_match_patterns').
+
+    Literal patterns (the default) are merged into a trie and compiled as one regular expression inside a lookahead, so every position of the payload is tested against all patterns at once and overlapping matches are found.  Regular expression patterns ('regex=True') are combined into a single alternation which is used as a prefilter, and only the payloads it hits are searched with each pattern on its own.
+
+    Examples:
+        >>> matcher = scapypayload_compile_patterns(['evil.com', 'evil', 'cmd.exe'])\n
+        >>> scapypayload_match_patterns(matcher, b'GET http://evil.com/cmd.exe')\n
+        [(0, 11, 19), (1, 11, 15), (2, 20, 27)]
+
+    Args:
+        patterns (list): Reference a list of patterns (str or bytes)
+        ignorecase (bool, optional): If you want to have a case-sensitive pattern match set this to False. Defaults to True.
+        regex (bool, optional): Set this to True if the patterns are regular expressions rather than literal strings. Defaults to False.
+
+    Returns:
+        dict: Returns a matcher (a dict) to pass to 'scapypayload_match_patterns'
+    """
+    import re
+#    
+    flags = re.IGNORECASE if ignorecase else 0
+    pattern_bytes = [ p.encode() if isinstance(p, str) else bytes(p) for p in patterns ]
+#    
+    if regex:
+        combined = re.compile(b'|'.join([ b'(?:' + p + b')' for p in pattern_bytes ]), flags)
+        return {
+            'patterns': list(patterns),
+            'regex': True,
+            'combined': combined,
+            'compiled': [ re.compile(p, flags) for p in pattern_bytes ],
+            'max_length': None,
+        }
+#    
+    # Building a trie of the (normalized) literals, with None marking the end of a pattern
+    lookup = {}
+    trie = {}
+    for pattern_index, p in enumerate(pattern_bytes):
+        if not p:
+            continue
+        normalized = p.lower() if ignorecase else p
+        lookup.setdefault(normalized, []).append(pattern_index)
+        node = trie
+        for c in normalized:
+            node = node.setdefault(c, {})
+        node[None] = True
+#    
+    def trie_to_regex(trie):
+        # Built bottom-up with an explicit stack rather than recursion, as a long literal makes a trie as deep as its length
+        node_regexes = {}
+        stack = [trie]
+        while stack:
+            node = stack[-1]
+            unbuilt_children = [ child for c, child in node.items() if c is not None and id(child) not in node_regexes ]
+            if unbuilt_children:
+                stack.extend(unbuilt_children)
+                continue
+            stack.pop()
+            # Children are tried before the end of a pattern, so the longest pattern at a position is matched
+            alternatives = [ re.escape(bytes([c])) + node_regexes.pop(id(child)) for c, child in sorted([ (k, v) for k, v in node.items() if k is not None ], key=lambda x: x[0]) ]
+            if not alternatives:
+                node_regexes[id(node)] = b''
+            elif len(alternatives) == 1 and None not in node:
+                node_regexes[id(node)] = alternatives[0]
+            else:
+                grouped = b'(?:' + b'|'.join(alternatives) + b')'
+                node_regexes[id(node)] = grouped + b'?' if None in node else grouped
+        return node_regexes[id(trie)]
+#    
+    combined = re.compile(b'(?=(' + trie_to_regex(trie) + b'))', flags) if trie else None
+    return {
+        'patterns': list(patterns),
+        'regex': False,
+        'ignorecase': ignorecase,
+        'combined': combined,
+        'lookup': lookup,
+        'lengths': sorted(set([ len(p) for p in lookup ])),
+        'max_length': max([ len(p) for p in lookup ], default=0),
+    }
+
+# %%
+#######################################
+def scapypayload_contains_patterns(packet_source, patterns: list, ignorecase=True, regex=False, streams=False, overlap=None):
+    """Searches the payloads of a .pcap file (or of a PacketList) for many patterns at once (e.g. an IOC list), in a single pass.  Unlike 'scapypayload_contains_pattern', which takes a single pattern, this reports which pattern hit which packet.
+
+    By default each packet's payload is searched on its own, and the results are the packet numbers (the position of the packet in the .pcap / PacketList, starting at 0) of the hits.  With 'streams=True' the TCP streams are reassembled (see 'scapystream_tcp_reassemble') and searched as continuous streams, so patterns split across packet boundaries are found too; the results are then (direction_key, stream_offset) tuples.  Only the last 'overlap' bytes of each stream are kept between packets, which defaults to the length of the longest literal pattern (regular expressions need an 'overlap' to match across packets).
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> scapypayload_contains_patterns('web.pcap', ['push%20green%20button', 'bbc.co.uk', 'not-there'])\n
+        {'push%20green%20button': [12], 'bbc.co.uk': [3, 12, 15], 'not-there': []}
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> scapypayload_contains_patterns('web.pcap', ['green%20button'], streams=True)\n
+        {'green%20button': [('TCP 74.2.7.198:48905 > 245.64.204.201:80', 871)]}
+
+        >>> ##### EXAMPLE 3 #####\n
+        >>> iocs = open('iocs.txt').read().split()\n
+        >>> hits = scapypayload_contains_patterns(rdpcap('web.pcap'), iocs)\n
+
+    Args:
+        packet_source (str | scapy.plist.PacketList): Reference a .pcap file, or an existing PacketList object
+        patterns (list): Reference a list of patterns (str or bytes)
+        ignorecase (bool, optional): If you want to have a case-sensitive pattern match set this to False. Defaults to True.
+        regex (bool, optional): Set this to True if the patterns are regular expressions rather than literal strings. Defaults to False.
+        streams (bool, optional): Set this to True to search the reassembled TCP streams, rather than each packet's payload. Defaults to False.
+        overlap (int, optional): Reference how many bytes at the end of each stream are kept to match patterns spanning packets (only used with 'streams=True'). Defaults to None (the longest literal pattern).
+
+    Returns:
+        dict: Returns a dict of each pattern to a list of the packet numbers it was found in (or of (direction_key, stream_offset) tuples with 'streams=True')
+    """
+    matcher = scapypayload_compile_patterns(patterns, ignorecase=ignorecase, regex=regex)
+    hits = [ [] for p in patterns ]
+#    
+    if streams:
+        if overlap is None:
+            overlap = max(matcher['max_length'] - 1, 0) if matcher['max_length'] else 0
+        for direction_key, buffer_offset, buffer, carry_length in scapystream_tcp_search_buffers(packet_source, overlap):
+            for pattern_index, start, end in scapypayload_match_patterns(matcher, buffer):
+                # Matches entirely within the carried over bytes were already reported with the previous chunk
+                if end > carry_length:
+                    hits[pattern_index].append((direction_key, buffer_offset + start))
+    else:
+        if isinstance(packet_source, str):
+            frames = ( (frame, linktype) for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(packet_source) )
+        else:
+            frames = ( (bytes(pckt), conf.l2types.layer2num.get(type(pckt), 1)) for pckt in packet_source )
+        # The payload is everything after the TCP/UDP/ICMP header, whether or not scapy would dissect it further (e.g. DNS)
+        for packet_number, (frame, linktype) in enumerate(frames):
+            headers = scapyraw_parse_headers(frame, linktype)
+            if not headers['payload_len'] or headers['payload_offset'] is None:
+                continue
+            payload = frame[headers['payload_offset']:headers['payload_offset'] + headers['payload_len']]
+            for pattern_index in sorted(set([ pattern_index for pattern_index, start, end in scapypayload_match_patterns(matcher, bytes(payload)) ])):
+                hits[pattern_index].append(packet_number)
+#    
+    return { pattern: pattern_hits for pattern, pattern_hits in zip(patterns, hits) }
+
+# %%
+#######################################
+def scapypayload_match_patterns(matcher: dict, payload: bytes):
+    """Searches a payload for every pattern of a matcher built with 'scapypayload_compile_patterns', in a single pass.  Returns a list of (pattern_index, start, end) tuples, one per match, where 'pattern_index' is the position of the pattern in the list given to 'scapypayload_compile_patterns'.
+
+    Examples:
+        >>> matcher = scapypayload_compile_patterns(['evil.com', 'evil', 'cmd.exe'])\n
+        >>> scapypayload_match_patterns(matcher, b'GET http://evil.com/cmd.exe')\n
+        [(0, 11, 19), (1, 11, 15), (2, 20, 27)]
+        >>> matcher['patterns'][2]\n
+        'cmd.exe'
+
+    Args:
+        matcher (dict): Reference a matcher built with 'scapypayload_compile_patterns'
+        payload (bytes): Reference the payload to search
+
+    Returns:
+        list: Returns a list of (pattern_index, start, end) tuples
+    """
+    combined = matcher['combined']
+    if combined is None:
+        return []
+#    
+    if matcher['regex']:
+        # The combined alternation only tells whether any pattern is present, each pattern is then searched for on its own
+        if not combined.search(payload):
+            return []
+        return [ (pattern_index, m.start(), m.end()) for pattern_index, compiled in enumerate(matcher['compiled']) for m in compiled.finditer(payload) ]
+#    
+    lookup = matcher['lookup']
+    lengths = matcher['lengths']
+    ignorecase = matcher['ignorecase']
+    matches = []
+    for m in combined.finditer(payload):
+        # The longest pattern starting here was matched, any shorter pattern starting here is one of its prefixes
+        start = m.start()
+        longest = m.group(1)
+        if ignorecase:
+            longest = longest.lower()
+        for length in lengths:
+            if length > len(longest):
+                break
+            for pattern_index in lookup.get(longest[:length], ()):
+                matches.append((pattern_index, start, start + length))
+    matches.sort(key=lambda x: (x[1], -x[2], x[0]))
+    return matches
+
+# %%
+#######################################
+def scapyraw_duplicate_key(frame: bytes, linktype=1, headers=None, tcp_only=True):
+    """Returns the key used to spot duplicate packets: the flow tuple (addresses, protocol and ports), the TCP sequence number, acknowledgment number and flags, and a fast digest (CRC-32 and length) of the payload.  Two packets with the same key carry the same data for the same flow, so unlike keying on the TCP sequence number alone, packets from unrelated flows that happen to share a sequence number are never mistaken for duplicates.
+
+    Returns None for the packets that are never treated as duplicates (everything but TCP when 'tcp_only=True').  With 'tcp_only=False', packets that are not IP (or that could not be parsed) are keyed on a digest of the whole frame.
+
+    Example:
+        >>> frame = bytes(Ether()/IP(src='10.1.1.1', dst='10.1.1.100')/TCP(sport=1046, dport=22, seq=100, flags='PA')/b'hello')\n
+        >>> scapyraw_duplicate_key(frame)\n
+        (b'\\n\\x01\\x01\\x01', b'\\n\\x01\\x01d', 6, 1046, 22, 100, 0, 24, 907060870, 5)
+
+    Args:
+        frame (bytes): Reference the raw bytes of a packet
+        linktype (int, optional): Reference the link-layer type of the frame. Defaults to 1 (Ethernet).
+        headers (dict, optional): Reference the result of 'scapyraw_parse_headers' for the frame, if already parsed. Defaults to None.
+        tcp_only (bool, optional): Set this to False to also spot duplicates of non-TCP packets. Defaults to True.
+
+    Returns:
+        tuple: Returns the duplicate key of the packet (or None)
+    """
+    import zlib
+#    
+    if headers is None:
+        headers = scapyraw_parse_headers(frame, linktype)
+#    
+    if headers['ip_proto'] == 6 and headers['tcp_seq'] is not None:
+        payload = frame[headers['payload_offset']:headers['payload_offset'] + headers['payload_len']]
+        return (headers['ip_src'], headers['ip_dst'], 6, headers['sport'], headers['dport'], headers['tcp_seq'], headers['tcp_ack'], headers['tcp_flags'], zlib.crc32(payload), len(payload))
+    if tcp_only:
+        return None
+#    
+    if headers['ip_src'] is not None and headers['payload_offset'] is not None:
+        payload = frame[headers['payload_offset']:headers['payload_offset'] + headers['payload_len']]
+        return (headers['ip_src'], headers['ip_dst'], headers['ip_proto'], headers['sport'], headers['dport'], None, None, None, zlib.crc32(payload), len(payload))
+    return (None, None, None, None, None, None, None, None, zlib.crc32(frame), len(frame))
+
+# %%
+#######################################
+def scapyraw_remove_duplicates(records, window=1.0, max_entries=100000, tcp_only=True):
+    """Streaming duplicate packet removal over raw records (see 'scapyraw_pcap_records').  Lazily yields each record, in the original order, unless a packet with the same duplicate key (see 'scapyraw_duplicate_key') was already seen in the last 'window' seconds (capture time, counted from the latest copy).  The first copy of each packet is kept.
+
+    Only the keys of the recent packets are held, in an LRU of at most 'max_entries' keys, so captures of any size can be streamed straight into 'scapyraw_pcap_writer'.
+
+    Example:
+        >>> records = scapyraw_remove_duplicates(scapyraw_pcap_records('span_port.pcap'))\n
+        >>> scapyraw_pcap_writer(records, 'span_port_deduplicated.pcap')\n
+        48211
+
+    Args:
+        records (iterable): Reference an iterable of (timestamp_ns, file_offset, frame, wirelen, linktype) records
+        window (float, optional): Reference how many seconds a packet is remembered for. Use None to remember packets for the whole capture (bounded by 'max_entries' only). Defaults to 1.0.
+        max_entries (int, optional): Reference the maximum number of packet keys remembered. Defaults to 100000.
+        tcp_only (bool, optional): Set this to False to also remove duplicates of non-TCP packets. Defaults to True.
+
+    Yields:
+        tuple: Yields each (timestamp_ns, file_offset, frame, wirelen, linktype) record that is not a duplicate
+    """
+    from collections import OrderedDict
+#    
+    window_ns = None if window is None else int(window * 1000000000)
+    recent_keys = OrderedDict()
+#    
+    for record in records:
+        timestamp_ns, file_offset, frame, wirelen, linktype = record
+        key = scapyraw_duplicate_key(frame, linktype, tcp_only=tcp_only)
+        if key is None:
+            yield record
+            continue
+#        
+        # Forgetting the keys that fell out of the time window (oldest first)
+        if window_ns is not None:
+            while recent_keys and next(iter(recent_keys.values())) < timestamp_ns - window_ns:
+                recent_keys.popitem(last=False)
+#        
+        if key in recent_keys:
+            # Refreshing a key on each repeat, so a packet that keeps being duplicated stays remembered
+            recent_keys.move_to_end(key)
+            recent_keys[key] = timestamp_ns
+            continue
+        recent_keys[key] = timestamp_ns
+        if len(recent_keys) > max_entries:
+            recent_keys.popitem(last=False)
+        yield record
+
+# %%
+#######################################
+def scapystream_remove_duplicates(packets, window=1.0, max_entries=100000, tcp_only=True):
+    """Streaming version of 'scapyremove_duplicate_packets'.  Takes an iterable of packets and lazily yields each packet, in the original order, unless a packet with the same flow, TCP sequence number and payload (see 'scapyraw_duplicate_key') was already seen in the last 'window' seconds.  Only the keys of the recent packets are held (in an LRU of at most 'max_entries' keys), so it can stream from a PcapReader straight into a PcapWriter.
+
+    Example:
+        >>> packet_stream = scapystream_pcapreader('span_port.pcap')\n
+        >>> packet_stream = scapystream_remove_duplicates(packet_stream)\n
+        >>> scapystream_pcapwriter(packet_stream, 'span_port_deduplicated.pcap')\n
+        48211
+
+    Args:
+        packets (iterable): Reference an iterable of packets (PacketList, PcapReader, or another 'scapystream_*' generator)
+        window (float, optional): Reference how many seconds a packet is remembered for. Use None to remember packets for the whole capture (bounded by 'max_entries' only). Defaults to 1.0.
+        max_entries (int, optional): Reference the maximum number of packet keys remembered. Defaults to 100000.
+        tcp_only (bool, optional): Set this to False to also remove duplicates of non-TCP packets. Defaults to True.
+
+    Yields:
+        scapy.layers.l2.Ether: Yields each packet that is not a duplicate
+    """
+    # Each record is yielded (or dropped) by 'scapyraw_remove_duplicates' as soon as it is read, so the packet read last is the one a yielded record came from
+    current_packet = [None]
+    def packet_records():
+        for pckt in packets:
+            current_packet[0] = pckt
+            yield (int(Decimal(str(pckt.time)) * 1000000000), None, bytes(pckt), None, conf.l2types.layer2num.get(type(pckt), 1))
+#    
+    for record in scapyraw_remove_duplicates(packet_records(), window=window, max_entries=max_entries, tcp_only=tcp_only):
+        yield current_packet[0]
+
+# %%
+#######################################
+def scapyclean_pcap(pcap_file: str, output_file: str, remove_bad_checksums=True, remove_duplicates=True, tcp_only=True, window=1.0, max_entries=100000, payload_bytes=None, snaplen=None):
+    """Cleans a .pcap file in a single pass, straight from disk to a new .pcap file: each record is read once, and then it goes through every cleaning stage before it is written.  Only the keys of the recent packets are held in memory (for the duplicate check), so captures far larger than RAM can be cleaned at close to disk-read speed.
+
+    The stages, in order, are:
+        - bad checksums ('remove_bad_checksums'): drops the packets whose IPv4 header or transport checksum is wrong (see 'scapyraw_checksum_valid')
+        - duplicates ('remove_duplicates'): drops the packets already seen in the last 'window' seconds (see 'scapyraw_remove_duplicates')
+        - payload truncation ('payload_bytes'): keeps at most this many bytes of each packet's payload (after the TCP/UDP/ICMP header), e.g. to share the headers of a capture without its content
+        - snaplen normalization ('snaplen'): cuts every frame to at most this many bytes, and writes this snaplen in the header of the new .pcap file
+
+    The original length of a truncated packet is kept, so tools reading the new .pcap file still see how long it was on the wire.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> scapyclean_pcap('fragments3.pcap', 'fragments3_clean.pcap')\n
+        {'read': 134, 'bad_checksum': 3, 'duplicate': 2, 'truncated': 0, 'written': 129}
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> # Headers only, for every protocol, with a snaplen of 128 bytes\n
+        >>> scapyclean_pcap('huge.pcap', 'huge_headers.pcap', tcp_only=False, payload_bytes=0, snaplen=128)\n
+        {'read': 48211877, 'bad_checksum': 1093, 'duplicate': 60112, 'truncated': 39022101, 'written': 48150672}
+
+    Args:
+        pcap_file (str): Reference a .pcap (or .pcapng) file
+        output_file (str): Reference the path of the new .pcap file
+        remove_bad_checksums (bool, optional): Set this to False to keep the packets with bad checksums. Defaults to True.
+        remove_duplicates (bool, optional): Set this to False to keep the duplicate packets. Defaults to True.
+        tcp_only (bool, optional): Set this to False to check the checksums and duplicates of every protocol, rather than of TCP only. Defaults to True.
+        window (float, optional): Reference how many seconds a packet is remembered for by the duplicate check. Defaults to 1.0.
+        max_entries (int, optional): Reference the maximum number of packet keys remembered by the duplicate check. Defaults to 100000.
+        payload_bytes (int, optional): Reference the maximum number of payload bytes to keep per packet. Defaults to None (the payload is kept).
+        snaplen (int, optional): Reference the maximum number of bytes to keep per frame. Defaults to None (the snaplen of the original .pcap file).
+
+    Returns:
+        dict: Returns a dict of the number of packets read, dropped by each stage, truncated, and written
+    """
+    import pathlib
+#    
+    counters = {'read': 0, 'bad_checksum': 0, 'duplicate': 0, 'truncated': 0, 'written': 0}
+#    
+    path_obj = pathlib.Path(pcap_file).resolve()
+    with path_obj.open('rb') as f:
+        global_header = f.read(24)
+    if global_header[:4] == b'\x0a\x0d\x0d\x0a':
+        output_linktype, output_snaplen, nanosecond = None, 262144, True
+    else:
+        pcap_header = scapyraw_pcap_global_header(global_header)
+        output_linktype, output_snaplen, nanosecond = pcap_header['linktype'], pcap_header['snaplen'], pcap_header['ns_multiplier'] == 1
+    if snaplen is not None:
+        output_snaplen = snaplen
+#    
+    def checked_records():
+        for record in scapyraw_pcap_records(pcap_file):
+            counters['read'] += 1
+            timestamp_ns, file_offset, frame, wirelen, linktype = record
+            if remove_bad_checksums:
+                headers = scapyraw_parse_headers(frame, linktype)
+                if (headers['ip_proto'] == 6 or not tcp_only) and not scapyraw_checksum_valid(frame, linktype, headers):
+                    counters['bad_checksum'] += 1
+                    continue
+            yield record
+#    
+    def truncated_records(records):
+        kept_count = 0
+        for timestamp_ns, file_offset, frame, wirelen, linktype in records:
+            kept_count += 1
+            original_length = wirelen or len(frame)
+            frame_length = len(frame)
+            if payload_bytes is not None:
+                headers = scapyraw_parse_headers(frame, linktype)
+                if headers['payload_offset'] is not None and headers['payload_len'] > payload_bytes:
+                    frame_length = min(frame_length, headers['payload_offset'] + payload_bytes)
+            if snaplen is not None:
+                frame_length = min(frame_length, snaplen)
+            if frame_length < len(frame):
+                counters['truncated'] += 1
+                frame = frame[:frame_length]
+            yield (timestamp_ns, file_offset, frame, original_length, linktype)
+        counters['duplicate'] = counters['read'] - counters['bad_checksum'] - kept_count
+#    
+    records = checked_records()
+    if remove_duplicates:
+        records = scapyraw_remove_duplicates(records, window=window, max_entries=max_entries, tcp_only=tcp_only)
+#    
+    counters['written'] = scapyraw_pcap_writer(truncated_records(records), output_file, linktype=output_linktype, snaplen=output_snaplen, nanosecond=nanosecond)
+    return counters
+
+# %%
+#######################################
+def scapymerge_pcaps(pcap_files: list, output_file: str, nanosecond=False):
+    """Merges several .pcap (or .pcapng) files into one .pcap file with the packets interleaved by timestamp, like Wireshark's 'mergecap'.  Each file must already be in timestamp order (see 'scapysort_pcap').  The records are streamed from the files straight to the new .pcap file (see 'scapyraw_merged_records'), holding one record per file in memory.
+
+    All the packets must share the same link-layer type (e.g. Ethernet), since a .pcap file has a single one.
+
+    Example:
+        >>> scapymerge_pcaps(['sensor1.pcap', 'sensor2.pcap', 'sensor3.pcap'], 'all_sensors.pcap')\n
+        130877
+
+    Args:
+        pcap_files (list): Reference a list of .pcap (or .pcapng) files
+        output_file (str): Reference the path of the new .pcap file
+        nanosecond (bool, optional): Set this to True to write nanosecond timestamps (if the files to merge have them). Defaults to False.
+
+    Returns:
+        int: Returns the number of packets written
+    """
+    def checked_records():
+        first_linktype = None
+        for record in scapyraw_merged_records(pcap_files):
+            if first_linktype is None:
+                first_linktype = record[4]
+            elif record[4] != first_linktype:
+                raise ValueError(f"Cannot merge packets with different link-layer types ({first_linktype} and {record[4]}) into one .pcap file")
+            yield record
+#    
+    return scapyraw_pcap_writer(checked_records(), output_file, nanosecond=nanosecond)
+
+# %%
+#######################################
+def scapyraw_merged_records(pcap_files: list):
+    """Interleaves the records of several .pcap (or .pcapng) files by timestamp, like Wireshark's 'mergecap' (e.g. to combine the captures of different sensors).  Each file must already be in timestamp order (see 'scapysort_pcap'); the files are read side by side and merged with a heap (heapq.merge), so only one record per file is held in memory.  Records with the same timestamp are taken from the files in the order the files were given.
+
+    Example:
+        >>> merged_records = scapyraw_merged_records(['sensor1.pcap', 'sensor2.pcap', 'sensor3.pcap'])\n
+        >>> scapyraw_pcap_writer(merged_records, 'all_sensors.pcap')\n
+        130877
+
+    Args:
+        pcap_files (list): Reference a list of .pcap (or .pcapng) files
+
+    Yields:
+        tuple: Yields each (timestamp_ns, file_offset, frame, wirelen, linktype) record, in timestamp order ('file_offset' is the offset in the record's own file)
+    """
+    import heapq
+#    
+    record_streams = [ scapyraw_pcap_records(pcap_file) for pcap_file in pcap_files ]
+    yield from heapq.merge(*record_streams, key=lambda record: record[0])
+
+# %%
+#######################################
+def scapyraw_sorted_records(pcap_file: str, run_size=1000000, temp_dir=None):
+    """Out-of-core timestamp sort of a .pcap file.  Lazily yields the records of the .pcap file (see 'scapyraw_pcap_records') ordered by timestamp, using bounded memory whatever the size of the capture.
+
+    Only the (timestamp, file offset) pair of each record is sorted, never the packets themselves: the pairs are sorted in runs of 'run_size' records, each sorted run is spilled to a temporary file, and the runs are then k-way merged with a heap (heapq.merge) while the records are read back by their file offset.  Records with the same timestamp keep their original order.
+
+    Example:
+        >>> sorted_records = scapyraw_sorted_records('unordered.pcap')\n
+        >>> scapyraw_pcap_writer(sorted_records, 'ordered.pcap')\n
+        48211
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        run_size (int, optional): Reference the number of records sorted in memory per run (16 bytes each). Defaults to 1000000.
+        temp_dir (str, optional): Reference the directory for the temporary run files. Defaults to None (the system's temporary directory).
+
+    Yields:
+        tuple: Yields each (timestamp_ns, file_offset, frame, wirelen, linktype) record, in timestamp order
+    """
+    import array
+    import heapq
+    import tempfile
+#    
+    def read_run(run_file):
+        # Reading a spilled run back in blocks, as (timestamp_ns, file_offset) pairs
+        run_file.seek(0)
+        while True:
+            block = array.array('q')
+            block.frombytes(run_file.read(65536 * 16))
+            if not block:
+                break
+            yield from zip(block[0::2], block[1::2])
+        run_file.close()
+#    
+    run_files = []
+    current_run = []
+    is_sorted = True
+    previous_timestamp_ns = None
+    try:
+        for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(pcap_file):
+            if file_offset is None:
+                raise ValueError("Sorting needs the file offsets of a libpcap formatted file, convert the pcapng file first (e.g. with 'scapyraw_pcap_writer')")
+            if previous_timestamp_ns is not None and timestamp_ns < previous_timestamp_ns:
+                is_sorted = False
+            previous_timestamp_ns = timestamp_ns
+            current_run.append((timestamp_ns, file_offset))
+            if len(current_run) >= run_size:
+                current_run.sort()
+                run_file = tempfile.TemporaryFile(dir=temp_dir)
+                run_file.write(array.array('q', [ value for pair in current_run for value in pair ]).tobytes())
+                run_files.append(run_file)
+                current_run = []
+#        
+        if is_sorted:
+            # Already in timestamp order, so no merge is needed
+            for run_file in run_files:
+                run_file.close()
+            run_files = []
+            yield from scapyraw_pcap_records(pcap_file)
+            return
+#        
+        current_run.sort()
+        runs = [ read_run(run_file) for run_file in run_files ] + [ iter(current_run) ]
+        sorted_offsets = ( file_offset for timestamp_ns, file_offset in heapq.merge(*runs) )
+        yield from scapyraw_pcap_records_at(pcap_file, sorted_offsets)
+    finally:
+        for run_file in run_files:
+            run_file.close()
+
+# %%
+#######################################
+def scapysort_pcap(pcap_file: str, output_file: str, run_size=1000000, temp_dir=None):
+    """Writes a copy of a .pcap file with its packets ordered by timestamp.  Unlike 'scapy_orderby_timestamp', which sorts a PacketList in memory, this is an out-of-core sort (see 'scapyraw_sorted_records') that streams the records straight to the new .pcap file, so it works on captures far larger than RAM.
+
+    Example:
+        >>> scapysort_pcap('unordered.pcap', 'ordered.pcap')\n
+        48211
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        output_file (str): Reference the path of the new .pcap file
+        run_size (int, optional): Reference the number of records sorted in memory per run. Defaults to 1000000.
+        temp_dir (str, optional): Reference the directory for the temporary run files. Defaults to None (the system's temporary directory).
+
+    Returns:
+        int: Returns the number of packets written
+    """
+    import pathlib
+#    
+    with pathlib.Path(pcap_file).resolve().open('rb') as f:
+        pcap_header = scapyraw_pcap_global_header(f.read(24))
+#    
+    sorted_records = scapyraw_sorted_records(pcap_file, run_size=run_size, temp_dir=temp_dir)
+    return scapyraw_pcap_writer(sorted_records, output_file, linktype=pcap_header['linktype'], snaplen=pcap_header['snaplen'], nanosecond=pcap_header['ns_multiplier'] == 1)
+
+# %%
+#######################################
+def scapyfilter_compile(expression: str):
+    """Compiles a BPF-like filter expression (the syntax of tcpdump / Wireshark capture filters) into a predicate over the raw header fields of a frame (the dict returned by 'scapyraw_parse_headers').  The expression is parsed once; the predicate short-circuits, and the operands of each run of 'and' / 'or' are reordered so the cheapest checks (e.g. the protocol) run first.  As in tcpdump, 'and' and 'or' have equal precedence and associate left to right, so 'udp or tcp and port 80' means '(udp or tcp) and port 80'.  See 'scapyfilter_pcap' and 'scapyfilter_packetlist' to filter with an expression.
+
+    Supported primitives (combined with 'and' / '&&', 'or' / '||', 'not' / '!' and parentheses):
+        - protocols: ether, ip, ip6, arp, tcp, udp, icmp, icmp6, vlan [id]
+        - [src|dst] host <ipv4 or ipv6 address>
+        - [src|dst] net <cidr>
+        - [tcp|udp] [src|dst] port <number or service name>
+        - [tcp|udp] [src|dst] portrange <first>-<last>
+        - ether [src|dst] host <mac address>
+        - proto <ip protocol number or name>
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> predicate = scapyfilter_compile('tcp and (port 443 or net 10.0.0.0/8) and not src host 1.2.3.4')\n
+        >>> ts_ns, offset, frame, wirelen, linktype = next(scapyraw_pcap_records('temp.pcap'))\n
+        >>> predicate(scapyraw_parse_headers(frame, linktype))\n
+        False
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> scapyfilter_compile('tcp and (port 443')\n
+        ValueError: Missing ')' at the end of the filter expression: 'tcp and (port 443'
+
+    Args:
+        expression (str): Reference a filter expression
+
+    Returns:
+        function: Returns a predicate taking the dict of 'scapyraw_parse_headers' and returning True or False
+    """
+    import ipaddress
+    import re
+    import socket
+#    
+    tokens = re.findall(r'\(|\)|!|&&|\|\||[^\s()!&|]+', expression)
+    position = 0
+#    
+    def peek():
+        return tokens[position].lower() if position < len(tokens) else None
+#    
+    def take(what=None):
+        nonlocal position
+        if position >= len(tokens):
+            raise ValueError(f"Missing {what or 'a value'} at the end of the filter expression: '{expression}'")
+        token = tokens[position]
+        position += 1
+        return token
+#    
+    # Each parsed primitive is a (cost, predicate) tuple, so the operands of 'and' / 'or' can be reordered by cost
+    protocols = {
+        'ip': (1, lambda h: h['ip_version'] == 4),
+        'ip6': (1, lambda h: h['ip_version'] == 6),
+        'tcp': (1, lambda h: h['ip_proto'] == 6),
+        'udp': (1, lambda h: h['ip_proto'] == 17),
+        'icmp': (1, lambda h: h['ip_proto'] == 1),
+        'icmp6': (1, lambda h: h['ip_proto'] == 58),
+        'arp': (1, lambda h: h['ethertype'] == 0x0806),
+        'ether': (1, lambda h: h['eth_src'] is not None),
+    }
+    protocol_numbers = {'icmp': 1, 'igmp': 2, 'tcp': 6, 'udp': 17, 'gre': 47, 'esp': 50, 'ah': 51, 'icmp6': 58, 'sctp': 132}
+#    
+    def parse_direction():
+        if peek() in ('src', 'dst'):
+            direction = take().lower()
+            if peek() in ('or', 'and'):
+                # 'src or dst' / 'src and dst'
+                combine = take().lower()
+                if take('dst').lower() != 'dst':
+                    raise ValueError(f"Expected 'dst' after 'src {combine}' in the filter expression: '{expression}'")
+                return combine
+            return direction
+        return None
+#    
+    def address_predicate(direction, src_key, dst_key, match):
+        if direction == 'src':
+            return lambda h: match(h[src_key])
+        if direction == 'dst':
+            return lambda h: match(h[dst_key])
+        if direction == 'and':
+            return lambda h: match(h[src_key]) and match(h[dst_key])
+        return lambda h: match(h[src_key]) or match(h[dst_key])
+#    
+    def parse_port(value):
+        # A port number or a service name (e.g. 'http')
+        if value.isdigit() and int(value) <= 65535:
+            return int(value)
+        for service_proto in ('tcp', 'udp'):
+            try:
+                return socket.getservbyname(value.lower(), service_proto)
+            except OSError:
+                pass
+        raise ValueError(f"Unknown port '{value}' in the filter expression: '{expression}'")
+#    
+    def parse_primitive():
+        token = peek()
+        if token is None:
+            raise ValueError(f"Missing a filter primitive at the end of the filter expression: '{expression}'")
+#        
+        if token == 'vlan':
+            take()
+            if peek() is not None and peek().isdigit():
+                vlan_id = int(take())
+                return (1, lambda h: vlan_id in h['vlan'])
+            return (1, lambda h: bool(h['vlan']))
+#        
+        if token == 'proto':
+            take()
+            value = take('a protocol').lower()
+            number = protocol_numbers.get(value, None) if not value.isdigit() else int(value)
+            if number is None:
+                raise ValueError(f"Unknown protocol '{value}' in the filter expression: '{expression}'")
+            return (1, lambda h: h['ip_proto'] == number)
+#        
+        if token == 'ether':
+            take()
+            direction = parse_direction()
+            if peek() != 'host':
+                if direction is not None:
+                    raise ValueError(f"Expected 'host' after 'ether {direction}' in the filter expression: '{expression}'")
+                return protocols['ether']
+            take()
+            mac_bytes = bytes.fromhex(re.sub(r'[:\-.]', '', take('a mac address')))
+            return (3, address_predicate(direction, 'eth_src', 'eth_dst', lambda value: value == mac_bytes))
+#        
+        transport = None
+        if token in ('tcp', 'udp') and position + 1 < len(tokens) and tokens[position + 1].lower() in ('src', 'dst', 'port', 'portrange'):
+            transport = 6 if take().lower() == 'tcp' else 17
+        elif token in protocols:
+            take()
+            return protocols[token]
+#        
+        direction = parse_direction()
+        kind = take('host, net, port or portrange').lower()
+#        
+        if kind in ('port', 'portrange'):
+            value = take(f'a {kind}')
+            if kind == 'port':
+                first_port = last_port = parse_port(value)
+            else:
+                if value.count('-') != 1:
+                    raise ValueError(f"Expected '<first>-<last>' after 'portrange' in the filter expression: '{expression}'")
+                first_port, last_port = [ parse_port(x) for x in value.split('-') ]
+            if first_port == last_port:
+                match = lambda value: value == first_port
+            else:
+                match = lambda value: value is not None and first_port <= value <= last_port
+            port_predicate = address_predicate(direction, 'sport', 'dport', match)
+            if transport is None:
+                return (2, lambda h: h['ip_proto'] in (6, 17) and port_predicate(h))
+            return (2, lambda h: h['ip_proto'] == transport and port_predicate(h))
+#        
+        if transport is not None:
+            raise ValueError(f"Expected 'port' or 'portrange' after '{token}' in the filter expression: '{expression}'")
+#        
+        if kind == 'host':
+            address_bytes = ipaddress.ip_address(take('an ip address')).packed
+            return (3, address_predicate(direction, 'ip_src', 'ip_dst', lambda value: value == address_bytes))
+#        
+        if kind == 'net':
+            network = ipaddress.ip_network(take('a network'), strict=False)
+            network_int = int(network.network_address)
+            netmask_int = int(network.netmask)
+            address_length = network.max_prefixlen // 8
+            def match(value):
+                return value is not None and len(value) == address_length and int.from_bytes(value, 'big') & netmask_int == network_int
+            return (4, address_predicate(direction, 'ip_src', 'ip_dst', match))
+#        
+        raise ValueError(f"Unknown filter primitive '{kind}' in the filter expression: '{expression}'")
+#    
+    def combine(operator, operands):
+        # Cheapest operands first, then folded into short-circuiting closures
+        operands = sorted(operands, key=lambda x: x[0])
+        cost = sum([ operand_cost for operand_cost, operand in operands ])
+        predicate = operands[-1][1]
+        for operand_cost, operand in reversed(operands[:-1]):
+            if operator == 'and':
+                predicate = (lambda first, rest: lambda h: first(h) and rest(h))(operand, predicate)
+            else:
+                predicate = (lambda first, rest: lambda h: first(h) or rest(h))(operand, predicate)
+        return (cost, predicate)
+#    
+    def parse_chain():
+        # 'and' and 'or' have equal precedence and associate left to right (as in tcpdump), so each run of the
+        # same operator is combined on its own, and a change of operator folds everything before it into one operand
+        operator = None
+        operands = [parse_not()]
+        while peek() in ('and', '&&', 'or', '||'):
+            next_operator = 'and' if take().lower() in ('and', '&&') else 'or'
+            if operator is not None and next_operator != operator:
+                operands = [combine(operator, operands)]
+            operator = next_operator
+            operands.append(parse_not())
+        return operands[0] if len(operands) == 1 else combine(operator, operands)
+#    
+    def parse_not():
+        if peek() in ('not', '!'):
+            take()
+            cost, predicate = parse_not()
+            return (cost, lambda h: not predicate(h))
+        if peek() == '(':
+            take()
+            result = parse_chain()
+            if take("')'") != ')':
+                raise ValueError(f"Expected ')' in the filter expression: '{expression}'")
+            return result
+        return parse_primitive()
+#    
+    if not tokens:
+        return lambda h: True
+    cost, predicate = parse_chain()
+    if position < len(tokens):
+        raise ValueError(f"Unexpected '{tokens[position]}' in the filter expression: '{expression}'")
+    return predicate
+
+# %%
+#######################################
+def scapyfilter_packetlist(packet_list: scapy.plist.PacketList, expression: str):
+    """Filters a PacketList with a BPF-like filter expression (see 'scapyfilter_compile'), e.g. 'tcp and (port 443 or net 10.0.0.0/8) and not src host 1.2.3.4', in a single pass.  This replaces chaining several 'scapyget_*' functions (each building a new PacketList) with one query.
+
+    Example:
+        >>> temp_pcap = rdpcap('temp.pcap')\n
+        >>> scapyfilter_packetlist(temp_pcap, 'udp and src host 66.17.1.2 and not dst port 53')\n
+        <PacketList: TCP:0 UDP:1 ICMP:0 Other:0>
+
+    Args:
+        packet_list (scapy.plist.PacketList): Reference an existing PacketList object
+        expression (str): Reference a filter expression
+
+    Returns:
+        scapy.plist.PacketList: Returns a PacketList object
+    """
+    return PacketList(list(scapystream_expression(packet_list, expression)))
+
+# %%
+#######################################
+def scapyfilter_pcap(pcap_file: str, expression: str, output_file=None):
+    """Filters a .pcap (or .pcapng) file with a BPF-like filter expression (see 'scapyfilter_compile'), e.g. 'tcp and (port 443 or net 10.0.0.0/8) and not src host 1.2.3.4'.  The expression is compiled once and evaluated against the raw header fields of each record, so a complex triage query runs in one pass over the file, and only the matching packets are ever dissected by scapy (or none at all, when writing to 'output_file').
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> scapyfilter_pcap('temp.pcap', 'udp and dst net 185.34.210.0/24 and dst port 10001')\n
+        <PacketList: TCP:0 UDP:1 ICMP:0 Other:0>
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> scapyfilter_pcap('huge.pcap', 'tcp and not port 22 and (host 10.1.1.1 or host 10.1.1.100)', output_file='triage.pcap')\n
+        107
+
+    Args:
+        pcap_file (str): Reference a .pcap (or .pcapng) file
+        expression (str): Reference a filter expression
+        output_file (str, optional): Reference the path of a .pcap file to write the matching packets to, instead of returning them as a PacketList. Defaults to None.
+
+    Returns:
+        object: Returns a PacketList object, or the number of packets written if 'output_file' was given
+    """
+    predicate = scapyfilter_compile(expression)
+    matching_records = ( record for record in scapyraw_pcap_records(pcap_file) if predicate(scapyraw_parse_headers(record[2], record[4])) )
+#    
+    if output_file:
+        # Keeping the linktype, snaplen and timestamp resolution of the original capture (a .pcapng keeps its nanoseconds, and the linktype of its first record)
+        with open(pcap_file, 'rb') as f:
+            global_header = f.read(24)
+        if global_header[:4] == b'\x0a\x0d\x0d\x0a':
+            return scapyraw_pcap_writer(matching_records, output_file, linktype=None, snaplen=262144, nanosecond=True)
+        pcap_header = scapyraw_pcap_global_header(global_header)
+        return scapyraw_pcap_writer(matching_records, output_file, linktype=pcap_header['linktype'], snaplen=pcap_header['snaplen'], nanosecond=pcap_header['ns_multiplier'] == 1)
+#    
+    return PacketList([ scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen) for timestamp_ns, file_offset, frame, wirelen, linktype in matching_records ])
+
+# %%
+#######################################
+def scapystream_expression(packets, expression: str):
+    """Streaming version of 'scapyfilter_packetlist'.  Takes an iterable of packets and a BPF-like filter expression (see 'scapyfilter_compile'), and lazily yields each packet that matches the expression.
+
+    Example:
+        >>> packet_stream = scapystream_pcapreader('huge.pcap')\n
+        >>> packet_stream = scapystream_expression(packet_stream, 'udp and port 53 and not host 8.8.8.8')\n
+        >>> scapystream_pcapwriter(packet_stream, 'dns_not_google.pcap')\n
+        1207
+
+    Args:
+        packets (iterable): Reference an iterable of packets (PacketList, PcapReader, or another 'scapystream_*' generator)
+        expression (str): Reference a filter expression
+
+    Yields:
+        scapy.layers.l2.Ether: Yields each matching packet
+    """
+    predicate = scapyfilter_compile(expression)
+    for pckt in packets:
+        if predicate(scapyraw_parse_headers(bytes(pckt), conf.l2types.layer2num.get(type(pckt), 1))):
+            yield pckt
+
+# %%
+#######################################
+def scapystats_pcap(packet_source, output_file=None, top=10, max_tracked=10000, interval=1.0):
+    """Computes the statistics of a capture in one streaming pass over the raw records (no scapy dissection), and returns them as a JSON-ready dict (and writes them as JSON to 'output_file', if given).  Unlike 'scapysniffoffline_summary', which prints the summary of every packet, this is meant for captures of tens of millions of packets.
+
+    The statistics are:
+        - 'capture': the number of packets and bytes, the first / last timestamps and the duration
+        - 'protocol_hierarchy': the packets and bytes of each stack of protocols (e.g. 'eth:vlan:ipv6:tcp')
+        - 'top_talkers': the ip addresses sending or receiving the most bytes / packets
+        - 'top_conversations': the conversations (both directions) with the most bytes
+        - 'ports': the most used TCP and UDP destination ports
+        - 'packets_per_second': the mean and max rate, and a histogram of how many intervals had each rate (in power-of-two buckets)
+        - 'flow_durations': the number of flows, the mean and max duration, a histogram of the durations (in power-of-ten buckets) and the longest flows
+        - 'tcp_flag_anomalies': the number of packets with flag combinations that normal TCP stacks never send (SYN+FIN, SYN+RST, FIN without ACK, null and Xmas scans)
+
+    Memory grows with the number of flows (one small entry each).  The talker and conversation counts are kept in bounded Space-Saving sketches of 'max_tracked' entries, so they stay bounded however many distinct hosts there are; their counts are exact until more than 'max_tracked' keys are seen, and can only be overestimated after that (by at most the 'error' given with each of them).
+
+    Examples:
+        >>> stats = scapystats_pcap('temp.pcap', output_file='temp_stats.json')\n
+        >>> stats['protocol_hierarchy']\n
+        {'eth:ipv4:udp': {'packets': 1, 'bytes': 60}}
+        >>> stats['top_talkers']['by_bytes']\n
+        [{'address': '66.17.1.2', 'bytes': 60, 'error': 0}, {'address': '185.34.210.1', 'bytes': 60, 'error': 0}]
+
+    Args:
+        packet_source (str | iterable): Reference a .pcap (or .pcapng) file, or an iterable of scapy packets (PacketList, PcapReader, or a 'scapystream_*' generator)
+        output_file (str, optional): Reference the path of a .json file to write the statistics to. Defaults to None.
+        top (int, optional): Reference how many entries to report in each top list. Defaults to 10.
+        max_tracked (int, optional): Reference the size of the talker and conversation sketches. Defaults to 10000.
+        interval (float, optional): Reference the length in seconds of the intervals the packet rate is measured over. Defaults to 1.0.
+
+    Returns:
+        dict: Returns a dict of the statistics
+    """
+    import json
+    import math
+    import pathlib
+#    
+    if isinstance(packet_source, str):
+        records = scapyraw_pcap_records(packet_source)
+    else:
+        records = ( (int(Decimal(str(pckt.time)) * 1000000000), None, bytes(pckt), None, conf.l2types.layer2num.get(type(pckt), 1)) for pckt in packet_source )
+#    
+    def sketch_add(sketch, key, weight):
+        # Space-Saving, pruned in batches: once the sketch holds twice its size, only the largest counts are kept, and keys seen again afterwards start from the largest count dropped (so counts are never underestimated)
+        entry = sketch['counts'].get(key)
+        if entry is None:
+            sketch['counts'][key] = [sketch['floor'] + weight, sketch['floor']]
+            if len(sketch['counts']) >= 2 * max_tracked:
+                ranked = sorted(sketch['counts'].items(), key=lambda x: x[1][0], reverse=True)
+                sketch['floor'] = ranked[max_tracked][1][0]
+                sketch['counts'] = dict(ranked[:max_tracked])
+        else:
+            entry[0] += weight
+#    
+    def sketch_top(sketch, name, value_name):
+        ranked = sorted(sketch['counts'].items(), key=lambda x: x[1][0], reverse=True)[:top]
+        return [ {name: key, value_name: count, 'error': error} for key, (count, error) in ranked ]
+#    
+    linktype_names = {1: 'eth', 101: 'raw', 228: 'raw', 229: 'raw', 12: 'raw', 14: 'raw', 113: 'sll', 276: 'sll2'}
+    ethertype_names = {0x0800: 'ipv4', 0x86DD: 'ipv6', 0x0806: 'arp', 0x8035: 'rarp', 0x88CC: 'lldp'}
+    ip_proto_names = {1: 'icmp', 2: 'igmp', 4: 'ipip', 6: 'tcp', 17: 'udp', 41: 'ipv6', 47: 'gre', 50: 'esp', 51: 'ah', 58: 'icmpv6', 132: 'sctp'}
+    FIN, SYN, RST, PSH, ACK, URG = 0x01, 0x02, 0x04, 0x08, 0x10, 0x20
+#    
+    packet_count = 0
+    byte_count = 0
+    first_timestamp_ns = None
+    last_timestamp_ns = None
+    hierarchy = {}
+    talkers_bytes = {'counts': {}, 'floor': 0}
+    talkers_packets = {'counts': {}, 'floor': 0}
+    conversations_bytes = {'counts': {}, 'floor': 0}
+    tcp_ports = {}
+    udp_ports = {}
+    interval_counts = {}
+    interval_ns = int(interval * 1000000000)
+    flows = {}
+    anomalies = {'syn_fin': 0, 'syn_rst': 0, 'fin_without_ack': 0, 'null': 0, 'xmas': 0}
+#    
+    for timestamp_ns, file_offset, frame, wirelen, linktype in records:
+        headers = scapyraw_parse_headers(frame, linktype)
+        packet_bytes = wirelen or len(frame)
+        packet_count += 1
+        byte_count += packet_bytes
+        if first_timestamp_ns is None or timestamp_ns < first_timestamp_ns:
+            first_timestamp_ns = timestamp_ns
+        if last_timestamp_ns is None or timestamp_ns > last_timestamp_ns:
+            last_timestamp_ns = timestamp_ns
+        interval_key = timestamp_ns // interval_ns
+        interval_counts[interval_key] = interval_counts.get(interval_key, 0) + 1
+#        
+        # Protocol hierarchy
+        layers = [linktype_names.get(linktype, f'linktype={linktype}')]
+        if headers['vlan']:
+            layers.append('vlan')
+        if headers['ip_version'] is not None:
+            layers.append('ipv4' if headers['ip_version'] == 4 else 'ipv6')
+            if headers['ip_fragment'] and headers['l4_offset'] is None:
+                layers.append('fragment')
+            else:
+                layers.append(ip_proto_names.get(headers['ip_proto'], f"ipproto={headers['ip_proto']}"))
+        elif headers['ethertype'] is not None:
+            layers.append(ethertype_names.get(headers['ethertype'], f"ethertype=0x{headers['ethertype']:04x}"))
+        hierarchy_key = ':'.join(layers)
+        hierarchy_entry = hierarchy.setdefault(hierarchy_key, {'packets': 0, 'bytes': 0})
+        hierarchy_entry['packets'] += 1
+        hierarchy_entry['bytes'] += packet_bytes
+#        
+        if headers['ip_src'] is None:
+            continue
+#        
+        # Talkers and conversations
+        src_ip = scapyraw_format_address(headers['ip_src'])
+        dst_ip = scapyraw_format_address(headers['ip_dst'])
+        for address in (src_ip, dst_ip):
+            sketch_add(talkers_bytes, address, packet_bytes)
+            sketch_add(talkers_packets, address, 1)
+        conversation_key = f'{src_ip} <> {dst_ip}' if headers['ip_src'] <= headers['ip_dst'] else f'{dst_ip} <> {src_ip}'
+        sketch_add(conversations_bytes, conversation_key, packet_bytes)
+#        
+        # Ports
+        ip_proto = headers['ip_proto']
+        if ip_proto == 6 and headers['dport'] is not None:
+            tcp_ports[headers['dport']] = tcp_ports.get(headers['dport'], 0) + 1
+        elif ip_proto == 17 and headers['dport'] is not None:
+            udp_ports[headers['dport']] = udp_ports.get(headers['dport'], 0) + 1
+#        
+        # Flows (both directions of a 5-tuple)
+        src_endpoint = (headers['ip_src'], headers['sport'])
+        dst_endpoint = (headers['ip_dst'], headers['dport'])
+        flow_key = (ip_proto,) + ((src_endpoint, dst_endpoint) if src_endpoint <= dst_endpoint else (dst_endpoint, src_endpoint))
+        flow = flows.get(flow_key)
+        if flow is None:
+            flows[flow_key] = [timestamp_ns, timestamp_ns, 1, packet_bytes]
+        else:
+            if timestamp_ns < flow[0]:
+                flow[0] = timestamp_ns
+            if timestamp_ns > flow[1]:
+                flow[1] = timestamp_ns
+            flow[2] += 1
+            flow[3] += packet_bytes
+#        
+        # TCP flag anomalies
+        if ip_proto == 6 and headers['tcp_flags'] is not None:
+            tcp_flags = headers['tcp_flags']
+            if tcp_flags & SYN and tcp_flags & FIN:
+                anomalies['syn_fin'] += 1
+            if tcp_flags & SYN and tcp_flags & RST:
+                anomalies['syn_rst'] += 1
+            if tcp_flags & FIN and not tcp_flags & ACK:
+                anomalies['fin_without_ack'] += 1
+            if tcp_flags & 0x3F == 0:
+                anomalies['null'] += 1
+            if tcp_flags & (FIN | PSH | URG) == (FIN | PSH | URG):
+                anomalies['xmas'] += 1
+#    
+    # Packet rate
+    interval_rates = [ count / interval for count in interval_counts.values() ]
+    if packet_count:
+        total_intervals = int((last_timestamp_ns // interval_ns) - (first_timestamp_ns // interval_ns)) + 1
+        rate_histogram = {}
+        empty_intervals = total_intervals - len(interval_counts)
+        if empty_intervals:
+            rate_histogram['0'] = empty_intervals
+        for count in sorted(interval_counts.values()):
+            bucket = 2 ** int(math.log2(count))
+            bucket_key = f'{bucket}-{2 * bucket - 1}'
+            rate_histogram[bucket_key] = rate_histogram.get(bucket_key, 0) + 1
+        packets_per_second = {'interval': interval, 'mean': packet_count / interval / total_intervals, 'max': max(interval_rates), 'histogram': rate_histogram}
+    else:
+        packets_per_second = {'interval': interval, 'mean': 0, 'max': 0, 'histogram': {}}
+#    
+    # Flow durations
+    duration_histogram = {}
+    for flow in flows.values():
+        duration = (flow[1] - flow[0]) / 1000000000
+        bucket_key = '0' if duration == 0 else f"<{10 ** math.ceil(math.log10(duration)):g}s"
+        duration_histogram[bucket_key] = duration_histogram.get(bucket_key, 0) + 1
+    longest_flows = sorted(flows.items(), key=lambda x: x[1][1] - x[1][0], reverse=True)[:top]
+    flow_durations = {
+        'flows': len(flows),
+        'mean': sum([ flow[1] - flow[0] for flow in flows.values() ]) / 1000000000 / len(flows) if flows else 0,
+        'max': (longest_flows[0][1][1] - longest_flows[0][1][0]) / 1000000000 if flows else 0,
+        'histogram': dict(sorted(duration_histogram.items(), key=lambda x: 0 if x[0] == '0' else float(x[0][1:-1]))),
+        'longest': [
+            {
+                'flow': f"{ip_proto_names.get(flow_key[0], flow_key[0])} {scapyraw_format_address(flow_key[1][0])}{'' if flow_key[1][1] is None else f':{flow_key[1][1]}'} <> {scapyraw_format_address(flow_key[2][0])}{'' if flow_key[2][1] is None else f':{flow_key[2][1]}'}",
+                'duration': (flow[1] - flow[0]) / 1000000000, 'packets': flow[2], 'bytes': flow[3],
+            }
+            for flow_key, flow in longest_flows
+        ],
+    }
+#    
+    stats = {
+        'capture': {
+            'packets': packet_count,
+            'bytes': byte_count,
+            'first_timestamp': None if first_timestamp_ns is None else first_timestamp_ns / 1000000000,
+            'last_timestamp': None if last_timestamp_ns is None else last_timestamp_ns / 1000000000,
+            'duration': 0 if first_timestamp_ns is None else (last_timestamp_ns - first_timestamp_ns) / 1000000000,
+        },
+        'protocol_hierarchy': dict(sorted(hierarchy.items(), key=lambda x: x[1]['packets'], reverse=True)),
+        'top_talkers': {
+            'by_bytes': sketch_top(talkers_bytes, 'address', 'bytes'),
+            'by_packets': sketch_top(talkers_packets, 'address', 'packets'),
+        },
+        'top_conversations': sketch_top(conversations_bytes, 'conversation', 'bytes'),
+        'ports': {
+            'tcp_dport': [ {'port': port, 'packets': count} for port, count in sorted(tcp_ports.items(), key=lambda x: x[1], reverse=True)[:top] ],
+            'udp_dport': [ {'port': port, 'packets': count} for port, count in sorted(udp_ports.items(), key=lambda x: x[1], reverse=True)[:top] ],
+            'distinct_tcp_dports': len(tcp_ports),
+            'distinct_udp_dports': len(udp_ports),
+        },
+        'packets_per_second': packets_per_second,
+        'flow_durations': flow_durations,
+        'tcp_flag_anomalies': anomalies,
+    }
+#    
+    if output_file:
+        with pathlib.Path(output_file).resolve().open('w') as f:
+            json.dump(stats, f, indent=4)
+    return stats
+
+# %%
+#######################################
+def scapyexport_ndjson(packet_source, output_file, fields=None, batch_size=1000):
+    """Exports the fields of each packet of a .pcap file (or of a PacketList) as NDJSON: one JSON object per line, per packet.  Unlike 'scapy_tshark_json', there is no round-trip through an external tshark process and the output is never held in memory as one JSON document: the lines are written to the file (or file handle) in batches of 'batch_size' packets.
+
+    Which fields are exported is pluggable through 'fields', a list of field names (or a dict of output names to fields) where each field is either:
+        - one of the raw header fields: 'timestamp', 'timestamp_ns', 'length', 'caplen', 'eth_src', 'eth_dst', 'vlan', 'ip_version', 'ip_src', 'ip_dst', 'protocol', 'sport', 'dport', 'tcp_seq', 'tcp_ack', 'tcp_flags', 'payload_len' (decoded straight from the raw bytes)
+        - a 'Layer.field' name of a scapy field, e.g. 'IP.ttl' or 'DNS.id' (None when the packet has no such layer)
+        - a function taking the scapy packet and returning a JSON-serializable value (only in a dict)
+
+    Packets are only dissected by scapy when a 'Layer.field' name or a function asks for it.  Without 'fields', every field of every layer is exported ({layer_name: {field_name: value}}, like tshark's JSON output), with repeated layers numbered (e.g. 'IP' and 'IP_2' for IP-in-IP).  Bytes are written as text when they are printable ascii (e.g. DNS names), and as hex strings otherwise.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> scapyexport_ndjson('temp.pcap', 'temp.ndjson', fields=['timestamp', 'ip_src', 'ip_dst', 'sport', 'dport'])\n
+        1
+        >>> print(open('temp.ndjson').read())\n
+        {"timestamp": 1629217872.080297, "ip_src": "66.17.1.2", "ip_dst": "185.34.210.1", "sport": 58429, "dport": 10001}
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> fields = {'time': 'timestamp', 'ttl': 'IP.ttl', 'summary': lambda pckt: pckt.summary()}\n
+        >>> scapyexport_ndjson(rdpcap('temp.pcap'), 'temp.ndjson', fields=fields)\n
+        1
+        >>> print(open('temp.ndjson').read())\n
+        {"time": 1629217872.080297, "ttl": 64, "summary": "Ether / IP / UDP 66.17.1.2:58429 > 185.34.210.1:10001 / Raw"}
+
+        >>> ##### EXAMPLE 3 #####\n
+        >>> import sys\n
+        >>> scapyexport_ndjson('temp.pcap', sys.stdout)\n
+        {"Ethernet": {"dst": "00:0c:29:64:3b:e1", "src": "00:50:56:c0:00:08", "type": 2048}, "IP": {"version": 4, "ihl": 5, ...
+        1
+
+    Args:
+        packet_source (str | iterable): Reference a .pcap (or .pcapng) file, or an iterable of scapy packets (PacketList, PcapReader, or a 'scapystream_*' generator)
+        output_file (str | file): Reference the path of the .ndjson file, or an open (text) file handle to write to
+        fields (list | dict, optional): Reference the fields to export. Defaults to None (every field of every layer).
+        batch_size (int, optional): Reference how many lines are written to the file at a time. Defaults to 1000.
+
+    Returns:
+        int: Returns the number of packets exported
+    """
+    import json
+    import pathlib
+#    
+    raw_fields = {
+        'timestamp': lambda record, headers: record[0] / 1000000000,
+        'timestamp_ns': lambda record, headers: record[0],
+        'length': lambda record, headers: record[3] or len(record[2]),
+        'caplen': lambda record, headers: len(record[2]),
+        'eth_src': lambda record, headers: None if headers['eth_src'] is None else scapyraw_format_address(headers['eth_src']),
+        'eth_dst': lambda record, headers: None if headers['eth_dst'] is None else scapyraw_format_address(headers['eth_dst']),
+        'vlan': lambda record, headers: list(headers['vlan']),
+        'ip_version': lambda record, headers: headers['ip_version'],
+        'ip_src': lambda record, headers: None if headers['ip_src'] is None else scapyraw_format_address(headers['ip_src']),
+        'ip_dst': lambda record, headers: None if headers['ip_dst'] is None else scapyraw_format_address(headers['ip_dst']),
+        'protocol': lambda record, headers: headers['ip_proto'],
+        'sport': lambda record, headers: headers['sport'],
+        'dport': lambda record, headers: headers['dport'],
+        'tcp_seq': lambda record, headers: headers['tcp_seq'],
+        'tcp_ack': lambda record, headers: headers['tcp_ack'],
+        'tcp_flags': lambda record, headers: headers['tcp_flags'],
+        'payload_len': lambda record, headers: headers['payload_len'],
+    }
+#    
+    def layer_field(spec):
+        layer_name, field_name = spec.split('.', 1)
+        def get_value(pckt):
+            if not pckt.haslayer(layer_name):
+                return None
+            value = pckt[layer_name]
+            for name in field_name.split('.'):
+                value = getattr(value, name)
+            return value
+        return get_value
+#    
+    def all_fields(pckt):
+        layers = {}
+        layer = pckt
+        while layer and not isinstance(layer, NoPayload):
+            # A repeated layer (e.g. the inner IP of IP-in-IP) is numbered, so the outer one is not overwritten
+            layer_name = layer.name
+            layer_number = 2
+            while layer_name in layers:
+                layer_name = f'{layer.name}_{layer_number}'
+                layer_number += 1
+            layers[layer_name] = { f.name: layer.getfieldval(f.name) for f in layer.fields_desc }
+            layer = layer.payload
+        return layers
+#    
+    def to_json(value):
+        # For the values json cannot serialize itself (bytes, scapy's EDecimal / FlagValue / nested packets)
+        if isinstance(value, (bytes, bytearray)):
+            return value.decode('ascii') if value.isascii() and bytes(value).decode('ascii').isprintable() else value.hex()
+        if isinstance(value, Decimal):
+            return float(value)
+        if isinstance(value, Packet):
+            return all_fields(value)
+        if isinstance(value, (set, tuple)):
+            return list(value)
+        return str(value) if not isinstance(value, int) else int(value)
+#    
+    # (output_name, raw field function or None, packet function or None) for each field
+    if fields is None:
+        extractors = None
+        needs_packet = True
+    else:
+        field_items = fields.items() if isinstance(fields, dict) else [ (f, f) for f in fields ]
+        extractors = []
+        for output_name, spec in field_items:
+            if callable(spec):
+                extractors.append((output_name, None, spec))
+            elif spec in raw_fields:
+                extractors.append((output_name, raw_fields[spec], None))
+            elif '.' in spec:
+                extractors.append((output_name, None, layer_field(spec)))
+            else:
+                raise ValueError(f"Unknown field '{spec}', use one of {list(raw_fields)} or a 'Layer.field' name")
+        needs_packet = any([ packet_function is not None for output_name, raw_function, packet_function in extractors ])
+#    
+    if isinstance(packet_source, str):
+        records_and_packets = ( (record, None) for record in scapyraw_pcap_records(packet_source) )
+    else:
+        records_and_packets = ( ((int(Decimal(str(pckt.time)) * 1000000000), None, bytes(pckt), getattr(pckt, 'wirelen', None), conf.l2types.layer2num.get(type(pckt), 1)), pckt) for pckt in packet_source )
+#    
+    if isinstance(output_file, str):
+        f = pathlib.Path(output_file).resolve().open('w', buffering=1 << 20)
+    else:
+        f = output_file
+    packet_count = 0
+    batch = []
+    try:
+        for record, pckt in records_and_packets:
+            if needs_packet and pckt is None:
+                timestamp_ns, file_offset, frame, wirelen, linktype = record
+                pckt = scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen)
+            if extractors is None:
+                row = all_fields(pckt)
+            else:
+                headers = scapyraw_parse_headers(record[2], record[4])
+                row = { output_name: raw_function(record, headers) if raw_function is not None else packet_function(pckt) for output_name, raw_function, packet_function in extractors }
+            batch.append(json.dumps(row, default=to_json))
+            packet_count += 1
+            if len(batch) >= batch_size:
+                f.write('\n'.join(batch) + '\n')
+                batch = []
+        if batch:
+            f.write('\n'.join(batch) + '\n')
+    finally:
+        if isinstance(output_file, str):
+            f.close()
+    return packet_count
+
+# %%
+#######################################
+def scapyconvert_packets_to_packed(packet_source):
+    """Converts a PacketList (or the records of a .pcap file) to a packed buffer: the bytes of every packet back to back in one contiguous bytearray, with NumPy arrays of the offset, length, timestamp, original length and linktype of each packet.  Unlike 'scapyconvert_packets_to_bytesarray', which returns a list of separate 'bytes' objects, a million packets are held in a handful of objects, so the packed buffer can be pickled to another process, or saved and loaded (see 'scapypacked_save' / 'scapypacked_load'), at the cost of one buffer copy.
+
+    The packets are read back with 'scapypacked_frame' (a zero-copy memoryview of the bytes of one packet) or 'scapypacked_packet' (the scapy packet, dissected only when it is asked for).
+
+    Example:
+        >>> ncat_pcap = rdpcap('ncat.pcap')\n
+        >>> packed = scapyconvert_packets_to_packed(ncat_pcap)\n
+        >>> len(packed['offsets']), len(packed['buffer'])\n
+        (12, 870)
+        >>> scapypacked_packet(packed, 5).load\n
+        b'Howareyou\\n'
+
+    Args:
+        packet_source (str | scapy.plist.PacketList): Reference an existing PacketList object, or a .pcap (or .pcapng) file
+
+    Returns:
+        dict: Returns the packed buffer, a dict with the 'buffer' (bytearray) and the 'offsets', 'lengths', 'timestamps_ns', 'wirelens' and 'linktypes' arrays
+    """
+    import numpy as np
+#    
+    if isinstance(packet_source, str):
+        records = scapyraw_pcap_records(packet_source)
+    else:
+        records = ( (int(Decimal(str(pckt.time)) * 1000000000), None, bytes(pckt), getattr(pckt, 'wirelen', None), conf.l2types.layer2num.get(type(pckt), 1)) for pckt in packet_source )
+#    
+    buffer = bytearray()
+    lengths = []
+    timestamps_ns = []
+    wirelens = []
+    linktypes = []
+    for timestamp_ns, file_offset, frame, wirelen, linktype in records:
+        buffer += frame
+        lengths.append(len(frame))
+        timestamps_ns.append(timestamp_ns)
+        wirelens.append(wirelen or len(frame))
+        linktypes.append(linktype)
+#    
+    lengths = np.array(lengths, dtype=np.uint32)
+    offsets = np.zeros(len(lengths), dtype=np.int64)
+    if len(lengths):
+        np.cumsum(lengths[:-1], out=offsets[1:])
+    return {
+        'buffer': buffer,
+        'offsets': offsets,
+        'lengths': lengths,
+        'timestamps_ns': np.array(timestamps_ns, dtype=np.int64),
+        'wirelens': np.array(wirelens, dtype=np.uint32),
+        'linktypes': np.array(linktypes, dtype=np.uint16),
+    }
+
+# %%
+#######################################
+def scapypacked_frame(packed: dict, index: int):
+    """Returns the bytes of one packet of a packed buffer (see 'scapyconvert_packets_to_packed') as a memoryview, without copying them.  The memoryview can be handed to 'scapyraw_parse_headers', searched, hashed, or written to a file as is.
+
+    Example:
+        >>> packed = scapyconvert_packets_to_packed(rdpcap('ncat.pcap'))\n
+        >>> frame = scapypacked_frame(packed, 5)\n
+        >>> headers = scapyraw_parse_headers(frame)\n
+        >>> bytes(frame[headers['payload_offset']:])\n
+        b'Howareyou\\n'
+
+    Args:
+        packed (dict): Reference a packed buffer
+        index (int): Reference the position of the packet in the packed buffer
+
+    Returns:
+        memoryview: Returns a memoryview of the bytes of the packet
+    """
+    offset = int(packed['offsets'][index])
+    return memoryview(packed['buffer'])[offset:offset + int(packed['lengths'][index])]
+
+# %%
+#######################################
+def scapypacked_iterator(packed: dict):
+    """Lazily yields each packet of a packed buffer (see 'scapyconvert_packets_to_packed') as a scapy packet, dissecting each one only when it is reached.  Use 'PacketList(list(scapypacked_iterator(packed)))' to get the whole PacketList back.
+
+    Example:
+        >>> packed = scapypacked_load('ncat.packed')\n
+        >>> packet_stream = scapystream_tcp_port(scapypacked_iterator(packed), 9898)\n
+        >>> scapystream_pcapwriter(packet_stream, 'ncat_9898.pcap')\n
+        12
+
+    Args:
+        packed (dict): Reference a packed buffer
+
+    Yields:
+        scapy.layers.l2.Ether: Yields each packet
+    """
+    for index in range(len(packed['offsets'])):
+        yield scapypacked_packet(packed, index)
+
+# %%
+#######################################
+def scapypacked_load(packed_file: str, use_mmap=True):
+    """Loads a packed buffer saved with 'scapypacked_save'.  By default the file is memory mapped: the arrays and the 'buffer' are views of the mapped file, so loading costs no copy at all, and the bytes of a packet are only read from disk when it is accessed.  With 'use_mmap=False' the whole file is read in one call instead.  (A memory mapped packed buffer cannot be pickled, so to share it with other processes, hand them the path of the file and let each of them map it.)
+
+    Example:
+        >>> packed = scapypacked_load('ncat.packed')\n
+        >>> scapypacked_packet(packed, 5).load\n
+        b'Howareyou\\n'
+
+    Args:
+        packed_file (str): Reference a file saved with 'scapypacked_save'
+        use_mmap (bool, optional): Set this to False to read the file into memory rather than memory mapping it. Defaults to True.
+
+    Returns:
+        dict: Returns the packed buffer
+    """
+    import mmap
+    import pathlib
+    import struct
+    import numpy as np
+#    
+    path_obj = pathlib.Path(packed_file).resolve()
+    with path_obj.open('rb') as f:
+        if use_mmap:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = f.read()
+#    
+    magic, packet_count, buffer_length = struct.unpack_from('<8sQQ', data, 0)
+    if magic != b'SCAPYPKD':
+        raise ValueError(f"Not a packed buffer file (magic: {bytes(magic)!r})")
+#    
+    packed = {}
+    offset = 24
+    for name, dtype in (('timestamps_ns', '<i8'), ('offsets', '<i8'), ('lengths', '<u4'), ('wirelens', '<u4'), ('linktypes', '<u2')):
+        packed[name] = np.frombuffer(data, dtype=dtype, count=packet_count, offset=offset)
+        offset += packet_count * np.dtype(dtype).itemsize
+    packed['buffer'] = memoryview(data)[offset:offset + buffer_length]
+    return packed
+
+# %%
+#######################################
+def scapypacked_packet(packed: dict, index: int):
+    """Returns one packet of a packed buffer (see 'scapyconvert_packets_to_packed') as a scapy packet (e.g. an Ether), with its original timestamp.  Only this packet is dissected, when it is asked for, rather than every packet of the buffer up front like 'scapyconvert_bytesarray_to_packets'.
+
+    Example:
+        >>> packed = scapyconvert_packets_to_packed(rdpcap('ncat.pcap'))\n
+        >>> pckt = scapypacked_packet(packed, 5)\n
+        >>> pckt.time\n
+        1635294905.032475
+        >>> pckt.load\n
+        b'Howareyou\\n'
+
+    Args:
+        packed (dict): Reference a packed buffer
+        index (int): Reference the position of the packet in the packed buffer
+
+    Returns:
+        scapy.layers.l2.Ether: Returns the packet
+    """
+    return scapyraw_frame_to_packet(bytes(scapypacked_frame(packed, index)), int(packed['timestamps_ns'][index]), int(packed['linktypes'][index]), int(packed['wirelens'][index]))
+
+# %%
+#######################################
+def scapypacked_save(packed: dict, output_file: str):
+    """Saves a packed buffer (see 'scapyconvert_packets_to_packed') to a file, as one write of its arrays and bytes (no per-packet work), to be loaded back with 'scapypacked_load'.
+
+    Example:
+        >>> packed = scapyconvert_packets_to_packed(rdpcap('ncat.pcap'))\n
+        >>> scapypacked_save(packed, 'ncat.packed')\n
+        '/home/kali/ncat.packed'
+
+    Args:
+        packed (dict): Reference a packed buffer
+        output_file (str): Reference the path of the file to save the packed buffer to
+
+    Returns:
+        str: Returns the path of the saved file
+    """
+    import pathlib
+    import struct
+    import numpy as np
+#    
+    path_obj = pathlib.Path(output_file).resolve()
+    packet_count = len(packed['offsets'])
+    # The 8 byte arrays come first, right after the 24 byte header, so they stay aligned when the file is memory mapped
+    header = struct.pack('<8sQQ', b'SCAPYPKD', packet_count, len(packed['buffer']))
+    with path_obj.open('wb') as f:
+        f.writelines([
+            header,
+            np.ascontiguousarray(packed['timestamps_ns'], dtype='<i8').tobytes(),
+            np.ascontiguousarray(packed['offsets'], dtype='<i8').tobytes(),
+            np.ascontiguousarray(packed['lengths'], dtype='<u4').tobytes(),
+            np.ascontiguousarray(packed['wirelens'], dtype='<u4').tobytes(),
+            np.ascontiguousarray(packed['linktypes'], dtype='<u2').tobytes(),
+            packed['buffer'],
+        ])
+    return path_obj.as_posix()
+
+# %%
+#######################################
+class ScapyLazyPacket:
+    """A lightweight stand-in for a scapy packet, for the filter-then-discard pattern (e.g. the 'scapystream_*' filters), see 'scapylazy_pcapreader'.  It holds only the raw bytes of the frame: the Ethernet / IP / IPv6 / TCP / UDP / ICMP headers are decoded (with 'scapyraw_parse_headers') the first time 'haslayer' or '[...]' is used, and the decoded layers are cached.  Anything else (another layer, a field that is not decoded here, 'show()', 'summary()', ...) is handed to a real scapy packet, which is only dissected then, once.
+
+    The layers decode these fields (every other field is read from the real scapy packet):
+        - Ether: src, dst
+        - IP / IPv6: src, dst, version
+        - TCP: sport, dport, seq, ack
+        - UDP: sport, dport
+        - ICMP: type, code
+
+    Example:
+        >>> ts_ns, offset, frame, wirelen, linktype = next(scapyraw_pcap_records('temp.pcap'))\n
+        >>> pckt = ScapyLazyPacket(frame, ts_ns, linktype, wirelen)\n
+        >>> pckt.haslayer('UDP'), pckt['IP'].src, pckt[UDP].dport\n
+        (True, '66.17.1.2', 10001)
+        >>> pckt['IP'].ttl\n
+        64
+        >>> pckt.packet\n
+        <Ether  dst=00:0c:29:64:3b:e1 src=00:50:56:c0:00:08 type=IPv4 |<IP  version=4 ihl=5 tos=0x0 len=46 id=1 flags= frag=0 ttl=64 proto=udp chksum=0x... src=66.17.1.2 dst=185.34.210.1 |<UDP  sport=58429 dport=10001 len=26 chksum=0x... |<Raw  load='...' |>>>>
+
+    Args:
+        frame (bytes): Reference the raw bytes of a frame
+        timestamp_ns (int, optional): Reference the timestamp of the frame in nanoseconds. Defaults to None.
+        linktype (int, optional): Reference the pcap linktype of the frame. Defaults to 1 (Ethernet).
+        wirelen (int, optional): Reference the original length of the frame. Defaults to None.
+    """
+    __slots__ = ('frame', 'timestamp_ns', 'linktype', 'wirelen', '_headers', '_layers', '_packet')
+#    
+    # The fields each layer decodes, from the 'scapyraw_parse_headers' dict
+    _fast_fields = {
+        'Ether': {'src': lambda h: scapyraw_format_address(h['eth_src']), 'dst': lambda h: scapyraw_format_address(h['eth_dst'])},
+        'IP': {'src': lambda h: scapyraw_format_address(h['ip_src']), 'dst': lambda h: scapyraw_format_address(h['ip_dst']), 'version': lambda h: 4},
+        'IPv6': {'src': lambda h: scapyraw_format_address(h['ip_src']), 'dst': lambda h: scapyraw_format_address(h['ip_dst']), 'version': lambda h: 6},
+        'TCP': {'sport': lambda h: h['sport'], 'dport': lambda h: h['dport'], 'seq': lambda h: h['tcp_seq'], 'ack': lambda h: h['tcp_ack']},
+        'UDP': {'sport': lambda h: h['sport'], 'dport': lambda h: h['dport']},
+        'ICMP': {'type': lambda h: h['icmp_type'], 'code': lambda h: h['icmp_code']},
+    }
+#    
+    def __init__(self, frame, timestamp_ns=None, linktype=1, wirelen=None):
+        self.frame = frame
+        self.timestamp_ns = timestamp_ns
+        self.linktype = linktype
+        self.wirelen = wirelen
+        self._headers = None
+        self._layers = {}
+        self._packet = None
+#    
+    @property
+    def headers(self):
+        if self._headers is None:
+            self._headers = scapyraw_parse_headers(self.frame, self.linktype)
+        return self._headers
+#    
+    @property
+    def packet(self):
+        """The real (fully dissected) scapy packet, dissected on first use"""
+        if self._packet is None:
+            self._packet = scapyraw_frame_to_packet(bytes(self.frame), self.timestamp_ns, self.linktype, self.wirelen)
+        return self._packet
+#    
+    @property
+    def time(self):
+        if self.timestamp_ns is None:
+            return self.packet.time
+        return EDecimal(self.timestamp_ns) / 1000000000
+#    
+    def _fast_haslayer(self, layer_name):
+        # True / False when the decoded headers are enough to tell, None when only scapy can
+        h = self.headers
+        if h['unparsed']:
+            return None
+        if layer_name == 'Ether':
+            return self.linktype == 1 and h['eth_src'] is not None
+        if layer_name == 'IP':
+            return h['ip_version'] == 4
+        if layer_name == 'IPv6':
+            return h['ip_version'] == 6
+        if layer_name in ('TCP', 'UDP', 'ICMP'):
+            if h['ip_version'] is None:
+                return False
+            if h['ip_fragment']:
+                return None
+            expected = {'TCP': 6, 'UDP': 17, 'ICMP': 1}[layer_name]
+            if h['ip_proto'] != expected:
+                return False
+            # A transport header cut short by the snaplen is left to scapy
+            return True if h['l4_offset'] is not None and (h['sport'] is not None or expected == 1) else None
+        return None
+#    
+    def haslayer(self, cls):
+        layer_name = cls if isinstance(cls, str) else cls.__name__
+        result = self._fast_haslayer(layer_name)
+        if result is None:
+            return self.packet.haslayer(cls)
+        return result
+#    
+    def __contains__(self, cls):
+        return self.haslayer(cls)
+#    
+    def __getitem__(self, cls):
+        layer_name = cls if isinstance(cls, str) else getattr(cls, '__name__', None)
+        if layer_name in self._layers:
+            return self._layers[layer_name]
+        if layer_name in self._fast_fields and self._fast_haslayer(layer_name):
+            layer = ScapyLazyLayer(self, layer_name)
+        else:
+            layer = self.packet[cls]
+        self._layers[layer_name] = layer
+        return layer
+#    
+    def getlayer(self, cls):
+        return self[cls] if self.haslayer(cls) else None
+#    
+    def __bytes__(self):
+        return bytes(self.frame)
+#    
+    def __len__(self):
+        return len(self.frame)
+#    
+    def __getattr__(self, name):
+        # Every other attribute / method (load, summary, show, sprintf, ...) comes from the real scapy packet.  Private
+        # names and unset slots are not delegated, as copy / pickle look them up before '__init__' has run.
+        if name.startswith('_') or name in self.__slots__:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        return getattr(self.packet, name)
+#    
+    def __getstate__(self):
+        # The frame may be a view of a memory-mapped file, so it is stored as bytes
+        return (bytes(self.frame), self.timestamp_ns, self.linktype, self.wirelen, self._packet)
+#    
+    def __setstate__(self, state):
+        self.__init__(*state[:4])
+        self._packet = state[4]
+#    
+    def __repr__(self):
+        if self._packet is not None:
+            return repr(self._packet)
+        return f'<ScapyLazyPacket {len(self.frame)} bytes (not dissected)>'
+
+# %%
+#######################################
+class ScapyLazyLayer:
+    """One layer of a 'ScapyLazyPacket': the fields decoded from the raw headers are returned (and cached) directly, any other field is read from the same layer of the real scapy packet."""
+    __slots__ = ('_lazy_packet', '_layer_name', '_values')
+#    
+    def __init__(self, lazy_packet, layer_name):
+        self._lazy_packet = lazy_packet
+        self._layer_name = layer_name
+        self._values = {}
+#    
+    def __getattr__(self, name):
+        # Private names and unset slots are not delegated, as copy / pickle look them up before '__init__' has run
+        if name.startswith('_') or name in self.__slots__:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        values = self._values
+        if name in values:
+            return values[name]
+        field_function = ScapyLazyPacket._fast_fields[self._layer_name].get(name)
+        if field_function is None:
+            return getattr(self._lazy_packet.packet[self._layer_name], name)
+        values[name] = field_function(self._lazy_packet.headers)
+        return values[name]
+#    
+    def __bytes__(self):
+        return bytes(self._lazy_packet.packet[self._layer_name])
+#    
+    def __repr__(self):
+        return repr(self._lazy_packet.packet[self._layer_name])
+
+# %%
+#######################################
+def scapylazy_pcapreader(pcap_file: str):
+    """Lazily yields each packet of a .pcap (or .pcapng) file as a 'ScapyLazyPacket', a stand-in that only decodes the headers it is asked about (and dissects the full scapy packet only when something else is needed).  Drop-in replacement for 'scapystream_pcapreader' in front of the 'scapystream_*' filters, where most packets are looked at once (an address, a port) and discarded, so they are never dissected by scapy at all.
+
+    Example:
+        >>> packet_stream = scapylazy_pcapreader('huge.pcap')\n
+        >>> packet_stream = scapystream_ip_address(packet_stream, '10.1.1.1')\n
+        >>> packet_stream = scapystream_tcp_port(packet_stream, 22)\n
+        >>> scapystream_pcapwriter(packet_stream, 'ssh_10.1.1.1.pcap')\n
+        4210
+
+    Args:
+        pcap_file (str): Reference a .pcap (or .pcapng) file
+
+    Yields:
+        ScapyLazyPacket: Yields each packet, undissected
+    """
+    for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(pcap_file):
+        yield ScapyLazyPacket(frame, timestamp_ns, linktype, wirelen)
+
+# %%
+#######################################
+def scapyraw_mmap_open(pcap_file: str):
+    """Memory maps a .pcap or .pcapng file and walks it once to find where every record starts, so that any record can then be read in O(1) by its index with 'scapyraw_mmap_record' (and every record, in order, with 'scapyraw_mmap_records').  The frames are returned as memoryviews of the mapped file: nothing is copied, and there is no read() call per packet.
+
+    Returns the opened capture as a dict with the 'mmap', a 'data' memoryview of the whole file, the 'format' ('pcap' or 'pcapng'), the 'offsets' of the records (a NumPy array), and the 'interfaces' of the records (the linktype and timestamp resolution of each capture interface, one for a .pcap file) with the 'record_interfaces' index of each record's interface (a NumPy array, None for a .pcap file).  Close it with 'scapyraw_mmap_close' once done.
+
+    Example:
+        >>> capture = scapyraw_mmap_open('huge.pcapng')\n
+        >>> len(capture['offsets'])\n
+        48211877
+        >>> timestamp_ns, file_offset, frame, wirelen, linktype = scapyraw_mmap_record(capture, 40000000)\n
+        >>> frame\n
+        <memory at 0x7f6b2c1e4a00>
+
+    Args:
+        pcap_file (str): Reference a .pcap or .pcapng file
+
+    Returns:
+        dict: Returns the opened capture
+    """
+    import mmap
+    import pathlib
+    import struct
+    import numpy as np
+#    
+    path_obj = pathlib.Path(pcap_file).resolve()
+    with path_obj.open('rb') as f:
+        if path_obj.stat().st_size == 0:
+            raise ValueError(f"Empty capture file: {path_obj.as_posix()}")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    data = memoryview(mapped)
+#    
+    capture = {'path': path_obj.as_posix(), 'mmap': mapped, 'data': data}
+    try:
+        if data[:4] == b'\x0a\x0d\x0d\x0a':
+            interfaces = []
+            offsets = []
+            record_interfaces = []
+            for block_offset, timestamp_ns, frame_start, frame_end, wirelen, interface_index in scapyraw_pcapng_walk(data, interfaces):
+                offsets.append(block_offset)
+                record_interfaces.append(interface_index)
+            capture.update({'format': 'pcapng', 'offsets': np.array(offsets, dtype=np.int64), 'interfaces': interfaces, 'record_interfaces': np.array(record_interfaces, dtype=np.int32)})
+            return capture
+#        
+        pcap_header = scapyraw_pcap_global_header(data[:24])
+        record_header = struct.Struct(pcap_header['endian'] + 'IIII')
+        data_length = len(data)
+        offsets = []
+        file_offset = 24
+        while file_offset + 16 <= data_length:
+            caplen = record_header.unpack_from(data, file_offset)[2]
+            if file_offset + 16 + caplen > data_length:
+                # Truncated final record
+                break
+            offsets.append(file_offset)
+            file_offset += 16 + caplen
+        interface = {'linktype': pcap_header['linktype'], 'snaplen': pcap_header['snaplen'], 'endian': pcap_header['endian'], 'ts_multiplier': pcap_header['ns_multiplier'], 'ts_divisor': 1, 'ts_offset_ns': 0}
+        capture.update({'format': 'pcap', 'offsets': np.array(offsets, dtype=np.int64), 'interfaces': [interface], 'record_interfaces': None})
+        return capture
+    except BaseException:
+        # Not leaving the file mapped when it cannot be read
+        data.release()
+        try:
+            mapped.close()
+        except BufferError:
+            pass
+        raise
+
+# %%
+#######################################
+def scapyraw_mmap_record(capture: dict, index: int):
+    """Returns the record at a given index of a capture opened with 'scapyraw_mmap_open', in O(1), as a tuple of (timestamp_ns, file_offset, frame, wirelen, linktype) where 'frame' is a memoryview of the mapped file (no copy), and 'file_offset' is the offset of the record (or pcapng block) in the file.  Negative indexes count from the end, like a list.
+
+    Example:
+        >>> capture = scapyraw_mmap_open('temp.pcap')\n
+        >>> timestamp_ns, file_offset, frame, wirelen, linktype = scapyraw_mmap_record(capture, -1)\n
+        >>> scapyraw_frame_to_packet(bytes(frame), timestamp_ns, linktype, wirelen).summary()\n
+        'Ether / IP / UDP 66.17.1.2:58429 > 185.34.210.1:10001 / Raw'
+
+    Args:
+        capture (dict): Reference a capture opened with 'scapyraw_mmap_open'
+        index (int): Reference the index of the record
+
+    Returns:
+        tuple: Returns a tuple of (timestamp_ns, file_offset, frame, wirelen, linktype)
+    """
+    import struct
+#    
+    file_offset = int(capture['offsets'][index])
+    data = capture['data']
+    if capture['format'] == 'pcapng':
+        interface = capture['interfaces'][capture['record_interfaces'][index]]
+        timestamp_ns, frame_start, frame_end, wirelen = scapyraw_pcapng_packet_block(data, file_offset, interface)
+        return (timestamp_ns or 0, file_offset, data[frame_start:frame_end], wirelen, interface['linktype'])
+#    
+    interface = capture['interfaces'][0]
+    ts_sec, ts_frac, caplen, wirelen = struct.unpack_from(interface['endian'] + 'IIII', data, file_offset)
+    return (ts_sec * 1000000000 + ts_frac * interface['ts_multiplier'], file_offset, data[file_offset + 16:file_offset + 16 + caplen], wirelen, interface['linktype'])
+
+# %%
+#######################################
+def scapyraw_mmap_records(pcap_file: str):
+    """Memory-mapped version of 'scapyraw_pcap_records', for .pcap and .pcapng files.  Lazily yields every record of the file as a tuple of (timestamp_ns, file_offset, frame, wirelen, linktype), walking the mapped file by offset, where 'frame' is a memoryview of the mapped file rather than a copy, and 'file_offset' is the offset of the record (or pcapng block) in the file.
+
+    The file is unmapped when the generator is exhausted or closed, unless frames are still referenced, in which case it is unmapped once the last of them is released; call bytes() on the frames to be kept for long, to let the mapping go.
+
+    Example:
+        >>> records = scapyraw_mmap_records('temp.pcapng')\n
+        >>> timestamp_ns, file_offset, frame, wirelen, linktype = next(records)\n
+        >>> timestamp_ns, file_offset, wirelen, linktype\n
+        (1629217872080297000, 140, 60, 1)
+        >>> scapyraw_parse_headers(frame, linktype)['dport']\n
+        10001
+
+    Args:
+        pcap_file (str): Reference a .pcap or .pcapng file
+
+    Yields:
+        tuple: Yields a tuple of (timestamp_ns, file_offset, frame, wirelen, linktype) for each record
+    """
+    import mmap
+    import pathlib
+    import struct
+#    
+    path_obj = pathlib.Path(pcap_file).resolve()
+    if path_obj.stat().st_size < 24:
+        return
+    with path_obj.open('rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    data = memoryview(mapped)
+    try:
+        if data[:4] == b'\x0a\x0d\x0d\x0a':
+            interfaces = []
+            for block_offset, timestamp_ns, frame_start, frame_end, wirelen, interface_index in scapyraw_pcapng_walk(data, interfaces):
+                if timestamp_ns is None:
+                    timestamp_ns = 0
+                yield (timestamp_ns, block_offset, data[frame_start:frame_end], wirelen, interfaces[interface_index]['linktype'])
+            return
+#        
+        pcap_header = scapyraw_pcap_global_header(data[:24])
+        ns_multiplier = pcap_header['ns_multiplier']
+        linktype = pcap_header['linktype']
+        unpack_from = struct.Struct(pcap_header['endian'] + 'IIII').unpack_from
+        data_length = len(data)
+        file_offset = 24
+        while file_offset + 16 <= data_length:
+            ts_sec, ts_frac, caplen, wirelen = unpack_from(data, file_offset)
+            frame_end = file_offset + 16 + caplen
+            if frame_end > data_length:
+                # Truncated final record
+                break
+            yield (ts_sec * 1000000000 + ts_frac * ns_multiplier, file_offset, data[file_offset + 16:frame_end], wirelen, linktype)
+            file_offset = frame_end
+    finally:
+        # Unmapping the file once the records are done with (or the generator is closed); frames still referenced by the caller keep the mapping alive until they are released
+        data.release()
+        try:
+            mapped.close()
+        except BufferError:
+            pass
+
+# %%
+#######################################
+def scapyraw_pcapng_packet_block(data, block_offset: int, interface: dict):
+    """Decodes one pcapng packet block (an Enhanced Packet Block, a Simple Packet Block, or an obsolete Packet Block) at a given offset of the file's bytes, given the interface the packet was captured on (from 'scapyraw_pcapng_walk').  Returns a tuple of (timestamp_ns, frame_start, frame_end, wirelen), where the frame is data[frame_start:frame_end].  Simple Packet Blocks carry no timestamp, so theirs is None.
+
+    Example:
+        >>> capture = scapyraw_mmap_open('temp.pcapng')\n
+        >>> scapyraw_pcapng_packet_block(capture['data'], int(capture['offsets'][0]), capture['interfaces'][0])\n
+        (1629217872080297000, 168, 228, 60)
+
+    Reference:
+        https://www.ietf.org/archive/id/draft-ietf-opsawg-pcapng-01.html
+
+    Args:
+        data (bytes | mmap.mmap | memoryview): Reference the bytes of a pcapng file
+        block_offset (int): Reference the offset of the block in the file
+        interface (dict): Reference the interface of the packet (as decoded by 'scapyraw_pcapng_walk')
+
+    Returns:
+        tuple: Returns a tuple of (timestamp_ns, frame_start, frame_end, wirelen)
+    """
+    import struct
+#    
+    endian = interface['endian']
+    block_type, block_length = struct.unpack_from(endian + 'II', data, block_offset)
+    if block_type == 3:
+        wirelen = struct.unpack_from(endian + 'I', data, block_offset + 8)[0]
+        caplen = min(wirelen, block_length - 16)
+        return (None, block_offset + 12, block_offset + 12 + caplen, wirelen)
+#    
+    # Enhanced Packet Blocks (6) and obsolete Packet Blocks (2) have their timestamp and lengths at the same offsets
+    ts_high, ts_low, caplen, wirelen = struct.unpack_from(endian + 'IIII', data, block_offset + 12)
+    timestamp = (ts_high << 32) | ts_low
+    timestamp_ns = timestamp * interface['ts_multiplier'] // interface['ts_divisor'] + interface['ts_offset_ns']
+    return (timestamp_ns, block_offset + 28, block_offset + 28 + caplen, wirelen)
+
+# %%
+#######################################
+def scapyraw_pcapng_walk(data, interfaces=None):
+    """Walks the blocks of a pcapng file (given as bytes, or better a memory map of the file) and lazily yields each packet, natively (without scapy's RawPcapNgReader).  Handles multiple sections (each with its own byte order) and multiple interfaces (each with its own linktype, timestamp resolution, e.g. nanoseconds, and timestamp offset).
+
+    Each packet is yielded as a tuple of (block_offset, timestamp_ns, frame_start, frame_end, wirelen, interface_index), where the frame is data[frame_start:frame_end], and 'interface_index' is the position of the packet's interface in 'interfaces' (a list the interfaces are appended to as they are found, counting across sections).
+
+    Example:
+        >>> interfaces = []\n
+        >>> with open('temp.pcapng', 'rb') as f:\n
+        ...     data = f.read()\n
+        >>> next(scapyraw_pcapng_walk(data, interfaces))\n
+        (140, 1629217872080297000, 168, 228, 60, 0)
+        >>> interfaces\n
+        [{'linktype': 1, 'snaplen': 262144, 'endian': '<', 'ts_multiplier': 1000, 'ts_divisor': 1, 'ts_offset_ns': 0}]
+
+    Reference:
+        https://www.ietf.org/archive/id/draft-ietf-opsawg-pcapng-01.html
+
+    Args:
+        data (bytes | mmap.mmap | memoryview): Reference the bytes of a pcapng file
+        interfaces (list, optional): Reference a list to collect the interfaces in. Defaults to None (a new list).
+
+    Yields:
+        tuple: Yields a tuple of (block_offset, timestamp_ns, frame_start, frame_end, wirelen, interface_index) for each packet
+    """
+    import struct
+#    
+    if interfaces is None:
+        interfaces = []
+    data_length = len(data)
+    endian = '<'
+    section_interfaces = []
+    block_offset = 0
+#    
+    while block_offset + 12 <= data_length:
+        if data[block_offset:block_offset + 4] == b'\x0a\x0d\x0d\x0a':
+            # Section Header Block, the byte order magic tells the byte order of the whole section
+            byte_order_magic = data[block_offset + 8:block_offset + 12]
+            if byte_order_magic == b'\x4d\x3c\x2b\x1a':
+                endian = '<'
+            elif byte_order_magic == b'\x1a\x2b\x3c\x4d':
+                endian = '>'
+            else:
+                raise ValueError(f"Not a pcapng formatted file (byte order magic: {bytes(byte_order_magic).hex()})")
+            section_interfaces = []
+#        
+        block_type, block_length = struct.unpack_from(endian + 'II', data, block_offset)
+        if block_length < 12 or block_offset + block_length > data_length:
+            # Truncated final block (e.g. a capture that is still being written)
+            break
+#        
+        if block_type == 1:
+            # Interface Description Block, with the if_tsresol (9) and if_tsoffset (14) options
+            linktype, reserved, snaplen = struct.unpack_from(endian + 'HHI', data, block_offset + 8)
+            ts_resolution = 6
+            ts_offset = 0
+            option_offset = block_offset + 16
+            options_end = block_offset + block_length - 4
+            while option_offset + 4 <= options_end:
+                option_code, option_length = struct.unpack_from(endian + 'HH', data, option_offset)
+                if option_code == 0:
+                    break
+                if option_code == 9 and option_length >= 1:
+                    ts_resolution = data[option_offset + 4]
+                elif option_code == 14 and option_length >= 8:
+                    ts_offset = struct.unpack_from(endian + 'q', data, option_offset + 4)[0]
+                option_offset += 4 + ((option_length + 3) & ~3)
+            if ts_resolution & 0x80:
+                # A power of 2 resolution
+                ts_multiplier, ts_divisor = 1000000000, 1 << (ts_resolution & 0x7F)
+            elif ts_resolution <= 9:
+                ts_multiplier, ts_divisor = 10 ** (9 - ts_resolution), 1
+            else:
+                ts_multiplier, ts_divisor = 1, 10 ** (ts_resolution - 9)
+            section_interfaces.append(len(interfaces))
+            interfaces.append({'linktype': linktype, 'snaplen': snaplen, 'endian': endian, 'ts_multiplier': ts_multiplier, 'ts_divisor': ts_divisor, 'ts_offset_ns': ts_offset * 1000000000})
+#        
+        elif block_type in (6, 2, 3):
+            if block_type == 6:
+                section_interface_id = struct.unpack_from(endian + 'I', data, block_offset + 8)[0]
+            elif block_type == 2:
+                section_interface_id = struct.unpack_from(endian + 'H', data, block_offset + 8)[0]
+            else:
+                section_interface_id = 0
+            if section_interface_id >= len(section_interfaces):
+                raise ValueError(f"Packet block at offset {block_offset} refers to interface {section_interface_id}, but its section only describes {len(section_interfaces)} interface(s)")
+            interface_index = section_interfaces[section_interface_id]
+            timestamp_ns, frame_start, frame_end, wirelen = scapyraw_pcapng_packet_block(data, block_offset, interfaces[interface_index])
+            yield (block_offset, timestamp_ns, frame_start, frame_end, wirelen, interface_index)
+#        
+        block_offset += block_length
+
+# %%
+#######################################
+def scapyconvert_timestamps(timestamp_source, tz=None, relative=False, as_strings=False, unit='us'):
+    """Bulk version of 'scapyconvert_packet_timestamp'.  Converts the timestamps of every packet of a PacketList, a .pcap / .pcapng file, a packet table (see 'scapyconvert_packets_to_numpy_table') or an array of timestamps at once, with NumPy, rather than one datetime at a time.  Returns a NumPy datetime64 array (in the given timezone, local time by default), or the same as strings in the form '%Y-%m-%d %H:%M:%S.%f' with 'as_strings=True'.
+
+    The timestamps are handled as integer nanoseconds from end to end, so the nanosecond precision of pcapng (and nanosecond pcap) files is kept with unit='ns'.  With 'relative=True' the times are the time since the first packet (like Wireshark's default time column), as a timedelta64 array, or as strings of seconds.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> scapyconvert_timestamps('one.pcap', as_strings=True)\n
+        array(['2021-08-17 09:31:12.080297'], dtype='<U26')
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> web_pcap = rdpcap('web.pcap')\n
+        >>> scapyconvert_timestamps(web_pcap, tz='UTC')[:2]\n
+        array(['2014-10-23T13:38:12.412640', '2014-10-23T13:38:12.412690'], dtype='datetime64[us]')
+
+        >>> ##### EXAMPLE 3 #####\n
+        >>> scapyconvert_timestamps(web_pcap, relative=True, as_strings=True)[:3]\n
+        array(['0.000000', '0.000050', '0.120301'], dtype='<U8')
+
+        >>> ##### EXAMPLE 4 #####\n
+        >>> scapyconvert_timestamps('sensor.pcapng', tz='America/New_York', unit='ns')[:1]\n
+        array(['2021-08-17T05:31:12.080297123'], dtype='datetime64[ns]')
+
+    Args:
+        timestamp_source (str | scapy.plist.PacketList | numpy.ndarray): Reference a .pcap / .pcapng file, an existing PacketList object (or any iterable of packets), a packet table, or an array of timestamps (integers in nanoseconds, or floats in seconds)
+        tz (str, optional): Reference the timezone to convert to, e.g. 'UTC' or 'Europe/Paris' (a named timezone other than 'UTC' needs Python 3.9+, or the 'backports.zoneinfo' or 'python-dateutil' package on Python 3.8). Defaults to None (the local timezone).
+        relative (bool, optional): Set this to True to get the time since the first packet instead. Defaults to False.
+        as_strings (bool, optional): Set this to True to get the times as strings. Defaults to False.
+        unit (str, optional): Reference the precision of the results, one of 's', 'ms', 'us' or 'ns'. Defaults to 'us'.
+
+    Returns:
+        numpy.ndarray: Returns an array of datetime64 (or timedelta64 with 'relative=True'), or of strings with 'as_strings=True'
+    """
+    import numpy as np
+    from datetime import datetime, timezone
+#    
+    unit_divisors = {'s': 1000000000, 'ms': 1000000, 'us': 1000, 'ns': 1}
+    if unit not in unit_divisors:
+        raise ValueError(f"Unknown unit '{unit}', use one of {list(unit_divisors)}")
+#    
+    # Getting every timestamp as integer nanoseconds
+    if isinstance(timestamp_source, str):
+        timestamps_ns = np.fromiter((record[0] for record in scapyraw_pcap_records(timestamp_source)), dtype=np.int64)
+    elif isinstance(timestamp_source, np.ndarray) and timestamp_source.dtype.names and 'timestamp_ns' in timestamp_source.dtype.names:
+        timestamps_ns = timestamp_source['timestamp_ns'].astype(np.int64)
+    elif isinstance(timestamp_source, np.ndarray) and timestamp_source.dtype.kind in 'iu':
+        timestamps_ns = timestamp_source.astype(np.int64)
+    elif isinstance(timestamp_source, np.ndarray) and timestamp_source.dtype.kind == 'f':
+        timestamps_ns = np.round(timestamp_source * 1e9).astype(np.int64)
+    else:
+        timestamps_ns = np.fromiter((int(Decimal(str(pckt.time)) * 1000000000) for pckt in timestamp_source), dtype=np.int64)
+#    
+    divisor = unit_divisors[unit]
+    if relative:
+        deltas_ns = timestamps_ns - timestamps_ns[0] if len(timestamps_ns) else timestamps_ns
+        # Negative deltas (packets before the first one, in merged or out of order captures) are truncated towards zero, and formatted with their sign in front
+        abs_deltas = np.abs(deltas_ns) // divisor
+        signs = np.where(deltas_ns < 0, -1, 1)
+        if not as_strings:
+            return (signs * abs_deltas).astype(f'timedelta64[{unit}]')
+        if not len(deltas_ns):
+            return np.array([], dtype=str)
+        # Seconds, with as many decimals as the unit
+        abs_deltas_ns = abs_deltas * divisor
+        seconds = np.char.add(np.where((signs < 0) & (abs_deltas > 0), '-', ''), np.char.mod('%d', abs_deltas_ns // 1000000000))
+        if unit == 's':
+            return seconds
+        digits = {'ms': 3, 'us': 6, 'ns': 9}[unit]
+        fractions = np.char.zfill(np.char.mod('%d', (abs_deltas_ns % 1000000000) // divisor), digits)
+        return np.char.add(np.char.add(seconds, '.'), fractions)
+#    
+    # The offset from UTC of the timezone, looked up once per distinct hour of the capture (daylight saving time changes on the hour)
+    if tz is None:
+        def utc_offset(hour):
+            return datetime.fromtimestamp(hour * 3600).astimezone().utcoffset()
+    else:
+        if tz.upper() == 'UTC':
+            zone = timezone.utc
+        else:
+            # zoneinfo is only in the standard library from Python 3.9, so on 3.8 the 'backports.zoneinfo' or 'python-dateutil' package is used instead
+            try:
+                from zoneinfo import ZoneInfo
+            except ImportError:
+                try:
+                    from backports.zoneinfo import ZoneInfo
+                except ImportError:
+                    ZoneInfo = None
+            if ZoneInfo is not None:
+                zone = ZoneInfo(tz)
+            else:
+                try:
+                    from dateutil.tz import gettz
+                except ImportError:
+                    raise ValueError(f"The named timezone '{tz}' needs Python 3.9+, or the 'backports.zoneinfo' or 'python-dateutil' package on Python 3.8 (tz=None and tz='UTC' work without them)") from None
+                zone = gettz(tz)
+                if zone is None:
+                    raise ValueError(f"Unknown timezone: '{tz}'")
+        def utc_offset(hour):
+            return datetime.fromtimestamp(hour * 3600, zone).utcoffset()
+    hours = timestamps_ns // 3600000000000
+    distinct_hours, hour_positions = np.unique(hours, return_inverse=True)
+    offsets_ns = np.array([ int(utc_offset(int(hour)).total_seconds()) * 1000000000 for hour in distinct_hours ], dtype=np.int64)
+    local_ns = timestamps_ns + offsets_ns[hour_positions.reshape(-1)] if len(timestamps_ns) else timestamps_ns
+#    
+    datetimes = (local_ns // divisor).astype(f'datetime64[{unit}]')
+    if not as_strings:
+        return datetimes
+    if not len(datetimes):
+        return np.array([], dtype=str)
+    return np.char.replace(np.datetime_as_string(datetimes, unit=unit), 'T', ' ')
+
+# %%
+#######################################
+def scapysniffoffline_pipeline(packet_source, prn=None, lfilter=None, workers=4, use_processes=False, queue_size=1000, ordered=True):
+    """Pipeline version of sniff(offline=..., prn=..., lfilter=...), for callbacks too slow to run inline (e.g. lookups, enrichment, heavy parsing).  A reader thread reads the packets and feeds them to a pool of worker threads (or processes, with 'use_processes=True') that run the callbacks, and the results are lazily yielded as they come back, in the original packet order ('ordered=True') or as soon as each one is ready ('ordered=False').
+
+    At most 'queue_size' packets are in flight at once: when the workers (or the consumer of the results) fall behind, the reader waits, so memory stays bounded whatever the size of the capture.  The results of the packets 'lfilter' rejects are skipped; without a 'prn', the packets 'lfilter' accepts are yielded.  With processes, the callbacks must be picklable (defined at the top level of a module), and the packets are sent to the workers as raw bytes and dissected there.  See 'scapysniffoffline_pipeline_async' for an asyncio-friendly version.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> def scapyprocessor(packetin):\n
+        ...     return f"UDP packet sent from {packetin['IP'].src}"\n
+        >>> for result in scapysniffoffline_pipeline('temp.pcap', prn=scapyprocessor, lfilter=lambda p: p.haslayer('UDP')):\n
+        ...     print(result)\n
+        UDP packet sent from 49.22.3.9\n
+        UDP packet sent from 49.22.3.9\n
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> results = list(scapysniffoffline_pipeline('huge.pcap', prn=my_enrichment, workers=16, use_processes=True, ordered=False))\n
+
+    Args:
+        packet_source (str | iterable): Reference a .pcap (or .pcapng) file, or an iterable of scapy packets (PacketList, PcapReader, or a 'scapystream_*' generator)
+        prn (function, optional): Reference the function to run on each packet. Defaults to None.
+        lfilter (function, optional): Reference the function deciding which packets 'prn' is run on. Defaults to None.
+        workers (int, optional): Reference the number of worker threads (or processes). Defaults to 4.
+        use_processes (bool, optional): Set this to True to run the callbacks in worker processes rather than threads (for CPU-bound callbacks). Defaults to False.
+        queue_size (int, optional): Reference the maximum number of packets in flight. Defaults to 1000.
+        ordered (bool, optional): Set this to False to get the results as soon as they are ready, rather than in packet order. Defaults to True.
+
+    Yields:
+        object: Yields the result of 'prn' for each packet accepted by 'lfilter'
+    """
+    import functools
+    import queue
+    import threading
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+#    
+    if isinstance(packet_source, str):
+        if use_processes:
+            # Raw records are cheaper to send to other processes than dissected packets
+            items = scapyraw_pcap_records(packet_source)
+        else:
+            items = ( scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen) for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(packet_source) )
+    else:
+        items = packet_source
+#    
+    executor = ProcessPoolExecutor(max_workers=workers) if use_processes else ThreadPoolExecutor(max_workers=workers)
+    task = functools.partial(scapysniffoffline_pipeline_apply, prn=prn, lfilter=lfilter)
+    futures_queue = queue.Queue()
+    # A slot is taken for each packet submitted and given back once its result has been consumed, so the reader waits when the workers or the consumer fall behind
+    in_flight = threading.Semaphore(queue_size)
+    stop_reading = threading.Event()
+    end_of_packets = object()
+    # The futures submitted but not consumed yet, cancelled if the consumer stops early (the lock keeps the reader from submitting while they are being cancelled)
+    unconsumed = set()
+    submit_lock = threading.Lock()
+#    
+    def reader():
+        try:
+            for item in items:
+                while not in_flight.acquire(timeout=0.1):
+                    if stop_reading.is_set():
+                        return
+                with submit_lock:
+                    if stop_reading.is_set():
+                        return
+                    future = executor.submit(task, item)
+                    unconsumed.add(future)
+                futures_queue.put(future)
+            futures_queue.put(end_of_packets)
+        except BaseException as error:
+            futures_queue.put(error)
+#    
+    reader_thread = threading.Thread(target=reader, daemon=True)
+    reader_thread.start()
+    try:
+        if ordered:
+            while True:
+                future = futures_queue.get()
+                if future is end_of_packets:
+                    break
+                if isinstance(future, BaseException):
+                    raise future
+                kept, result = future.result()
+                unconsumed.discard(future)
+                in_flight.release()
+                if kept:
+                    yield result
+        else:
+            pending = set()
+            reading = True
+            while reading or pending:
+                # Taking every future already queued (waiting for one when nothing is pending), then yielding the finished ones; the in-flight slots keep 'pending' within queue_size
+                while reading:
+                    try:
+                        future = futures_queue.get(block=not pending)
+                    except queue.Empty:
+                        break
+                    if future is end_of_packets:
+                        reading = False
+                    elif isinstance(future, BaseException):
+                        raise future
+                    else:
+                        pending.add(future)
+                if not pending:
+                    continue
+                done, pending = wait(pending, timeout=0.1 if reading else None, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kept, result = future.result()
+                    unconsumed.discard(future)
+                    in_flight.release()
+                    if kept:
+                        yield result
+    finally:
+        with submit_lock:
+            stop_reading.set()
+            for future in list(unconsumed):
+                future.cancel()
+        executor.shutdown(wait=False)
+
+# %%
+#######################################
+def scapysniffoffline_pipeline_apply(item, prn=None, lfilter=None):
+    """Worker for 'scapysniffoffline_pipeline': turns a raw record into a packet (when given a record rather than a packet), then runs the 'lfilter' and 'prn' callbacks on it, like sniff() does.  Returns a tuple of (kept, result), where 'kept' is False when 'lfilter' rejected the packet, and 'result' is what 'prn' returned (or the packet itself when there is no 'prn').
+
+    Example:
+        >>> pckt = rdpcap('temp.pcap')[0]\n
+        >>> scapysniffoffline_pipeline_apply(pckt, prn=lambda p: p['IP'].src, lfilter=lambda p: p.haslayer('UDP'))\n
+        (True, '66.17.1.2')
+
+    Args:
+        item (object): Reference a packet, or a (timestamp_ns, file_offset, frame, wirelen, linktype) record
+        prn (function, optional): Reference the function to run on each packet. Defaults to None.
+        lfilter (function, optional): Reference the function deciding which packets 'prn' is run on. Defaults to None.
+
+    Returns:
+        tuple: Returns a tuple of (kept, result)
+    """
+    if isinstance(item, tuple):
+        timestamp_ns, file_offset, frame, wirelen, linktype = item
+        item = scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen)
+    if lfilter is not None and not lfilter(item):
+        return (False, None)
+    if prn is None:
+        return (True, item)
+    return (True, prn(item))
+
+# %%
+#######################################
+async def scapysniffoffline_pipeline_async(packet_source, prn=None, lfilter=None, workers=4, use_processes=False, queue_size=1000, ordered=True):
+    """asyncio version of 'scapysniffoffline_pipeline': an async iterator over the results of the callbacks, for consumers running in an event loop.  The pipeline runs in its own threads (or processes), and each result is awaited without blocking the event loop.
+
+    Example:
+        >>> async def main():\n
+        ...     async for result in scapysniffoffline_pipeline_async('temp.pcap', prn=lambda p: p.summary(), lfilter=lambda p: p.haslayer('UDP')):\n
+        ...         print(result)\n
+        >>> asyncio.run(main())\n
+        Ether / IP / UDP 49.22.3.9:58429 > 185.34.210.1:10001 / Raw\n
+
+    Args:
+        packet_source (str | iterable): Reference a .pcap (or .pcapng) file, or an iterable of scapy packets
+        prn (function, optional): Reference the function to run on each packet. Defaults to None.
+        lfilter (function, optional): Reference the function deciding which packets 'prn' is run on. Defaults to None.
+        workers (int, optional): Reference the number of worker threads (or processes). Defaults to 4.
+        use_processes (bool, optional): Set this to True to run the callbacks in worker processes rather than threads. Defaults to False.
+        queue_size (int, optional): Reference the maximum number of packets in flight. Defaults to 1000.
+        ordered (bool, optional): Set this to False to get the results as soon as they are ready, rather than in packet order. Defaults to True.
+
+    Yields:
+        object: Yields the result of 'prn' for each packet accepted by 'lfilter'
+    """
+    import asyncio
+#    
+    loop = asyncio.get_running_loop()
+    results = scapysniffoffline_pipeline(packet_source, prn=prn, lfilter=lfilter, workers=workers, use_processes=use_processes, queue_size=queue_size, ordered=ordered)
+    end_of_results = object()
+    try:
+        while True:
+            result = await loop.run_in_executor(None, next, results, end_of_results)
+            if result is end_of_results:
+                break
+            yield result
+    finally:
+        results.close()
+
+# %%
+#######################################
+def scapyget_ip_watchlist(packet_list: scapy.plist.PacketList, watchlist, dst=False, src=False, notin=False):
+    """Takes a PacketList and a watchlist of ip addresses and CIDR ranges (IPv4 and IPv6, see 'scapywatchlist_compile_ips'), and returns the packets whose [IP].src or [IP].dst is in the watchlist (or those that are not in it, with notin=True), in a single pass whatever the size of the watchlist.  Unlike 'scapyget_ip_address', the addresses are matched exactly rather than as partial strings.
+
+    Example:
+        >>> temp_pcap = rdpcap('temp.pcap')\n
+        >>> scapyget_ip_watchlist(temp_pcap, ['185.34.210.0/24', '10.1.1.1'], dst=True)\n
+        <PacketList: TCP:0 UDP:1 ICMP:0 Other:0>
+
+    Args:
+        packet_list (scapy.plist.PacketList): Reference an existing PacketList object
+        watchlist (list | dict): Reference a list of ip addresses and CIDR ranges, or a watchlist compiled with 'scapywatchlist_compile_ips'
+        dst (bool, optional): If you want to only search the [IP].dst field, set dst=True. Defaults to False.
+        src (bool, optional): If you want to only search the [IP].src field, set src=True. Defaults to False.
+        notin (bool, optional): If you want to get every IP packet that DOES NOT match the watchlist, set notin=True. Defaults to False.
+
+    Returns:
+        scapy.plist.PacketList: Returns a PacketList object
+    """
+    if dst and src:
+        print("The defaults of this tool will search for the given ip address in both the [IP].dst and the [IP].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return PacketList([])
+#    
+    if not isinstance(watchlist, dict):
+        watchlist = scapywatchlist_compile_ips(watchlist)
+    if dst:
+        fields = ['dst']
+    elif src:
+        fields = ['src']
+    else:
+        fields = ['src', 'dst']
+#    
+    matching_packets = []
+    for pckt in packet_list:
+        headers = scapyraw_parse_headers(bytes(pckt), conf.l2types.layer2num.get(type(pckt), 1))
+        if headers['ip_version'] is None:
+            continue
+        is_match = any( scapywatchlist_ip_match(watchlist, headers['ip_' + f]) for f in fields )
+        if is_match != notin:
+            matching_packets.append(pckt)
+#    
+    return PacketList(matching_packets)
+
+# %%
+#######################################
+def scapynumpy_ip_watchlist(table, watchlist, dst=False, src=False, notin=False):
+    """Vectorized watchlist lookup over a packet table (see 'scapyconvert_packets_to_numpy_table').  Returns the IPv4 rows whose src_ip or dst_ip is in a watchlist of ip addresses and CIDR ranges (or the rows that are not in it, with notin=True), with one np.searchsorted over the watchlist's sorted intervals for the whole column (the IPv6 entries of the watchlist are ignored, since the table holds IPv4 addresses only).
+
+    Example:
+        >>> table = scapynumpy_load_table('huge.pcap')\n
+        >>> rows = scapynumpy_ip_watchlist(table, open('threat_intel.txt').read().split())\n
+        >>> len(rows)\n
+        3120
+
+    Args:
+        table (numpy.ndarray): Reference a packet table
+        watchlist (list | dict): Reference a list of ip addresses and CIDR ranges, or a watchlist compiled with 'scapywatchlist_compile_ips'
+        dst (bool, optional): If you want to only search the dst_ip column, set dst=True. Defaults to False.
+        src (bool, optional): If you want to only search the src_ip column, set src=True. Defaults to False.
+        notin (bool, optional): If you want to get every IPv4 row that DOES NOT match the watchlist, set notin=True. Defaults to False.
+
+    Returns:
+        numpy.ndarray: Returns the matching rows of the table
+    """
+    import numpy as np
+#    
+    if dst and src:
+        print("The defaults of this tool will search for the given ip address in both the [IP].dst and the [IP].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return table[:0]
+#    
+    if not isinstance(watchlist, dict):
+        watchlist = scapywatchlist_compile_ips(watchlist)
+    starts = np.array(watchlist[4]['starts'], dtype=np.int64)
+    ends = np.array(watchlist[4]['ends'], dtype=np.int64)
+#    
+    def in_watchlist(addresses):
+        addresses = addresses.astype(np.int64)
+        positions = np.searchsorted(starts, addresses, side='right') - 1
+        return (positions >= 0) & (addresses <= ends[np.maximum(positions, 0)]) if len(starts) else np.zeros(len(addresses), dtype=bool)
+#    
+    if dst:
+        ip_mask = in_watchlist(table['dst_ip'])
+    elif src:
+        ip_mask = in_watchlist(table['src_ip'])
+    else:
+        ip_mask = in_watchlist(table['src_ip']) | in_watchlist(table['dst_ip'])
+#    
+    if notin:
+        ip_mask = ~ip_mask
+    return table[ (table['ip_version'] == 4) & ip_mask ]
+
+# %%
+#######################################
+def scapypcapreader_ip_watchlist(pcap_file: str, watchlist, dst=False, src=False, notin=False):
+    """Returns the packets of a .pcap file whose [IP].src or [IP].dst (IPv4 or IPv6) is in a watchlist of ip addresses and CIDR ranges (or those that are not in it, with notin=True), in a single pass whatever the size of the watchlist (see 'scapywatchlist_compile_ips').  The packets are matched on their raw header bytes, so only the matching packets are dissected by scapy.
+
+    Example:
+        >>> watchlist = open('threat_intel.txt').read().split()\n
+        >>> scapypcapreader_ip_watchlist('huge.pcap', watchlist)\n
+        <PacketList: TCP:3108 UDP:12 ICMP:0 Other:0>
+
+    Args:
+        pcap_file (str): Reference a .pcap (or .pcapng) file
+        watchlist (list | dict): Reference a list of ip addresses and CIDR ranges, or a watchlist compiled with 'scapywatchlist_compile_ips'
+        dst (bool, optional): If you want to only search the [IP].dst field, set dst=True. Defaults to False.
+        src (bool, optional): If you want to only search the [IP].src field, set src=True. Defaults to False.
+        notin (bool, optional): If you want to get every IP packet that DOES NOT match the watchlist, set notin=True. Defaults to False.
+
+    Returns:
+        scapy.plist.PacketList: Returns a PacketList object
+    """
+    import ipaddress
+#    
+    if dst and src:
+        print("The defaults of this tool will search for the given ip address in both the [IP].dst and the [IP].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return PacketList([])
+#    
+    if not isinstance(watchlist, dict):
+        watchlist = scapywatchlist_compile_ips(watchlist)
+    if dst:
+        fields = ['dst']
+    elif src:
+        fields = ['src']
+    else:
+        fields = ['src', 'dst']
+#    
+    def raw_predicate(headers):
+        if headers['ip_version'] is None:
+            return False
+        is_match = any( scapywatchlist_ip_match(watchlist, headers['ip_' + f]) for f in fields )
+        return is_match != notin
+#    
+    def scapy_predicate(pckt):
+        if pckt.haslayer('IP'):
+            layer = pckt['IP']
+        elif pckt.haslayer('IPv6'):
+            layer = pckt['IPv6']
+        else:
+            return False
+        is_match = any( scapywatchlist_ip_match(watchlist, ipaddress.ip_address(getattr(layer, f)).packed) for f in fields )
+        return is_match != notin
+#    
+    result_list = list( scapyraw_filter(pcap_file, raw_predicate, fallback=scapy_predicate) )
+#
+    return PacketList(result_list)
+
+# %%
+#######################################
+def scapywatchlist_compile_ips(entries):
+    """Compiles a watchlist of ip addresses and CIDR ranges (IPv4 and IPv6, e.g. a threat-intel list of tens of thousands of entries) into sorted arrays of merged integer intervals, one per ip version.  An address is then looked up with a binary search ('scapywatchlist_ip_match'), so the cost of a lookup barely grows with the size of the watchlist, and a whole capture is checked against all the entries in one pass.
+
+    Unlike the partial string matching of 'scapyget_ip_address', addresses are matched exactly (10.1.1.1 does not match 10.1.1.100) and ranges by their prefix.  Blank entries and '#' comments are ignored, so the lines of a watchlist file can be given as is.
+
+    Example:
+        >>> watchlist = scapywatchlist_compile_ips(['10.1.1.1', '192.168.0.0/16', '192.168.4.0/24', '2001:db8::/32'])\n
+        >>> watchlist[4]\n
+        {'starts': [167837953, 3232235520], 'ends': [167837953, 3232301055]}
+        >>> scapywatchlist_ip_match(watchlist, '10.1.1.100'), scapywatchlist_ip_match(watchlist, '192.168.4.20')\n
+        (False, True)
+
+    Args:
+        entries (iterable): Reference an iterable of ip addresses and CIDR ranges (str), e.g. a list, or an open watchlist file
+
+    Returns:
+        dict: Returns the compiled watchlist, with the 'starts' and 'ends' of the intervals for each ip version (4 and 6)
+    """
+    import ipaddress
+#    
+    intervals = {4: [], 6: []}
+    for entry in entries:
+        entry = entry.split('#', 1)[0].strip()
+        if not entry:
+            continue
+        network = ipaddress.ip_network(entry, strict=False)
+        intervals[network.version].append((int(network.network_address), int(network.broadcast_address)))
+#    
+    watchlist = {}
+    for version, version_intervals in intervals.items():
+        # Merging the overlapping (and touching) intervals, so the intervals left are disjoint and sorted
+        starts = []
+        ends = []
+        for start, end in sorted(version_intervals):
+            if ends and start <= ends[-1] + 1:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        watchlist[version] = {'starts': starts, 'ends': ends}
+    return watchlist
+
+# %%
+#######################################
+def scapywatchlist_ip_match(watchlist: dict, address):
+    """Tells whether an ip address is in a watchlist compiled with 'scapywatchlist_compile_ips', with a binary search over the watchlist's intervals.
+
+    Example:
+        >>> watchlist = scapywatchlist_compile_ips(['10.1.1.1', '192.168.0.0/16', '2001:db8::/32'])\n
+        >>> scapywatchlist_ip_match(watchlist, '2001:db8::1'), scapywatchlist_ip_match(watchlist, b'\\n\\x01\\x01\\x01')\n
+        (True, True)
+
+    Args:
+        watchlist (dict): Reference a watchlist compiled with 'scapywatchlist_compile_ips'
+        address (str | bytes): Reference an ip address, as a string or as its 4 / 16 raw bytes (e.g. the 'ip_src' of 'scapyraw_parse_headers')
+
+    Returns:
+        bool: Returns True when the address is in the watchlist
+    """
+    import bisect
+    import ipaddress
+#    
+    if isinstance(address, str):
+        address = ipaddress.ip_address(address).packed
+    if address is None:
+        return False
+    intervals = watchlist[4 if len(address) == 4 else 6]
+    address_int = int.from_bytes(address, 'big')
+    position = bisect.bisect_right(intervals['starts'], address_int) - 1
+    return position >= 0 and address_int <= intervals['ends'][position]
+
+# %%
+#######################################
+def scapyget_mac_watchlist(packet_list: scapy.plist.PacketList, watchlist, dst=False, src=False, notin=False):
+    """Takes a PacketList and a watchlist of mac addresses and OUI prefixes (see 'scapywatchlist_compile_macs'), and returns the packets whose [Ether].src or [Ether].dst is in the watchlist (or those that are not in it, with notin=True), in a single pass whatever the size of the watchlist.
+
+    Example:
+        >>> temp_pcap = rdpcap('temp.pcap')\n
+        >>> scapyget_mac_watchlist(temp_pcap, ['00:0c:29', '00:50:56:c0:00:08'])\n
+        <PacketList: TCP:0 UDP:1 ICMP:0 Other:0>
+
+    Args:
+        packet_list (scapy.plist.PacketList): Reference an existing PacketList object
+        watchlist (list | dict): Reference a list of mac addresses and prefixes, or a watchlist compiled with 'scapywatchlist_compile_macs'
+        dst (bool, optional): If you want to only search the [Ether].dst field, set dst=True. Defaults to False.
+        src (bool, optional): If you want to only search the [Ether].src field, set src=True. Defaults to False.
+        notin (bool, optional): If you want to get every Ethernet packet that DOES NOT match the watchlist, set notin=True. Defaults to False.
+
+    Returns:
+        scapy.plist.PacketList: Returns a PacketList object
+    """
+    if dst and src:
+        print("The defaults of this tool will search for the given mac address in both the [Ether].dst and the [Ether].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return PacketList([])
+#    
+    if not isinstance(watchlist, dict) or 'macs' not in watchlist:
+        watchlist = scapywatchlist_compile_macs(watchlist)
+    if dst:
+        fields = ['dst']
+    elif src:
+        fields = ['src']
+    else:
+        fields = ['src', 'dst']
+#    
+    matching_packets = [ pckt for pckt in packet_list if pckt.haslayer('Ether') and ( any( scapywatchlist_mac_match(watchlist, getattr(pckt['Ether'], f)) is not None for f in fields ) != notin ) ]
+#    
+    return PacketList(matching_packets)
+
+# %%
+#######################################
+def scapypcapreader_mac_watchlist(pcap_file: str, watchlist, dst=False, src=False, notin=False):
+    """Returns the packets of a .pcap file whose [Ether].src or [Ether].dst is in a watchlist of mac addresses and OUI prefixes (or those that are not in it, with notin=True), in a single streaming pass whatever the size of the watchlist (see 'scapywatchlist_compile_macs').  The addresses are matched on the raw header bytes, so only the matching packets are dissected by scapy.
+
+    Example:
+        >>> scapypcapreader_mac_watchlist('huge.pcap', ['00:0c:29', '00:50:56', '00:05:69', '00:1c:14'], src=True)\n
+        <PacketList: TCP:20388 UDP:1022 ICMP:41 Other:87>
+
+    Args:
+        pcap_file (str): Reference a .pcap (or .pcapng) file
+        watchlist (list | dict): Reference a list of mac addresses and prefixes, or a watchlist compiled with 'scapywatchlist_compile_macs'
+        dst (bool, optional): If you want to only search the [Ether].dst field, set dst=True. Defaults to False.
+        src (bool, optional): If you want to only search the [Ether].src field, set src=True. Defaults to False.
+        notin (bool, optional): If you want to get every Ethernet packet that DOES NOT match the watchlist, set notin=True. Defaults to False.
+
+    Returns:
+        scapy.plist.PacketList: Returns a PacketList object
+    """
+    if dst and src:
+        print("The defaults of this tool will search for the given mac address in both the [Ether].dst and the [Ether].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return PacketList([])
+#    
+    if not isinstance(watchlist, dict) or 'macs' not in watchlist:
+        watchlist = scapywatchlist_compile_macs(watchlist)
+    if dst:
+        fields = ['dst']
+    elif src:
+        fields = ['src']
+    else:
+        fields = ['src', 'dst']
+#    
+    # The Ethernet header is always decoded, so no scapy fallback is needed
+    def raw_predicate(headers):
+        if headers['eth_src'] is None:
+            return False
+        is_match = any( scapywatchlist_mac_match(watchlist, headers['eth_' + f]) is not None for f in fields )
+        return is_match != notin
+#    
+    result_list = list( scapyraw_filter(pcap_file, raw_predicate) )
+#
+    return PacketList(result_list)
+
+# %%
+#######################################
+def scapywatchlist_compile_macs(entries):
+    """Compiles a watchlist of mac addresses and OUI / vendor prefixes into 48 bit integers, held in a hashed set of full addresses and one hashed set of prefixes per prefix length, so a mac address is looked up with a few dict lookups ('scapywatchlist_mac_match') whatever the size of the watchlist.
+
+    Each entry is a full mac address ('00:0c:29:64:3b:e1', '00-0C-29-64-3B-E1', '000c.2964.3be1'), an OUI ('00:0c:29', the first 24 bits), or a prefix with its length in bits ('70:b3:d5:0e:30:00/36', e.g. the MA-S blocks of the IEEE registry).  Entries can be given a label (e.g. a vendor or an asset name) by passing a dict of entries to labels, otherwise the entry itself is the label.  Blank entries and '#' comments are ignored.
+
+    Example:
+        >>> watchlist = scapywatchlist_compile_macs({'00:0c:29': 'VMware', '00:50:56:c0:00:08': 'vmnet8 host', '70:b3:d5:0e:30:00/36': 'PLC'})\n
+        >>> scapywatchlist_mac_match(watchlist, '00:0c:29:64:3b:e1'), scapywatchlist_mac_match(watchlist, '00:50:56:c0:00:01')\n
+        ('VMware', None)
+
+    Args:
+        entries (iterable | dict): Reference an iterable of mac addresses and prefixes (str), or a dict of them to their labels
+
+    Returns:
+        dict: Returns the compiled watchlist, with the 'macs' (a dict of 48 bit integers to labels) and the 'prefixes' (a dict of prefix lengths to dicts of prefixes to labels, longest prefixes first)
+    """
+    import re
+#    
+    labelled_entries = entries.items() if isinstance(entries, dict) else [ (entry, None) for entry in entries ]
+    macs = {}
+    prefixes = {}
+    for entry, label in labelled_entries:
+        entry_text = entry.split('#', 1)[0].strip()
+        if not entry_text:
+            continue
+        if label is None:
+            label = entry_text
+        address_text, slash, bits_text = entry_text.partition('/')
+        hex_digits = re.sub(r'[:\-. ]', '', address_text).lower()
+        if not re.fullmatch(r'[0-9a-f]{1,12}', hex_digits):
+            raise ValueError(f"Not a mac address or prefix: '{entry}'")
+        bits = int(bits_text) if slash else len(hex_digits) * 4
+        value = int(hex_digits.ljust(12, '0'), 16)
+        if bits >= 48:
+            macs[value] = label
+        else:
+            prefixes.setdefault(bits, {})[value >> (48 - bits)] = label
+#    
+    return {'macs': macs, 'prefixes': dict(sorted(prefixes.items(), reverse=True))}
+
+# %%
+#######################################
+def scapywatchlist_mac_match(watchlist: dict, mac):
+    """Looks up a mac address in a watchlist compiled with 'scapywatchlist_compile_macs'.  Returns the label of the full address entry that matches, or else of the longest prefix that matches, or None.
+
+    Example:
+        >>> watchlist = scapywatchlist_compile_macs(['00:0c:29', '00:50:56:c0:00:08'])\n
+        >>> scapywatchlist_mac_match(watchlist, b'\\x00\\x0c\\x29\\x64\\x3b\\xe1')\n
+        '00:0c:29'
+
+    Args:
+        watchlist (dict): Reference a watchlist compiled with 'scapywatchlist_compile_macs'
+        mac (str | bytes | int): Reference a mac address, as a string, as its 6 raw bytes (e.g. the 'eth_src' of 'scapyraw_parse_headers'), or as a 48 bit integer
+
+    Returns:
+        str: Returns the label of the matching entry, or None
+    """
+    if mac is None:
+        return None
+    if isinstance(mac, str):
+        mac_int = int(mac.replace(':', '').replace('-', '').replace('.', ''), 16)
+    elif isinstance(mac, int):
+        mac_int = mac
+    else:
+        mac_int = int.from_bytes(mac, 'big')
+#    
+    label = watchlist['macs'].get(mac_int)
+    if label is not None:
+        return label
+    for bits, bits_prefixes in watchlist['prefixes'].items():
+        label = bits_prefixes.get(mac_int >> (48 - bits))
+        if label is not None:
+            return label
+    return None
+
+# %%
+#######################################
+def scapywatchlist_mac_vendor_counts(packet_source, watchlist=None, top=None):
+    """Builds an asset inventory of a capture in one streaming pass: for each vendor, the number of distinct mac addresses seen (as [Ether].src or [Ether].dst) and the number of packets they sent.  The vendor of each mac address is the label of the watchlist entry it matches (see 'scapywatchlist_compile_macs'), or when no watchlist is given, the short manufacturer name from scapy's manuf database (conf.manufdb).  The vendor is looked up once per distinct mac address.  Addresses with no known vendor are counted under 'Unknown'.
+
+    Example:
+        >>> scapywatchlist_mac_vendor_counts('office.pcap', top=3)\n
+        {'Dell': {'macs': 212, 'packets': 1820446}, 'Apple': {'macs': 97, 'packets': 520115}, 'Cisco': {'macs': 12, 'packets': 98011}}
+
+    Args:
+        packet_source (str | iterable): Reference a .pcap (or .pcapng) file, or an iterable of scapy packets (PacketList, PcapReader, or a 'scapystream_*' generator)
+        watchlist (list | dict, optional): Reference a list (or dict of labels) of mac addresses and prefixes, or a watchlist compiled with 'scapywatchlist_compile_macs'. Defaults to None (scapy's manuf database).
+        top (int, optional): Reference how many vendors to return (by number of packets). Defaults to None (every vendor).
+
+    Returns:
+        dict: Returns a dict of each vendor to the number of distinct 'macs' and the number of 'packets' sent, by number of packets
+    """
+    if watchlist is not None and (not isinstance(watchlist, dict) or 'macs' not in watchlist):
+        watchlist = scapywatchlist_compile_macs(watchlist)
+#    
+    if isinstance(packet_source, str):
+        frames = ( (frame, linktype) for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(packet_source) )
+    else:
+        frames = ( (bytes(pckt), conf.l2types.layer2num.get(type(pckt), 1)) for pckt in packet_source )
+#    
+    # Counting per distinct mac address first, the vendors are only looked up at the end
+    sent_packets = {}
+    for frame, linktype in frames:
+        headers = scapyraw_parse_headers(frame, linktype)
+        if headers['eth_src'] is None:
+            continue
+        sent_packets[headers['eth_src']] = sent_packets.get(headers['eth_src'], 0) + 1
+        sent_packets.setdefault(headers['eth_dst'], 0)
+#    
+    vendor_counts = {}
+    for mac_bytes, packet_count in sent_packets.items():
+        if watchlist is not None:
+            vendor = scapywatchlist_mac_match(watchlist, mac_bytes)
+        else:
+            mac_text = scapyraw_format_address(mac_bytes)
+            vendor = conf.manufdb._get_short_manuf(mac_text)
+            if vendor == mac_text:
+                vendor = None
+        vendor_entry = vendor_counts.setdefault(vendor or 'Unknown', {'macs': 0, 'packets': 0})
+        vendor_entry['macs'] += 1
+        vendor_entry['packets'] += packet_count
+#    
+    ranked = sorted(vendor_counts.items(), key=lambda x: x[1]['packets'], reverse=True)
+    return dict(ranked[:top] if top else ranked)
+
+# %%
+#######################################
+def scapyport_compile_set(ports):
+    """Compiles ports, port ranges and named port groups into a 65536 entry bitmap (a bytearray with a 1 for each port in the set), so testing whether a port is in the set is a single index (bitmap[port]) whatever the number of ports.  Used by 'scapyget_port', 'scapyget_tcp_port' and 'scapyget_udp_port'.
+
+    The named groups are 'well-known' (0-1023), 'registered' (1024-49151) and 'ephemeral' (49152-65535, also called 'dynamic').  Ranges can be given as a range object or as a 'low-high' string (both ends included).
+
+    Example:
+        >>> port_bitmap = scapyport_compile_set([22, 80, 443, '8000-8100', range(3000, 3010), 'ephemeral'])\n
+        >>> port_bitmap[443], port_bitmap[8050], port_bitmap[3010], port_bitmap[60000]\n
+        (1, 1, 0, 1)
+
+    Args:
+        ports (int | str | range | iterable): Reference a port number (any integer type, numpy included), a range, a 'low-high' string, a group name, or an iterable mixing any of them (an already compiled bitmap is returned as it is)
+
+    Returns:
+        bytearray: Returns a 65536 entry bitmap of the ports
+    """
+    import numbers
+#    
+    if isinstance(ports, bytearray) and len(ports) == 65536:
+        return ports
+#    
+    port_groups = {'well-known': range(0, 1024), 'registered': range(1024, 49152), 'ephemeral': range(49152, 65536), 'dynamic': range(49152, 65536)}
+    port_bitmap = bytearray(65536)
+    pending = [ports]
+    while pending:
+        entry = pending.pop()
+        if isinstance(entry, numbers.Integral):
+            # Any integer type, e.g. the numpy integers of a 'scapynumpy' table column
+            entry = int(entry)
+            if not 0 <= entry <= 65535:
+                raise ValueError(f"Not a port number: {entry}")
+            port_bitmap[entry] = 1
+        elif isinstance(entry, range):
+            if entry.step != 1:
+                pending.extend(entry)
+                continue
+            if entry.start < 0 or entry.stop > 65536:
+                raise ValueError(f"Not a port range: {entry}")
+            # Setting a whole slice at once rather than port by port
+            port_bitmap[entry.start:entry.stop] = b'\x01' * len(entry)
+        elif isinstance(entry, str):
+            entry_text = entry.strip().lower()
+            if entry_text in port_groups:
+                pending.append(port_groups[entry_text])
+            elif '-' in entry_text:
+                low, high = entry_text.split('-', 1)
+                pending.append(range(int(low), int(high) + 1))
+            else:
+                pending.append(int(entry_text))
+        else:
+            pending.extend(entry)
+#    
+    return port_bitmap
+
+# %%
+#######################################
+def scapypayload_extract_between_patterns(packet_source, left_pattern, right_pattern, ignorecase=True, streams=False, overlap=4096):
+    """Lazily extracts the content between a left and a right pattern (regular expressions) from the payloads of a .pcap file (or of a PacketList), in a single pass.  The 'left(.*?)right' expression is compiled once as a bytes pattern and run straight on the raw payload bytes, so nothing is decoded and non utf-8 payloads are handled.
+
+    By default each packet's payload is searched on its own, and each extracted span comes with its packet number (the position of the packet in the .pcap / PacketList, starting at 0).  With 'streams=True' the TCP streams are reassembled (see 'scapystream_tcp_reassemble') and searched as continuous streams, so content spanning packet boundaries is extracted too, and each span comes with its direction_key.  Only the last 'overlap' bytes of each stream are kept between packets (see 'scapystream_tcp_search_buffers'), so a match longer than 'overlap' bytes that spans packets is not found.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> list(scapypayload_extract_between_patterns('web.pcap', 'Host: ', '\\r\\n'))\n
+        [(3, 22, b'www.bbc.co.uk'), (12, 22, b'www.google.com')]
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> for direction_key, stream_offset, content in scapypayload_extract_between_patterns('web.pcap', 'Cookie: ', '\\r\\n', streams=True):\n
+        >>>     print(direction_key, content[:20])\n
+        TCP 74.2.7.198:48905 > 245.64.204.201:80 b'SID=31d4d96e407aad42'
+
+    Args:
+        packet_source (str | scapy.plist.PacketList): Reference a .pcap file, or an existing PacketList object (or any iterable of packets)
+        left_pattern (str | bytes): Reference the regular expression before the content
+        right_pattern (str | bytes): Reference the regular expression after the content
+        ignorecase (bool, optional): If you want to have a case-sensitive pattern match set this to False. Defaults to True.
+        streams (bool, optional): Set this to True to search the reassembled TCP streams, rather than each packet's payload. Defaults to False.
+        overlap (int, optional): Reference how many bytes at the end of each stream are kept to match content spanning packets (only used with 'streams=True'). Defaults to 4096.
+
+    Yields:
+        tuple: Yields (packet_number, payload_offset, content) for each extracted span (or (direction_key, stream_offset, content) with 'streams=True'), the offset being where the content starts
+    """
+    import re
+#    
+    left_bytes = left_pattern.encode() if isinstance(left_pattern, str) else left_pattern
+    right_bytes = right_pattern.encode() if isinstance(right_pattern, str) else right_pattern
+    flags = re.IGNORECASE if ignorecase else 0
+    # The content is the first group after any groups of the left pattern itself
+    content_group = re.compile(left_bytes).groups + 1
+    match_syntax = re.compile(b'(?:' + left_bytes + b')(.*?)(?:' + right_bytes + b')', flags)
+#    
+    if streams:
+        for direction_key, buffer_offset, buffer, carry_length in scapystream_tcp_search_buffers(packet_source, overlap):
+            for match in match_syntax.finditer(buffer):
+                # Matches entirely within the carried over bytes were already extracted with the previous chunk
+                if match.end() > carry_length:
+                    yield (direction_key, buffer_offset + match.start(content_group), match.group(content_group))
+    else:
+        if isinstance(packet_source, str):
+            frames = ( (frame, linktype) for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(packet_source) )
+        else:
+            frames = ( (bytes(pckt), conf.l2types.layer2num.get(type(pckt), 1)) for pckt in packet_source )
+        for packet_number, (frame, linktype) in enumerate(frames):
+            headers = scapyraw_parse_headers(frame, linktype)
+            if not headers['payload_len']:
+                continue
+            payload = bytes(frame[headers['payload_offset']:headers['payload_offset'] + headers['payload_len']])
+            for match in match_syntax.finditer(payload):
+                yield (packet_number, match.start(content_group), match.group(content_group))
+
+# %%
+#######################################
+def scapyexport_dns(packet_source, output_file, output_format=None, responses_only=False, cache_size=10000, batch_size=1000):
+    """Exports a DNS query log from a .pcap file (or a PacketList) as CSV or NDJSON, with one row of (ts, client, qname, qtype, rcode, answers) per DNS message (see 'scapystream_dns_records').  The DNS messages are parsed straight from the raw UDP port 53 payloads, and the rows are streamed to the file (or file handle) in batches of 'batch_size' rows, so captures of any size are exported without being held in memory.  In the CSV output the answers are joined with ';'.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> scapyexport_dns('dns.pcap', 'dns.csv')\n
+        2
+        >>> print(open('dns.csv').read())\n
+        ts,client,qname,qtype,rcode,answers
+        1629217872.080297,192.168.0.5,www.example.com,A,,
+        1629217872.091455,192.168.0.5,www.example.com,A,NOERROR,example.com;93.184.216.34
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> scapyexport_dns('dns.pcap', 'dns.ndjson', responses_only=True)\n
+        1
+        >>> print(open('dns.ndjson').read())\n
+        {"ts": 1629217872.091455, "client": "192.168.0.5", "qname": "www.example.com", "qtype": "A", "rcode": "NOERROR", "answers": ["example.com", "93.184.216.34"]}
+
+    Args:
+        packet_source (str | iterable): Reference a .pcap (or .pcapng) file, or an iterable of scapy packets (PacketList, PcapReader, or a 'scapystream_*' generator)
+        output_file (str | file): Reference the path of the .csv / .ndjson file, or an open (text) file handle to write to
+        output_format (str, optional): Reference the output format, 'csv' or 'ndjson'. Defaults to None (from the extension of output_file, otherwise 'ndjson').
+        responses_only (bool, optional): If you only want the responses (which carry the rcode and answers), set responses_only=True. Defaults to False.
+        cache_size (int, optional): Reference the maximum number of decoded names kept in the cache. Defaults to 10000.
+        batch_size (int, optional): Reference how many rows are written to the file at a time. Defaults to 1000.
+
+    Returns:
+        int: Returns the number of rows exported
+    """
+    import csv
+    import json
+    import pathlib
+#    
+    if output_format is None:
+        output_format = 'csv' if isinstance(output_file, str) and output_file.lower().endswith('.csv') else 'ndjson'
+    if output_format not in ('csv', 'ndjson'):
+        raise ValueError(f"Unknown output_format '{output_format}', use 'csv' or 'ndjson'")
+    columns = ['ts', 'client', 'qname', 'qtype', 'rcode', 'answers']
+#    
+    if isinstance(output_file, str):
+        f = pathlib.Path(output_file).resolve().open('w', newline='', buffering=1 << 20)
+    else:
+        f = output_file
+    row_count = 0
+    batch = []
+    try:
+        if output_format == 'csv':
+            writer = csv.writer(f)
+            writer.writerow(columns)
+        for row in scapystream_dns_records(packet_source, responses_only=responses_only, cache_size=cache_size):
+            if output_format == 'csv':
+                batch.append(row[:5] + (';'.join(row[5]),))
+            else:
+                batch.append(json.dumps(dict(zip(columns, row))))
+            row_count += 1
+            if len(batch) >= batch_size:
+                if output_format == 'csv':
+                    writer.writerows(batch)
+                else:
+                    f.write('\n'.join(batch) + '\n')
+                batch = []
+        if batch:
+            if output_format == 'csv':
+                writer.writerows(batch)
+            else:
+                f.write('\n'.join(batch) + '\n')
+    finally:
+        if isinstance(output_file, str):
+            f.close()
+    return row_count
+
+# %%
+#######################################
+def scapyraw_dns_parse(payload: bytes, name_cache=None, cache_size=10000):
+    """Parses a DNS message straight from the raw bytes of a UDP payload: the header, the first question and the answer records, without building scapy DNS objects.  Compressed names (pointers to earlier names in the message) are followed, with a limit on the number of jumps so a malformed or malicious pointer loop cannot hang the parser.
+
+    The decoded names can be kept in an LRU cache ('name_cache', an OrderedDict shared between calls), keyed by the raw label bytes of the name, so the names that repeat through a capture (the same few domains queried over and over) are only decoded once.
+
+    Example:
+        >>> dns_pcap = rdpcap('dns.pcap')\n
+        >>> scapyraw_dns_parse(bytes(dns_pcap[1]['UDP'].payload))\n
+        {'id': 4660, 'qr': 1, 'opcode': 0, 'rcode': 0, 'qname': 'www.example.com', 'qtype': 1, 'qclass': 1, 'answers': [('www.example.com', 5, 300, 'example.com'), ('example.com', 1, 300, '93.184.216.34')]}
+
+    Args:
+        payload (bytes): Reference the raw bytes of a DNS message (the payload of a UDP packet)
+        name_cache (collections.OrderedDict, optional): Reference an OrderedDict to use as the LRU cache of decoded names, shared between calls. Defaults to None (no cache).
+        cache_size (int, optional): Reference the maximum number of names kept in 'name_cache'. Defaults to 10000.
+
+    Returns:
+        dict: Returns the 'id', 'qr', 'opcode', 'rcode', 'qname', 'qtype', 'qclass' and the 'answers' (a list of (name, type, ttl, data) tuples, the data formatted as text) of the message, or None if the payload is not a well-formed DNS message
+    """
+    import socket
+    import struct
+#    
+    payload = bytes(payload)
+    payload_length = len(payload)
+    if payload_length < 12:
+        return None
+#    
+    def read_name(offset):
+        # Returns the decoded name and the offset just after it (after the first pointer, if the name is compressed)
+        labels = []
+        end_offset = None
+        jumps = 0
+        while True:
+            if offset >= payload_length:
+                raise ValueError('name runs past the end of the message')
+            label_start = offset
+            # The uncompressed run of labels from here, up to the terminating zero or a pointer
+            while offset < payload_length and payload[offset] and payload[offset] < 0xC0:
+                offset += payload[offset] + 1
+            if offset >= payload_length:
+                raise ValueError('name runs past the end of the message')
+            run_bytes = payload[label_start:offset]
+            if run_bytes:
+                run_text = name_cache.get(run_bytes) if name_cache is not None else None
+                if run_text is None:
+                    run_labels = []
+                    position = 0
+                    while position < len(run_bytes):
+                        label_length = run_bytes[position]
+                        run_labels.append(run_bytes[position + 1:position + 1 + label_length].decode('ascii', errors='backslashreplace'))
+                        position += label_length + 1
+                    run_text = '.'.join(run_labels)
+                    if name_cache is not None:
+                        name_cache[run_bytes] = run_text
+                        if len(name_cache) > cache_size:
+                            name_cache.popitem(last=False)
+                elif name_cache is not None:
+                    name_cache.move_to_end(run_bytes)
+                labels.append(run_text)
+            if payload[offset] == 0:
+                return ('.'.join(labels) or '.', end_offset if end_offset is not None else offset + 1)
+            # A compression pointer to an earlier name
+            if offset + 1 >= payload_length:
+                raise ValueError('name runs past the end of the message')
+            if end_offset is None:
+                end_offset = offset + 2
+            jumps += 1
+            if jumps > 32:
+                raise ValueError('too many compression pointers')
+            offset = ((payload[offset] & 0x3F) << 8) | payload[offset + 1]
+#    
+    def format_rdata(rtype, rdata_offset, rdata_length):
+        rdata = payload[rdata_offset:rdata_offset + rdata_length]
+        if rtype == 1 and rdata_length == 4:
+            return socket.inet_ntop(socket.AF_INET, rdata)
+        if rtype == 28 and rdata_length == 16:
+            return socket.inet_ntop(socket.AF_INET6, rdata)
+        if rtype in (2, 5, 12, 39):
+            # NS, CNAME, PTR and DNAME, which hold a (possibly compressed) name
+            return read_name(rdata_offset)[0]
+        if rtype == 15 and rdata_length > 2:
+            return f"{int.from_bytes(rdata[:2], 'big')} {read_name(rdata_offset + 2)[0]}"
+        if rtype == 16:
+            strings = []
+            position = 0
+            while position < rdata_length:
+                string_length = rdata[position]
+                strings.append(rdata[position + 1:position + 1 + string_length].decode(errors='replace'))
+                position += string_length + 1
+            return ''.join(strings)
+        return rdata.hex()
+#    
+    message_id, flags, qdcount, ancount, nscount, arcount = struct.unpack_from('!HHHHHH', payload, 0)
+    parsed = {'id': message_id, 'qr': flags >> 15, 'opcode': (flags >> 11) & 0xF, 'rcode': flags & 0xF, 'qname': None, 'qtype': None, 'qclass': None, 'answers': []}
+    try:
+        offset = 12
+        for question_index in range(qdcount):
+            qname, offset = read_name(offset)
+            if offset + 4 > payload_length:
+                return None
+            if question_index == 0:
+                parsed['qname'] = qname
+                parsed['qtype'], parsed['qclass'] = struct.unpack_from('!HH', payload, offset)
+            offset += 4
+        for answer_index in range(ancount):
+            name, offset = read_name(offset)
+            if offset + 10 > payload_length:
+                return None
+            rtype, rclass, ttl, rdata_length = struct.unpack_from('!HHIH', payload, offset)
+            offset += 10
+            if offset + rdata_length > payload_length:
+                return None
+            parsed['answers'].append((name, rtype, ttl, format_rdata(rtype, offset, rdata_length)))
+            offset += rdata_length
+    except ValueError:
+        return None
+#    
+    return parsed
+
+# %%
+#######################################
+def scapystream_dns_records(packet_source, responses_only=False, cache_size=10000):
+    """Lazily yields one row per DNS message sent over UDP port 53 in a .pcap file (or a PacketList), parsed straight from the raw UDP payload bytes by 'scapyraw_dns_parse' rather than dissected into scapy DNS objects.  The decoded names are kept in an LRU cache of 'cache_size' names shared across the whole capture.  Payloads that are not well-formed DNS messages are skipped.
+
+    Each row is a tuple of (ts, client, qname, qtype, rcode, answers): the timestamp (float seconds), the ip address of the client (the source of a query, the destination of a response), the first question name, the query type name (e.g. 'A', 'AAAA', or the number when it has no name), the response code name (e.g. 'NOERROR', 'NXDOMAIN'; None for a query) and the list of answer data.
+
+    Example:
+        >>> for row in scapystream_dns_records('dns.pcap', responses_only=True):\n
+        >>>     print(row)\n
+        (1629217872.080297, '192.168.0.5', 'www.example.com', 'A', 'NOERROR', ['example.com', '93.184.216.34'])
+
+    Args:
+        packet_source (str | iterable): Reference a .pcap (or .pcapng) file, or an iterable of scapy packets (PacketList, PcapReader, or a 'scapystream_*' generator)
+        responses_only (bool, optional): If you only want the responses (which carry the rcode and answers), set responses_only=True. Defaults to False.
+        cache_size (int, optional): Reference the maximum number of decoded names kept in the cache. Defaults to 10000.
+
+    Yields:
+        tuple: Yields (ts, client, qname, qtype, rcode, answers) for each DNS message
+    """
+    import collections
+#    
+    rcode_names = {0: 'NOERROR', 1: 'FORMERR', 2: 'SERVFAIL', 3: 'NXDOMAIN', 4: 'NOTIMP', 5: 'REFUSED', 6: 'YXDOMAIN', 7: 'YXRRSET', 8: 'NXRRSET', 9: 'NOTAUTH', 10: 'NOTZONE'}
+    name_cache = collections.OrderedDict()
+#    
+    if isinstance(packet_source, str):
+        records = scapyraw_pcap_records(packet_source)
+    else:
+        records = ( (int(Decimal(str(pckt.time)) * 1000000000), None, bytes(pckt), None, conf.l2types.layer2num.get(type(pckt), 1)) for pckt in packet_source )
+#    
+    for timestamp_ns, file_offset, frame, wirelen, linktype in records:
+        headers = scapyraw_parse_headers(frame, linktype)
+        if headers['ip_proto'] != 17 or headers['ip_fragment'] or (headers['sport'] != 53 and headers['dport'] != 53):
+            continue
+        payload = frame[headers['payload_offset']:headers['payload_offset'] + headers['payload_len']]
+        parsed = scapyraw_dns_parse(payload, name_cache, cache_size)
+        if parsed is None:
+            continue
+        # The QR bit, not the port, tells a response apart (a resolver also sends its queries from port 53)
+        is_response = parsed['qr'] == 1
+        if responses_only and not is_response:
+            continue
+        client = scapyraw_format_address(headers['ip_dst'] if is_response else headers['ip_src'])
+        qtype = dnstypes.get(parsed['qtype'], parsed['qtype'])
+        rcode = rcode_names.get(parsed['rcode'], parsed['rcode']) if is_response else None
+        yield (timestamp_ns / 1000000000, client, parsed['qname'], qtype, rcode, [ data for name, rtype, ttl, data in parsed['answers'] ])
+
+# %%
+#######################################
+def scapyindex_offsets(index: dict, group_ids):
+    """Reads the byte offsets of the records of the given groups of an index built by 'scapyindex_build' (e.g. the group ids of an address in index['ip_src'], or of a flow in index['flows']) from its binary offsets file, seeking straight to each group's chunks rather than reading the whole file.
+
+    Example:
+        >>> index = scapyindex_build('temp.pcap')\n
+        >>> scapyindex_offsets(index, index['ip_dst']['185.34.210.1'])\n
+        [10411]
+
+    Args:
+        index (dict): Reference an index returned by 'scapyindex_build'
+        group_ids (iterable): Reference the ids of the groups
+
+    Returns:
+        list: Returns the sorted byte offsets of the records of the groups
+    """
+    import array
+    import pathlib
+#    
+    chunks = sorted([ chunk for group_id in set(group_ids) for chunk in index['groups'][group_id]['chunks'] ])
+    record_offsets = array.array('q')
+    with pathlib.Path(index['offsets_path']).open('rb') as f:
+        for position, count in chunks:
+            f.seek(position * 8)
+            record_offsets.fromfile(f, count)
+    return sorted(record_offsets)
+
+# %%
+#######################################
+def scapyraw_checksum_valid(frame: bytes, linktype=1, headers=None):
+    """Verifies the IPv4 header, TCP, UDP, ICMP and ICMPv6 checksums of one raw frame (see 'scapyraw_transport_checksum').  Returns False when any checksum the frame carries is wrong.  Checksums that cannot be verified (IP fragments, packets truncated by the snaplen) and UDP over IPv4 with no checksum (0) count as correct.  This is the per-frame check behind 'scapyraw_verify_checksums', for streaming stages that already hold the decoded headers.
+
+    Example:
+        >>> scapyraw_checksum_valid(bytes(Ether()/IP()/TCP(chksum=0x1234))), scapyraw_checksum_valid(bytes(Ether()/IP()/UDP(chksum=0)))\n
+        (False, True)
+
+    Args:
+        frame (bytes): Reference the raw bytes of a frame
+        linktype (int, optional): Reference the pcap linktype of the frame. Defaults to 1 (Ethernet).
+        headers (dict, optional): Reference the already decoded headers of the frame from 'scapyraw_parse_headers'. Defaults to None (the frame is decoded here).
+
+    Returns:
+        bool: Returns True when every checksum of the frame is correct (or cannot be verified)
+    """
+    if headers is None:
+        headers = scapyraw_parse_headers(frame, linktype)
+    if headers['ip_version'] == 4:
+        ip_offset = headers['ip_offset']
+        ihl = (frame[ip_offset] & 0x0F) * 4
+        # The sum over a header that includes a correct checksum is 0xFFFF (0 modulo 0xFFFF)
+        if ip_offset + ihl <= len(frame) and int.from_bytes(frame[ip_offset:ip_offset + ihl], 'big') % 0xFFFF != 0:
+            return False
+#    
+    checksum_result = scapyraw_transport_checksum(frame, linktype, headers)
+    if checksum_result is None:
+        return True
+    protocol_name, packet_checksum, correct_checksum = checksum_result
+    if protocol_name == 'UDP' and packet_checksum == 0 and headers['ip_version'] == 4:
+        return True
+    return packet_checksum == correct_checksum
+
+# %%
+#######################################
+def scapyraw_mmap_close(capture: dict):
+    """Unmaps a capture opened with 'scapyraw_mmap_open' and closes its file mapping.  The frames returned by 'scapyraw_mmap_record' are memoryviews of the mapping, so they have to be released (or copied with bytes() beforehand) first, otherwise a BufferError is raised and the capture stays open.
+
+    Example:
+        >>> capture = scapyraw_mmap_open('temp.pcap')\n
+        >>> frame = bytes(scapyraw_mmap_record(capture, 0)[2])\n
+        >>> scapyraw_mmap_close(capture)\n
+
+    Args:
+        capture (dict): Reference a capture opened with 'scapyraw_mmap_open'
+    """
+    capture['data'].release()
+    capture['mmap'].close()
+
+# %%
+#######################################
+def scapystream_tcp_search_buffers(packet_source, overlap):
+    """Lazily yields the reassembled TCP stream data of a .pcap file (or of an iterable of packets) as buffers to search for patterns, where each buffer is the new chunk of a direction (see 'scapystream_tcp_reassemble') with the last 'overlap' bytes of the previous chunk in front of it, so a pattern spanning the two chunks is found.  Used by 'scapypayload_contains_patterns' and 'scapypayload_extract_between_patterns' with 'streams=True'.
+
+    The tail of the previous chunk is only carried over when the new chunk follows on from it: it is dropped when the stream skips a gap (a forced drain of the reassembly buffer), and when the connection is flushed, so a later connection that reuses the same addresses and ports never starts with the bytes of an earlier one, and the tails of finished connections are not kept.
+
+    Example:
+        >>> for direction_key, buffer_offset, buffer, carry_length in scapystream_tcp_search_buffers('web.pcap', 16):\n
+        ...     hits = [ m.start() for m in re.finditer(b'green%20button', buffer) if m.end() > carry_length ]\n
+
+    Args:
+        packet_source (str | iterable): Reference a .pcap file, or an iterable of scapy packets (PacketList, PcapReader, or a 'scapystream_*' generator)
+        overlap (int): Reference how many bytes at the end of each chunk are carried over to the next chunk of the same direction
+
+    Yields:
+        tuple: Yields (direction_key, buffer_offset, buffer, carry_length) for each chunk, where 'buffer_offset' is the stream offset of the start of the buffer and 'carry_length' is how many of its bytes were carried over (matches that end within them were already found in the previous buffer)
+    """
+    carries = {}
+    for session_key, direction_key, stream_offset, data in scapystream_tcp_reassemble(packet_source, end_markers=True):
+        if not data:
+            # The connection was flushed
+            carries.pop(direction_key, None)
+            continue
+        carry_end, carry = carries.get(direction_key, (None, b''))
+        if carry_end != stream_offset:
+            carry = b''
+        buffer = carry + data
+        yield (direction_key, stream_offset - len(carry), buffer, len(carry))
+        if overlap:
+            carries[direction_key] = (stream_offset + len(data), buffer[-overlap:])
+
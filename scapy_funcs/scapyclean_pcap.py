@@ -0,0 +1,88 @@
+# %%
+#######################################
+def scapyclean_pcap(pcap_file: str, output_file: str, remove_bad_checksums=True, remove_duplicates=True, tcp_only=True, window=1.0, max_entries=100000, payload_bytes=None, snaplen=None):
+    """Cleans a .pcap file in a single pass, straight from disk to a new .pcap file: each record is read once, and then it goes through every cleaning stage before it is written.  Only the keys of the recent packets are held in memory (for the duplicate check), so captures far larger than RAM can be cleaned at close to disk-read speed.
+
+    The stages, in order, are:
+        - bad checksums ('remove_bad_checksums'): drops the packets whose IPv4 header or transport checksum is wrong (see 'scapyraw_checksum_valid')
+        - duplicates ('remove_duplicates'): drops the packets already seen in the last 'window' seconds (see 'scapyraw_remove_duplicates')
+        - payload truncation ('payload_bytes'): keeps at most this many bytes of each packet's payload (after the TCP/UDP/ICMP header), e.g. to share the headers of a capture without its content
+        - snaplen normalization ('snaplen'): cuts every frame to at most this many bytes, and writes this snaplen in the header of the new .pcap file
+
+    The original length of a truncated packet is kept, so tools reading the new .pcap file still see how long it was on the wire.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> scapyclean_pcap('fragments3.pcap', 'fragments3_clean.pcap')\n
+        {'read': 134, 'bad_checksum': 3, 'duplicate': 2, 'truncated': 0, 'written': 129}
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> # Headers only, for every protocol, with a snaplen of 128 bytes\n
+        >>> scapyclean_pcap('huge.pcap', 'huge_headers.pcap', tcp_only=False, payload_bytes=0, snaplen=128)\n
+        {'read': 48211877, 'bad_checksum': 1093, 'duplicate': 60112, 'truncated': 39022101, 'written': 48150672}
+
+    Args:
+        pcap_file (str): Reference a .pcap (or .pcapng) file
+        output_file (str): Reference the path of the new .pcap file
+        remove_bad_checksums (bool, optional): Set this to False to keep the packets with bad checksums. Defaults to True.
+        remove_duplicates (bool, optional): Set this to False to keep the duplicate packets. Defaults to True.
+        tcp_only (bool, optional): Set this to False to check the checksums and duplicates of every protocol, rather than of TCP only. Defaults to True.
+        window (float, optional): Reference how many seconds a packet is remembered for by the duplicate check. Defaults to 1.0.
+        max_entries (int, optional): Reference the maximum number of packet keys remembered by the duplicate check. Defaults to 100000.
+        payload_bytes (int, optional): Reference the maximum number of payload bytes to keep per packet. Defaults to None (the payload is kept).
+        snaplen (int, optional): Reference the maximum number of bytes to keep per frame. Defaults to None (the snaplen of the original .pcap file).
+
+    Returns:
+        dict: Returns a dict of the number of packets read, dropped by each stage, truncated, and written
+    """
+    import pathlib
+#    
+    counters = {'read': 0, 'bad_checksum': 0, 'duplicate': 0, 'truncated': 0, 'written': 0}
+#    
+    path_obj = pathlib.Path(pcap_file).resolve()
+    with path_obj.open('rb') as f:
+        global_header = f.read(24)
+    if global_header[:4] == b'\x0a\x0d\x0d\x0a':
+        output_linktype, output_snaplen, nanosecond = None, 262144, True
+    else:
+        pcap_header = scapyraw_pcap_global_header(global_header)
+        output_linktype, output_snaplen, nanosecond = pcap_header['linktype'], pcap_header['snaplen'], pcap_header['ns_multiplier'] == 1
+    if snaplen is not None:
+        output_snaplen = snaplen
+#    
+    def checked_records():
+        for record in scapyraw_pcap_records(pcap_file):
+            counters['read'] += 1
+            timestamp_ns, file_offset, frame, wirelen, linktype = record
+            if remove_bad_checksums:
+                headers = scapyraw_parse_headers(frame, linktype)
+                if (headers['ip_proto'] == 6 or not tcp_only) and not scapyraw_checksum_valid(frame, linktype, headers):
+                    counters['bad_checksum'] += 1
+                    continue
+            yield record
+#    
+    def truncated_records(records):
+        kept_count = 0
+        for timestamp_ns, file_offset, frame, wirelen, linktype in records:
+            kept_count += 1
+            original_length = wirelen or len(frame)
+            frame_length = len(frame)
+            if payload_bytes is not None:
+                headers = scapyraw_parse_headers(frame, linktype)
+                if headers['payload_offset'] is not None and headers['payload_len'] > payload_bytes:
+                    frame_length = min(frame_length, headers['payload_offset'] + payload_bytes)
+            if snaplen is not None:
+                frame_length = min(frame_length, snaplen)
+            if frame_length < len(frame):
+                counters['truncated'] += 1
+                frame = frame[:frame_length]
+            yield (timestamp_ns, file_offset, frame, original_length, linktype)
+        counters['duplicate'] = counters['read'] - counters['bad_checksum'] - kept_count
+#    
+    records = checked_records()
+    if remove_duplicates:
+        records = scapyraw_remove_duplicates(records, window=window, max_entries=max_entries, tcp_only=tcp_only)
+#    
+    counters['written'] = scapyraw_pcap_writer(truncated_records(records), output_file, linktype=output_linktype, snaplen=output_snaplen, nanosecond=nanosecond)
+    return counters
+
@@ -0,0 +1,64 @@
+# %%
+#######################################
+def scapyconvert_packets_to_numpy_table(packet_source):
+    """Converts a PacketList (or a .pcap file) to a columnar NumPy structured array with one row per packet, so that queries over the whole capture can be run as vectorized masks and sorts (see the 'scapynumpy_*' functions) instead of Python loops over scapy objects.
+
+    Columns:
+        timestamp (float64), timestamp_ns (int64), src_ip / dst_ip (uint32, IPv4 only, 0 otherwise), ip_version (uint8), protocol (uint8, the IP protocol number), sport / dport (uint16), length (uint32, the original length of the packet), tcp_seq / tcp_ack (uint32), tcp_flags (uint8), file_offset (int64, the byte offset of the record in the .pcap file, or -1 if unknown)
+
+    When given a .pcap file, the headers are decoded straight from the raw records with 'scapyraw_parse_headers', so no scapy dissection happens at all.
+
+    Example:
+        >>> table = scapyconvert_packets_to_numpy_table('temp.pcap')\n
+        >>> table.shape\n
+        (118,)
+        >>> table[0]['sport'], table[0]['dport'], table[0]['protocol'], table[0]['length']\n
+        (np.uint16(22), np.uint16(1046), np.uint8(6), np.uint32(178))
+
+    Args:
+        packet_source (scapy.plist.PacketList | str): Reference an existing PacketList object, or the path of a .pcap file
+
+    Returns:
+        numpy.ndarray: Returns a NumPy structured array with one row per packet
+    """
+    import numpy as np
+    from decimal import Decimal
+#    
+    table_dtype = np.dtype([
+        ('timestamp', 'f8'), ('timestamp_ns', 'i8'),
+        ('src_ip', 'u4'), ('dst_ip', 'u4'), ('ip_version', 'u1'), ('protocol', 'u1'),
+        ('sport', 'u2'), ('dport', 'u2'), ('length', 'u4'),
+        ('tcp_seq', 'u4'), ('tcp_ack', 'u4'), ('tcp_flags', 'u1'),
+        ('file_offset', 'i8'),
+    ])
+#    
+    if isinstance(packet_source, str):
+        records = scapyraw_pcap_records(packet_source)
+    else:
+        # Re-using the bytes of the already dissected packets, and the linktype of the first layer of each packet
+        def packetlist_records(packet_list):
+            for pckt in packet_list:
+                frame = bytes(pckt)
+                linktype = conf.l2types.layer2num.get(type(pckt), 1)
+                timestamp_ns = int(Decimal(str(pckt.time)) * 1000000000)
+                yield (timestamp_ns, None, frame, getattr(pckt, 'wirelen', None) or len(frame), linktype)
+        records = packetlist_records(packet_source)
+#    
+    rows = []
+    for timestamp_ns, file_offset, frame, wirelen, linktype in records:
+        headers = scapyraw_parse_headers(frame, linktype)
+        if headers['ip_version'] == 4:
+            src_ip = int.from_bytes(headers['ip_src'], 'big')
+            dst_ip = int.from_bytes(headers['ip_dst'], 'big')
+        else:
+            src_ip = dst_ip = 0
+        rows.append((
+            timestamp_ns / 1e9, timestamp_ns,
+            src_ip, dst_ip, headers['ip_version'] or 0, headers['ip_proto'] or 0,
+            headers['sport'] or 0, headers['dport'] or 0, wirelen or len(frame),
+            headers['tcp_seq'] or 0, headers['tcp_ack'] or 0, headers['tcp_flags'] or 0,
+            -1 if file_offset is None else file_offset,
+        ))
+#    
+    return np.array(rows, dtype=table_dtype)
+
@@ -0,0 +1,53 @@
+# %%
+#######################################
+def scapyconvert_packets_to_packed(packet_source):
+    """Converts a PacketList (or the records of a .pcap file) to a packed buffer: the bytes of every packet back to back in one contiguous bytearray, with NumPy arrays of the offset, length, timestamp, original length and linktype of each packet.  Unlike 'scapyconvert_packets_to_bytesarray', which returns a list of separate 'bytes' objects, a million packets are held in a handful of objects, so the packed buffer can be pickled to another process, or saved and loaded (see 'scapypacked_save' / 'scapypacked_load'), at the cost of one buffer copy.
+
+    The packets are read back with 'scapypacked_frame' (a zero-copy memoryview of the bytes of one packet) or 'scapypacked_packet' (the scapy packet, dissected only when it is asked for).
+
+    Example:
+        >>> ncat_pcap = rdpcap('ncat.pcap')\n
+        >>> packed = scapyconvert_packets_to_packed(ncat_pcap)\n
+        >>> len(packed['offsets']), len(packed['buffer'])\n
+        (12, 870)
+        >>> scapypacked_packet(packed, 5).load\n
+        b'Howareyou\\n'
+
+    Args:
+        packet_source (str | scapy.plist.PacketList): Reference an existing PacketList object, or a .pcap (or .pcapng) file
+
+    Returns:
+        dict: Returns the packed buffer, a dict with the 'buffer' (bytearray) and the 'offsets', 'lengths', 'timestamps_ns', 'wirelens' and 'linktypes' arrays
+    """
+    import numpy as np
+#    
+    if isinstance(packet_source, str):
+        records = scapyraw_pcap_records(packet_source)
+    else:
+        records = ( (int(Decimal(str(pckt.time)) * 1000000000), None, bytes(pckt), getattr(pckt, 'wirelen', None), conf.l2types.layer2num.get(type(pckt), 1)) for pckt in packet_source )
+#    
+    buffer = bytearray()
+    lengths = []
+    timestamps_ns = []
+    wirelens = []
+    linktypes = []
+    for timestamp_ns, file_offset, frame, wirelen, linktype in records:
+        buffer += frame
+        lengths.append(len(frame))
+        timestamps_ns.append(timestamp_ns)
+        wirelens.append(wirelen or len(frame))
+        linktypes.append(linktype)
+#    
+    lengths = np.array(lengths, dtype=np.uint32)
+    offsets = np.zeros(len(lengths), dtype=np.int64)
+    if len(lengths):
+        np.cumsum(lengths[:-1], out=offsets[1:])
+    return {
+        'buffer': buffer,
+        'offsets': offsets,
+        'lengths': lengths,
+        'timestamps_ns': np.array(timestamps_ns, dtype=np.int64),
+        'wirelens': np.array(wirelens, dtype=np.uint32),
+        'linktypes': np.array(linktypes, dtype=np.uint16),
+    }
+
@@ -0,0 +1,113 @@
+# %%
+#######################################
+def scapyconvert_timestamps(timestamp_source, tz=None, relative=False, as_strings=False, unit='us'):
+    """Bulk version of 'scapyconvert_packet_timestamp'.  Converts the timestamps of every packet of a PacketList, a .pcap / .pcapng file, a packet table (see 'scapyconvert_packets_to_numpy_table') or an array of timestamps at once, with NumPy, rather than one datetime at a time.  Returns a NumPy datetime64 array (in the given timezone, local time by default), or the same as strings in the form '%Y-%m-%d %H:%M:%S.%f' with 'as_strings=True'.
+
+    The timestamps are handled as integer nanoseconds from end to end, so the nanosecond precision of pcapng (and nanosecond pcap) files is kept with unit='ns'.  With 'relative=True' the times are the time since the first packet (like Wireshark's default time column), as a timedelta64 array, or as strings of seconds.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> scapyconvert_timestamps('one.pcap', as_strings=True)\n
+        array(['2021-08-17 09:31:12.080297'], dtype='<U26')
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> web_pcap = rdpcap('web.pcap')\n
+        >>> scapyconvert_timestamps(web_pcap, tz='UTC')[:2]\n
+        array(['2014-10-23T13:38:12.412640', '2014-10-23T13:38:12.412690'], dtype='datetime64[us]')
+
+        >>> ##### EXAMPLE 3 #####\n
+        >>> scapyconvert_timestamps(web_pcap, relative=True, as_strings=True)[:3]\n
+        array(['0.000000', '0.000050', '0.120301'], dtype='<U8')
+
+        >>> ##### EXAMPLE 4 #####\n
+        >>> scapyconvert_timestamps('sensor.pcapng', tz='America/New_York', unit='ns')[:1]\n
+        array(['2021-08-17T05:31:12.080297123'], dtype='datetime64[ns]')
+
+    Args:
+        timestamp_source (str | scapy.plist.PacketList | numpy.ndarray): Reference a .pcap / .pcapng file, an existing PacketList object (or any iterable of packets), a packet table, or an array of timestamps (integers in nanoseconds, or floats in seconds)
+        tz (str, optional): Reference the timezone to convert to, e.g. 'UTC' or 'Europe/Paris' (a named timezone other than 'UTC' needs Python 3.9+, or the 'backports.zoneinfo' or 'python-dateutil' package on Python 3.8). Defaults to None (the local timezone).
+        relative (bool, optional): Set this to True to get the time since the first packet instead. Defaults to False.
+        as_strings (bool, optional): Set this to True to get the times as strings. Defaults to False.
+        unit (str, optional): Reference the precision of the results, one of 's', 'ms', 'us' or 'ns'. Defaults to 'us'.
+
+    Returns:
+        numpy.ndarray: Returns an array of datetime64 (or timedelta64 with 'relative=True'), or of strings with 'as_strings=True'
+    """
+    import numpy as np
+    from datetime import datetime, timezone
+#    
+    unit_divisors = {'s': 1000000000, 'ms': 1000000, 'us': 1000, 'ns': 1}
+    if unit not in unit_divisors:
+        raise ValueError(f"Unknown unit '{unit}', use one of {list(unit_divisors)}")
+#    
+    # Getting every timestamp as integer nanoseconds
+    if isinstance(timestamp_source, str):
+        timestamps_ns = np.fromiter((record[0] for record in scapyraw_pcap_records(timestamp_source)), dtype=np.int64)
+    elif isinstance(timestamp_source, np.ndarray) and timestamp_source.dtype.names and 'timestamp_ns' in timestamp_source.dtype.names:
+        timestamps_ns = timestamp_source['timestamp_ns'].astype(np.int64)
+    elif isinstance(timestamp_source, np.ndarray) and timestamp_source.dtype.kind in 'iu':
+        timestamps_ns = timestamp_source.astype(np.int64)
+    elif isinstance(timestamp_source, np.ndarray) and timestamp_source.dtype.kind == 'f':
+        timestamps_ns = np.round(timestamp_source * 1e9).astype(np.int64)
+    else:
+        timestamps_ns = np.fromiter((int(Decimal(str(pckt.time)) * 1000000000) for pckt in timestamp_source), dtype=np.int64)
+#    
+    divisor = unit_divisors[unit]
+    if relative:
+        deltas_ns = timestamps_ns - timestamps_ns[0] if len(timestamps_ns) else timestamps_ns
+        # Negative deltas (packets before the first one, in merged or out of order captures) are truncated towards zero, and formatted with their sign in front
+        abs_deltas = np.abs(deltas_ns) // divisor
+        signs = np.where(deltas_ns < 0, -1, 1)
+        if not as_strings:
+            return (signs * abs_deltas).astype(f'timedelta64[{unit}]')
+        if not len(deltas_ns):
+            return np.array([], dtype=str)
+        # Seconds, with as many decimals as the unit
+        abs_deltas_ns = abs_deltas * divisor
+        seconds = np.char.add(np.where((signs < 0) & (abs_deltas > 0), '-', ''), np.char.mod('%d', abs_deltas_ns // 1000000000))
+        if unit == 's':
+            return seconds
+        digits = {'ms': 3, 'us': 6, 'ns': 9}[unit]
+        fractions = np.char.zfill(np.char.mod('%d', (abs_deltas_ns % 1000000000) // divisor), digits)
+        return np.char.add(np.char.add(seconds, '.'), fractions)
+#    
+    # The offset from UTC of the timezone, looked up once per distinct hour of the capture (daylight saving time changes on the hour)
+    if tz is None:
+        def utc_offset(hour):
+            return datetime.fromtimestamp(hour * 3600).astimezone().utcoffset()
+    else:
+        if tz.upper() == 'UTC':
+            zone = timezone.utc
+        else:
+            # zoneinfo is only in the standard library from Python 3.9, so on 3.8 the 'backports.zoneinfo' or 'python-dateutil' package is used instead
+            try:
+                from zoneinfo import ZoneInfo
+            except ImportError:
+                try:
+                    from backports.zoneinfo import ZoneInfo
+                except ImportError:
+                    ZoneInfo = None
+            if ZoneInfo is not None:
+                zone = ZoneInfo(tz)
+            else:
+                try:
+                    from dateutil.tz import gettz
+                except ImportError:
+                    raise ValueError(f"The named timezone '{tz}' needs Python 3.9+, or the 'backports.zoneinfo' or 'python-dateutil' package on Python 3.8 (tz=None and tz='UTC' work without them)") from None
+                zone = gettz(tz)
+                if zone is None:
+                    raise ValueError(f"Unknown timezone: '{tz}'")
+        def utc_offset(hour):
+            return datetime.fromtimestamp(hour * 3600, zone).utcoffset()
+    hours = timestamps_ns // 3600000000000
+    distinct_hours, hour_positions = np.unique(hours, return_inverse=True)
+    offsets_ns = np.array([ int(utc_offset(int(hour)).total_seconds()) * 1000000000 for hour in distinct_hours ], dtype=np.int64)
+    local_ns = timestamps_ns + offsets_ns[hour_positions.reshape(-1)] if len(timestamps_ns) else timestamps_ns
+#    
+    datetimes = (local_ns // divisor).astype(f'datetime64[{unit}]')
+    if not as_strings:
+        return datetimes
+    if not len(datetimes):
+        return np.array([], dtype=str)
+    return np.char.replace(np.datetime_as_string(datetimes, unit=unit), 'T', ' ')
+
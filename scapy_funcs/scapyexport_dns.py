@@ -0,0 +1,73 @@
+# %%
+#######################################
+def scapyexport_dns(packet_source, output_file, output_format=None, responses_only=False, cache_size=10000, batch_size=1000):
+    """Exports a DNS query log from a .pcap file (or a PacketList) as CSV or NDJSON, with one row of (ts, client, qname, qtype, rcode, answers) per DNS message (see 'scapystream_dns_records').  The DNS messages are parsed straight from the raw UDP port 53 payloads, and the rows are streamed to the file (or file handle) in batches of 'batch_size' rows, so captures of any size are exported without being held in memory.  In the CSV output the answers are joined with ';'.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> scapyexport_dns('dns.pcap', 'dns.csv')\n
+        2
+        >>> print(open('dns.csv').read())\n
+        ts,client,qname,qtype,rcode,answers
+        1629217872.080297,192.168.0.5,www.example.com,A,,
+        1629217872.091455,192.168.0.5,www.example.com,A,NOERROR,example.com;93.184.216.34
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> scapyexport_dns('dns.pcap', 'dns.ndjson', responses_only=True)\n
+        1
+        >>> print(open('dns.ndjson').read())\n
+        {"ts": 1629217872.091455, "client": "192.168.0.5", "qname": "www.example.com", "qtype": "A", "rcode": "NOERROR", "answers": ["example.com", "93.184.216.34"]}
+
+    Args:
+        packet_source (str | iterable): Reference a .pcap (or .pcapng) file, or an iterable of scapy packets (PacketList, PcapReader, or a 'scapystream_*' generator)
+        output_file (str | file): Reference the path of the .csv / .ndjson file, or an open (text) file handle to write to
+        output_format (str, optional): Reference the output format, 'csv' or 'ndjson'. Defaults to None (from the extension of output_file, otherwise 'ndjson').
+        responses_only (bool, optional): If you only want the responses (which carry the rcode and answers), set responses_only=True. Defaults to False.
+        cache_size (int, optional): Reference the maximum number of decoded names kept in the cache. Defaults to 10000.
+        batch_size (int, optional): Reference how many rows are written to the file at a time. Defaults to 1000.
+
+    Returns:
+        int: Returns the number of rows exported
+    """
+    import csv
+    import json
+    import pathlib
+#    
+    if output_format is None:
+        output_format = 'csv' if isinstance(output_file, str) and output_file.lower().endswith('.csv') else 'ndjson'
+    if output_format not in ('csv', 'ndjson'):
+        raise ValueError(f"Unknown output_format '{output_format}', use 'csv' or 'ndjson'")
+    columns = ['ts', 'client', 'qname', 'qtype', 'rcode', 'answers']
+#    
+    if isinstance(output_file, str):
+        f = pathlib.Path(output_file).resolve().open('w', newline='', buffering=1 << 20)
+    else:
+        f = output_file
+    row_count = 0
+    batch = []
+    try:
+        if output_format == 'csv':
+            writer = csv.writer(f)
+            writer.writerow(columns)
+        for row in scapystream_dns_records(packet_source, responses_only=responses_only, cache_size=cache_size):
+            if output_format == 'csv':
+                batch.append(row[:5] + (';'.join(row[5]),))
+            else:
+                batch.append(json.dumps(dict(zip(columns, row))))
+            row_count += 1
+            if len(batch) >= batch_size:
+                if output_format == 'csv':
+                    writer.writerows(batch)
+                else:
+                    f.write('\n'.join(batch) + '\n')
+                batch = []
+        if batch:
+            if output_format == 'csv':
+                writer.writerows(batch)
+            else:
+                f.write('\n'.join(batch) + '\n')
+    finally:
+        if isinstance(output_file, str):
+            f.close()
+    return row_count
+
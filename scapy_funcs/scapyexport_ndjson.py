@@ -0,0 +1,152 @@
+# %%
+#######################################
+def scapyexport_ndjson(packet_source, output_file, fields=None, batch_size=1000):
+    """Exports the fields of each packet of a .pcap file (or of a PacketList) as NDJSON: one JSON object per line, per packet.  Unlike 'scapy_tshark_json', there is no round-trip through an external tshark process and the output is never held in memory as one JSON document: the lines are written to the file (or file handle) in batches of 'batch_size' packets.
+
+    Which fields are exported is pluggable through 'fields', a list of field names (or a dict of output names to fields) where each field is either:
+        - one of the raw header fields: 'timestamp', 'timestamp_ns', 'length', 'caplen', 'eth_src', 'eth_dst', 'vlan', 'ip_version', 'ip_src', 'ip_dst', 'protocol', 'sport', 'dport', 'tcp_seq', 'tcp_ack', 'tcp_flags', 'payload_len' (decoded straight from the raw bytes)
+        - a 'Layer.field' name of a scapy field, e.g. 'IP.ttl' or 'DNS.id' (None when the packet has no such layer)
+        - a function taking the scapy packet and returning a JSON-serializable value (only in a dict)
+
+    Packets are only dissected by scapy when a 'Layer.field' name or a function asks for it.  Without 'fields', every field of every layer is exported ({layer_name: {field_name: value}}, like tshark's JSON output), with repeated layers numbered (e.g. 'IP' and 'IP_2' for IP-in-IP).  Bytes are written as text when they are printable ascii (e.g. DNS names), and as hex strings otherwise.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> scapyexport_ndjson('temp.pcap', 'temp.ndjson', fields=['timestamp', 'ip_src', 'ip_dst', 'sport', 'dport'])\n
+        1
+        >>> print(open('temp.ndjson').read())\n
+        {"timestamp": 1629217872.080297, "ip_src": "66.17.1.2", "ip_dst": "185.34.210.1", "sport": 58429, "dport": 10001}
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> fields = {'time': 'timestamp', 'ttl': 'IP.ttl', 'summary': lambda pckt: pckt.summary()}\n
+        >>> scapyexport_ndjson(rdpcap('temp.pcap'), 'temp.ndjson', fields=fields)\n
+        1
+        >>> print(open('temp.ndjson').read())\n
+        {"time": 1629217872.080297, "ttl": 64, "summary": "Ether / IP / UDP 66.17.1.2:58429 > 185.34.210.1:10001 / Raw"}
+
+        >>> ##### EXAMPLE 3 #####\n
+        >>> import sys\n
+        >>> scapyexport_ndjson('temp.pcap', sys.stdout)\n
+        {"Ethernet": {"dst": "00:0c:29:64:3b:e1", "src": "00:50:56:c0:00:08", "type": 2048}, "IP": {"version": 4, "ihl": 5, ...
+        1
+
+    Args:
+        packet_source (str | iterable): Reference a .pcap (or .pcapng) file, or an iterable of scapy packets (PacketList, PcapReader, or a 'scapystream_*' generator)
+        output_file (str | file): Reference the path of the .ndjson file, or an open (text) file handle to write to
+        fields (list | dict, optional): Reference the fields to export. Defaults to None (every field of every layer).
+        batch_size (int, optional): Reference how many lines are written to the file at a time. Defaults to 1000.
+
+    Returns:
+        int: Returns the number of packets exported
+    """
+    import json
+    import pathlib
+#    
+    raw_fields = {
+        'timestamp': lambda record, headers: record[0] / 1000000000,
+        'timestamp_ns': lambda record, headers: record[0],
+        'length': lambda record, headers: record[3] or len(record[2]),
+        'caplen': lambda record, headers: len(record[2]),
+        'eth_src': lambda record, headers: None if headers['eth_src'] is None else scapyraw_format_address(headers['eth_src']),
+        'eth_dst': lambda record, headers: None if headers['eth_dst'] is None else scapyraw_format_address(headers['eth_dst']),
+        'vlan': lambda record, headers: list(headers['vlan']),
+        'ip_version': lambda record, headers: headers['ip_version'],
+        'ip_src': lambda record, headers: None if headers['ip_src'] is None else scapyraw_format_address(headers['ip_src']),
+        'ip_dst': lambda record, headers: None if headers['ip_dst'] is None else scapyraw_format_address(headers['ip_dst']),
+        'protocol': lambda record, headers: headers['ip_proto'],
+        'sport': lambda record, headers: headers['sport'],
+        'dport': lambda record, headers: headers['dport'],
+        'tcp_seq': lambda record, headers: headers['tcp_seq'],
+        'tcp_ack': lambda record, headers: headers['tcp_ack'],
+        'tcp_flags': lambda record, headers: headers['tcp_flags'],
+        'payload_len': lambda record, headers: headers['payload_len'],
+    }
+#    
+    def layer_field(spec):
+        layer_name, field_name = spec.split('.', 1)
+        def get_value(pckt):
+            if not pckt.haslayer(layer_name):
+                return None
+            value = pckt[layer_name]
+            for name in field_name.split('.'):
+                value = getattr(value, name)
+            return value
+        return get_value
+#    
+    def all_fields(pckt):
+        layers = {}
+        layer = pckt
+        while layer and not isinstance(layer, NoPayload):
+            # A repeated layer (e.g. the inner IP of IP-in-IP) is numbered, so the outer one is not overwritten
+            layer_name = layer.name
+            layer_number = 2
+            while layer_name in layers:
+                layer_name = f'{layer.name}_{layer_number}'
+                layer_number += 1
+            layers[layer_name] = { f.name: layer.getfieldval(f.name) for f in layer.fields_desc }
+            layer = layer.payload
+        return layers
+#    
+    def to_json(value):
+        # For the values json cannot serialize itself (bytes, scapy's EDecimal / FlagValue / nested packets)
+        if isinstance(value, (bytes, bytearray)):
+            return value.decode('ascii') if value.isascii() and bytes(value).decode('ascii').isprintable() else value.hex()
+        if isinstance(value, Decimal):
+            return float(value)
+        if isinstance(value, Packet):
+            return all_fields(value)
+        if isinstance(value, (set, tuple)):
+            return list(value)
+        return str(value) if not isinstance(value, int) else int(value)
+#    
+    # (output_name, raw field function or None, packet function or None) for each field
+    if fields is None:
+        extractors = None
+        needs_packet = True
+    else:
+        field_items = fields.items() if isinstance(fields, dict) else [ (f, f) for f in fields ]
+        extractors = []
+        for output_name, spec in field_items:
+            if callable(spec):
+                extractors.append((output_name, None, spec))
+            elif spec in raw_fields:
+                extractors.append((output_name, raw_fields[spec], None))
+            elif '.' in spec:
+                extractors.append((output_name, None, layer_field(spec)))
+            else:
+                raise ValueError(f"Unknown field '{spec}', use one of {list(raw_fields)} or a 'Layer.field' name")
+        needs_packet = any([ packet_function is not None for output_name, raw_function, packet_function in extractors ])
+#    
+    if isinstance(packet_source, str):
+        records_and_packets = ( (record, None) for record in scapyraw_pcap_records(packet_source) )
+    else:
+        records_and_packets = ( ((int(Decimal(str(pckt.time)) * 1000000000), None, bytes(pckt), getattr(pckt, 'wirelen', None), conf.l2types.layer2num.get(type(pckt), 1)), pckt) for pckt in packet_source )
+#    
+    if isinstance(output_file, str):
+        f = pathlib.Path(output_file).resolve().open('w', buffering=1 << 20)
+    else:
+        f = output_file
+    packet_count = 0
+    batch = []
+    try:
+        for record, pckt in records_and_packets:
+            if needs_packet and pckt is None:
+                timestamp_ns, file_offset, frame, wirelen, linktype = record
+                pckt = scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen)
+            if extractors is None:
+                row = all_fields(pckt)
+            else:
+                headers = scapyraw_parse_headers(record[2], record[4])
+                row = { output_name: raw_function(record, headers) if raw_function is not None else packet_function(pckt) for output_name, raw_function, packet_function in extractors }
+            batch.append(json.dumps(row, default=to_json))
+            packet_count += 1
+            if len(batch) >= batch_size:
+                f.write('\n'.join(batch) + '\n')
+                batch = []
+        if batch:
+            f.write('\n'.join(batch) + '\n')
+    finally:
+        if isinstance(output_file, str):
+            f.close()
+    return packet_count
+
@@ -0,0 +1,215 @@
+# %%
+#######################################
+def scapyfilter_compile(expression: str):
+    """Compiles a BPF-like filter expression (the syntax of tcpdump / Wireshark capture filters) into a predicate over the raw header fields of a frame (the dict returned by 'scapyraw_parse_headers').  The expression is parsed once; the predicate short-circuits, and the operands of each run of 'and' / 'or' are reordered so the cheapest checks (e.g. the protocol) run first.  As in tcpdump, 'and' and 'or' have equal precedence and associate left to right, so 'udp or tcp and port 80' means '(udp or tcp) and port 80'.  See 'scapyfilter_pcap' and 'scapyfilter_packetlist' to filter with an expression.
+
+    Supported primitives (combined with 'and' / '&&', 'or' / '||', 'not' / '!' and parentheses):
+        - protocols: ether, ip, ip6, arp, tcp, udp, icmp, icmp6, vlan [id]
+        - [src|dst] host <ipv4 or ipv6 address>
+        - [src|dst] net <cidr>
+        - [tcp|udp] [src|dst] port <number or service name>
+        - [tcp|udp] [src|dst] portrange <first>-<last>
+        - ether [src|dst] host <mac address>
+        - proto <ip protocol number or name>
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> predicate = scapyfilter_compile('tcp and (port 443 or net 10.0.0.0/8) and not src host 1.2.3.4')\n
+        >>> ts_ns, offset, frame, wirelen, linktype = next(scapyraw_pcap_records('temp.pcap'))\n
+        >>> predicate(scapyraw_parse_headers(frame, linktype))\n
+        False
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> scapyfilter_compile('tcp and (port 443')\n
+        ValueError: Missing ')' at the end of the filter expression: 'tcp and (port 443'
+
+    Args:
+        expression (str): Reference a filter expression
+
+    Returns:
+        function: Returns a predicate taking the dict of 'scapyraw_parse_headers' and returning True or False
+    """
+    import ipaddress
+    import re
+    import socket
+#    
+    tokens = re.findall(r'\(|\)|!|&&|\|\||[^\s()!&|]+', expression)
+    position = 0
+#    
+    def peek():
+        return tokens[position].lower() if position < len(tokens) else None
+#    
+    def take(what=None):
+        nonlocal position
+        if position >= len(tokens):
+            raise ValueError(f"Missing {what or 'a value'} at the end of the filter expression: '{expression}'")
+        token = tokens[position]
+        position += 1
+        return token
+#    
+    # Each parsed primitive is a (cost, predicate) tuple, so the operands of 'and' / 'or' can be reordered by cost
+    protocols = {
+        'ip': (1, lambda h: h['ip_version'] == 4),
+        'ip6': (1, lambda h: h['ip_version'] == 6),
+        'tcp': (1, lambda h: h['ip_proto'] == 6),
+        'udp': (1, lambda h: h['ip_proto'] == 17),
+        'icmp': (1, lambda h: h['ip_proto'] == 1),
+        'icmp6': (1, lambda h: h['ip_proto'] == 58),
+        'arp': (1, lambda h: h['ethertype'] == 0x0806),
+        'ether': (1, lambda h: h['eth_src'] is not None),
+    }
+    protocol_numbers = {'icmp': 1, 'igmp': 2, 'tcp': 6, 'udp': 17, 'gre': 47, 'esp': 50, 'ah': 51, 'icmp6': 58, 'sctp': 132}
+#    
+    def parse_direction():
+        if peek() in ('src', 'dst'):
+            direction = take().lower()
+            if peek() in ('or', 'and'):
+                # 'src or dst' / 'src and dst'
+                combine = take().lower()
+                if take('dst').lower() != 'dst':
+                    raise ValueError(f"Expected 'dst' after 'src {combine}' in the filter expression: '{expression}'")
+                return combine
+            return direction
+        return None
+#    
+    def address_predicate(direction, src_key, dst_key, match):
+        if direction == 'src':
+            return lambda h: match(h[src_key])
+        if direction == 'dst':
+            return lambda h: match(h[dst_key])
+        if direction == 'and':
+            return lambda h: match(h[src_key]) and match(h[dst_key])
+        return lambda h: match(h[src_key]) or match(h[dst_key])
+#    
+    def parse_port(value):
+        # A port number or a service name (e.g. 'http')
+        if value.isdigit() and int(value) <= 65535:
+            return int(value)
+        for service_proto in ('tcp', 'udp'):
+            try:
+                return socket.getservbyname(value.lower(), service_proto)
+            except OSError:
+                pass
+        raise ValueError(f"Unknown port '{value}' in the filter expression: '{expression}'")
+#    
+    def parse_primitive():
+        token = peek()
+        if token is None:
+            raise ValueError(f"Missing a filter primitive at the end of the filter expression: '{expression}'")
+#        
+        if token == 'vlan':
+            take()
+            if peek() is not None and peek().isdigit():
+                vlan_id = int(take())
+                return (1, lambda h: vlan_id in h['vlan'])
+            return (1, lambda h: bool(h['vlan']))
+#        
+        if token == 'proto':
+            take()
+            value = take('a protocol').lower()
+            number = protocol_numbers.get(value, None) if not value.isdigit() else int(value)
+            if number is None:
+                raise ValueError(f"Unknown protocol '{value}' in the filter expression: '{expression}'")
+            return (1, lambda h: h['ip_proto'] == number)
+#        
+        if token == 'ether':
+            take()
+            direction = parse_direction()
+            if peek() != 'host':
+                if direction is not None:
+                    raise ValueError(f"Expected 'host' after 'ether {direction}' in the filter expression: '{expression}'")
+                return protocols['ether']
+            take()
+            mac_bytes = bytes.fromhex(re.sub(r'[:\-.]', '', take('a mac address')))
+            return (3, address_predicate(direction, 'eth_src', 'eth_dst', lambda value: value == mac_bytes))
+#        
+        transport = None
+        if token in ('tcp', 'udp') and position + 1 < len(tokens) and tokens[position + 1].lower() in ('src', 'dst', 'port', 'portrange'):
+            transport = 6 if take().lower() == 'tcp' else 17
+        elif token in protocols:
+            take()
+            return protocols[token]
+#        
+        direction = parse_direction()
+        kind = take('host, net, port or portrange').lower()
+#        
+        if kind in ('port', 'portrange'):
+            value = take(f'a {kind}')
+            if kind == 'port':
+                first_port = last_port = parse_port(value)
+            else:
+                if value.count('-') != 1:
+                    raise ValueError(f"Expected '<first>-<last>' after 'portrange' in the filter expression: '{expression}'")
+                first_port, last_port = [ parse_port(x) for x in value.split('-') ]
+            if first_port == last_port:
+                match = lambda value: value == first_port
+            else:
+                match = lambda value: value is not None and first_port <= value <= last_port
+            port_predicate = address_predicate(direction, 'sport', 'dport', match)
+            if transport is None:
+                return (2, lambda h: h['ip_proto'] in (6, 17) and port_predicate(h))
+            return (2, lambda h: h['ip_proto'] == transport and port_predicate(h))
+#        
+        if transport is not None:
+            raise ValueError(f"Expected 'port' or 'portrange' after '{token}' in the filter expression: '{expression}'")
+#        
+        if kind == 'host':
+            address_bytes = ipaddress.ip_address(take('an ip address')).packed
+            return (3, address_predicate(direction, 'ip_src', 'ip_dst', lambda value: value == address_bytes))
+#        
+        if kind == 'net':
+            network = ipaddress.ip_network(take('a network'), strict=False)
+            network_int = int(network.network_address)
+            netmask_int = int(network.netmask)
+            address_length = network.max_prefixlen // 8
+            def match(value):
+                return value is not None and len(value) == address_length and int.from_bytes(value, 'big') & netmask_int == network_int
+            return (4, address_predicate(direction, 'ip_src', 'ip_dst', match))
+#        
+        raise ValueError(f"Unknown filter primitive '{kind}' in the filter expression: '{expression}'")
+#    
+    def combine(operator, operands):
+        # Cheapest operands first, then folded into short-circuiting closures
+        operands = sorted(operands, key=lambda x: x[0])
+        cost = sum([ operand_cost for operand_cost, operand in operands ])
+        predicate = operands[-1][1]
+        for operand_cost, operand in reversed(operands[:-1]):
+            if operator == 'and':
+                predicate = (lambda first, rest: lambda h: first(h) and rest(h))(operand, predicate)
+            else:
+                predicate = (lambda first, rest: lambda h: first(h) or rest(h))(operand, predicate)
+        return (cost, predicate)
+#    
+    def parse_chain():
+        # 'and' and 'or' have equal precedence and associate left to right (as in tcpdump), so each run of the
+        # same operator is combined on its own, and a change of operator folds everything before it into one operand
+        operator = None
+        operands = [parse_not()]
+        while peek() in ('and', '&&', 'or', '||'):
+            next_operator = 'and' if take().lower() in ('and', '&&') else 'or'
+            if operator is not None and next_operator != operator:
+                operands = [combine(operator, operands)]
+            operator = next_operator
+            operands.append(parse_not())
+        return operands[0] if len(operands) == 1 else combine(operator, operands)
+#    
+    def parse_not():
+        if peek() in ('not', '!'):
+            take()
+            cost, predicate = parse_not()
+            return (cost, lambda h: not predicate(h))
+        if peek() == '(':
+            take()
+            result = parse_chain()
+            if take("')'") != ')':
+                raise ValueError(f"Expected ')' in the filter expression: '{expression}'")
+            return result
+        return parse_primitive()
+#    
+    if not tokens:
+        return lambda h: True
+    cost, predicate = parse_chain()
+    if position < len(tokens):
+        raise ValueError(f"Unexpected '{tokens[position]}' in the filter expression: '{expression}'")
+    return predicate
+
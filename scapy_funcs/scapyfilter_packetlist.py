@@ -0,0 +1,19 @@
+# %%
+#######################################
+def scapyfilter_packetlist(packet_list: scapy.plist.PacketList, expression: str):
+    """Filters a PacketList with a BPF-like filter expression (see 'scapyfilter_compile'), e.g. 'tcp and (port 443 or net 10.0.0.0/8) and not src host 1.2.3.4', in a single pass.  This replaces chaining several 'scapyget_*' functions (each building a new PacketList) with one query.
+
+    Example:
+        >>> temp_pcap = rdpcap('temp.pcap')\n
+        >>> scapyfilter_packetlist(temp_pcap, 'udp and src host 66.17.1.2 and not dst port 53')\n
+        <PacketList: TCP:0 UDP:1 ICMP:0 Other:0>
+
+    Args:
+        packet_list (scapy.plist.PacketList): Reference an existing PacketList object
+        expression (str): Reference a filter expression
+
+    Returns:
+        scapy.plist.PacketList: Returns a PacketList object
+    """
+    return PacketList(list(scapystream_expression(packet_list, expression)))
+
@@ -0,0 +1,36 @@
+# %%
+#######################################
+def scapyfilter_pcap(pcap_file: str, expression: str, output_file=None):
+    """Filters a .pcap (or .pcapng) file with a BPF-like filter expression (see 'scapyfilter_compile'), e.g. 'tcp and (port 443 or net 10.0.0.0/8) and not src host 1.2.3.4'.  The expression is compiled once and evaluated against the raw header fields of each record, so a complex triage query runs in one pass over the file, and only the matching packets are ever dissected by scapy (or none at all, when writing to 'output_file').
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> scapyfilter_pcap('temp.pcap', 'udp and dst net 185.34.210.0/24 and dst port 10001')\n
+        <PacketList: TCP:0 UDP:1 ICMP:0 Other:0>
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> scapyfilter_pcap('huge.pcap', 'tcp and not port 22 and (host 10.1.1.1 or host 10.1.1.100)', output_file='triage.pcap')\n
+        107
+
+    Args:
+        pcap_file (str): Reference a .pcap (or .pcapng) file
+        expression (str): Reference a filter expression
+        output_file (str, optional): Reference the path of a .pcap file to write the matching packets to, instead of returning them as a PacketList. Defaults to None.
+
+    Returns:
+        object: Returns a PacketList object, or the number of packets written if 'output_file' was given
+    """
+    predicate = scapyfilter_compile(expression)
+    matching_records = ( record for record in scapyraw_pcap_records(pcap_file) if predicate(scapyraw_parse_headers(record[2], record[4])) )
+#    
+    if output_file:
+        # Keeping the linktype, snaplen and timestamp resolution of the original capture (a .pcapng keeps its nanoseconds, and the linktype of its first record)
+        with open(pcap_file, 'rb') as f:
+            global_header = f.read(24)
+        if global_header[:4] == b'\x0a\x0d\x0d\x0a':
+            return scapyraw_pcap_writer(matching_records, output_file, linktype=None, snaplen=262144, nanosecond=True)
+        pcap_header = scapyraw_pcap_global_header(global_header)
+        return scapyraw_pcap_writer(matching_records, output_file, linktype=pcap_header['linktype'], snaplen=pcap_header['snaplen'], nanosecond=pcap_header['ns_multiplier'] == 1)
+#    
+    return PacketList([ scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen) for timestamp_ns, file_offset, frame, wirelen, linktype in matching_records ])
+
@@ -0,0 +1,44 @@
+# %%
+#######################################
+def scapyget_ip_watchlist(packet_list: scapy.plist.PacketList, watchlist, dst=False, src=False, notin=False):
+    """Takes a PacketList and a watchlist of ip addresses and CIDR ranges (IPv4 and IPv6, see 'scapywatchlist_compile_ips'), and returns the packets whose [IP].src or [IP].dst is in the watchlist (or those that are not in it, with notin=True), in a single pass whatever the size of the watchlist.  Unlike 'scapyget_ip_address', the addresses are matched exactly rather than as partial strings.
+
+    Example:
+        >>> temp_pcap = rdpcap('temp.pcap')\n
+        >>> scapyget_ip_watchlist(temp_pcap, ['185.34.210.0/24', '10.1.1.1'], dst=True)\n
+        <PacketList: TCP:0 UDP:1 ICMP:0 Other:0>
+
+    Args:
+        packet_list (scapy.plist.PacketList): Reference an existing PacketList object
+        watchlist (list | dict): Reference a list of ip addresses and CIDR ranges, or a watchlist compiled with 'scapywatchlist_compile_ips'
+        dst (bool, optional): If you want to only search the [IP].dst field, set dst=True. Defaults to False.
+        src (bool, optional): If you want to only search the [IP].src field, set src=True. Defaults to False.
+        notin (bool, optional): If you want to get every IP packet that DOES NOT match the watchlist, set notin=True. Defaults to False.
+
+    Returns:
+        scapy.plist.PacketList: Returns a PacketList object
+    """
+    if dst and src:
+        print("The defaults of this tool will search for the given ip address in both the [IP].dst and the [IP].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return PacketList([])
+#    
+    if not isinstance(watchlist, dict):
+        watchlist = scapywatchlist_compile_ips(watchlist)
+    if dst:
+        fields = ['dst']
+    elif src:
+        fields = ['src']
+    else:
+        fields = ['src', 'dst']
+#    
+    matching_packets = []
+    for pckt in packet_list:
+        headers = scapyraw_parse_headers(bytes(pckt), conf.l2types.layer2num.get(type(pckt), 1))
+        if headers['ip_version'] is None:
+            continue
+        is_match = any( scapywatchlist_ip_match(watchlist, headers['ip_' + f]) for f in fields )
+        if is_match != notin:
+            matching_packets.append(pckt)
+#    
+    return PacketList(matching_packets)
+
@@ -0,0 +1,37 @@
+# %%
+#######################################
+def scapyget_mac_watchlist(packet_list: scapy.plist.PacketList, watchlist, dst=False, src=False, notin=False):
+    """Takes a PacketList and a watchlist of mac addresses and OUI prefixes (see 'scapywatchlist_compile_macs'), and returns the packets whose [Ether].src or [Ether].dst is in the watchlist (or those that are not in it, with notin=True), in a single pass whatever the size of the watchlist.
+
+    Example:
+        >>> temp_pcap = rdpcap('temp.pcap')\n
+        >>> scapyget_mac_watchlist(temp_pcap, ['00:0c:29', '00:50:56:c0:00:08'])\n
+        <PacketList: TCP:0 UDP:1 ICMP:0 Other:0>
+
+    Args:
+        packet_list (scapy.plist.PacketList): Reference an existing PacketList object
+        watchlist (list | dict): Reference a list of mac addresses and prefixes, or a watchlist compiled with 'scapywatchlist_compile_macs'
+        dst (bool, optional): If you want to only search the [Ether].dst field, set dst=True. Defaults to False.
+        src (bool, optional): If you want to only search the [Ether].src field, set src=True. Defaults to False.
+        notin (bool, optional): If you want to get every Ethernet packet that DOES NOT match the watchlist, set notin=True. Defaults to False.
+
+    Returns:
+        scapy.plist.PacketList: Returns a PacketList object
+    """
+    if dst and src:
+        print("The defaults of this tool will search for the given mac address in both the [Ether].dst and the [Ether].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return PacketList([])
+#    
+    if not isinstance(watchlist, dict) or 'macs' not in watchlist:
+        watchlist = scapywatchlist_compile_macs(watchlist)
+    if dst:
+        fields = ['dst']
+    elif src:
+        fields = ['src']
+    else:
+        fields = ['src', 'dst']
+#    
+    matching_packets = [ pckt for pckt in packet_list if pckt.haslayer('Ether') and ( any( scapywatchlist_mac_match(watchlist, getattr(pckt['Ether'], f)) is not None for f in fields ) != notin ) ]
+#    
+    return PacketList(matching_packets)
+
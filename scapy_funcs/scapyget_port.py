@@ -1,24 +1,52 @@
 # %%
 #######################################
-def scapyget_port(packet_list: scapy.plist.PacketList, port: int, sport=False, dport=False, notin=False):
-    if notin:
-        if sport and dport:
-            print("The defaults of this tool will search for the given port in both the [TCP/UDP].sport and the [TCP/UDP].dport fields.  If you only want to search for 'sport' field OR the 'dport' field use, sport=True or dport=True, respectively (but don't turn them both on).")
-        elif sport:
-            result_list = [ pckt for pckt in packet_list if ( pckt.haslayer('TCP') and pckt['TCP'].sport != port ) or ( pckt.haslayer('UDP') and pckt['UDP'].sport != port ) ]
-        elif dport:
-            result_list = [ pckt for pckt in packet_list if ( pckt.haslayer('TCP') and pckt['TCP'].dport != port ) or ( pckt.haslayer('UDP') and pckt['UDP'].dport != port ) ]
-        else:
-            result_list = [ pckt for pckt in packet_list if ( pckt.haslayer('TCP') and ( pckt['TCP'].sport != port and pckt['TCP'].dport != port ) ) or ( pckt.haslayer('UDP') and ( pckt['UDP'].sport != port and pckt['UDP'].dport != port ) ) ]
+def scapyget_port(packet_list: scapy.plist.PacketList, port, sport=False, dport=False, notin=False, split=False):
+    """Takes a PacketList and a port, or a set of ports, and returns every TCP or UDP packet that has one of the ports in the sport or dport field (or that has none of them, if the notin=True switch is turned on).  The ports can be a list, ranges and named groups such as 'well-known' or 'ephemeral' (see 'scapyport_compile_set'); they are compiled into a 65536 entry bitmap once, and each packet is checked against it in a single pass.
+
+    Example:
+        >>> temp_pcap = rdpcap('temp.pcap')\n
+        >>> scapyget_port(temp_pcap, [53, 80, 443], dport=True)\n
+        <PacketList: TCP:212 UDP:36 ICMP:0 Other:0>
+        >>> scapyget_port(temp_pcap, [53, 80, 443], dport=True, split=True)\n
+        {53: <PacketList: TCP:0 UDP:36 ICMP:0 Other:0>, 80: <PacketList: TCP:12 UDP:0 ICMP:0 Other:0>, 443: <PacketList: TCP:200 UDP:0 ICMP:0 Other:0>}
+
+    Args:
+        packet_list (scapy.plist.PacketList): Reference an existing PacketList object
+        port (int | str | range | iterable): Reference a port number, or a set of ports, ranges and named groups (see 'scapyport_compile_set')
+        sport (bool, optional): If you want to only search the [TCP/UDP].sport field, set sport=True. Defaults to False.
+        dport (bool, optional): If you want to only search the [TCP/UDP].dport field, set dport=True. Defaults to False.
+        notin (bool, optional): If you want to get every TCP or UDP packet that DOES NOT contain any of the given ports, set notin=True. Defaults to False.
+        split (bool, optional): If you want the matching packets split per port, set split=True (a packet whose sport and dport both match is in both lists; ignored with notin=True). Defaults to False.
+
+    Returns:
+        scapy.plist.PacketList: Returns a PacketList object (or a dict of each matched port to a PacketList object, with split=True)
+    """
+    if sport and dport:
+        print("The defaults of this tool will search for the given port in both the [TCP/UDP].sport and the [TCP/UDP].dport fields.  If you only want to search for 'sport' field OR the 'dport' field use, sport=True or dport=True, respectively (but don't turn them both on).")
+        return PacketList([])
+#    
+    port_bitmap = scapyport_compile_set(port)
+    if sport:
+        fields = ('sport',)
+    elif dport:
+        fields = ('dport',)
     else:
-        if sport and dport:
-            print("The defaults of this tool will search for the given port in both the [TCP/UDP].sport and the [TCP/UDP].dport fields.  If you only want to search for 'sport' field OR the 'dport' field use, sport=True or dport=True, respectively (but don't turn them both on).")
-        elif sport:
-            result_list = [ pckt for pckt in packet_list if ( pckt.haslayer('TCP') and pckt['TCP'].sport == port ) or ( pckt.haslayer('UDP') and pckt['UDP'].sport == port ) ]
-        elif dport:
-            result_list = [ pckt for pckt in packet_list if ( pckt.haslayer('TCP') and pckt['TCP'].dport == port ) or ( pckt.haslayer('UDP') and pckt['UDP'].dport == port ) ]
-        else:
-            result_list = [ pckt for pckt in packet_list if ( pckt.haslayer('TCP') and ( pckt['TCP'].sport == port or pckt['TCP'].dport == port ) ) or ( pckt.haslayer('UDP') and ( pckt['UDP'].sport == port or pckt['UDP'].dport == port ) ) ]
+        fields = ('sport', 'dport')
+#    
+    result_list = []
+    split_lists = {}
+    for pckt in packet_list:
+        layers = [ pckt[proto] for proto in ('TCP', 'UDP') if pckt.haslayer(proto) ]
+        if not layers:
+            continue
+        matched_ports = [ getattr(layer, f) for layer in layers for f in fields if port_bitmap[getattr(layer, f)] ]
+        if bool(matched_ports) != notin:
+            result_list.append(pckt)
+            if split and not notin:
+                for matched_port in dict.fromkeys(matched_ports):
+                    split_lists.setdefault(matched_port, []).append(pckt)
 #            
+    if split and not notin:
+        return { matched_port: PacketList(split_lists[matched_port]) for matched_port in sorted(split_lists) }
     return PacketList(result_list)
 
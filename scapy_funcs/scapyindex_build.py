@@ -0,0 +1,148 @@
+# %%
+#######################################
+def scapyindex_build(pcap_file: str, index_file=None, rebuild=False):
+    """Builds (or updates) a sidecar index for a .pcap file that records, for every IP address, mac address and 5-tuple flow, the byte offsets of the pcap records that contain it.  Later queries (see 'scapyindex_ip_address', 'scapyindex_mac_address' and 'scapyindex_flow') can then seek straight to the matching records instead of re-scanning the whole capture.
+
+    The records are grouped by their (mac_src, mac_dst, ip_src, ip_dst, flow), and the byte offsets of each group are stored once, in a binary offsets file next to the capture ('<pcap_file>.index.offsets').  The index itself ('<pcap_file>.index.json') only maps each address and flow to the ids of its groups, so a query reads the small JSON index and then just the offsets of the groups it matched (see 'scapyindex_offsets').  If the capture has not changed, the saved index is returned as-is.  If the capture has grown (e.g. it is still being written) and its first and last indexed records are unchanged, only the new records are scanned and added to the index.  Anything else (a capture that shrank or was replaced) triggers a full rebuild.
+
+    Example:
+        >>> index = scapyindex_build('temp.pcap')\n
+        >>> index['packet_count']\n
+        118
+        >>> list(index['flows'])[:2]\n
+        ['TCP 27.72.5.247:22 > 84.67.6.14:1046', 'TCP 84.67.6.14:1046 > 27.72.5.247:22']
+        >>> scapyindex_offsets(index, index['ip_dst']['185.34.210.1'])\n
+        [10411]
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        index_file (str, optional): Reference the path of the index file. Defaults to None (the .pcap file path + '.index.json').
+        rebuild (bool, optional): If you want to ignore any existing index and rebuild it, set rebuild=True. Defaults to False.
+
+    Returns:
+        dict: Returns the index
+    """
+    import array
+    import json
+    import pathlib
+    import zlib
+#    
+    pcap_path_obj = pathlib.Path(pcap_file).resolve()
+    if index_file:
+        index_path_obj = pathlib.Path(index_file).resolve()
+    else:
+        index_path_obj = pcap_path_obj.with_name(pcap_path_obj.name + '.index.json')
+    offsets_path_obj = index_path_obj.with_name(index_path_obj.name.rsplit('.json', 1)[0] + '.offsets')
+#    
+    def record_check(f, file_offset):
+        # The crc32 of a record's header and frame, to tell whether the bytes at an indexed offset are still the same record
+        f.seek(file_offset)
+        record_header = f.read(16)
+        if len(record_header) < 16:
+            return None
+        caplen = int.from_bytes(record_header[8:12], 'little' if pcap_global_header[:8] in ('d4c3b2a1', '4d3cb2a1') else 'big')
+        return zlib.crc32(record_header + f.read(caplen))
+#    
+    pcap_stat = pcap_path_obj.stat()
+    with pcap_path_obj.open('rb') as f:
+        pcap_global_header = f.read(24).hex()
+#    
+        index = None
+        if index_path_obj.is_file() and offsets_path_obj.is_file() and not rebuild:
+            index = json.loads(index_path_obj.read_text())
+            index['offsets_path'] = offsets_path_obj.as_posix()
+            if index.get('groups') is None or index.get('check_records') is None:
+                # An index in an older layout
+                index = None
+            elif index['pcap_size'] == pcap_stat.st_size and index['pcap_mtime_ns'] == pcap_stat.st_mtime_ns:
+                return index
+            # Only a capture that has grown (same global header, same first and last indexed records) can be indexed incrementally
+            elif index['pcap_global_header'] != pcap_global_header or index['indexed_until'] > pcap_stat.st_size:
+                index = None
+            elif any( record_check(f, file_offset) != checksum for file_offset, checksum in index['check_records'] ):
+                index = None
+#    
+        if index is None:
+            index = {
+                'pcap_global_header': pcap_global_header, 'pcap_size': 0, 'pcap_mtime_ns': 0, 'indexed_until': 24, 'packet_count': 0, 'check_records': [],
+                'groups': [], 'ip_src': {}, 'ip_dst': {}, 'ipv6_src': {}, 'ipv6_dst': {}, 'mac_src': {}, 'mac_dst': {}, 'flows': {},
+            }
+            index['offsets_path'] = offsets_path_obj.as_posix()
+            offsets_mode = 'wb'
+        else:
+            offsets_mode = 'ab'
+#    
+        proto_names = {1: 'ICMP', 6: 'TCP', 17: 'UDP', 58: 'ICMPv6'}
+        group_ids = { (g['mac_src'], g['mac_dst'], g['ip_version'], g['ip_src'], g['ip_dst'], g['flow'], g['unparsed']): group_id for group_id, g in enumerate(index['groups']) }
+        new_offsets = {}
+        first_offset = None
+        last_offset = None
+#    
+        for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(pcap_path_obj.as_posix(), start_offset=index['indexed_until']):
+            if file_offset is None:
+                raise ValueError(f"'{pcap_file}' is not a libpcap formatted file, which is required for indexing by file offset")
+            headers = scapyraw_parse_headers(frame, linktype)
+            index['packet_count'] += 1
+            index['indexed_until'] = file_offset + 16 + len(frame)
+            if first_offset is None:
+                first_offset = file_offset
+            last_offset = file_offset
+#            
+            mac_src = scapyraw_format_address(headers['eth_src'])
+            mac_dst = scapyraw_format_address(headers['eth_dst'])
+            ip_src = scapyraw_format_address(headers['ip_src'])
+            ip_dst = scapyraw_format_address(headers['ip_dst'])
+            flow_key = None
+            if headers['ip_version'] is not None:
+                proto_name = proto_names.get(headers['ip_proto'], f"IP proto={headers['ip_proto']}")
+                if headers['sport'] is not None:
+                    flow_key = f"{proto_name} {ip_src}:{headers['sport']} > {ip_dst}:{headers['dport']}"
+                else:
+                    flow_key = f"{proto_name} {ip_src} > {ip_dst}"
+#            
+            group_key = (mac_src, mac_dst, headers['ip_version'], ip_src, ip_dst, flow_key, bool(headers['unparsed']))
+            group_id = group_ids.get(group_key)
+            if group_id is None:
+                group_id = len(index['groups'])
+                group_ids[group_key] = group_id
+                index['groups'].append({'mac_src': mac_src, 'mac_dst': mac_dst, 'ip_version': headers['ip_version'], 'ip_src': ip_src, 'ip_dst': ip_dst, 'flow': flow_key, 'unparsed': bool(headers['unparsed']), 'chunks': []})
+                if mac_src is not None:
+                    index['mac_src'].setdefault(mac_src, []).append(group_id)
+                    index['mac_dst'].setdefault(mac_dst, []).append(group_id)
+                if headers['ip_version'] == 4:
+                    index['ip_src'].setdefault(ip_src, []).append(group_id)
+                    index['ip_dst'].setdefault(ip_dst, []).append(group_id)
+                elif headers['ip_version'] == 6:
+                    index['ipv6_src'].setdefault(ip_src, []).append(group_id)
+                    index['ipv6_dst'].setdefault(ip_dst, []).append(group_id)
+                if flow_key is not None:
+                    index['flows'].setdefault(flow_key, []).append(group_id)
+            new_offsets.setdefault(group_id, array.array('q')).append(file_offset)
+#    
+        if first_offset is not None:
+            if not index['check_records']:
+                index['check_records'] = [[first_offset, record_check(f, first_offset)]]
+            index['check_records'] = [index['check_records'][0], [last_offset, record_check(f, last_offset)]]
+#    
+    # Appending the offsets of the new records, one contiguous chunk of (position, count) per group; a full rebuild goes through a temporary file
+    offsets_temp_obj = offsets_path_obj.with_name(offsets_path_obj.name + '.tmp')
+    offsets_write_obj = offsets_temp_obj if offsets_mode == 'wb' else offsets_path_obj
+    with offsets_write_obj.open(offsets_mode) as offsets_f:
+        position = offsets_f.tell() // 8
+        for group_id, group_offsets in new_offsets.items():
+            group_offsets.tofile(offsets_f)
+            index['groups'][group_id]['chunks'].append([position, len(group_offsets)])
+            position += len(group_offsets)
+    if offsets_mode == 'wb':
+        offsets_temp_obj.replace(offsets_path_obj)
+#    
+    index['pcap_size'] = pcap_stat.st_size
+    index['pcap_mtime_ns'] = pcap_stat.st_mtime_ns
+#    
+    # Writing to a temporary file first, so that an interrupted write never leaves a corrupt index behind
+    temp_path_obj = index_path_obj.with_name(index_path_obj.name + '.tmp')
+    temp_path_obj.write_text(json.dumps({ k: v for k, v in index.items() if k != 'offsets_path' }))
+    temp_path_obj.replace(index_path_obj)
+#    
+    return index
+
@@ -0,0 +1,33 @@
+# %%
+#######################################
+def scapyindex_flow(pcap_file: str, flow_key: str, bidirectional=False):
+    """Returns the packets of a single 5-tuple flow from a .pcap file, using the sidecar index from 'scapyindex_build' (built on the first call, and updated when the capture grows) to read only the records of that flow.  The flow keys use the same form as the keys of PacketList.sessions(), e.g. 'TCP 10.1.1.1:1046 > 10.1.1.100:22'.
+
+    Example:
+        >>> index = scapyindex_build('temp.pcap')\n
+        >>> list(index['flows'])[0]\n
+        'TCP 27.72.5.247:22 > 84.67.6.14:1046'
+        >>> scapyindex_flow('temp.pcap', 'TCP 27.72.5.247:22 > 84.67.6.14:1046')\n
+        <PacketList: TCP:53 UDP:0 ICMP:0 Other:0>
+        >>> scapyindex_flow('temp.pcap', 'TCP 27.72.5.247:22 > 84.67.6.14:1046', bidirectional=True)\n
+        <PacketList: TCP:113 UDP:0 ICMP:0 Other:0>
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        flow_key (str): Reference a flow key, in the form 'PROTO src_ip:sport > dst_ip:dport' (or 'PROTO src_ip > dst_ip' for protocols without ports)
+        bidirectional (bool, optional): If you want the packets of the reverse direction of the flow as well, set bidirectional=True. Defaults to False.
+
+    Returns:
+        scapy.plist.PacketList: Returns a PacketList of the packets in the flow
+    """
+    index = scapyindex_build(pcap_file)
+#    
+    flow_groups = set(index['flows'].get(flow_key, []))
+    if bidirectional:
+        proto_name, src_endpoint, _, dst_endpoint = flow_key.rsplit(' ', 3)
+        reverse_flow_key = f"{proto_name} {dst_endpoint} > {src_endpoint}"
+        flow_groups.update(index['flows'].get(reverse_flow_key, []))
+#    
+    result_list = [ scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen) for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records_at(pcap_file, scapyindex_offsets(index, flow_groups)) ]
+    return PacketList(result_list)
+
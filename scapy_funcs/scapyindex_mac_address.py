@@ -0,0 +1,59 @@
+# %%
+#######################################
+def scapyindex_mac_address(pcap_file: str, mac: str, dst=False, src=False, notin=False):
+    """Indexed version of 'scapypcapreader_mac_address'.  Takes a given .pcap file and a partial/full string of a mac address (in the form aa:bb:cc:dd:11:22) and returns each packet that contains that mac address (or that DOES NOT contain that mac address if the notin=True switch is turned on).  The matching is done against the keys of the sidecar index from 'scapyindex_build' (built on the first call, and updated when the capture grows), and only the matching records are read from the capture.
+
+    Example:
+        >>> example = scapyindex_mac_address('temp.pcap', '64:5a', notin=True)\n
+        >>> example\n
+        <PacketList: TCP:0 UDP:2 ICMP:0 Other:0>
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        mac (str): Reference a mac address
+        dst (bool, optional): If you want to only search the [Ether].dst field, set dst=True. Defaults to False.
+        src (bool, optional): If you want to only search the [Ether].src field, set src=True. Defaults to False.
+        notin (bool, optional): If you want to get every packet that DOES NOT contain a given mac address, set notin=True. Defaults to False.
+
+    Returns:
+        scapy.plist.PacketList: Returns a PacketList of the matching packets.
+    """
+    if dst and src:
+        print("The defaults of this tool will search for the given mac address in both the [Ether].dst and the [Ether].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return PacketList([])
+#
+    if dst:
+        fields = ['dst']
+    elif src:
+        fields = ['src']
+    else:
+        fields = ['src', 'dst']
+#    
+    index = scapyindex_build(pcap_file)
+#    
+    matching_groups = set()
+    for f in fields:
+        for address, group_ids in index['mac_' + f].items():
+            if mac in address:
+                matching_groups.update(group_ids)
+    if notin:
+        matching_groups = set([ group_id for group_id, g in enumerate(index['groups']) if g['mac_src'] is not None ]) - matching_groups
+    matching_offsets = set(scapyindex_offsets(index, matching_groups))
+#    
+    # The packets the raw decoder could not follow are checked the slow way, with a full scapy dissection
+    def scapy_predicate(pckt):
+        if not pckt.haslayer('Ether'):
+            return False
+        is_match = any( mac in getattr(pckt['Ether'], f) for f in fields )
+        return is_match != notin
+#    
+    unparsed_offsets = set(scapyindex_offsets(index, [ group_id for group_id, g in enumerate(index['groups']) if g['unparsed'] ]))
+    result_list = []
+    for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records_at(pcap_file, sorted(matching_offsets | unparsed_offsets)):
+        pckt = scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen)
+        if file_offset in unparsed_offsets and not scapy_predicate(pckt):
+            continue
+        result_list.append(pckt)
+#
+    return PacketList(result_list)
+
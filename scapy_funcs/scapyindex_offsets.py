@@ -0,0 +1,28 @@
+# %%
+#######################################
+def scapyindex_offsets(index: dict, group_ids):
+    """Reads the byte offsets of the records of the given groups of an index built by 'scapyindex_build' (e.g. the group ids of an address in index['ip_src'], or of a flow in index['flows']) from its binary offsets file, seeking straight to each group's chunks rather than reading the whole file.
+
+    Example:
+        >>> index = scapyindex_build('temp.pcap')\n
+        >>> scapyindex_offsets(index, index['ip_dst']['185.34.210.1'])\n
+        [10411]
+
+    Args:
+        index (dict): Reference an index returned by 'scapyindex_build'
+        group_ids (iterable): Reference the ids of the groups
+
+    Returns:
+        list: Returns the sorted byte offsets of the records of the groups
+    """
+    import array
+    import pathlib
+#    
+    chunks = sorted([ chunk for group_id in set(group_ids) for chunk in index['groups'][group_id]['chunks'] ])
+    record_offsets = array.array('q')
+    with pathlib.Path(index['offsets_path']).open('rb') as f:
+        for position, count in chunks:
+            f.seek(position * 8)
+            record_offsets.fromfile(f, count)
+    return sorted(record_offsets)
+
@@ -0,0 +1,30 @@
+# %%
+#######################################
+class ScapyLazyLayer:
+    """One layer of a 'ScapyLazyPacket': the fields decoded from the raw headers are returned (and cached) directly, any other field is read from the same layer of the real scapy packet."""
+    __slots__ = ('_lazy_packet', '_layer_name', '_values')
+#    
+    def __init__(self, lazy_packet, layer_name):
+        self._lazy_packet = lazy_packet
+        self._layer_name = layer_name
+        self._values = {}
+#    
+    def __getattr__(self, name):
+        # Private names and unset slots are not delegated, as copy / pickle look them up before '__init__' has run
+        if name.startswith('_') or name in self.__slots__:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        values = self._values
+        if name in values:
+            return values[name]
+        field_function = ScapyLazyPacket._fast_fields[self._layer_name].get(name)
+        if field_function is None:
+            return getattr(self._lazy_packet.packet[self._layer_name], name)
+        values[name] = field_function(self._lazy_packet.headers)
+        return values[name]
+#    
+    def __bytes__(self):
+        return bytes(self._lazy_packet.packet[self._layer_name])
+#    
+    def __repr__(self):
+        return repr(self._lazy_packet.packet[self._layer_name])
+
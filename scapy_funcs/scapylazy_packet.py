@@ -0,0 +1,141 @@
+# %%
+#######################################
+class ScapyLazyPacket:
+    """A lightweight stand-in for a scapy packet, for the filter-then-discard pattern (e.g. the 'scapystream_*' filters), see 'scapylazy_pcapreader'.  It holds only the raw bytes of the frame: the Ethernet / IP / IPv6 / TCP / UDP / ICMP headers are decoded (with 'scapyraw_parse_headers') the first time 'haslayer' or '[...]' is used, and the decoded layers are cached.  Anything else (another layer, a field that is not decoded here, 'show()', 'summary()', ...) is handed to a real scapy packet, which is only dissected then, once.
+
+    The layers decode these fields (every other field is read from the real scapy packet):
+        - Ether: src, dst
+        - IP / IPv6: src, dst, version
+        - TCP: sport, dport, seq, ack
+        - UDP: sport, dport
+        - ICMP: type, code
+
+    Example:
+        >>> ts_ns, offset, frame, wirelen, linktype = next(scapyraw_pcap_records('temp.pcap'))\n
+        >>> pckt = ScapyLazyPacket(frame, ts_ns, linktype, wirelen)\n
+        >>> pckt.haslayer('UDP'), pckt['IP'].src, pckt[UDP].dport\n
+        (True, '66.17.1.2', 10001)
+        >>> pckt['IP'].ttl\n
+        64
+        >>> pckt.packet\n
+        <Ether  dst=00:0c:29:64:3b:e1 src=00:50:56:c0:00:08 type=IPv4 |<IP  version=4 ihl=5 tos=0x0 len=46 id=1 flags= frag=0 ttl=64 proto=udp chksum=0x... src=66.17.1.2 dst=185.34.210.1 |<UDP  sport=58429 dport=10001 len=26 chksum=0x... |<Raw  load='...' |>>>>
+
+    Args:
+        frame (bytes): Reference the raw bytes of a frame
+        timestamp_ns (int, optional): Reference the timestamp of the frame in nanoseconds. Defaults to None.
+        linktype (int, optional): Reference the pcap linktype of the frame. Defaults to 1 (Ethernet).
+        wirelen (int, optional): Reference the original length of the frame. Defaults to None.
+    """
+    __slots__ = ('frame', 'timestamp_ns', 'linktype', 'wirelen', '_headers', '_layers', '_packet')
+#    
+    # The fields each layer decodes, from the 'scapyraw_parse_headers' dict
+    _fast_fields = {
+        'Ether': {'src': lambda h: scapyraw_format_address(h['eth_src']), 'dst': lambda h: scapyraw_format_address(h['eth_dst'])},
+        'IP': {'src': lambda h: scapyraw_format_address(h['ip_src']), 'dst': lambda h: scapyraw_format_address(h['ip_dst']), 'version': lambda h: 4},
+        'IPv6': {'src': lambda h: scapyraw_format_address(h['ip_src']), 'dst': lambda h: scapyraw_format_address(h['ip_dst']), 'version': lambda h: 6},
+        'TCP': {'sport': lambda h: h['sport'], 'dport': lambda h: h['dport'], 'seq': lambda h: h['tcp_seq'], 'ack': lambda h: h['tcp_ack']},
+        'UDP': {'sport': lambda h: h['sport'], 'dport': lambda h: h['dport']},
+        'ICMP': {'type': lambda h: h['icmp_type'], 'code': lambda h: h['icmp_code']},
+    }
+#    
+    def __init__(self, frame, timestamp_ns=None, linktype=1, wirelen=None):
+        self.frame = frame
+        self.timestamp_ns = timestamp_ns
+        self.linktype = linktype
+        self.wirelen = wirelen
+        self._headers = None
+        self._layers = {}
+        self._packet = None
+#    
+    @property
+    def headers(self):
+        if self._headers is None:
+            self._headers = scapyraw_parse_headers(self.frame, self.linktype)
+        return self._headers
+#    
+    @property
+    def packet(self):
+        """The real (fully dissected) scapy packet, dissected on first use"""
+        if self._packet is None:
+            self._packet = scapyraw_frame_to_packet(bytes(self.frame), self.timestamp_ns, self.linktype, self.wirelen)
+        return self._packet
+#    
+    @property
+    def time(self):
+        if self.timestamp_ns is None:
+            return self.packet.time
+        return EDecimal(self.timestamp_ns) / 1000000000
+#    
+    def _fast_haslayer(self, layer_name):
+        # True / False when the decoded headers are enough to tell, None when only scapy can
+        h = self.headers
+        if h['unparsed']:
+            return None
+        if layer_name == 'Ether':
+            return self.linktype == 1 and h['eth_src'] is not None
+        if layer_name == 'IP':
+            return h['ip_version'] == 4
+        if layer_name == 'IPv6':
+            return h['ip_version'] == 6
+        if layer_name in ('TCP', 'UDP', 'ICMP'):
+            if h['ip_version'] is None:
+                return False
+            if h['ip_fragment']:
+                return None
+            expected = {'TCP': 6, 'UDP': 17, 'ICMP': 1}[layer_name]
+            if h['ip_proto'] != expected:
+                return False
+            # A transport header cut short by the snaplen is left to scapy
+            return True if h['l4_offset'] is not None and (h['sport'] is not None or expected == 1) else None
+        return None
+#    
+    def haslayer(self, cls):
+        layer_name = cls if isinstance(cls, str) else cls.__name__
+        result = self._fast_haslayer(layer_name)
+        if result is None:
+            return self.packet.haslayer(cls)
+        return result
+#    
+    def __contains__(self, cls):
+        return self.haslayer(cls)
+#    
+    def __getitem__(self, cls):
+        layer_name = cls if isinstance(cls, str) else getattr(cls, '__name__', None)
+        if layer_name in self._layers:
+            return self._layers[layer_name]
+        if layer_name in self._fast_fields and self._fast_haslayer(layer_name):
+            layer = ScapyLazyLayer(self, layer_name)
+        else:
+            layer = self.packet[cls]
+        self._layers[layer_name] = layer
+        return layer
+#    
+    def getlayer(self, cls):
+        return self[cls] if self.haslayer(cls) else None
+#    
+    def __bytes__(self):
+        return bytes(self.frame)
+#    
+    def __len__(self):
+        return len(self.frame)
+#    
+    def __getattr__(self, name):
+        # Every other attribute / method (load, summary, show, sprintf, ...) comes from the real scapy packet.  Private
+        # names and unset slots are not delegated, as copy / pickle look them up before '__init__' has run.
+        if name.startswith('_') or name in self.__slots__:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        return getattr(self.packet, name)
+#    
+    def __getstate__(self):
+        # The frame may be a view of a memory-mapped file, so it is stored as bytes
+        return (bytes(self.frame), self.timestamp_ns, self.linktype, self.wirelen, self._packet)
+#    
+    def __setstate__(self, state):
+        self.__init__(*state[:4])
+        self._packet = state[4]
+#    
+    def __repr__(self):
+        if self._packet is not None:
+            return repr(self._packet)
+        return f'<ScapyLazyPacket {len(self.frame)} bytes (not dissected)>'
+
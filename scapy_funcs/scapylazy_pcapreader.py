@@ -0,0 +1,21 @@
+# %%
+#######################################
+def scapylazy_pcapreader(pcap_file: str):
+    """Lazily yields each packet of a .pcap (or .pcapng) file as a 'ScapyLazyPacket', a stand-in that only decodes the headers it is asked about (and dissects the full scapy packet only when something else is needed).  Drop-in replacement for 'scapystream_pcapreader' in front of the 'scapystream_*' filters, where most packets are looked at once (an address, a port) and discarded, so they are never dissected by scapy at all.
+
+    Example:
+        >>> packet_stream = scapylazy_pcapreader('huge.pcap')\n
+        >>> packet_stream = scapystream_ip_address(packet_stream, '10.1.1.1')\n
+        >>> packet_stream = scapystream_tcp_port(packet_stream, 22)\n
+        >>> scapystream_pcapwriter(packet_stream, 'ssh_10.1.1.1.pcap')\n
+        4210
+
+    Args:
+        pcap_file (str): Reference a .pcap (or .pcapng) file
+
+    Yields:
+        ScapyLazyPacket: Yields each packet, undissected
+    """
+    for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(pcap_file):
+        yield ScapyLazyPacket(frame, timestamp_ns, linktype, wirelen)
+
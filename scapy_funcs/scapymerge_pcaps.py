@@ -0,0 +1,30 @@
+# %%
+#######################################
+def scapymerge_pcaps(pcap_files: list, output_file: str, nanosecond=False):
+    """Merges several .pcap (or .pcapng) files into one .pcap file with the packets interleaved by timestamp, like Wireshark's 'mergecap'.  Each file must already be in timestamp order (see 'scapysort_pcap').  The records are streamed from the files straight to the new .pcap file (see 'scapyraw_merged_records'), holding one record per file in memory.
+
+    All the packets must share the same link-layer type (e.g. Ethernet), since a .pcap file has a single one.
+
+    Example:
+        >>> scapymerge_pcaps(['sensor1.pcap', 'sensor2.pcap', 'sensor3.pcap'], 'all_sensors.pcap')\n
+        130877
+
+    Args:
+        pcap_files (list): Reference a list of .pcap (or .pcapng) files
+        output_file (str): Reference the path of the new .pcap file
+        nanosecond (bool, optional): Set this to True to write nanosecond timestamps (if the files to merge have them). Defaults to False.
+
+    Returns:
+        int: Returns the number of packets written
+    """
+    def checked_records():
+        first_linktype = None
+        for record in scapyraw_merged_records(pcap_files):
+            if first_linktype is None:
+                first_linktype = record[4]
+            elif record[4] != first_linktype:
+                raise ValueError(f"Cannot merge packets with different link-layer types ({first_linktype} and {record[4]}) into one .pcap file")
+            yield record
+#    
+    return scapyraw_pcap_writer(checked_records(), output_file, nanosecond=nanosecond)
+
@@ -0,0 +1,44 @@
+# %%
+#######################################
+def scapynumpy_ip_address(table, ip: str, dst=False, src=False, notin=False):
+    """Vectorized ip address filter for a packet table (from 'scapyconvert_packets_to_numpy_table' or 'scapynumpy_load_table').  Takes a full IPv4 address or a CIDR network and returns the rows of the IPv4 packets that contain that address (or that DO NOT contain that address if the notin=True switch is turned on).
+
+    Examples:
+        >>> table = scapynumpy_load_table('temp.pcap')\n
+        >>> len(scapynumpy_ip_address(table, '185.34.210.1'))\n
+        1
+        >>> len(scapynumpy_ip_address(table, '185.34.210.0/24'))\n
+        1
+
+    Args:
+        table (numpy.ndarray): Reference a packet table
+        ip (str): Reference an IPv4 address, or an IPv4 network in CIDR notation
+        dst (bool, optional): If you want to only search the dst_ip column, set dst=True. Defaults to False.
+        src (bool, optional): If you want to only search the src_ip column, set src=True. Defaults to False.
+        notin (bool, optional): If you want to get every packet that DOES NOT contain a given ip address, set notin=True. Defaults to False.
+
+    Returns:
+        numpy.ndarray: Returns the matching rows of the packet table
+    """
+    import ipaddress
+    import numpy as np
+#    
+    if dst and src:
+        print("The defaults of this tool will search for the given ip address in both the [IP].dst and the [IP].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return table[:0]
+#    
+    network = ipaddress.IPv4Network(ip, strict=False)
+    netmask = np.uint32(int(network.netmask))
+    network_address = np.uint32(int(network.network_address))
+#    
+    if dst:
+        ip_mask = (table['dst_ip'] & netmask) == network_address
+    elif src:
+        ip_mask = (table['src_ip'] & netmask) == network_address
+    else:
+        ip_mask = ((table['src_ip'] & netmask) == network_address) | ((table['dst_ip'] & netmask) == network_address)
+#    
+    if notin:
+        ip_mask = ~ip_mask
+    return table[ (table['ip_version'] == 4) & ip_mask ]
+
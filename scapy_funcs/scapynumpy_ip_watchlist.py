@@ -0,0 +1,48 @@
+# %%
+#######################################
+def scapynumpy_ip_watchlist(table, watchlist, dst=False, src=False, notin=False):
+    """Vectorized watchlist lookup over a packet table (see 'scapyconvert_packets_to_numpy_table').  Returns the IPv4 rows whose src_ip or dst_ip is in a watchlist of ip addresses and CIDR ranges (or the rows that are not in it, with notin=True), with one np.searchsorted over the watchlist's sorted intervals for the whole column (the IPv6 entries of the watchlist are ignored, since the table holds IPv4 addresses only).
+
+    Example:
+        >>> table = scapynumpy_load_table('huge.pcap')\n
+        >>> rows = scapynumpy_ip_watchlist(table, open('threat_intel.txt').read().split())\n
+        >>> len(rows)\n
+        3120
+
+    Args:
+        table (numpy.ndarray): Reference a packet table
+        watchlist (list | dict): Reference a list of ip addresses and CIDR ranges, or a watchlist compiled with 'scapywatchlist_compile_ips'
+        dst (bool, optional): If you want to only search the dst_ip column, set dst=True. Defaults to False.
+        src (bool, optional): If you want to only search the src_ip column, set src=True. Defaults to False.
+        notin (bool, optional): If you want to get every IPv4 row that DOES NOT match the watchlist, set notin=True. Defaults to False.
+
+    Returns:
+        numpy.ndarray: Returns the matching rows of the table
+    """
+    import numpy as np
+#    
+    if dst and src:
+        print("The defaults of this tool will search for the given ip address in both the [IP].dst and the [IP].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return table[:0]
+#    
+    if not isinstance(watchlist, dict):
+        watchlist = scapywatchlist_compile_ips(watchlist)
+    starts = np.array(watchlist[4]['starts'], dtype=np.int64)
+    ends = np.array(watchlist[4]['ends'], dtype=np.int64)
+#    
+    def in_watchlist(addresses):
+        addresses = addresses.astype(np.int64)
+        positions = np.searchsorted(starts, addresses, side='right') - 1
+        return (positions >= 0) & (addresses <= ends[np.maximum(positions, 0)]) if len(starts) else np.zeros(len(addresses), dtype=bool)
+#    
+    if dst:
+        ip_mask = in_watchlist(table['dst_ip'])
+    elif src:
+        ip_mask = in_watchlist(table['src_ip'])
+    else:
+        ip_mask = in_watchlist(table['src_ip']) | in_watchlist(table['dst_ip'])
+#    
+    if notin:
+        ip_mask = ~ip_mask
+    return table[ (table['ip_version'] == 4) & ip_mask ]
+
@@ -0,0 +1,38 @@
+# %%
+#######################################
+def scapynumpy_load_table(pcap_file: str, npz_file=None, rebuild=False):
+    """Returns the packet table for a given .pcap file, loading it from the .npz cache next to the .pcap file when that cache is still valid (same file size and modification time), and otherwise building it with 'scapyconvert_packets_to_numpy_table' and saving a fresh cache with 'scapynumpy_save_table'.  The first call on a capture pays for one pass over the file, and the calls after that only cost the time to load the table.
+
+    Example:
+        >>> table = scapynumpy_load_table('huge.pcap')\n
+        >>> https_rows = scapynumpy_tcp_port(table, 443)\n
+        >>> len(https_rows)\n
+        88412
+
+    Args:
+        pcap_file (str): Reference a .pcap file
+        npz_file (str, optional): Reference the path of the cache file. Defaults to None (the .pcap file path + '.npz').
+        rebuild (bool, optional): If you want to ignore any existing cache and rebuild the table, set rebuild=True. Defaults to False.
+
+    Returns:
+        numpy.ndarray: Returns a NumPy structured array with one row per packet
+    """
+    import pathlib
+    import numpy as np
+#    
+    pcap_path_obj = pathlib.Path(pcap_file).resolve()
+    if npz_file:
+        npz_path_obj = pathlib.Path(npz_file).resolve()
+    else:
+        npz_path_obj = pcap_path_obj.with_name(pcap_path_obj.name + '.npz')
+#    
+    if npz_path_obj.is_file() and not rebuild:
+        pcap_stat = pcap_path_obj.stat()
+        with np.load(npz_path_obj.as_posix()) as cache:
+            if int(cache['pcap_size']) == pcap_stat.st_size and int(cache['pcap_mtime_ns']) == pcap_stat.st_mtime_ns:
+                return cache['table']
+#    
+    table = scapyconvert_packets_to_numpy_table(pcap_path_obj.as_posix())
+    scapynumpy_save_table(table, pcap_path_obj.as_posix(), npz_path_obj.as_posix())
+    return table
+
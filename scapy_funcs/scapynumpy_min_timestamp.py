@@ -0,0 +1,19 @@
+# %%
+#######################################
+def scapynumpy_min_timestamp(table):
+    """Vectorized version of 'scapyget_min_timestamp' for a packet table.  Returns the smallest timestamp in the table.
+
+    Example:
+        >>> table = scapynumpy_load_table('temp.pcap')\n
+        >>> scapynumpy_min_timestamp(table)\n
+        1629217872.080297
+
+    Args:
+        table (numpy.ndarray): Reference a packet table
+
+    Returns:
+        float: Returns the smallest epoch timestamp in the table
+    """
+    smallest_timestamp_ns = int(table['timestamp_ns'].min())
+    return smallest_timestamp_ns / 1e9
+
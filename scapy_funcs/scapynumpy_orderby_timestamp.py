@@ -0,0 +1,21 @@
+# %%
+#######################################
+def scapynumpy_orderby_timestamp(table):
+    """Vectorized version of 'scapy_orderby_timestamp' for a packet table.  Returns the rows of the table sorted by their nanosecond timestamp (packets with the same timestamp keep their original order).
+
+    Example:
+        >>> table = scapynumpy_load_table('temp.pcap')\n
+        >>> ordered = scapynumpy_orderby_timestamp(table)\n
+        >>> bool((ordered['timestamp_ns'][1:] >= ordered['timestamp_ns'][:-1]).all())\n
+        True
+
+    Args:
+        table (numpy.ndarray): Reference a packet table
+
+    Returns:
+        numpy.ndarray: Returns the rows of the packet table in timestamp order
+    """
+    import numpy as np
+#    
+    return table[ np.argsort(table['timestamp_ns'], kind='stable') ]
+
@@ -0,0 +1,34 @@
+# %%
+#######################################
+def scapynumpy_save_table(table, pcap_file: str, npz_file=None):
+    """Saves a packet table (from 'scapyconvert_packets_to_numpy_table') as an .npz cache file next to the .pcap file it was built from.  The size and modification time of the .pcap file are stored with the table, so that 'scapynumpy_load_table' can tell when the cache is stale.
+
+    Example:
+        >>> table = scapyconvert_packets_to_numpy_table('temp.pcap')\n
+        >>> scapynumpy_save_table(table, 'temp.pcap')\n
+        '/home/user/pcaps/temp.pcap.npz'
+
+    Args:
+        table (numpy.ndarray): Reference a packet table
+        pcap_file (str): Reference the .pcap file the table was built from
+        npz_file (str, optional): Reference the path of the cache file. Defaults to None (the .pcap file path + '.npz').
+
+    Returns:
+        str: Returns the path of the .npz cache file
+    """
+    import pathlib
+    import numpy as np
+#    
+    pcap_path_obj = pathlib.Path(pcap_file).resolve()
+    if npz_file:
+        npz_path_obj = pathlib.Path(npz_file).resolve()
+    else:
+        npz_path_obj = pcap_path_obj.with_name(pcap_path_obj.name + '.npz')
+#    
+    pcap_stat = pcap_path_obj.stat()
+    # Writing through a file handle, so that numpy does not add a second '.npz' to the name
+    with npz_path_obj.open('wb') as f:
+        np.savez(f, table=table, pcap_size=pcap_stat.st_size, pcap_mtime_ns=pcap_stat.st_mtime_ns)
+#    
+    return npz_path_obj.as_posix()
+
@@ -0,0 +1,35 @@
+# %%
+#######################################
+def scapynumpy_udp_port(table, port: int, sport=False, dport=False, notin=False):
+    """Vectorized version of 'scapyget_udp_port' for a packet table (from 'scapyconvert_packets_to_numpy_table' or 'scapynumpy_load_table').  Returns the rows of the UDP packets that have the given port in the sport or dport column (or that DOES NOT have that port if the notin=True switch is turned on).
+
+    Example:
+        >>> table = scapynumpy_load_table('temp.pcap')\n
+        >>> scapynumpy_udp_port(table, 22)['length']\n
+        array([178,  60, 146, ...,  60, 146,  60], dtype=uint32)
+
+    Args:
+        table (numpy.ndarray): Reference a packet table
+        port (int): Reference a port number
+        sport (bool, optional): If you want to only search the sport column, set sport=True. Defaults to False.
+        dport (bool, optional): If you want to only search the dport column, set dport=True. Defaults to False.
+        notin (bool, optional): If you want to get every UDP packet that DOES NOT contain the given port, set notin=True. Defaults to False.
+
+    Returns:
+        numpy.ndarray: Returns the matching rows of the packet table
+    """
+    if sport and dport:
+        print("The defaults of this tool will search for the given port in both the [UDP].sport and the [UDP].dport fields.  If you only want to search for 'sport' field OR the 'dport' field use, sport=True or dport=True, respectively (but don't turn them both on).")
+        return table[:0]
+#    
+    if sport:
+        port_mask = table['sport'] == port
+    elif dport:
+        port_mask = table['dport'] == port
+    else:
+        port_mask = (table['sport'] == port) | (table['dport'] == port)
+#    
+    if notin:
+        port_mask = ~port_mask
+    return table[ (table['protocol'] == 17) & port_mask ]
+
@@ -0,0 +1,22 @@
+# %%
+#######################################
+def scapypacked_frame(packed: dict, index: int):
+    """Returns the bytes of one packet of a packed buffer (see 'scapyconvert_packets_to_packed') as a memoryview, without copying them.  The memoryview can be handed to 'scapyraw_parse_headers', searched, hashed, or written to a file as is.
+
+    Example:
+        >>> packed = scapyconvert_packets_to_packed(rdpcap('ncat.pcap'))\n
+        >>> frame = scapypacked_frame(packed, 5)\n
+        >>> headers = scapyraw_parse_headers(frame)\n
+        >>> bytes(frame[headers['payload_offset']:])\n
+        b'Howareyou\\n'
+
+    Args:
+        packed (dict): Reference a packed buffer
+        index (int): Reference the position of the packet in the packed buffer
+
+    Returns:
+        memoryview: Returns a memoryview of the bytes of the packet
+    """
+    offset = int(packed['offsets'][index])
+    return memoryview(packed['buffer'])[offset:offset + int(packed['lengths'][index])]
+
@@ -0,0 +1,20 @@
+# %%
+#######################################
+def scapypacked_iterator(packed: dict):
+    """Lazily yields each packet of a packed buffer (see 'scapyconvert_packets_to_packed') as a scapy packet, dissecting each one only when it is reached.  Use 'PacketList(list(scapypacked_iterator(packed)))' to get the whole PacketList back.
+
+    Example:
+        >>> packed = scapypacked_load('ncat.packed')\n
+        >>> packet_stream = scapystream_tcp_port(scapypacked_iterator(packed), 9898)\n
+        >>> scapystream_pcapwriter(packet_stream, 'ncat_9898.pcap')\n
+        12
+
+    Args:
+        packed (dict): Reference a packed buffer
+
+    Yields:
+        scapy.layers.l2.Ether: Yields each packet
+    """
+    for index in range(len(packed['offsets'])):
+        yield scapypacked_packet(packed, index)
+
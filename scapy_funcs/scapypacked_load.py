@@ -0,0 +1,41 @@
+# %%
+#######################################
+def scapypacked_load(packed_file: str, use_mmap=True):
+    """Loads a packed buffer saved with 'scapypacked_save'.  By default the file is memory mapped: the arrays and the 'buffer' are views of the mapped file, so loading costs no copy at all, and the bytes of a packet are only read from disk when it is accessed.  With 'use_mmap=False' the whole file is read in one call instead.  (A memory mapped packed buffer cannot be pickled, so to share it with other processes, hand them the path of the file and let each of them map it.)
+
+    Example:
+        >>> packed = scapypacked_load('ncat.packed')\n
+        >>> scapypacked_packet(packed, 5).load\n
+        b'Howareyou\\n'
+
+    Args:
+        packed_file (str): Reference a file saved with 'scapypacked_save'
+        use_mmap (bool, optional): Set this to False to read the file into memory rather than memory mapping it. Defaults to True.
+
+    Returns:
+        dict: Returns the packed buffer
+    """
+    import mmap
+    import pathlib
+    import struct
+    import numpy as np
+#    
+    path_obj = pathlib.Path(packed_file).resolve()
+    with path_obj.open('rb') as f:
+        if use_mmap:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = f.read()
+#    
+    magic, packet_count, buffer_length = struct.unpack_from('<8sQQ', data, 0)
+    if magic != b'SCAPYPKD':
+        raise ValueError(f"Not a packed buffer file (magic: {bytes(magic)!r})")
+#    
+    packed = {}
+    offset = 24
+    for name, dtype in (('timestamps_ns', '<i8'), ('offsets', '<i8'), ('lengths', '<u4'), ('wirelens', '<u4'), ('linktypes', '<u2')):
+        packed[name] = np.frombuffer(data, dtype=dtype, count=packet_count, offset=offset)
+        offset += packet_count * np.dtype(dtype).itemsize
+    packed['buffer'] = memoryview(data)[offset:offset + buffer_length]
+    return packed
+
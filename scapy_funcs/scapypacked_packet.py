@@ -0,0 +1,22 @@
+# %%
+#######################################
+def scapypacked_packet(packed: dict, index: int):
+    """Returns one packet of a packed buffer (see 'scapyconvert_packets_to_packed') as a scapy packet (e.g. an Ether), with its original timestamp.  Only this packet is dissected, when it is asked for, rather than every packet of the buffer up front like 'scapyconvert_bytesarray_to_packets'.
+
+    Example:
+        >>> packed = scapyconvert_packets_to_packed(rdpcap('ncat.pcap'))\n
+        >>> pckt = scapypacked_packet(packed, 5)\n
+        >>> pckt.time\n
+        1635294905.032475
+        >>> pckt.load\n
+        b'Howareyou\\n'
+
+    Args:
+        packed (dict): Reference a packed buffer
+        index (int): Reference the position of the packet in the packed buffer
+
+    Returns:
+        scapy.layers.l2.Ether: Returns the packet
+    """
+    return scapyraw_frame_to_packet(bytes(scapypacked_frame(packed, index)), int(packed['timestamps_ns'][index]), int(packed['linktypes'][index]), int(packed['wirelens'][index]))
+
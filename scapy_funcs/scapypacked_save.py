@@ -0,0 +1,37 @@
+# %%
+#######################################
+def scapypacked_save(packed: dict, output_file: str):
+    """Saves a packed buffer (see 'scapyconvert_packets_to_packed') to a file, as one write of its arrays and bytes (no per-packet work), to be loaded back with 'scapypacked_load'.
+
+    Example:
+        >>> packed = scapyconvert_packets_to_packed(rdpcap('ncat.pcap'))\n
+        >>> scapypacked_save(packed, 'ncat.packed')\n
+        '/home/kali/ncat.packed'
+
+    Args:
+        packed (dict): Reference a packed buffer
+        output_file (str): Reference the path of the file to save the packed buffer to
+
+    Returns:
+        str: Returns the path of the saved file
+    """
+    import pathlib
+    import struct
+    import numpy as np
+#    
+    path_obj = pathlib.Path(output_file).resolve()
+    packet_count = len(packed['offsets'])
+    # The 8 byte arrays come first, right after the 24 byte header, so they stay aligned when the file is memory mapped
+    header = struct.pack('<8sQQ', b'SCAPYPKD', packet_count, len(packed['buffer']))
+    with path_obj.open('wb') as f:
+        f.writelines([
+            header,
+            np.ascontiguousarray(packed['timestamps_ns'], dtype='<i8').tobytes(),
+            np.ascontiguousarray(packed['offsets'], dtype='<i8').tobytes(),
+            np.ascontiguousarray(packed['lengths'], dtype='<u4').tobytes(),
+            np.ascontiguousarray(packed['wirelens'], dtype='<u4').tobytes(),
+            np.ascontiguousarray(packed['linktypes'], dtype='<u2').tobytes(),
+            packed['buffer'],
+        ])
+    return path_obj.as_posix()
+
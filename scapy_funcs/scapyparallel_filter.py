@@ -0,0 +1,40 @@
+# %%
+#######################################
+def scapyparallel_filter(pcap_file: str, ip=None, port=None, output_file=None, processes=None, expression=None):
+    """Multi-core ip address / port filter for large .pcap files.  The capture is split into byte ranges which are filtered in parallel by 'scapyparallel_shard_filter', and the matching packets are returned in the original packet order.  The ip address is matched as a partial/full string against the IPv4 src and dst (like 'scapyget_ip_address') and the port against the TCP/UDP sport and dport (like 'scapyget_port').  A BPF-like filter expression (see 'scapyfilter_compile') can be given too, or instead; the expression string is sent to the workers, which each compile it once.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> scapyparallel_filter('temp.pcap', ip='185.34.210')\n
+        <PacketList: TCP:0 UDP:1 ICMP:0 Other:0>
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> scapyparallel_filter('huge.pcap', ip='10.1.1.1', port=443, output_file='host_https.pcap', processes=32)\n
+        20417
+
+        >>> ##### EXAMPLE 3 #####\n
+        >>> scapyparallel_filter('huge.pcap', expression='tcp and (port 443 or net 10.0.0.0/8) and not src host 1.2.3.4', output_file='triage.pcap')\n
+        1870221
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        ip (str, optional): Reference an ip address. Defaults to None.
+        port (int, optional): Reference a port number. Defaults to None.
+        output_file (str, optional): Reference the path of a .pcap file to write the matching packets to, instead of returning them as a PacketList. Defaults to None.
+        processes (int, optional): Reference the number of worker processes. Defaults to None (the number of CPU cores).
+        expression (str, optional): Reference a filter expression. Defaults to None.
+
+    Returns:
+        object: Returns a PacketList object, or the number of packets written if 'output_file' was given
+    """
+    shard_results = scapyparallel_map(pcap_file, scapyparallel_shard_filter, ip, port, expression, processes=processes)
+    matching_offsets = [ offset for shard_result in shard_results for offset in shard_result ]
+#    
+    matching_records = scapyraw_pcap_records_at(pcap_file, matching_offsets)
+    if output_file:
+        with open(pcap_file, 'rb') as f:
+            pcap_header = scapyraw_pcap_global_header(f.read(24))
+        return scapyraw_pcap_writer(matching_records, output_file, linktype=pcap_header['linktype'], snaplen=pcap_header['snaplen'], nanosecond=pcap_header['ns_multiplier'] == 1)
+#    
+    return PacketList([ scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen) for timestamp_ns, file_offset, frame, wirelen, linktype in matching_records ])
+
@@ -0,0 +1,36 @@
+# %%
+#######################################
+def scapyparallel_map(pcap_file: str, shard_function, *args, processes=None, shards_per_process=4):
+    """Runs a function over a .pcap file on several CPU cores.  The file is split into byte ranges on record boundaries with 'scapyraw_pcap_shards', and each range is handed to 'shard_function' in a process pool.  The results are returned in the original file order, one result per shard, so the caller can merge them by simply chaining the lists together.
+
+    The 'shard_function' is called as shard_function(pcap_file, start_offset, end_offset, *args) and must be defined at the top level of a module (so that it can be pickled and sent to the worker processes), such as the 'scapyparallel_shard_*' functions.
+
+    Example:
+        >>> shard_results = scapyparallel_map('huge.pcap', scapyparallel_shard_checksum, processes=32)\n
+        >>> good_offsets = [ offset for shard_result in shard_results for offset in shard_result ]\n
+        >>> len(good_offsets)\n
+        48133972
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        shard_function (function): Reference a top level function to run against each byte range of the file
+        *args: Reference any extra arguments to pass to the shard_function
+        processes (int, optional): Reference the number of worker processes. Defaults to None (the number of CPU cores).
+        shards_per_process (int, optional): Reference how many byte ranges to create per worker process (more, smaller ranges balance the work better). Defaults to 4.
+
+    Returns:
+        list: Returns the result of each shard, in file order
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+#    
+    processes = processes or os.cpu_count() or 1
+    shards = scapyraw_pcap_shards(pcap_file, processes * shards_per_process)
+#    
+    if processes == 1 or len(shards) <= 1:
+        return [ shard_function(pcap_file, start_offset, end_offset, *args) for start_offset, end_offset in shards ]
+#    
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [ executor.submit(shard_function, pcap_file, start_offset, end_offset, *args) for start_offset, end_offset in shards ]
+        return [ future.result() for future in futures ]
+
@@ -0,0 +1,35 @@
+# %%
+#######################################
+def scapyparallel_payload_contains_pattern(pcap_file: str, thepattern: str, return_packetlist=False, ignorecase=True, processes=None):
+    """Multi-core version of 'scapypayload_contains_pattern' for large .pcap files.  The capture is split into byte ranges which are searched in parallel by 'scapyparallel_shard_pattern', and the results are returned in the original packet order.  The payload searched is every byte after the TCP/UDP/ICMP header, so payloads that scapy would dissect further (e.g. DNS) are searched as well.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> scapyparallel_payload_contains_pattern('web.pcap', 'push%20green%20button')\n
+        ['POST /hitchhikers-guide-game/hhguide HTTP/1.1\\r\\nHost: talkback.live.bbc.co.uk\\r\\n ... <zclient><command>push%20green%20button</command><sessionid>42==</sessionid><version>0.08</version></zclient>']
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> scapyparallel_payload_contains_pattern('web.pcap', 'push%20green%20button', return_packetlist=True)\n
+        <PacketList: TCP:1 UDP:0 ICMP:0 Other:0>
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        thepattern (str): Reference a pattern you want to match
+        return_packetlist (bool, optional): If you want the full packet with the pattern found in the payload, set this to True. Defaults to False.
+        ignorecase (bool, optional): If you want to have a case-sensitive pattern match set this to False. Defaults to True.
+        processes (int, optional): Reference the number of worker processes. Defaults to None (the number of CPU cores).
+
+    Returns:
+        object: Returns a list of strings with the matching payloads by default (bytes that are not valid UTF-8 are replaced). If 'return_packetlist = True' then a PacketList of packets with the matching payloads is returned.
+    """
+    shard_results = scapyparallel_map(pcap_file, scapyparallel_shard_pattern, thepattern.encode(), ignorecase, processes=processes)
+    matches = [ match for shard_result in shard_results for match in shard_result ]
+#    
+    if return_packetlist:
+        matching_records = scapyraw_pcap_records_at(pcap_file, [ offset for offset, payload in matches ])
+        results = PacketList([ scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen) for timestamp_ns, file_offset, frame, wirelen, linktype in matching_records ])
+    else:
+        results = [ payload.decode(errors='replace') for offset, payload in matches ]
+#    
+    return results
+
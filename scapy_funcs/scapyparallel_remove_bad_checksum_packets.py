@@ -0,0 +1,35 @@
+# %%
+#######################################
+def scapyparallel_remove_bad_checksum_packets(pcap_file: str, output_file=None, processes=None):
+    """Multi-core version of 'scapyremove_bad_checksum_packets' for large .pcap files.  The capture is split into byte ranges which are checked in parallel by 'scapyparallel_shard_checksum', and the TCP packets with a bad checksum are omitted from the results (which stay in the original packet order).
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> new_frag3 = scapyparallel_remove_bad_checksum_packets('fragments3.pcap')\n
+        >>> new_frag3.__len__()\n
+        123
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> # Streaming the good packets straight to a new .pcap file\n
+        >>> scapyparallel_remove_bad_checksum_packets('huge.pcap', output_file='huge_goodsum.pcap', processes=32)\n
+        48133972
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        output_file (str, optional): Reference the path of a .pcap file to write the good packets to, instead of returning them as a PacketList. Defaults to None.
+        processes (int, optional): Reference the number of worker processes. Defaults to None (the number of CPU cores).
+
+    Returns:
+        object: Returns a PacketList object, or the number of packets written if 'output_file' was given
+    """
+    shard_results = scapyparallel_map(pcap_file, scapyparallel_shard_checksum, processes=processes)
+    keep_offsets = [ offset for shard_result in shard_results for offset in shard_result ]
+#    
+    kept_records = scapyraw_pcap_records_at(pcap_file, keep_offsets)
+    if output_file:
+        with open(pcap_file, 'rb') as f:
+            pcap_header = scapyraw_pcap_global_header(f.read(24))
+        return scapyraw_pcap_writer(kept_records, output_file, linktype=pcap_header['linktype'], snaplen=pcap_header['snaplen'], nanosecond=pcap_header['ns_multiplier'] == 1)
+#    
+    return PacketList([ scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen) for timestamp_ns, file_offset, frame, wirelen, linktype in kept_records ])
+
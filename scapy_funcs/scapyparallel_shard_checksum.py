@@ -0,0 +1,28 @@
+# %%
+#######################################
+def scapyparallel_shard_checksum(pcap_file: str, start_offset: int, end_offset: int):
+    """Worker for 'scapyparallel_map' that validates the TCP checksums of the records in one byte range of a .pcap file.  Returns the file offsets of the records to keep: the TCP packets with a correct checksum, and every packet that is not TCP (the same packets 'scapyremove_bad_checksum_packets' keeps).  The checksums are checked straight from the raw bytes with 'scapyraw_transport_checksum'.
+
+    Example:
+        >>> start_offset, end_offset = scapyraw_pcap_shards('fragments3.pcap', 1)[0]\n
+        >>> len(scapyparallel_shard_checksum('fragments3.pcap', start_offset, end_offset))\n
+        123
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        start_offset (int): Reference the file offset of the first record of the range
+        end_offset (int): Reference the file offset where the range ends
+
+    Returns:
+        list: Returns the file offsets of the records to keep
+    """
+    keep_offsets = []
+    for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(pcap_file, start_offset, end_offset):
+        headers = scapyraw_parse_headers(frame, linktype)
+        if headers['ip_proto'] == 6:
+            checksum_result = scapyraw_transport_checksum(frame, linktype, headers)
+            if checksum_result and checksum_result[1] != checksum_result[2]:
+                continue
+        keep_offsets.append(file_offset)
+    return keep_offsets
+
@@ -0,0 +1,38 @@
+# %%
+#######################################
+def scapyparallel_shard_filter(pcap_file: str, start_offset: int, end_offset: int, ip=None, port=None, expression=None):
+    """Worker for 'scapyparallel_map' that filters the records in one byte range of a .pcap file by ip address and/or port.  The ip address is matched as a partial/full string against the IPv4 src and dst (like 'scapyget_ip_address') and the port against the TCP/UDP sport and dport (like 'scapyget_port').  A BPF-like filter expression (see 'scapyfilter_compile') can be given too, or instead.  When several are given, a record has to match all of them.  Returns the file offsets of the matching records.
+
+    Example:
+        >>> start_offset, end_offset = scapyraw_pcap_shards('temp.pcap', 1)[0]\n
+        >>> scapyparallel_shard_filter('temp.pcap', start_offset, end_offset, ip='185.34.210', port=10001)\n
+        [10411]
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        start_offset (int): Reference the file offset of the first record of the range
+        end_offset (int): Reference the file offset where the range ends
+        ip (str, optional): Reference an ip address. Defaults to None.
+        port (int, optional): Reference a port number. Defaults to None.
+        expression (str, optional): Reference a filter expression. Defaults to None.
+
+    Returns:
+        list: Returns the file offsets of the matching records
+    """
+    predicate = scapyfilter_compile(expression) if expression else None
+    matching_offsets = []
+    for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(pcap_file, start_offset, end_offset):
+        headers = scapyraw_parse_headers(frame, linktype)
+        if ip is not None:
+            if headers['ip_version'] != 4:
+                continue
+            if ip not in scapyraw_format_address(headers['ip_src']) and ip not in scapyraw_format_address(headers['ip_dst']):
+                continue
+        if port is not None:
+            if headers['ip_proto'] not in (6, 17) or port not in (headers['sport'], headers['dport']):
+                continue
+        if predicate is not None and not predicate(headers):
+            continue
+        matching_offsets.append(file_offset)
+    return matching_offsets
+
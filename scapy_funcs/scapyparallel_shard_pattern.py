@@ -0,0 +1,37 @@
+# %%
+#######################################
+def scapyparallel_shard_pattern(pcap_file: str, start_offset: int, end_offset: int, thepattern: bytes, ignorecase=True):
+    """Worker for 'scapyparallel_map' that searches the payload (the bytes after the TCP/UDP/ICMP header) of the records in one byte range of a .pcap file for a regular expression.  Returns a list of (file_offset, payload) tuples for the records where the pattern was found.
+
+    Example:
+        >>> start_offset, end_offset = scapyraw_pcap_shards('web.pcap', 1)[0]\n
+        >>> [ offset for offset, payload in scapyparallel_shard_pattern('web.pcap', start_offset, end_offset, b'push%20green%20button') ]\n
+        [52436]
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        start_offset (int): Reference the file offset of the first record of the range
+        end_offset (int): Reference the file offset where the range ends
+        thepattern (bytes): Reference a pattern you want to match
+        ignorecase (bool, optional): If you want to have a case-sensitive pattern match set this to False. Defaults to True.
+
+    Returns:
+        list: Returns a list of (file_offset, payload) tuples
+    """
+    import re
+#    
+    if ignorecase:
+        match_syntax = re.compile(thepattern, re.IGNORECASE)
+    else:
+        match_syntax = re.compile(thepattern)
+#    
+    matches = []
+    for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(pcap_file, start_offset, end_offset):
+        headers = scapyraw_parse_headers(frame, linktype)
+        if not headers['payload_len']:
+            continue
+        payload = bytes(frame[headers['payload_offset']:headers['payload_offset'] + headers['payload_len']])
+        if match_syntax.search(payload):
+            matches.append((file_offset, payload))
+    return matches
+
@@ -0,0 +1,81 @@
+# %%
+#######################################
+def scapypayload_compile_patterns(patterns: list, ignorecase=True, regex=False):
+    """Compiles a list of patterns (e.g. thousands of IOC strings) into a single matcher, so every pattern can be searched for in one pass over each payload (see 'scapypayload_match_patterns').
+
+    Literal patterns (the default) are merged into a trie and compiled as one regular expression inside a lookahead, so every position of the payload is tested against all patterns at once and overlapping matches are found.  Regular expression patterns ('regex=True') are combined into a single alternation which is used as a prefilter, and only the payloads it hits are searched with each pattern on its own.
+
+    Examples:
+        >>> matcher = scapypayload_compile_patterns(['evil.com', 'evil', 'cmd.exe'])\n
+        >>> scapypayload_match_patterns(matcher, b'GET http://evil.com/cmd.exe')\n
+        [(0, 11, 19), (1, 11, 15), (2, 20, 27)]
+
+    Args:
+        patterns (list): Reference a list of patterns (str or bytes)
+        ignorecase (bool, optional): If you want to have a case-sensitive pattern match set this to False. Defaults to True.
+        regex (bool, optional): Set this to True if the patterns are regular expressions rather than literal strings. Defaults to False.
+
+    Returns:
+        dict: Returns a matcher (a dict) to pass to 'scapypayload_match_patterns'
+    """
+    import re
+#    
+    flags = re.IGNORECASE if ignorecase else 0
+    pattern_bytes = [ p.encode() if isinstance(p, str) else bytes(p) for p in patterns ]
+#    
+    if regex:
+        combined = re.compile(b'|'.join([ b'(?:' + p + b')' for p in pattern_bytes ]), flags)
+        return {
+            'patterns': list(patterns),
+            'regex': True,
+            'combined': combined,
+            'compiled': [ re.compile(p, flags) for p in pattern_bytes ],
+            'max_length': None,
+        }
+#    
+    # Building a trie of the (normalized) literals, with None marking the end of a pattern
+    lookup = {}
+    trie = {}
+    for pattern_index, p in enumerate(pattern_bytes):
+        if not p:
+            continue
+        normalized = p.lower() if ignorecase else p
+        lookup.setdefault(normalized, []).append(pattern_index)
+        node = trie
+        for c in normalized:
+            node = node.setdefault(c, {})
+        node[None] = True
+#    
+    def trie_to_regex(trie):
+        # Built bottom-up with an explicit stack rather than recursion, as a long literal makes a trie as deep as its length
+        node_regexes = {}
+        stack = [trie]
+        while stack:
+            node = stack[-1]
+            unbuilt_children = [ child for c, child in node.items() if c is not None and id(child) not in node_regexes ]
+            if unbuilt_children:
+                stack.extend(unbuilt_children)
+                continue
+            stack.pop()
+            # Children are tried before the end of a pattern, so the longest pattern at a position is matched
+            alternatives = [ re.escape(bytes([c])) + node_regexes.pop(id(child)) for c, child in sorted([ (k, v) for k, v in node.items() if k is not None ], key=lambda x: x[0]) ]
+            if not alternatives:
+                node_regexes[id(node)] = b''
+            elif len(alternatives) == 1 and None not in node:
+                node_regexes[id(node)] = alternatives[0]
+            else:
+                grouped = b'(?:' + b'|'.join(alternatives) + b')'
+                node_regexes[id(node)] = grouped + b'?' if None in node else grouped
+        return node_regexes[id(trie)]
+#    
+    combined = re.compile(b'(?=(' + trie_to_regex(trie) + b'))', flags) if trie else None
+    return {
+        'patterns': list(patterns),
+        'regex': False,
+        'ignorecase': ignorecase,
+        'combined': combined,
+        'lookup': lookup,
+        'lengths': sorted(set([ len(p) for p in lookup ])),
+        'max_length': max([ len(p) for p in lookup ], default=0),
+    }
+
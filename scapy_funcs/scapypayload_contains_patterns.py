@@ -0,0 +1,58 @@
+# %%
+#######################################
+def scapypayload_contains_patterns(packet_source, patterns: list, ignorecase=True, regex=False, streams=False, overlap=None):
+    """Searches the payloads of a .pcap file (or of a PacketList) for many patterns at once (e.g. an IOC list), in a single pass.  Unlike 'scapypayload_contains_pattern', which takes a single pattern, this reports which pattern hit which packet.
+
+    By default each packet's payload is searched on its own, and the results are the packet numbers (the position of the packet in the .pcap / PacketList, starting at 0) of the hits.  With 'streams=True' the TCP streams are reassembled (see 'scapystream_tcp_reassemble') and searched as continuous streams, so patterns split across packet boundaries are found too; the results are then (direction_key, stream_offset) tuples.  Only the last 'overlap' bytes of each stream are kept between packets, which defaults to the length of the longest literal pattern (regular expressions need an 'overlap' to match across packets).
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> scapypayload_contains_patterns('web.pcap', ['push%20green%20button', 'bbc.co.uk', 'not-there'])\n
+        {'push%20green%20button': [12], 'bbc.co.uk': [3, 12, 15], 'not-there': []}
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> scapypayload_contains_patterns('web.pcap', ['green%20button'], streams=True)\n
+        {'green%20button': [('TCP 74.2.7.198:48905 > 245.64.204.201:80', 871)]}
+
+        >>> ##### EXAMPLE 3 #####\n
+        >>> iocs = open('iocs.txt').read().split()\n
+        >>> hits = scapypayload_contains_patterns(rdpcap('web.pcap'), iocs)\n
+
+    Args:
+        packet_source (str | scapy.plist.PacketList): Reference a .pcap file, or an existing PacketList object
+        patterns (list): Reference a list of patterns (str or bytes)
+        ignorecase (bool, optional): If you want to have a case-sensitive pattern match set this to False. Defaults to True.
+        regex (bool, optional): Set this to True if the patterns are regular expressions rather than literal strings. Defaults to False.
+        streams (bool, optional): Set this to True to search the reassembled TCP streams, rather than each packet's payload. Defaults to False.
+        overlap (int, optional): Reference how many bytes at the end of each stream are kept to match patterns spanning packets (only used with 'streams=True'). Defaults to None (the longest literal pattern).
+
+    Returns:
+        dict: Returns a dict of each pattern to a list of the packet numbers it was found in (or of (direction_key, stream_offset) tuples with 'streams=True')
+    """
+    matcher = scapypayload_compile_patterns(patterns, ignorecase=ignorecase, regex=regex)
+    hits = [ [] for p in patterns ]
+#    
+    if streams:
+        if overlap is None:
+            overlap = max(matcher['max_length'] - 1, 0) if matcher['max_length'] else 0
+        for direction_key, buffer_offset, buffer, carry_length in scapystream_tcp_search_buffers(packet_source, overlap):
+            for pattern_index, start, end in scapypayload_match_patterns(matcher, buffer):
+                # Matches entirely within the carried over bytes were already reported with the previous chunk
+                if end > carry_length:
+                    hits[pattern_index].append((direction_key, buffer_offset + start))
+    else:
+        if isinstance(packet_source, str):
+            frames = ( (frame, linktype) for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(packet_source) )
+        else:
+            frames = ( (bytes(pckt), conf.l2types.layer2num.get(type(pckt), 1)) for pckt in packet_source )
+        # The payload is everything after the TCP/UDP/ICMP header, whether or not scapy would dissect it further (e.g. DNS)
+        for packet_number, (frame, linktype) in enumerate(frames):
+            headers = scapyraw_parse_headers(frame, linktype)
+            if not headers['payload_len'] or headers['payload_offset'] is None:
+                continue
+            payload = frame[headers['payload_offset']:headers['payload_offset'] + headers['payload_len']]
+            for pattern_index in sorted(set([ pattern_index for pattern_index, start, end in scapypayload_match_patterns(matcher, bytes(payload)) ])):
+                hits[pattern_index].append(packet_number)
+#    
+    return { pattern: pattern_hits for pattern, pattern_hits in zip(patterns, hits) }
+
@@ -1,46 +1,24 @@
 # %%
 #######################################
 def scapypayload_content_between_patterns(packet_list: scapy.plist.PacketList, left_pattern: str, right_pattern: str, return_packetlist=False, ignorecase=True):
-    import re
-    
-    def scapypayload_contains_pattern(packet_list: scapy.plist.PacketList, thepattern: str, return_packetlist=False, ignorecase=True):
-        import re
-        
-        # Converting the string pattern to bytes for proper pattern matching of the payload in the packets
-        thepattern_bytes = thepattern.encode()
-        
-        # Specifying case-sensitive or case-insensitive matching, along with the pattern to match
-        if ignorecase:
-            match_syntax = re.compile(thepattern_bytes, re.IGNORECASE)
-        else:
-            match_syntax = re.compile(thepattern_bytes)
-        
-        # For each packet, where the packet has a Raw layer (i.e. the payload exists), get the packets w/ payload that match our pattern within the payload
-        keep_list = [p for p in packet_list if p.haslayer(Raw) and re.findall(match_syntax, p.load)]
-        
-        # If the option of 'return_packetlist' = True, then this function returns the complete list of packets as a PacketList object
-        if return_packetlist:
-            results = PacketList(keep_list)
-        else:
-            # Otherwise, the payload of each packet is decoded as a single string and returned in a list
-            results = [pl.load.decode() for pl in keep_list]
-        
-        return results
-    
-    initial_results = scapypayload_contains_pattern(packet_list, left_pattern)
-    
-    # Specifying case-sensitive or case-insensitive matching, along with the pattern to match
-    if ignorecase:
-        match_syntax = re.compile(left_pattern + r'(.*?)' + right_pattern, re.IGNORECASE)
-    else:
-        match_syntax = re.compile(left_pattern + r'(.*?)' + right_pattern)
-    
-    # For each item find the matches of the Reg Ex compiled pattern above
-    keep_list = []
-    [keep_list.extend(re.findall(match_syntax, theresults)) for theresults in initial_results]
+    """Returns the content between a left and a right pattern (regular expressions) in the payloads of a PacketList (or of a .pcap file), as a list of strings.  Built on 'scapypayload_extract_between_patterns', so the payloads are searched as bytes in a single pass, and content that is not valid utf-8 is replaced rather than raising an error.
 
-    # Otherwise, the payload of each packet is decoded as a single string and returned in a list
-    results = keep_list
-    
+    Example:
+        >>> temp_pcap = rdpcap('web.pcap')\n
+        >>> scapypayload_content_between_patterns(temp_pcap, 'Host: ', '\\r\\n')\n
+        ['www.bbc.co.uk', 'www.google.com']
+
+    Args:
+        packet_list (scapy.plist.PacketList): Reference an existing PacketList object, or a .pcap file
+        left_pattern (str): Reference the regular expression before the content
+        right_pattern (str): Reference the regular expression after the content
+        return_packetlist (bool, optional): Unused, kept for compatibility. Defaults to False.
+        ignorecase (bool, optional): If you want to have a case-sensitive pattern match set this to False. Defaults to True.
+
+    Returns:
+        list: Returns a list of strings, one per extracted content
+    """
+    results = [ content.decode(errors='replace') for packet_number, payload_offset, content in scapypayload_extract_between_patterns(packet_list, left_pattern, right_pattern, ignorecase=ignorecase) ]
+#    
     return results
 
@@ -0,0 +1,56 @@
+# %%
+#######################################
+def scapypayload_extract_between_patterns(packet_source, left_pattern, right_pattern, ignorecase=True, streams=False, overlap=4096):
+    """Lazily extracts the content between a left and a right pattern (regular expressions) from the payloads of a .pcap file (or of a PacketList), in a single pass.  The 'left(.*?)right' expression is compiled once as a bytes pattern and run straight on the raw payload bytes, so nothing is decoded and non utf-8 payloads are handled.
+
+    By default each packet's payload is searched on its own, and each extracted span comes with its packet number (the position of the packet in the .pcap / PacketList, starting at 0).  With 'streams=True' the TCP streams are reassembled (see 'scapystream_tcp_reassemble') and searched as continuous streams, so content spanning packet boundaries is extracted too, and each span comes with its direction_key.  Only the last 'overlap' bytes of each stream are kept between packets (see 'scapystream_tcp_search_buffers'), so a match longer than 'overlap' bytes that spans packets is not found.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> list(scapypayload_extract_between_patterns('web.pcap', 'Host: ', '\\r\\n'))\n
+        [(3, 22, b'www.bbc.co.uk'), (12, 22, b'www.google.com')]
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> for direction_key, stream_offset, content in scapypayload_extract_between_patterns('web.pcap', 'Cookie: ', '\\r\\n', streams=True):\n
+        >>>     print(direction_key, content[:20])\n
+        TCP 74.2.7.198:48905 > 245.64.204.201:80 b'SID=31d4d96e407aad42'
+
+    Args:
+        packet_source (str | scapy.plist.PacketList): Reference a .pcap file, or an existing PacketList object (or any iterable of packets)
+        left_pattern (str | bytes): Reference the regular expression before the content
+        right_pattern (str | bytes): Reference the regular expression after the content
+        ignorecase (bool, optional): If you want to have a case-sensitive pattern match set this to False. Defaults to True.
+        streams (bool, optional): Set this to True to search the reassembled TCP streams, rather than each packet's payload. Defaults to False.
+        overlap (int, optional): Reference how many bytes at the end of each stream are kept to match content spanning packets (only used with 'streams=True'). Defaults to 4096.
+
+    Yields:
+        tuple: Yields (packet_number, payload_offset, content) for each extracted span (or (direction_key, stream_offset, content) with 'streams=True'), the offset being where the content starts
+    """
+    import re
+#    
+    left_bytes = left_pattern.encode() if isinstance(left_pattern, str) else left_pattern
+    right_bytes = right_pattern.encode() if isinstance(right_pattern, str) else right_pattern
+    flags = re.IGNORECASE if ignorecase else 0
+    # The content is the first group after any groups of the left pattern itself
+    content_group = re.compile(left_bytes).groups + 1
+    match_syntax = re.compile(b'(?:' + left_bytes + b')(.*?)(?:' + right_bytes + b')', flags)
+#    
+    if streams:
+        for direction_key, buffer_offset, buffer, carry_length in scapystream_tcp_search_buffers(packet_source, overlap):
+            for match in match_syntax.finditer(buffer):
+                # Matches entirely within the carried over bytes were already extracted with the previous chunk
+                if match.end() > carry_length:
+                    yield (direction_key, buffer_offset + match.start(content_group), match.group(content_group))
+    else:
+        if isinstance(packet_source, str):
+            frames = ( (frame, linktype) for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(packet_source) )
+        else:
+            frames = ( (bytes(pckt), conf.l2types.layer2num.get(type(pckt), 1)) for pckt in packet_source )
+        for packet_number, (frame, linktype) in enumerate(frames):
+            headers = scapyraw_parse_headers(frame, linktype)
+            if not headers['payload_len']:
+                continue
+            payload = bytes(frame[headers['payload_offset']:headers['payload_offset'] + headers['payload_len']])
+            for match in match_syntax.finditer(payload):
+                yield (packet_number, match.start(content_group), match.group(content_group))
+
@@ -0,0 +1,47 @@
+# %%
+#######################################
+def scapypayload_match_patterns(matcher: dict, payload: bytes):
+    """Searches a payload for every pattern of a matcher built with 'scapypayload_compile_patterns', in a single pass.  Returns a list of (pattern_index, start, end) tuples, one per match, where 'pattern_index' is the position of the pattern in the list given to 'scapypayload_compile_patterns'.
+
+    Examples:
+        >>> matcher = scapypayload_compile_patterns(['evil.com', 'evil', 'cmd.exe'])\n
+        >>> scapypayload_match_patterns(matcher, b'GET http://evil.com/cmd.exe')\n
+        [(0, 11, 19), (1, 11, 15), (2, 20, 27)]
+        >>> matcher['patterns'][2]\n
+        'cmd.exe'
+
+    Args:
+        matcher (dict): Reference a matcher built with 'scapypayload_compile_patterns'
+        payload (bytes): Reference the payload to search
+
+    Returns:
+        list: Returns a list of (pattern_index, start, end) tuples
+    """
+    combined = matcher['combined']
+    if combined is None:
+        return []
+#    
+    if matcher['regex']:
+        # The combined alternation only tells whether any pattern is present, each pattern is then searched for on its own
+        if not combined.search(payload):
+            return []
+        return [ (pattern_index, m.start(), m.end()) for pattern_index, compiled in enumerate(matcher['compiled']) for m in compiled.finditer(payload) ]
+#    
+    lookup = matcher['lookup']
+    lengths = matcher['lengths']
+    ignorecase = matcher['ignorecase']
+    matches = []
+    for m in combined.finditer(payload):
+        # The longest pattern starting here was matched, any shorter pattern starting here is one of its prefixes
+        start = m.start()
+        longest = m.group(1)
+        if ignorecase:
+            longest = longest.lower()
+        for length in lengths:
+            if length > len(longest):
+                break
+            for pattern_index in lookup.get(longest[:length], ()):
+                matches.append((pattern_index, start, start + length))
+    matches.sort(key=lambda x: (x[1], -x[2], x[0]))
+    return matches
+
@@ -1,6 +1,6 @@
 # %%
 #######################################
-def scapypcapreader_ip_address(pcap_file: str, ip: str, dst=False, src=False, notin=False):
+def scapypcapreader_ip_address(pcap_file: str, ip: str, dst=False, src=False, notin=False, use_index=False):
     """Takes a given .pcap file and a partial/full string of an ip address and returns each packet that contains that ip address (or that DOES NOT contain that ip address if the notin=True switch is turned on).
 
     Example:
@@ -16,33 +16,40 @@ def scapypcapreader_ip_address(pcap_file: str, ip: str, dst=False, src=False, no
         dst (bool, optional): If you want to only search the [IP].dst field, set dst=True. Defaults to False.
         src (bool, optional): If you want to only search the [IP].src field, set src=True. Defaults to False.
         notin (bool, optional): If you want to get every packet that DOES NOT contain a given ip address, set notin=True. Defaults to False.
+        use_index (bool, optional): If you will be running several queries against the same capture, set use_index=True to build (once) and use the sidecar index from 'scapyindex_build' instead of scanning the whole capture on every query. Defaults to False.
 
     Returns:
         scapy.plist.PacketList: Returns a PacketList of the matching packets.
     """
-    import pathlib
+    if dst and src:
+        print("The defaults of this tool will search for the given ip address in both the [IP].dst and the [IP].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return PacketList([])
+#
+    if dst:
+        fields = ['dst']
+    elif src:
+        fields = ['src']
+    else:
+        fields = ['src', 'dst']
 #    
-    path_obj = pathlib.Path(pcap_file).resolve().as_posix()
-    pcap_reader = PcapReader(path_obj)
+    if use_index:
+        return scapyindex_ip_address(pcap_file, ip, dst=dst, src=src, notin=notin)
 #    
-    if notin:
-        if dst and src:
-            print("The defaults of this tool will search for the given ip address in both the [IP].dst and the [IP].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
-        elif dst:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('IP') and ( (ip not in pckt['IP'].dst) ) ]
-        elif src:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('IP') and ( (ip not in pckt['IP'].src) ) ]
-        else:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('IP') and ( (ip not in pckt['IP'].src) and (ip not in pckt['IP'].dst) ) ]
-    else:
-        if dst and src:
-            print("The defaults of this tool will search for the given ip address in both the [IP].dst and the [IP].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
-        elif dst:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('IP') and ( (ip in pckt['IP'].dst) ) ]
-        elif src:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('IP') and ( (ip in pckt['IP'].src) ) ]
-        else:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('IP') and ( (ip in pckt['IP'].src) or (ip in pckt['IP'].dst) ) ]
+    # Fast path: match against the raw header bytes, so only the matching packets are dissected by scapy
+    def raw_predicate(headers):
+        if headers['ip_version'] != 4:
+            return False
+        is_match = any( ip in scapyraw_format_address(headers['ip_' + f]) for f in fields )
+        return is_match != notin
+#    
+    # Slow path for the packets the raw decoder cannot follow (e.g. MPLS, PPPoE, tunnels)
+    def scapy_predicate(pckt):
+        if not pckt.haslayer('IP'):
+            return False
+        is_match = any( ip in getattr(pckt['IP'], f) for f in fields )
+        return is_match != notin
+#    
+    result_list = list( scapyraw_filter(pcap_file, raw_predicate, fallback=scapy_predicate) )
 #
     return PacketList(result_list)
 
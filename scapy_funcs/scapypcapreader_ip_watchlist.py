@@ -0,0 +1,55 @@
+# %%
+#######################################
+def scapypcapreader_ip_watchlist(pcap_file: str, watchlist, dst=False, src=False, notin=False):
+    """Returns the packets of a .pcap file whose [IP].src or [IP].dst (IPv4 or IPv6) is in a watchlist of ip addresses and CIDR ranges (or those that are not in it, with notin=True), in a single pass whatever the size of the watchlist (see 'scapywatchlist_compile_ips').  The packets are matched on their raw header bytes, so only the matching packets are dissected by scapy.
+
+    Example:
+        >>> watchlist = open('threat_intel.txt').read().split()\n
+        >>> scapypcapreader_ip_watchlist('huge.pcap', watchlist)\n
+        <PacketList: TCP:3108 UDP:12 ICMP:0 Other:0>
+
+    Args:
+        pcap_file (str): Reference a .pcap (or .pcapng) file
+        watchlist (list | dict): Reference a list of ip addresses and CIDR ranges, or a watchlist compiled with 'scapywatchlist_compile_ips'
+        dst (bool, optional): If you want to only search the [IP].dst field, set dst=True. Defaults to False.
+        src (bool, optional): If you want to only search the [IP].src field, set src=True. Defaults to False.
+        notin (bool, optional): If you want to get every IP packet that DOES NOT match the watchlist, set notin=True. Defaults to False.
+
+    Returns:
+        scapy.plist.PacketList: Returns a PacketList object
+    """
+    import ipaddress
+#    
+    if dst and src:
+        print("The defaults of this tool will search for the given ip address in both the [IP].dst and the [IP].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return PacketList([])
+#    
+    if not isinstance(watchlist, dict):
+        watchlist = scapywatchlist_compile_ips(watchlist)
+    if dst:
+        fields = ['dst']
+    elif src:
+        fields = ['src']
+    else:
+        fields = ['src', 'dst']
+#    
+    def raw_predicate(headers):
+        if headers['ip_version'] is None:
+            return False
+        is_match = any( scapywatchlist_ip_match(watchlist, headers['ip_' + f]) for f in fields )
+        return is_match != notin
+#    
+    def scapy_predicate(pckt):
+        if pckt.haslayer('IP'):
+            layer = pckt['IP']
+        elif pckt.haslayer('IPv6'):
+            layer = pckt['IPv6']
+        else:
+            return False
+        is_match = any( scapywatchlist_ip_match(watchlist, ipaddress.ip_address(getattr(layer, f)).packed) for f in fields )
+        return is_match != notin
+#    
+    result_list = list( scapyraw_filter(pcap_file, raw_predicate, fallback=scapy_predicate) )
+#
+    return PacketList(result_list)
+
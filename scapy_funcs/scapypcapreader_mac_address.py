@@ -1,6 +1,6 @@
 # %%
 #######################################
-def scapypcapreader_mac_address(pcap_file: str, mac: str, dst=False, src=False, notin=False):
+def scapypcapreader_mac_address(pcap_file: str, mac: str, dst=False, src=False, notin=False, use_index=False):
     """Takes a given .pcap file and a partial/full string of a mac address (in the form aa:bb:cc:dd:11:22:33:44) and returns each packet that contains that mac address (or that DOES NOT contain that mac address if the notin=True switch is turned on).
 
     Example:
@@ -16,33 +16,40 @@ def scapypcapreader_mac_address(pcap_file: str, mac: str, dst=False, src=False,
         dst (bool, optional): If you want to only search the [Ether].dst field, set dst=True. Defaults to False.
         src (bool, optional): If you want to only search the [Ether].src field, set src=True. Defaults to False.
         notin (bool, optional): If you want to get every packet that DOES NOT contain a given mac address, set notin=True. Defaults to False.
+        use_index (bool, optional): If you will be running several queries against the same capture, set use_index=True to build (once) and use the sidecar index from 'scapyindex_build' instead of scanning the whole capture on every query. Defaults to False.
 
     Returns:
         scapy.plist.PacketList: Returns a PacketList of the matching packets.
     """
-    import pathlib
+    if dst and src:
+        print("The defaults of this tool will search for the given mac address in both the [Ether].dst and the [Ether].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return PacketList([])
+#
+    if dst:
+        fields = ['dst']
+    elif src:
+        fields = ['src']
+    else:
+        fields = ['src', 'dst']
 #    
-    path_obj = pathlib.Path(pcap_file).resolve().as_posix()
-    pcap_reader = PcapReader(path_obj)
+    if use_index:
+        return scapyindex_mac_address(pcap_file, mac, dst=dst, src=src, notin=notin)
 #    
-    if notin:
-        if dst and src:
-            print("The defaults of this tool will search for the given mac address in both the [Ether].dst and the [Ether].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
-        elif dst:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('Ether') and ( (mac not in pckt['Ether'].dst) ) ]
-        elif src:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('Ether') and ( (mac not in pckt['Ether'].src) ) ]
-        else:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('Ether') and ( (mac not in pckt['Ether'].src) and (mac not in pckt['Ether'].dst) ) ]
-    else:
-        if dst and src:
-            print("The defaults of this tool will search for the given mac address in both the [Ether].dst and the [Ether].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
-        elif dst:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('Ether') and ( (mac in pckt['Ether'].dst) ) ]
-        elif src:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('Ether') and ( (mac in pckt['Ether'].src) ) ]
-        else:
-            result_list = [ pckt for pckt in pcap_reader if pckt.haslayer('Ether') and ( (mac in pckt['Ether'].src) or (mac in pckt['Ether'].dst) ) ]
+    # Fast path: match against the raw header bytes, so only the matching packets are dissected by scapy
+    def raw_predicate(headers):
+        if headers['eth_src'] is None:
+            return False
+        is_match = any( mac in scapyraw_format_address(headers['eth_' + f]) for f in fields )
+        return is_match != notin
+#    
+    # Slow path for the packets the raw decoder cannot follow (e.g. MPLS, PPPoE, tunnels)
+    def scapy_predicate(pckt):
+        if not pckt.haslayer('Ether'):
+            return False
+        is_match = any( mac in getattr(pckt['Ether'], f) for f in fields )
+        return is_match != notin
+#    
+    result_list = list( scapyraw_filter(pcap_file, raw_predicate, fallback=scapy_predicate) )
 #
     return PacketList(result_list)
 
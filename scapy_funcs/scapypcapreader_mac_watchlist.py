@@ -0,0 +1,43 @@
+# %%
+#######################################
+def scapypcapreader_mac_watchlist(pcap_file: str, watchlist, dst=False, src=False, notin=False):
+    """Returns the packets of a .pcap file whose [Ether].src or [Ether].dst is in a watchlist of mac addresses and OUI prefixes (or those that are not in it, with notin=True), in a single streaming pass whatever the size of the watchlist (see 'scapywatchlist_compile_macs').  The addresses are matched on the raw header bytes, so only the matching packets are dissected by scapy.
+
+    Example:
+        >>> scapypcapreader_mac_watchlist('huge.pcap', ['00:0c:29', '00:50:56', '00:05:69', '00:1c:14'], src=True)\n
+        <PacketList: TCP:20388 UDP:1022 ICMP:41 Other:87>
+
+    Args:
+        pcap_file (str): Reference a .pcap (or .pcapng) file
+        watchlist (list | dict): Reference a list of mac addresses and prefixes, or a watchlist compiled with 'scapywatchlist_compile_macs'
+        dst (bool, optional): If you want to only search the [Ether].dst field, set dst=True. Defaults to False.
+        src (bool, optional): If you want to only search the [Ether].src field, set src=True. Defaults to False.
+        notin (bool, optional): If you want to get every Ethernet packet that DOES NOT match the watchlist, set notin=True. Defaults to False.
+
+    Returns:
+        scapy.plist.PacketList: Returns a PacketList object
+    """
+    if dst and src:
+        print("The defaults of this tool will search for the given mac address in both the [Ether].dst and the [Ether].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return PacketList([])
+#    
+    if not isinstance(watchlist, dict) or 'macs' not in watchlist:
+        watchlist = scapywatchlist_compile_macs(watchlist)
+    if dst:
+        fields = ['dst']
+    elif src:
+        fields = ['src']
+    else:
+        fields = ['src', 'dst']
+#    
+    # The Ethernet header is always decoded, so no scapy fallback is needed
+    def raw_predicate(headers):
+        if headers['eth_src'] is None:
+            return False
+        is_match = any( scapywatchlist_mac_match(watchlist, headers['eth_' + f]) is not None for f in fields )
+        return is_match != notin
+#    
+    result_list = list( scapyraw_filter(pcap_file, raw_predicate) )
+#
+    return PacketList(result_list)
+
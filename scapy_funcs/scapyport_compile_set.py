@@ -0,0 +1,56 @@
+# %%
+#######################################
+def scapyport_compile_set(ports):
+    """Compiles ports, port ranges and named port groups into a 65536 entry bitmap (a bytearray with a 1 for each port in the set), so testing whether a port is in the set is a single index (bitmap[port]) whatever the number of ports.  Used by 'scapyget_port', 'scapyget_tcp_port' and 'scapyget_udp_port'.
+
+    The named groups are 'well-known' (0-1023), 'registered' (1024-49151) and 'ephemeral' (49152-65535, also called 'dynamic').  Ranges can be given as a range object or as a 'low-high' string (both ends included).
+
+    Example:
+        >>> port_bitmap = scapyport_compile_set([22, 80, 443, '8000-8100', range(3000, 3010), 'ephemeral'])\n
+        >>> port_bitmap[443], port_bitmap[8050], port_bitmap[3010], port_bitmap[60000]\n
+        (1, 1, 0, 1)
+
+    Args:
+        ports (int | str | range | iterable): Reference a port number (any integer type, numpy included), a range, a 'low-high' string, a group name, or an iterable mixing any of them (an already compiled bitmap is returned as it is)
+
+    Returns:
+        bytearray: Returns a 65536 entry bitmap of the ports
+    """
+    import numbers
+#    
+    if isinstance(ports, bytearray) and len(ports) == 65536:
+        return ports
+#    
+    port_groups = {'well-known': range(0, 1024), 'registered': range(1024, 49152), 'ephemeral': range(49152, 65536), 'dynamic': range(49152, 65536)}
+    port_bitmap = bytearray(65536)
+    pending = [ports]
+    while pending:
+        entry = pending.pop()
+        if isinstance(entry, numbers.Integral):
+            # Any integer type, e.g. the numpy integers of a 'scapynumpy' table column
+            entry = int(entry)
+            if not 0 <= entry <= 65535:
+                raise ValueError(f"Not a port number: {entry}")
+            port_bitmap[entry] = 1
+        elif isinstance(entry, range):
+            if entry.step != 1:
+                pending.extend(entry)
+                continue
+            if entry.start < 0 or entry.stop > 65536:
+                raise ValueError(f"Not a port range: {entry}")
+            # Setting a whole slice at once rather than port by port
+            port_bitmap[entry.start:entry.stop] = b'\x01' * len(entry)
+        elif isinstance(entry, str):
+            entry_text = entry.strip().lower()
+            if entry_text in port_groups:
+                pending.append(port_groups[entry_text])
+            elif '-' in entry_text:
+                low, high = entry_text.split('-', 1)
+                pending.append(range(int(low), int(high) + 1))
+            else:
+                pending.append(int(entry_text))
+        else:
+            pending.extend(entry)
+#    
+    return port_bitmap
+
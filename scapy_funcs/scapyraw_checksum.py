@@ -0,0 +1,32 @@
+# %%
+#######################################
+def scapyraw_checksum(data: bytes, initial=0):
+    """Computes the 16 bit ones-complement Internet checksum (RFC 1071) of the given bytes, i.e. the value that belongs in the checksum field when that field is zeroed in 'data'.
+
+    The ones-complement sum of a run of 16 bit big-endian words is the same as the whole run read as one big-endian integer modulo 0xFFFF (because 2**16 is 1 modulo 0xFFFF), so the sum is done with a single int.from_bytes() in C over the buffer, without splitting it into words or copying it (a memoryview slice works too).
+
+    Examples:
+        >>> scapyraw_checksum(bytes.fromhex('450000730000400040110000c0a80001c0a800c7'))\n
+        47201
+        >>> hex(47201)\n
+        '0xb861'
+
+    Reference:
+        https://datatracker.ietf.org/doc/html/rfc1071
+
+    Args:
+        data (bytes): Reference the bytes to checksum (bytes, bytearray or memoryview)
+        initial (int, optional): Reference a partial sum to start from, e.g. the sum of a TCP/UDP pseudo header. Defaults to 0.
+
+    Returns:
+        int: Returns the 16 bit checksum
+    """
+    data_as_int = int.from_bytes(data, 'big')
+    if len(data) % 2:
+        # An odd length is padded with a zero byte at the end
+        data_as_int <<= 8
+    partial_sum = (data_as_int + initial) % 0xFFFF
+#    
+    # A partial sum of 0 here is the ones-complement 0xFFFF (for any non-zero data), whose complement is 0
+    return 0xFFFF - partial_sum if partial_sum else 0
+
@@ -0,0 +1,34 @@
+# %%
+#######################################
+def scapyraw_checksum_valid(frame: bytes, linktype=1, headers=None):
+    """Verifies the IPv4 header, TCP, UDP, ICMP and ICMPv6 checksums of one raw frame (see 'scapyraw_transport_checksum').  Returns False when any checksum the frame carries is wrong.  Checksums that cannot be verified (IP fragments, packets truncated by the snaplen) and UDP over IPv4 with no checksum (0) count as correct.  This is the per-frame check behind 'scapyraw_verify_checksums', for streaming stages that already hold the decoded headers.
+
+    Example:
+        >>> scapyraw_checksum_valid(bytes(Ether()/IP()/TCP(chksum=0x1234))), scapyraw_checksum_valid(bytes(Ether()/IP()/UDP(chksum=0)))\n
+        (False, True)
+
+    Args:
+        frame (bytes): Reference the raw bytes of a frame
+        linktype (int, optional): Reference the pcap linktype of the frame. Defaults to 1 (Ethernet).
+        headers (dict, optional): Reference the already decoded headers of the frame from 'scapyraw_parse_headers'. Defaults to None (the frame is decoded here).
+
+    Returns:
+        bool: Returns True when every checksum of the frame is correct (or cannot be verified)
+    """
+    if headers is None:
+        headers = scapyraw_parse_headers(frame, linktype)
+    if headers['ip_version'] == 4:
+        ip_offset = headers['ip_offset']
+        ihl = (frame[ip_offset] & 0x0F) * 4
+        # The sum over a header that includes a correct checksum is 0xFFFF (0 modulo 0xFFFF)
+        if ip_offset + ihl <= len(frame) and int.from_bytes(frame[ip_offset:ip_offset + ihl], 'big') % 0xFFFF != 0:
+            return False
+#    
+    checksum_result = scapyraw_transport_checksum(frame, linktype, headers)
+    if checksum_result is None:
+        return True
+    protocol_name, packet_checksum, correct_checksum = checksum_result
+    if protocol_name == 'UDP' and packet_checksum == 0 and headers['ip_version'] == 4:
+        return True
+    return packet_checksum == correct_checksum
+
@@ -0,0 +1,120 @@
+# %%
+#######################################
+def scapyraw_dns_parse(payload: bytes, name_cache=None, cache_size=10000):
+    """Parses a DNS message straight from the raw bytes of a UDP payload: the header, the first question and the answer records, without building scapy DNS objects.  Compressed names (pointers to earlier names in the message) are followed, with a limit on the number of jumps so a malformed or malicious pointer loop cannot hang the parser.
+
+    The decoded names can be kept in an LRU cache ('name_cache', an OrderedDict shared between calls), keyed by the raw label bytes of the name, so the names that repeat through a capture (the same few domains queried over and over) are only decoded once.
+
+    Example:
+        >>> dns_pcap = rdpcap('dns.pcap')\n
+        >>> scapyraw_dns_parse(bytes(dns_pcap[1]['UDP'].payload))\n
+        {'id': 4660, 'qr': 1, 'opcode': 0, 'rcode': 0, 'qname': 'www.example.com', 'qtype': 1, 'qclass': 1, 'answers': [('www.example.com', 5, 300, 'example.com'), ('example.com', 1, 300, '93.184.216.34')]}
+
+    Args:
+        payload (bytes): Reference the raw bytes of a DNS message (the payload of a UDP packet)
+        name_cache (collections.OrderedDict, optional): Reference an OrderedDict to use as the LRU cache of decoded names, shared between calls. Defaults to None (no cache).
+        cache_size (int, optional): Reference the maximum number of names kept in 'name_cache'. Defaults to 10000.
+
+    Returns:
+        dict: Returns the 'id', 'qr', 'opcode', 'rcode', 'qname', 'qtype', 'qclass' and the 'answers' (a list of (name, type, ttl, data) tuples, the data formatted as text) of the message, or None if the payload is not a well-formed DNS message
+    """
+    import socket
+    import struct
+#    
+    payload = bytes(payload)
+    payload_length = len(payload)
+    if payload_length < 12:
+        return None
+#    
+    def read_name(offset):
+        # Returns the decoded name and the offset just after it (after the first pointer, if the name is compressed)
+        labels = []
+        end_offset = None
+        jumps = 0
+        while True:
+            if offset >= payload_length:
+                raise ValueError('name runs past the end of the message')
+            label_start = offset
+            # The uncompressed run of labels from here, up to the terminating zero or a pointer
+            while offset < payload_length and payload[offset] and payload[offset] < 0xC0:
+                offset += payload[offset] + 1
+            if offset >= payload_length:
+                raise ValueError('name runs past the end of the message')
+            run_bytes = payload[label_start:offset]
+            if run_bytes:
+                run_text = name_cache.get(run_bytes) if name_cache is not None else None
+                if run_text is None:
+                    run_labels = []
+                    position = 0
+                    while position < len(run_bytes):
+                        label_length = run_bytes[position]
+                        run_labels.append(run_bytes[position + 1:position + 1 + label_length].decode('ascii', errors='backslashreplace'))
+                        position += label_length + 1
+                    run_text = '.'.join(run_labels)
+                    if name_cache is not None:
+                        name_cache[run_bytes] = run_text
+                        if len(name_cache) > cache_size:
+                            name_cache.popitem(last=False)
+                elif name_cache is not None:
+                    name_cache.move_to_end(run_bytes)
+                labels.append(run_text)
+            if payload[offset] == 0:
+                return ('.'.join(labels) or '.', end_offset if end_offset is not None else offset + 1)
+            # A compression pointer to an earlier name
+            if offset + 1 >= payload_length:
+                raise ValueError('name runs past the end of the message')
+            if end_offset is None:
+                end_offset = offset + 2
+            jumps += 1
+            if jumps > 32:
+                raise ValueError('too many compression pointers')
+            offset = ((payload[offset] & 0x3F) << 8) | payload[offset + 1]
+#    
+    def format_rdata(rtype, rdata_offset, rdata_length):
+        rdata = payload[rdata_offset:rdata_offset + rdata_length]
+        if rtype == 1 and rdata_length == 4:
+            return socket.inet_ntop(socket.AF_INET, rdata)
+        if rtype == 28 and rdata_length == 16:
+            return socket.inet_ntop(socket.AF_INET6, rdata)
+        if rtype in (2, 5, 12, 39):
+            # NS, CNAME, PTR and DNAME, which hold a (possibly compressed) name
+            return read_name(rdata_offset)[0]
+        if rtype == 15 and rdata_length > 2:
+            return f"{int.from_bytes(rdata[:2], 'big')} {read_name(rdata_offset + 2)[0]}"
+        if rtype == 16:
+            strings = []
+            position = 0
+            while position < rdata_length:
+                string_length = rdata[position]
+                strings.append(rdata[position + 1:position + 1 + string_length].decode(errors='replace'))
+                position += string_length + 1
+            return ''.join(strings)
+        return rdata.hex()
+#    
+    message_id, flags, qdcount, ancount, nscount, arcount = struct.unpack_from('!HHHHHH', payload, 0)
+    parsed = {'id': message_id, 'qr': flags >> 15, 'opcode': (flags >> 11) & 0xF, 'rcode': flags & 0xF, 'qname': None, 'qtype': None, 'qclass': None, 'answers': []}
+    try:
+        offset = 12
+        for question_index in range(qdcount):
+            qname, offset = read_name(offset)
+            if offset + 4 > payload_length:
+                return None
+            if question_index == 0:
+                parsed['qname'] = qname
+                parsed['qtype'], parsed['qclass'] = struct.unpack_from('!HH', payload, offset)
+            offset += 4
+        for answer_index in range(ancount):
+            name, offset = read_name(offset)
+            if offset + 10 > payload_length:
+                return None
+            rtype, rclass, ttl, rdata_length = struct.unpack_from('!HHIH', payload, offset)
+            offset += 10
+            if offset + rdata_length > payload_length:
+                return None
+            parsed['answers'].append((name, rtype, ttl, format_rdata(rtype, offset, rdata_length)))
+            offset += rdata_length
+    except ValueError:
+        return None
+#    
+    return parsed
+
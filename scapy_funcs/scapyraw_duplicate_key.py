@@ -0,0 +1,37 @@
+# %%
+#######################################
+def scapyraw_duplicate_key(frame: bytes, linktype=1, headers=None, tcp_only=True):
+    """Returns the key used to spot duplicate packets: the flow tuple (addresses, protocol and ports), the TCP sequence number, acknowledgment number and flags, and a fast digest (CRC-32 and length) of the payload.  Two packets with the same key carry the same data for the same flow, so unlike keying on the TCP sequence number alone, packets from unrelated flows that happen to share a sequence number are never mistaken for duplicates.
+
+    Returns None for the packets that are never treated as duplicates (everything but TCP when 'tcp_only=True').  With 'tcp_only=False', packets that are not IP (or that could not be parsed) are keyed on a digest of the whole frame.
+
+    Example:
+        >>> frame = bytes(Ether()/IP(src='10.1.1.1', dst='10.1.1.100')/TCP(sport=1046, dport=22, seq=100, flags='PA')/b'hello')\n
+        >>> scapyraw_duplicate_key(frame)\n
+        (b'\\n\\x01\\x01\\x01', b'\\n\\x01\\x01d', 6, 1046, 22, 100, 0, 24, 907060870, 5)
+
+    Args:
+        frame (bytes): Reference the raw bytes of a packet
+        linktype (int, optional): Reference the link-layer type of the frame. Defaults to 1 (Ethernet).
+        headers (dict, optional): Reference the result of 'scapyraw_parse_headers' for the frame, if already parsed. Defaults to None.
+        tcp_only (bool, optional): Set this to False to also spot duplicates of non-TCP packets. Defaults to True.
+
+    Returns:
+        tuple: Returns the duplicate key of the packet (or None)
+    """
+    import zlib
+#    
+    if headers is None:
+        headers = scapyraw_parse_headers(frame, linktype)
+#    
+    if headers['ip_proto'] == 6 and headers['tcp_seq'] is not None:
+        payload = frame[headers['payload_offset']:headers['payload_offset'] + headers['payload_len']]
+        return (headers['ip_src'], headers['ip_dst'], 6, headers['sport'], headers['dport'], headers['tcp_seq'], headers['tcp_ack'], headers['tcp_flags'], zlib.crc32(payload), len(payload))
+    if tcp_only:
+        return None
+#    
+    if headers['ip_src'] is not None and headers['payload_offset'] is not None:
+        payload = frame[headers['payload_offset']:headers['payload_offset'] + headers['payload_len']]
+        return (headers['ip_src'], headers['ip_dst'], headers['ip_proto'], headers['sport'], headers['dport'], None, None, None, zlib.crc32(payload), len(payload))
+    return (None, None, None, None, None, None, None, None, zlib.crc32(frame), len(frame))
+
@@ -0,0 +1,35 @@
+# %%
+#######################################
+def scapyraw_filter(pcap_file: str, predicate, fallback=None):
+    """Fast path filter for large .pcap files.  Reads the raw records of the file, decodes only the header fields with 'scapyraw_parse_headers', and passes that dict of fields to the given predicate.  Only the packets where the predicate returns True are dissected by scapy and yielded, which avoids paying for a full dissection of every packet in the file.
+
+    If a 'fallback' function is given, it is used for the frames the raw decoder could not follow (headers['unparsed'] is True, e.g. MPLS, PPPoE or tunnelled traffic).  Those packets are dissected by scapy and passed to the fallback, which should return True or False the same way a 'scapyget_*' style comprehension would.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> https_packets = scapyraw_filter('huge.pcap', lambda h: h['ip_proto'] == 6 and 443 in (h['sport'], h['dport']))\n
+        >>> PacketList(list(https_packets))\n
+        <PacketList: TCP:88412 UDP:0 ICMP:0 Other:0>
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> # Streaming the survivors straight to a new .pcap file\n
+        >>> scapystream_pcapwriter(scapyraw_filter('huge.pcap', lambda h: h['vlan'] == (5,)), 'vlan5.pcap')\n
+        1420
+
+    Args:
+        pcap_file (str): Reference a .pcap file
+        predicate (function): Reference a function that receives the dict returned by 'scapyraw_parse_headers' and returns True (keep) or False (discard)
+        fallback (function, optional): Reference a function that receives a scapy packet for the frames the raw decoder could not follow. Defaults to None (those frames are judged by the predicate alone).
+
+    Yields:
+        scapy.packet.Packet: Yields each matching packet as a scapy packet
+    """
+    for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(pcap_file):
+        headers = scapyraw_parse_headers(frame, linktype)
+        if fallback and headers['unparsed']:
+            pckt = scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen)
+            if fallback(pckt):
+                yield pckt
+        elif predicate(headers):
+            yield scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen)
+
@@ -0,0 +1,27 @@
+# %%
+#######################################
+def scapyraw_format_address(address: bytes):
+    """Converts the raw bytes of an address, as returned by 'scapyraw_parse_headers', to the same string form scapy uses: dotted-quad for a 4 byte IPv4 address, compressed hex for a 16 byte IPv6 address, and lowercase colon separated hex for a 6 byte mac address.
+
+    Examples:
+        >>> scapyraw_format_address(b'B\\x11\\x01\\x02')\n
+        '66.17.1.2'
+        >>> scapyraw_format_address(b'\\xb48\\x91$\\xc9\\xd9')\n
+        'b4:38:91:24:c9:d9'
+
+    Args:
+        address (bytes): Reference the raw bytes of an ip or mac address
+
+    Returns:
+        str: Returns the address as a string (or None if no address was given)
+    """
+    import socket
+#    
+    if address is None:
+        return None
+    if len(address) == 4:
+        return socket.inet_ntop(socket.AF_INET, address)
+    if len(address) == 16:
+        return socket.inet_ntop(socket.AF_INET6, address)
+    return address.hex(':')
+
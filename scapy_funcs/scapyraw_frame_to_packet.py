@@ -0,0 +1,33 @@
+# %%
+#######################################
+def scapyraw_frame_to_packet(frame: bytes, timestamp_ns=None, linktype=1, wirelen=None):
+    """Turns a raw frame (such as one yielded by 'scapyraw_pcap_records') into a fully dissected scapy packet, with the packet.time and packet.wirelen set the same way a PcapReader would set them.  Use this only on the packets that survive a raw filter, so that the cost of the scapy dissection is only paid for the packets you keep.
+
+    Example:
+        >>> ts_ns, offset, frame, wirelen, linktype = next(scapyraw_pcap_records('temp.pcap'))\n
+        >>> pckt = scapyraw_frame_to_packet(frame, ts_ns, linktype, wirelen)\n
+        >>> pckt.summary()\n
+        'Ether / IP / UDP 66.17.1.2:58429 > 185.34.210.1:10001 / Raw / Padding'
+        >>> pckt.time\n
+        1629217872.080297
+
+    Args:
+        frame (bytes): Reference the raw bytes of a frame
+        timestamp_ns (int, optional): Reference the epoch timestamp of the frame in nanoseconds. Defaults to None.
+        linktype (int, optional): Reference the pcap linktype of the frame. Defaults to 1 (Ethernet).
+        wirelen (int, optional): Reference the original length of the packet on the wire. Defaults to None.
+
+    Returns:
+        scapy.packet.Packet: Returns a scapy packet
+    """
+    try:
+        layer_class = conf.l2types[linktype]
+    except KeyError:
+        layer_class = conf.raw_layer
+#    
+    pckt = layer_class(bytes(frame))
+    if timestamp_ns is not None:
+        pckt.time = EDecimal(timestamp_ns) / 1000000000
+    pckt.wirelen = wirelen
+    return pckt
+
@@ -0,0 +1,21 @@
+# %%
+#######################################
+def scapyraw_merged_records(pcap_files: list):
+    """Interleaves the records of several .pcap (or .pcapng) files by timestamp, like Wireshark's 'mergecap' (e.g. to combine the captures of different sensors).  Each file must already be in timestamp order (see 'scapysort_pcap'); the files are read side by side and merged with a heap (heapq.merge), so only one record per file is held in memory.  Records with the same timestamp are taken from the files in the order the files were given.
+
+    Example:
+        >>> merged_records = scapyraw_merged_records(['sensor1.pcap', 'sensor2.pcap', 'sensor3.pcap'])\n
+        >>> scapyraw_pcap_writer(merged_records, 'all_sensors.pcap')\n
+        130877
+
+    Args:
+        pcap_files (list): Reference a list of .pcap (or .pcapng) files
+
+    Yields:
+        tuple: Yields each (timestamp_ns, file_offset, frame, wirelen, linktype) record, in timestamp order ('file_offset' is the offset in the record's own file)
+    """
+    import heapq
+#    
+    record_streams = [ scapyraw_pcap_records(pcap_file) for pcap_file in pcap_files ]
+    yield from heapq.merge(*record_streams, key=lambda record: record[0])
+
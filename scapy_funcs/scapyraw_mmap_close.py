@@ -0,0 +1,16 @@
+# %%
+#######################################
+def scapyraw_mmap_close(capture: dict):
+    """Unmaps a capture opened with 'scapyraw_mmap_open' and closes its file mapping.  The frames returned by 'scapyraw_mmap_record' are memoryviews of the mapping, so they have to be released (or copied with bytes() beforehand) first, otherwise a BufferError is raised and the capture stays open.
+
+    Example:
+        >>> capture = scapyraw_mmap_open('temp.pcap')\n
+        >>> frame = bytes(scapyraw_mmap_record(capture, 0)[2])\n
+        >>> scapyraw_mmap_close(capture)\n
+
+    Args:
+        capture (dict): Reference a capture opened with 'scapyraw_mmap_open'
+    """
+    capture['data'].release()
+    capture['mmap'].close()
+
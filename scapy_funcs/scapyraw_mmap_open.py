@@ -0,0 +1,69 @@
+# %%
+#######################################
+def scapyraw_mmap_open(pcap_file: str):
+    """Memory maps a .pcap or .pcapng file and walks it once to find where every record starts, so that any record can then be read in O(1) by its index with 'scapyraw_mmap_record' (and every record, in order, with 'scapyraw_mmap_records').  The frames are returned as memoryviews of the mapped file: nothing is copied, and there is no read() call per packet.
+
+    Returns the opened capture as a dict with the 'mmap', a 'data' memoryview of the whole file, the 'format' ('pcap' or 'pcapng'), the 'offsets' of the records (a NumPy array), and the 'interfaces' of the records (the linktype and timestamp resolution of each capture interface, one for a .pcap file) with the 'record_interfaces' index of each record's interface (a NumPy array, None for a .pcap file).  Close it with 'scapyraw_mmap_close' once done.
+
+    Example:
+        >>> capture = scapyraw_mmap_open('huge.pcapng')\n
+        >>> len(capture['offsets'])\n
+        48211877
+        >>> timestamp_ns, file_offset, frame, wirelen, linktype = scapyraw_mmap_record(capture, 40000000)\n
+        >>> frame\n
+        <memory at 0x7f6b2c1e4a00>
+
+    Args:
+        pcap_file (str): Reference a .pcap or .pcapng file
+
+    Returns:
+        dict: Returns the opened capture
+    """
+    import mmap
+    import pathlib
+    import struct
+    import numpy as np
+#    
+    path_obj = pathlib.Path(pcap_file).resolve()
+    with path_obj.open('rb') as f:
+        if path_obj.stat().st_size == 0:
+            raise ValueError(f"Empty capture file: {path_obj.as_posix()}")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    data = memoryview(mapped)
+#    
+    capture = {'path': path_obj.as_posix(), 'mmap': mapped, 'data': data}
+    try:
+        if data[:4] == b'\x0a\x0d\x0d\x0a':
+            interfaces = []
+            offsets = []
+            record_interfaces = []
+            for block_offset, timestamp_ns, frame_start, frame_end, wirelen, interface_index in scapyraw_pcapng_walk(data, interfaces):
+                offsets.append(block_offset)
+                record_interfaces.append(interface_index)
+            capture.update({'format': 'pcapng', 'offsets': np.array(offsets, dtype=np.int64), 'interfaces': interfaces, 'record_interfaces': np.array(record_interfaces, dtype=np.int32)})
+            return capture
+#        
+        pcap_header = scapyraw_pcap_global_header(data[:24])
+        record_header = struct.Struct(pcap_header['endian'] + 'IIII')
+        data_length = len(data)
+        offsets = []
+        file_offset = 24
+        while file_offset + 16 <= data_length:
+            caplen = record_header.unpack_from(data, file_offset)[2]
+            if file_offset + 16 + caplen > data_length:
+                # Truncated final record
+                break
+            offsets.append(file_offset)
+            file_offset += 16 + caplen
+        interface = {'linktype': pcap_header['linktype'], 'snaplen': pcap_header['snaplen'], 'endian': pcap_header['endian'], 'ts_multiplier': pcap_header['ns_multiplier'], 'ts_divisor': 1, 'ts_offset_ns': 0}
+        capture.update({'format': 'pcap', 'offsets': np.array(offsets, dtype=np.int64), 'interfaces': [interface], 'record_interfaces': None})
+        return capture
+    except BaseException:
+        # Not leaving the file mapped when it cannot be read
+        data.release()
+        try:
+            mapped.close()
+        except BufferError:
+            pass
+        raise
+
@@ -0,0 +1,31 @@
+# %%
+#######################################
+def scapyraw_mmap_record(capture: dict, index: int):
+    """Returns the record at a given index of a capture opened with 'scapyraw_mmap_open', in O(1), as a tuple of (timestamp_ns, file_offset, frame, wirelen, linktype) where 'frame' is a memoryview of the mapped file (no copy), and 'file_offset' is the offset of the record (or pcapng block) in the file.  Negative indexes count from the end, like a list.
+
+    Example:
+        >>> capture = scapyraw_mmap_open('temp.pcap')\n
+        >>> timestamp_ns, file_offset, frame, wirelen, linktype = scapyraw_mmap_record(capture, -1)\n
+        >>> scapyraw_frame_to_packet(bytes(frame), timestamp_ns, linktype, wirelen).summary()\n
+        'Ether / IP / UDP 66.17.1.2:58429 > 185.34.210.1:10001 / Raw'
+
+    Args:
+        capture (dict): Reference a capture opened with 'scapyraw_mmap_open'
+        index (int): Reference the index of the record
+
+    Returns:
+        tuple: Returns a tuple of (timestamp_ns, file_offset, frame, wirelen, linktype)
+    """
+    import struct
+#    
+    file_offset = int(capture['offsets'][index])
+    data = capture['data']
+    if capture['format'] == 'pcapng':
+        interface = capture['interfaces'][capture['record_interfaces'][index]]
+        timestamp_ns, frame_start, frame_end, wirelen = scapyraw_pcapng_packet_block(data, file_offset, interface)
+        return (timestamp_ns or 0, file_offset, data[frame_start:frame_end], wirelen, interface['linktype'])
+#    
+    interface = capture['interfaces'][0]
+    ts_sec, ts_frac, caplen, wirelen = struct.unpack_from(interface['endian'] + 'IIII', data, file_offset)
+    return (ts_sec * 1000000000 + ts_frac * interface['ts_multiplier'], file_offset, data[file_offset + 16:file_offset + 16 + caplen], wirelen, interface['linktype'])
+
@@ -0,0 +1,62 @@
+# %%
+#######################################
+def scapyraw_mmap_records(pcap_file: str):
+    """Memory-mapped version of 'scapyraw_pcap_records', for .pcap and .pcapng files.  Lazily yields every record of the file as a tuple of (timestamp_ns, file_offset, frame, wirelen, linktype), walking the mapped file by offset, where 'frame' is a memoryview of the mapped file rather than a copy, and 'file_offset' is the offset of the record (or pcapng block) in the file.
+
+    The file is unmapped when the generator is exhausted or closed, unless frames are still referenced, in which case it is unmapped once the last of them is released; call bytes() on the frames to be kept for long, to let the mapping go.
+
+    Example:
+        >>> records = scapyraw_mmap_records('temp.pcapng')\n
+        >>> timestamp_ns, file_offset, frame, wirelen, linktype = next(records)\n
+        >>> timestamp_ns, file_offset, wirelen, linktype\n
+        (1629217872080297000, 140, 60, 1)
+        >>> scapyraw_parse_headers(frame, linktype)['dport']\n
+        10001
+
+    Args:
+        pcap_file (str): Reference a .pcap or .pcapng file
+
+    Yields:
+        tuple: Yields a tuple of (timestamp_ns, file_offset, frame, wirelen, linktype) for each record
+    """
+    import mmap
+    import pathlib
+    import struct
+#    
+    path_obj = pathlib.Path(pcap_file).resolve()
+    if path_obj.stat().st_size < 24:
+        return
+    with path_obj.open('rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    data = memoryview(mapped)
+    try:
+        if data[:4] == b'\x0a\x0d\x0d\x0a':
+            interfaces = []
+            for block_offset, timestamp_ns, frame_start, frame_end, wirelen, interface_index in scapyraw_pcapng_walk(data, interfaces):
+                if timestamp_ns is None:
+                    timestamp_ns = 0
+                yield (timestamp_ns, block_offset, data[frame_start:frame_end], wirelen, interfaces[interface_index]['linktype'])
+            return
+#        
+        pcap_header = scapyraw_pcap_global_header(data[:24])
+        ns_multiplier = pcap_header['ns_multiplier']
+        linktype = pcap_header['linktype']
+        unpack_from = struct.Struct(pcap_header['endian'] + 'IIII').unpack_from
+        data_length = len(data)
+        file_offset = 24
+        while file_offset + 16 <= data_length:
+            ts_sec, ts_frac, caplen, wirelen = unpack_from(data, file_offset)
+            frame_end = file_offset + 16 + caplen
+            if frame_end > data_length:
+                # Truncated final record
+                break
+            yield (ts_sec * 1000000000 + ts_frac * ns_multiplier, file_offset, data[file_offset + 16:frame_end], wirelen, linktype)
+            file_offset = frame_end
+    finally:
+        # Unmapping the file once the records are done with (or the generator is closed); frames still referenced by the caller keep the mapping alive until they are released
+        data.release()
+        try:
+            mapped.close()
+        except BufferError:
+            pass
+
@@ -0,0 +1,139 @@
+# %%
+#######################################
+def scapyraw_parse_headers(frame: bytes, linktype=1):
+    """Decodes only the header fields of a raw frame that the filters need (Ethernet / 802.1Q VLAN / IPv4 / IPv6 / TCP / UDP / ICMP), using struct on the raw bytes instead of a full scapy dissection.  Returns a dict with every key always present (fields of layers that are not in the frame are None).
+
+    The 'unparsed' key is True when the frame uses an encapsulation this decoder does not follow (an unknown linktype or ethertype, or an IP tunnel), meaning a full scapy dissection might still find an IP layer deeper in the packet.
+
+    Example:
+        >>> ts_ns, offset, frame, wirelen, linktype = next(scapyraw_pcap_records('temp.pcap'))\n
+        >>> headers = scapyraw_parse_headers(frame, linktype)\n
+        >>> scapyraw_format_address(headers['ip_src']), scapyraw_format_address(headers['ip_dst']), headers['sport'], headers['dport']\n
+        ('66.17.1.2', '185.34.210.1', 58429, 10001)
+
+    Args:
+        frame (bytes): Reference the raw bytes of a frame (bytes, bytearray or memoryview)
+        linktype (int, optional): Reference the pcap linktype of the frame (1 = Ethernet, 101 = Raw IP, 228 = IPv4, 229 = IPv6). Defaults to 1.
+
+    Returns:
+        dict: Returns a dict of the decoded header fields
+    """
+    import struct
+#    
+    headers = {
+        'linktype': linktype, 'unparsed': False,
+        'eth_dst': None, 'eth_src': None, 'ethertype': None, 'vlan': (),
+        'ip_version': None, 'ip_offset': None, 'ip_end': None, 'ip_src': None, 'ip_dst': None, 'ip_proto': None, 'ip_fragment': False,
+        'l4_offset': None, 'sport': None, 'dport': None, 'tcp_seq': None, 'tcp_ack': None, 'tcp_flags': None, 'icmp_type': None, 'icmp_code': None,
+        'payload_offset': None, 'payload_len': 0,
+    }
+    frame_len = len(frame)
+#    
+    # Link layer
+    if linktype == 1:
+        if frame_len < 14:
+            return headers
+        headers['eth_dst'] = bytes(frame[0:6])
+        headers['eth_src'] = bytes(frame[6:12])
+        ethertype = struct.unpack_from('!H', frame, 12)[0]
+        offset = 14
+        vlan_ids = []
+        while ethertype in (0x8100, 0x88A8, 0x9100) and frame_len >= offset + 4:
+            tci, ethertype = struct.unpack_from('!HH', frame, offset)
+            vlan_ids.append(tci & 0x0FFF)
+            offset += 4
+        headers['vlan'] = tuple(vlan_ids)
+        headers['ethertype'] = ethertype
+        if ethertype == 0x0800:
+            ip_version = 4
+        elif ethertype == 0x86DD:
+            ip_version = 6
+        else:
+            # ARP (and anything else with no IP layer) is fully handled here, other ethertypes (MPLS, PPPoE, ...) are not
+            headers['unparsed'] = ethertype not in (0x0806, 0x8035, 0x88CC)
+            return headers
+    elif linktype in (101, 228, 229, 12, 14):
+        if frame_len < 1:
+            return headers
+        offset = 0
+        ip_version = frame[0] >> 4
+    else:
+        headers['unparsed'] = True
+        return headers
+#    
+    # Network layer
+    if ip_version == 4:
+        if frame_len < offset + 20:
+            return headers
+        ver_ihl, total_length, frag_field, ip_proto = struct.unpack_from('!BxHxxHxB', frame, offset)
+        ihl = (ver_ihl & 0x0F) * 4
+        headers['ip_src'] = bytes(frame[offset + 12:offset + 16])
+        headers['ip_dst'] = bytes(frame[offset + 16:offset + 20])
+        ip_end = min(offset + total_length, frame_len) if total_length >= ihl else frame_len
+        l4_offset = offset + ihl
+        # Only the first fragment carries the transport header
+        is_fragment = bool(frag_field & 0x3FFF)
+        first_fragment = (frag_field & 0x1FFF) == 0
+    elif ip_version == 6:
+        if frame_len < offset + 40:
+            return headers
+        payload_length, ip_proto = struct.unpack_from('!HB', frame, offset + 4)
+        headers['ip_src'] = bytes(frame[offset + 8:offset + 24])
+        headers['ip_dst'] = bytes(frame[offset + 24:offset + 40])
+        ip_end = min(offset + 40 + payload_length, frame_len)
+        l4_offset = offset + 40
+        is_fragment = False
+        first_fragment = True
+        # Walk the extension headers: hop-by-hop, routing, fragment, destination options, authentication
+        while ip_proto in (0, 43, 44, 51, 60) and ip_end >= l4_offset + 8:
+            next_header, ext_len = struct.unpack_from('!BB', frame, l4_offset)
+            if ip_proto == 44:
+                is_fragment = True
+                first_fragment = (struct.unpack_from('!H', frame, l4_offset + 2)[0] & 0xFFF8) == 0
+                ext_size = 8
+            elif ip_proto == 51:
+                ext_size = (ext_len + 2) * 4
+            else:
+                ext_size = (ext_len + 1) * 8
+            ip_proto = next_header
+            l4_offset += ext_size
+    else:
+        headers['unparsed'] = True
+        return headers
+#    
+    headers['ip_version'] = ip_version
+    headers['ip_offset'] = offset
+    headers['ip_end'] = ip_end
+    headers['ip_proto'] = ip_proto
+    headers['ip_fragment'] = is_fragment
+    if ip_proto in (4, 41, 47):
+        # IP-in-IP, IPv6-in-IP and GRE tunnels
+        headers['unparsed'] = True
+    if not first_fragment:
+        return headers
+#    
+    # Transport layer
+    if ip_proto == 6 and ip_end >= l4_offset + 20:
+        sport, dport, seq, ack, dataofs, flags = struct.unpack_from('!HHIIBB', frame, l4_offset)
+        headers['sport'] = sport
+        headers['dport'] = dport
+        headers['tcp_seq'] = seq
+        headers['tcp_ack'] = ack
+        headers['tcp_flags'] = flags
+        payload_offset = l4_offset + (dataofs >> 4) * 4
+    elif ip_proto == 17 and ip_end >= l4_offset + 8:
+        sport, dport = struct.unpack_from('!HH', frame, l4_offset)
+        headers['sport'] = sport
+        headers['dport'] = dport
+        payload_offset = l4_offset + 8
+    elif ip_proto in (1, 58) and ip_end >= l4_offset + 8:
+        headers['icmp_type'], headers['icmp_code'] = struct.unpack_from('!BB', frame, l4_offset)
+        payload_offset = l4_offset + 8
+    else:
+        return headers
+    headers['l4_offset'] = l4_offset
+    headers['payload_offset'] = payload_offset
+    headers['payload_len'] = max(ip_end - payload_offset, 0)
+#    
+    return headers
+
@@ -0,0 +1,35 @@
+# %%
+#######################################
+def scapyraw_pcap_global_header(global_header: bytes):
+    """Decodes the 24 byte global header at the start of a libpcap file.  The magic number at the start of the header tells us both the byte order of the file and whether the record timestamps are in microseconds or nanoseconds.
+
+    Example:
+        >>> with open('temp.pcap', 'rb') as f:\n
+        ...     scapyraw_pcap_global_header(f.read(24))\n
+        {'endian': '<', 'ns_multiplier': 1000, 'snaplen': 65535, 'linktype': 1}
+
+    Reference:
+        https://wiki.wireshark.org/Development/LibpcapFileFormat
+
+    Args:
+        global_header (bytes): Reference the first 24 bytes of a libpcap file
+
+    Returns:
+        dict: Returns the byte order ('<' or '>') for struct, the multiplier that converts the fractional part of a timestamp to nanoseconds, the snaplen, and the linktype of the file
+    """
+    import struct
+#    
+    magic_numbers = {
+        b'\xd4\xc3\xb2\xa1': ('<', 1000),
+        b'\xa1\xb2\xc3\xd4': ('>', 1000),
+        b'\x4d\x3c\xb2\xa1': ('<', 1),
+        b'\xa1\xb2\x3c\x4d': ('>', 1),
+    }
+    if len(global_header) < 24 or global_header[:4] not in magic_numbers:
+        raise ValueError(f"Not a libpcap formatted file (magic number: {bytes(global_header[:4]).hex()})")
+#    
+    endian, ns_multiplier = magic_numbers[global_header[:4]]
+    snaplen, linktype = struct.unpack(endian + 'II', global_header[16:24])
+#    
+    return {'endian': endian, 'ns_multiplier': ns_multiplier, 'snaplen': snaplen, 'linktype': linktype & 0x0FFFFFFF}
+
@@ -0,0 +1,64 @@
+# %%
+#######################################
+def scapyraw_pcap_records(pcap_file: str, start_offset=None, end_offset=None):
+    """Lazily yields the raw records of a given .pcap file without handing any of the bytes to scapy for dissection.  Each record is returned as a tuple of: (timestamp_ns, file_offset, frame, wirelen, linktype), where 'timestamp_ns' is the integer epoch time in nanoseconds, 'file_offset' is the byte offset of the record header in the file, and 'frame' is the captured bytes of the packet.
+
+    pcapng files are decoded natively (see 'scapyraw_pcapng_walk'), with every interface's linktype and timestamp resolution, in which case the 'file_offset' is None and passing a start_offset or end_offset raises a ValueError.  See 'scapyraw_mmap_records' for a memory-mapped version, and 'scapyraw_mmap_open' for random access by record index.
+
+    This is the fast path used by the 'scapyraw_*' functions.  The frames can be decoded with 'scapyraw_parse_headers', and only the packets of interest turned into scapy objects with 'scapyraw_frame_to_packet'.
+
+    Example:
+        >>> records = scapyraw_pcap_records('temp.pcap')\n
+        >>> next(records)\n
+        (1629217872080297000, 24, b'\\xb48\\x91$\\xc9\\xd9\\xa8\\x81q\\xe3"a\\x08\\x00E\\x00\\x00 \\xcc\\x89@\\x00\\x01\\x11\\xf6\\xa1B\\x11\\x01\\x02\\xb9"\\xd2\\x01\\xe4=\\'\\x11\\x00\\x0c<\\xe5\\x01\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00', 60, 1)
+
+    Reference:
+        https://wiki.wireshark.org/Development/LibpcapFileFormat
+
+    Args:
+        pcap_file (str): Reference a .pcap file
+        start_offset (int, optional): Reference the file offset of a record to start reading from (e.g. where a previous pass stopped on a capture that is still growing). Defaults to None (the first record).
+        end_offset (int, optional): Reference the file offset to stop reading at, so that a byte range of the file (see 'scapyraw_pcap_shards') can be read on its own. Defaults to None (the end of the file).
+
+    Yields:
+        tuple: Yields a tuple of (timestamp_ns, file_offset, frame, wirelen, linktype) for each record
+    """
+    import pathlib
+    import struct
+#    
+    path_obj = pathlib.Path(pcap_file).resolve()
+#    
+    with path_obj.open('rb', buffering=1 << 20) as f:
+        global_header = f.read(24)
+        if len(global_header) < 24:
+            return
+#        
+        if global_header[:4] == b'\x0a\x0d\x0d\x0a':
+            if start_offset or end_offset is not None:
+                raise ValueError(f"'{pcap_file}' is a pcapng file, which cannot be read from or to a record offset (start_offset / end_offset are only for libpcap files)")
+            for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_mmap_records(path_obj.as_posix()):
+                yield (timestamp_ns, None, bytes(frame), wirelen, linktype)
+            return
+        pcap_header = scapyraw_pcap_global_header(global_header)
+        endian = pcap_header['endian']
+        ns_multiplier = pcap_header['ns_multiplier']
+        linktype = pcap_header['linktype']
+#        
+        record_header = struct.Struct(endian + 'IIII')
+        read = f.read
+        file_offset = 24
+        if start_offset:
+            f.seek(start_offset)
+            file_offset = start_offset
+        while end_offset is None or file_offset < end_offset:
+            header_bytes = read(16)
+            if len(header_bytes) < 16:
+                break
+            ts_sec, ts_frac, caplen, wirelen = record_header.unpack(header_bytes)
+            frame = read(caplen)
+            if len(frame) < caplen:
+                # Truncated final record (e.g. a capture that is still being written)
+                break
+            yield (ts_sec * 1000000000 + ts_frac * ns_multiplier, file_offset, frame, wirelen, linktype)
+            file_offset += 16 + caplen
+
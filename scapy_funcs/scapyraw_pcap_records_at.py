@@ -0,0 +1,35 @@
+# %%
+#######################################
+def scapyraw_pcap_records_at(pcap_file: str, file_offsets):
+    """Lazily yields the raw records found at the given byte offsets of a .pcap file (such as the offsets stored by 'scapyindex_build' or in the 'file_offset' column of a packet table), seeking straight to each record instead of reading the whole file.  Each record is returned in the same (timestamp_ns, file_offset, frame, wirelen, linktype) form as 'scapyraw_pcap_records'.
+
+    Example:
+        >>> records = scapyraw_pcap_records_at('temp.pcap', [24, 2290])\n
+        >>> [ (ts_ns, offset, wirelen) for ts_ns, offset, frame, wirelen, linktype in records ]\n
+        [(1629217872080297000, 24, 178), (1629217872413309000, 2290, 60)]
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        file_offsets (iterable): Reference the byte offsets of the record headers to read
+
+    Yields:
+        tuple: Yields a tuple of (timestamp_ns, file_offset, frame, wirelen, linktype) for each record
+    """
+    import pathlib
+    import struct
+#    
+    path_obj = pathlib.Path(pcap_file).resolve()
+#    
+    with path_obj.open('rb') as f:
+        pcap_header = scapyraw_pcap_global_header(f.read(24))
+        endian = pcap_header['endian']
+        ns_multiplier = pcap_header['ns_multiplier']
+        linktype = pcap_header['linktype']
+        record_header = struct.Struct(endian + 'IIII')
+#        
+        for file_offset in file_offsets:
+            f.seek(file_offset)
+            ts_sec, ts_frac, caplen, wirelen = record_header.unpack(f.read(16))
+            frame = f.read(caplen)
+            yield (ts_sec * 1000000000 + ts_frac * ns_multiplier, file_offset, frame, wirelen, linktype)
+
@@ -0,0 +1,47 @@
+# %%
+#######################################
+def scapyraw_pcap_shards(pcap_file: str, num_shards: int):
+    """Splits a .pcap file into (up to) 'num_shards' byte ranges of roughly equal size, where every range starts and ends on a record boundary.  Only the 16 byte record headers are read (the packet data is skipped over with a seek), so this pre-scan is much cheaper than reading the capture.  Each (start_offset, end_offset) range can then be read on its own with scapyraw_pcap_records(pcap_file, start_offset, end_offset), e.g. by one worker of a process pool (see 'scapyparallel_map').
+
+    Example:
+        >>> scapyraw_pcap_shards('temp.pcap', 4)\n
+        [(24, 2958), (2958, 5874), (5874, 8797), (8797, 11668)]
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        num_shards (int): Reference the number of byte ranges to split the file into
+
+    Returns:
+        list: Returns a list of (start_offset, end_offset) tuples, in file order
+    """
+    import pathlib
+    import struct
+#    
+    path_obj = pathlib.Path(pcap_file).resolve()
+    file_size = path_obj.stat().st_size
+    target_shard_size = max((file_size - 24) // max(num_shards, 1), 1)
+#    
+    shards = []
+    with path_obj.open('rb') as f:
+        pcap_header = scapyraw_pcap_global_header(f.read(24))
+        record_header = struct.Struct(pcap_header['endian'] + 'IIII')
+#        
+        shard_start = file_offset = 24
+        while True:
+            header_bytes = f.read(16)
+            if len(header_bytes) < 16:
+                break
+            caplen = record_header.unpack(header_bytes)[2]
+            if file_offset + 16 + caplen > file_size:
+                # Truncated final record
+                break
+            if file_offset - shard_start >= target_shard_size:
+                shards.append((shard_start, file_offset))
+                shard_start = file_offset
+            file_offset += 16 + caplen
+            f.seek(file_offset)
+#    
+    if file_offset > shard_start:
+        shards.append((shard_start, file_offset))
+    return shards
+
@@ -0,0 +1,51 @@
+# %%
+#######################################
+def scapyraw_pcap_writer(records, output_file: str, linktype=None, snaplen=262144, nanosecond=False):
+    """Writes raw records (in the (timestamp_ns, file_offset, frame, wirelen, linktype) form yielded by 'scapyraw_pcap_records') straight to a new .pcap file.  The frames are copied byte for byte, without being dissected or re-built by scapy, so this runs at close to disk speed.
+
+    Example:
+        >>> records = scapyraw_pcap_records('temp.pcap')\n
+        >>> udp_records = ( r for r in records if scapyraw_parse_headers(r[2], r[4])['ip_proto'] == 17 )\n
+        >>> scapyraw_pcap_writer(udp_records, 'udp_only.pcap')\n
+        2
+
+    Args:
+        records (iterable): Reference an iterable of raw records
+        output_file (str): Reference the path of the .pcap file to write
+        linktype (int, optional): Reference the linktype to write in the global header. Defaults to None (the linktype of the first record).
+        snaplen (int, optional): Reference the snaplen to write in the global header. Defaults to 262144.
+        nanosecond (bool, optional): If you want to keep nanosecond timestamp precision (e.g. records from a pcapng file), set nanosecond=True to write a nanosecond resolution .pcap. Defaults to False (microsecond resolution).
+
+    Returns:
+        int: Returns the number of records written
+    """
+    import itertools
+    import pathlib
+    import struct
+#    
+    path_obj = pathlib.Path(output_file).resolve()
+    if nanosecond:
+        magic_number, ns_divisor = 0xA1B23C4D, 1
+    else:
+        magic_number, ns_divisor = 0xA1B2C3D4, 1000
+#    
+    record_header = struct.Struct('<IIII')
+    record_count = 0
+    with path_obj.open('wb', buffering=1 << 20) as f:
+        records = iter(records)
+        first_record = next(records, None)
+        if linktype is None:
+            linktype = first_record[4] if first_record else 1
+        f.write(struct.pack('<IHHiIII', magic_number, 2, 4, 0, 0, snaplen, linktype))
+        if first_record is None:
+            return 0
+#        
+        write = f.write
+        for timestamp_ns, file_offset, frame, wirelen, record_linktype in itertools.chain([first_record], records):
+            ts_sec, ts_frac = divmod(timestamp_ns, 1000000000)
+            write(record_header.pack(ts_sec, ts_frac // ns_divisor, len(frame), wirelen or len(frame)))
+            write(frame)
+            record_count += 1
+#    
+    return record_count
+
@@ -0,0 +1,36 @@
+# %%
+#######################################
+def scapyraw_pcapng_packet_block(data, block_offset: int, interface: dict):
+    """Decodes one pcapng packet block (an Enhanced Packet Block, a Simple Packet Block, or an obsolete Packet Block) at a given offset of the file's bytes, given the interface the packet was captured on (from 'scapyraw_pcapng_walk').  Returns a tuple of (timestamp_ns, frame_start, frame_end, wirelen), where the frame is data[frame_start:frame_end].  Simple Packet Blocks carry no timestamp, so theirs is None.
+
+    Example:
+        >>> capture = scapyraw_mmap_open('temp.pcapng')\n
+        >>> scapyraw_pcapng_packet_block(capture['data'], int(capture['offsets'][0]), capture['interfaces'][0])\n
+        (1629217872080297000, 168, 228, 60)
+
+    Reference:
+        https://www.ietf.org/archive/id/draft-ietf-opsawg-pcapng-01.html
+
+    Args:
+        data (bytes | mmap.mmap | memoryview): Reference the bytes of a pcapng file
+        block_offset (int): Reference the offset of the block in the file
+        interface (dict): Reference the interface of the packet (as decoded by 'scapyraw_pcapng_walk')
+
+    Returns:
+        tuple: Returns a tuple of (timestamp_ns, frame_start, frame_end, wirelen)
+    """
+    import struct
+#    
+    endian = interface['endian']
+    block_type, block_length = struct.unpack_from(endian + 'II', data, block_offset)
+    if block_type == 3:
+        wirelen = struct.unpack_from(endian + 'I', data, block_offset + 8)[0]
+        caplen = min(wirelen, block_length - 16)
+        return (None, block_offset + 12, block_offset + 12 + caplen, wirelen)
+#    
+    # Enhanced Packet Blocks (6) and obsolete Packet Blocks (2) have their timestamp and lengths at the same offsets
+    ts_high, ts_low, caplen, wirelen = struct.unpack_from(endian + 'IIII', data, block_offset + 12)
+    timestamp = (ts_high << 32) | ts_low
+    timestamp_ns = timestamp * interface['ts_multiplier'] // interface['ts_divisor'] + interface['ts_offset_ns']
+    return (timestamp_ns, block_offset + 28, block_offset + 28 + caplen, wirelen)
+
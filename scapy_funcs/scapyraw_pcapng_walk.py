@@ -0,0 +1,93 @@
+# %%
+#######################################
+def scapyraw_pcapng_walk(data, interfaces=None):
+    """Walks the blocks of a pcapng file (given as bytes, or better a memory map of the file) and lazily yields each packet, natively (without scapy's RawPcapNgReader).  Handles multiple sections (each with its own byte order) and multiple interfaces (each with its own linktype, timestamp resolution, e.g. nanoseconds, and timestamp offset).
+
+    Each packet is yielded as a tuple of (block_offset, timestamp_ns, frame_start, frame_end, wirelen, interface_index), where the frame is data[frame_start:frame_end], and 'interface_index' is the position of the packet's interface in 'interfaces' (a list the interfaces are appended to as they are found, counting across sections).
+
+    Example:
+        >>> interfaces = []\n
+        >>> with open('temp.pcapng', 'rb') as f:\n
+        ...     data = f.read()\n
+        >>> next(scapyraw_pcapng_walk(data, interfaces))\n
+        (140, 1629217872080297000, 168, 228, 60, 0)
+        >>> interfaces\n
+        [{'linktype': 1, 'snaplen': 262144, 'endian': '<', 'ts_multiplier': 1000, 'ts_divisor': 1, 'ts_offset_ns': 0}]
+
+    Reference:
+        https://www.ietf.org/archive/id/draft-ietf-opsawg-pcapng-01.html
+
+    Args:
+        data (bytes | mmap.mmap | memoryview): Reference the bytes of a pcapng file
+        interfaces (list, optional): Reference a list to collect the interfaces in. Defaults to None (a new list).
+
+    Yields:
+        tuple: Yields a tuple of (block_offset, timestamp_ns, frame_start, frame_end, wirelen, interface_index) for each packet
+    """
+    import struct
+#    
+    if interfaces is None:
+        interfaces = []
+    data_length = len(data)
+    endian = '<'
+    section_interfaces = []
+    block_offset = 0
+#    
+    while block_offset + 12 <= data_length:
+        if data[block_offset:block_offset + 4] == b'\x0a\x0d\x0d\x0a':
+            # Section Header Block, the byte order magic tells the byte order of the whole section
+            byte_order_magic = data[block_offset + 8:block_offset + 12]
+            if byte_order_magic == b'\x4d\x3c\x2b\x1a':
+                endian = '<'
+            elif byte_order_magic == b'\x1a\x2b\x3c\x4d':
+                endian = '>'
+            else:
+                raise ValueError(f"Not a pcapng formatted file (byte order magic: {bytes(byte_order_magic).hex()})")
+            section_interfaces = []
+#        
+        block_type, block_length = struct.unpack_from(endian + 'II', data, block_offset)
+        if block_length < 12 or block_offset + block_length > data_length:
+            # Truncated final block (e.g. a capture that is still being written)
+            break
+#        
+        if block_type == 1:
+            # Interface Description Block, with the if_tsresol (9) and if_tsoffset (14) options
+            linktype, reserved, snaplen = struct.unpack_from(endian + 'HHI', data, block_offset + 8)
+            ts_resolution = 6
+            ts_offset = 0
+            option_offset = block_offset + 16
+            options_end = block_offset + block_length - 4
+            while option_offset + 4 <= options_end:
+                option_code, option_length = struct.unpack_from(endian + 'HH', data, option_offset)
+                if option_code == 0:
+                    break
+                if option_code == 9 and option_length >= 1:
+                    ts_resolution = data[option_offset + 4]
+                elif option_code == 14 and option_length >= 8:
+                    ts_offset = struct.unpack_from(endian + 'q', data, option_offset + 4)[0]
+                option_offset += 4 + ((option_length + 3) & ~3)
+            if ts_resolution & 0x80:
+                # A power of 2 resolution
+                ts_multiplier, ts_divisor = 1000000000, 1 << (ts_resolution & 0x7F)
+            elif ts_resolution <= 9:
+                ts_multiplier, ts_divisor = 10 ** (9 - ts_resolution), 1
+            else:
+                ts_multiplier, ts_divisor = 1, 10 ** (ts_resolution - 9)
+            section_interfaces.append(len(interfaces))
+            interfaces.append({'linktype': linktype, 'snaplen': snaplen, 'endian': endian, 'ts_multiplier': ts_multiplier, 'ts_divisor': ts_divisor, 'ts_offset_ns': ts_offset * 1000000000})
+#        
+        elif block_type in (6, 2, 3):
+            if block_type == 6:
+                section_interface_id = struct.unpack_from(endian + 'I', data, block_offset + 8)[0]
+            elif block_type == 2:
+                section_interface_id = struct.unpack_from(endian + 'H', data, block_offset + 8)[0]
+            else:
+                section_interface_id = 0
+            if section_interface_id >= len(section_interfaces):
+                raise ValueError(f"Packet block at offset {block_offset} refers to interface {section_interface_id}, but its section only describes {len(section_interfaces)} interface(s)")
+            interface_index = section_interfaces[section_interface_id]
+            timestamp_ns, frame_start, frame_end, wirelen = scapyraw_pcapng_packet_block(data, block_offset, interfaces[interface_index])
+            yield (block_offset, timestamp_ns, frame_start, frame_end, wirelen, interface_index)
+#        
+        block_offset += block_length
+
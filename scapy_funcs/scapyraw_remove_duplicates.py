@@ -0,0 +1,48 @@
+# %%
+#######################################
+def scapyraw_remove_duplicates(records, window=1.0, max_entries=100000, tcp_only=True):
+    """Streaming duplicate packet removal over raw records (see 'scapyraw_pcap_records').  Lazily yields each record, in the original order, unless a packet with the same duplicate key (see 'scapyraw_duplicate_key') was already seen in the last 'window' seconds (capture time, counted from the latest copy).  The first copy of each packet is kept.
+
+    Only the keys of the recent packets are held, in an LRU of at most 'max_entries' keys, so captures of any size can be streamed straight into 'scapyraw_pcap_writer'.
+
+    Example:
+        >>> records = scapyraw_remove_duplicates(scapyraw_pcap_records('span_port.pcap'))\n
+        >>> scapyraw_pcap_writer(records, 'span_port_deduplicated.pcap')\n
+        48211
+
+    Args:
+        records (iterable): Reference an iterable of (timestamp_ns, file_offset, frame, wirelen, linktype) records
+        window (float, optional): Reference how many seconds a packet is remembered for. Use None to remember packets for the whole capture (bounded by 'max_entries' only). Defaults to 1.0.
+        max_entries (int, optional): Reference the maximum number of packet keys remembered. Defaults to 100000.
+        tcp_only (bool, optional): Set this to False to also remove duplicates of non-TCP packets. Defaults to True.
+
+    Yields:
+        tuple: Yields each (timestamp_ns, file_offset, frame, wirelen, linktype) record that is not a duplicate
+    """
+    from collections import OrderedDict
+#    
+    window_ns = None if window is None else int(window * 1000000000)
+    recent_keys = OrderedDict()
+#    
+    for record in records:
+        timestamp_ns, file_offset, frame, wirelen, linktype = record
+        key = scapyraw_duplicate_key(frame, linktype, tcp_only=tcp_only)
+        if key is None:
+            yield record
+            continue
+#        
+        # Forgetting the keys that fell out of the time window (oldest first)
+        if window_ns is not None:
+            while recent_keys and next(iter(recent_keys.values())) < timestamp_ns - window_ns:
+                recent_keys.popitem(last=False)
+#        
+        if key in recent_keys:
+            # Refreshing a key on each repeat, so a packet that keeps being duplicated stays remembered
+            recent_keys.move_to_end(key)
+            recent_keys[key] = timestamp_ns
+            continue
+        recent_keys[key] = timestamp_ns
+        if len(recent_keys) > max_entries:
+            recent_keys.popitem(last=False)
+        yield record
+
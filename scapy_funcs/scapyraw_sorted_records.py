@@ -0,0 +1,70 @@
+# %%
+#######################################
+def scapyraw_sorted_records(pcap_file: str, run_size=1000000, temp_dir=None):
+    """Out-of-core timestamp sort of a .pcap file.  Lazily yields the records of the .pcap file (see 'scapyraw_pcap_records') ordered by timestamp, using bounded memory whatever the size of the capture.
+
+    Only the (timestamp, file offset) pair of each record is sorted, never the packets themselves: the pairs are sorted in runs of 'run_size' records, each sorted run is spilled to a temporary file, and the runs are then k-way merged with a heap (heapq.merge) while the records are read back by their file offset.  Records with the same timestamp keep their original order.
+
+    Example:
+        >>> sorted_records = scapyraw_sorted_records('unordered.pcap')\n
+        >>> scapyraw_pcap_writer(sorted_records, 'ordered.pcap')\n
+        48211
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        run_size (int, optional): Reference the number of records sorted in memory per run (16 bytes each). Defaults to 1000000.
+        temp_dir (str, optional): Reference the directory for the temporary run files. Defaults to None (the system's temporary directory).
+
+    Yields:
+        tuple: Yields each (timestamp_ns, file_offset, frame, wirelen, linktype) record, in timestamp order
+    """
+    import array
+    import heapq
+    import tempfile
+#    
+    def read_run(run_file):
+        # Reading a spilled run back in blocks, as (timestamp_ns, file_offset) pairs
+        run_file.seek(0)
+        while True:
+            block = array.array('q')
+            block.frombytes(run_file.read(65536 * 16))
+            if not block:
+                break
+            yield from zip(block[0::2], block[1::2])
+        run_file.close()
+#    
+    run_files = []
+    current_run = []
+    is_sorted = True
+    previous_timestamp_ns = None
+    try:
+        for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(pcap_file):
+            if file_offset is None:
+                raise ValueError("Sorting needs the file offsets of a libpcap formatted file, convert the pcapng file first (e.g. with 'scapyraw_pcap_writer')")
+            if previous_timestamp_ns is not None and timestamp_ns < previous_timestamp_ns:
+                is_sorted = False
+            previous_timestamp_ns = timestamp_ns
+            current_run.append((timestamp_ns, file_offset))
+            if len(current_run) >= run_size:
+                current_run.sort()
+                run_file = tempfile.TemporaryFile(dir=temp_dir)
+                run_file.write(array.array('q', [ value for pair in current_run for value in pair ]).tobytes())
+                run_files.append(run_file)
+                current_run = []
+#        
+        if is_sorted:
+            # Already in timestamp order, so no merge is needed
+            for run_file in run_files:
+                run_file.close()
+            run_files = []
+            yield from scapyraw_pcap_records(pcap_file)
+            return
+#        
+        current_run.sort()
+        runs = [ read_run(run_file) for run_file in run_files ] + [ iter(current_run) ]
+        sorted_offsets = ( file_offset for timestamp_ns, file_offset in heapq.merge(*runs) )
+        yield from scapyraw_pcap_records_at(pcap_file, sorted_offsets)
+    finally:
+        for run_file in run_files:
+            run_file.close()
+
@@ -0,0 +1,68 @@
+# %%
+#######################################
+def scapyraw_transport_checksum(frame: bytes, linktype=1, headers=None):
+    """Reads the TCP / UDP / ICMP / ICMPv6 checksum of a raw frame, and computes what the correct checksum should be, straight from the raw header and payload bytes (with the IPv4 or IPv6 pseudo header where the protocol uses one).  Nothing is copied or re-dissected, unlike the deepcopy / del chksum / IP(bytes(...)) approach.
+
+    Returns a tuple of (protocol_name, packet_checksum, correct_checksum), or None when the checksum cannot be verified: the packet has no TCP/UDP/ICMP layer, is an IP fragment, or was truncated by the snaplen of the capture.
+
+    Example:
+        >>> frag3_pcap = rdpcap('fragments3.pcap')\n
+        >>> [ scapyraw_transport_checksum(bytes(p)) for p in frag3_pcap if p.haslayer(TCP) ][:2]\n
+        [('TCP', 49411, 49411), ('TCP', 14704, 28667)]
+
+    Args:
+        frame (bytes): Reference the raw bytes of a frame
+        linktype (int, optional): Reference the pcap linktype of the frame. Defaults to 1 (Ethernet).
+        headers (dict, optional): Reference the already decoded headers of the frame from 'scapyraw_parse_headers'. Defaults to None (the frame is decoded here).
+
+    Returns:
+        tuple: Returns a tuple of (protocol_name, packet_checksum, correct_checksum), or None
+    """
+    if headers is None:
+        headers = scapyraw_parse_headers(frame, linktype)
+    l4_offset = headers['l4_offset']
+    if l4_offset is None or headers['ip_fragment']:
+        return None
+#    
+    ip_offset = headers['ip_offset']
+    ip_end = headers['ip_end']
+    ip_proto = headers['ip_proto']
+    if headers['ip_version'] == 4:
+        declared_end = ip_offset + int.from_bytes(frame[ip_offset + 2:ip_offset + 4], 'big')
+        address_bytes = frame[ip_offset + 12:ip_offset + 20]
+    else:
+        declared_end = ip_offset + 40 + int.from_bytes(frame[ip_offset + 4:ip_offset + 6], 'big')
+        address_bytes = frame[ip_offset + 8:ip_offset + 40]
+    if ip_end < declared_end:
+        # Truncated by the snaplen of the capture
+        return None
+#    
+    if ip_proto == 6:
+        protocol_name, checksum_offset = 'TCP', l4_offset + 16
+    elif ip_proto == 17:
+        protocol_name, checksum_offset = 'UDP', l4_offset + 6
+    elif ip_proto == 1:
+        protocol_name, checksum_offset = 'ICMP', l4_offset + 2
+    else:
+        protocol_name, checksum_offset = 'ICMPv6', l4_offset + 2
+    packet_checksum = int.from_bytes(frame[checksum_offset:checksum_offset + 2], 'big')
+#    
+    # The pseudo header (addresses, protocol and length), which ICMP over IPv4 does not use
+    segment_length = ip_end - l4_offset
+    if ip_proto == 1:
+        pseudo_header_sum = 0
+    else:
+        pseudo_header_sum = int.from_bytes(address_bytes, 'big') + ip_proto + segment_length
+#    
+    # Summing the whole segment (checksum field included) and then taking the packet's checksum back out, so the segment is never copied to zero the field
+    segment_sum = int.from_bytes(frame[l4_offset:ip_end], 'big')
+    if segment_length % 2:
+        segment_sum <<= 8
+    partial_sum = (segment_sum + pseudo_header_sum + (0xFFFF - packet_checksum)) % 0xFFFF
+    correct_checksum = 0xFFFF - partial_sum if partial_sum else 0
+    if ip_proto == 17 and correct_checksum == 0:
+        # UDP sends a computed checksum of 0 as 0xFFFF (0 means no checksum)
+        correct_checksum = 0xFFFF
+#    
+    return (protocol_name, packet_checksum, correct_checksum)
+
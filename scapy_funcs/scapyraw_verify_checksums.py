@@ -0,0 +1,39 @@
+# %%
+#######################################
+def scapyraw_verify_checksums(packets, linktype=1):
+    """Verifies the IPv4 header, TCP, UDP, ICMP and ICMPv6 checksums of a batch of packets, directly over their raw bytes (see 'scapyraw_transport_checksum'), and returns one boolean per packet.  A packet is False when any checksum it carries is wrong.  Checksums that cannot be verified (IP fragments, packets truncated by the snaplen) and UDP over IPv4 with no checksum (0) count as correct.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> frag3_pcap = rdpcap('fragments3.pcap')\n
+        >>> checksums_ok = scapyraw_verify_checksums(frag3_pcap)\n
+        >>> checksums_ok.sum(), len(checksums_ok)\n
+        (np.int64(123), 129)
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> # Raw records straight from a .pcap file, without any scapy dissection\n
+        >>> checksums_ok = scapyraw_verify_checksums(scapyraw_pcap_records('fragments3.pcap'))\n
+
+    Args:
+        packets (iterable): Reference an iterable of scapy packets (e.g. a PacketList), raw frames (bytes / memoryview), or raw records from 'scapyraw_pcap_records'
+        linktype (int, optional): Reference the pcap linktype of raw frames. Defaults to 1 (Ethernet).
+
+    Returns:
+        numpy.ndarray: Returns a boolean array with one entry per packet
+    """
+    import numpy as np
+#    
+    results = []
+    for pckt in packets:
+        if isinstance(pckt, tuple):
+            frame, frame_linktype = pckt[2], pckt[4]
+        elif isinstance(pckt, (bytes, bytearray, memoryview)):
+            frame, frame_linktype = pckt, linktype
+        else:
+            frame, frame_linktype = bytes(pckt), conf.l2types.layer2num.get(type(pckt), linktype)
+#        
+        is_valid = scapyraw_checksum_valid(frame, frame_linktype)
+        results.append(is_valid)
+#    
+    return np.array(results, dtype=bool)
+
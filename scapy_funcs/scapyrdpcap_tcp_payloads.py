@@ -1,25 +1,24 @@
 # %%
 #######################################
 def scapyrdpcap_tcp_payloads(pcap_file: str):
-    def scapy_orderby_seqnum(packet_list: scapy.plist.PacketList):
-        tcp_only_packetlist = PacketList([ pckt for pckt in packet_list if pckt.haslayer('TCP') ])
-        seq_num_sorted = sorted(tcp_only_packetlist, key=lambda x: x.seq)
-        return PacketList(seq_num_sorted)
-#
-    def scapyget_payload(packet_list: scapy.plist.PacketList):
-        payload_only_list = [pack.load for pack in packet_list if pack.haslayer("Raw")]
-        combined_byte_strings = b"".join(payload_only_list)
-        convert_to_strings = combined_byte_strings.decode()
-        return convert_to_strings
-#    
+    """Returns the reassembled payload of every TCP stream in a .pcap file, as one string per direction of each connection (in the order the streams were first seen).  Built on 'scapystream_tcp_reassemble', so retransmissions, overlaps, out-of-order segments and sequence number wraparound are handled, and the .pcap is streamed rather than loaded with rdpcap.
+
+    Examples:
+        >>> payloads = scapyrdpcap_tcp_payloads('ncat.pcap')\n
+        >>> payloads\n
+        ['Hello\\nHowareyou\\nhaveyoubeenalright\\n', 'Hi\\nGood\\n']
+
+    Args:
+        pcap_file (str): Reference a .pcap file
+
+    Returns:
+        list: Returns a list of strings, one per direction of each TCP stream (bytes that are not valid utf-8 are replaced)
+    """
     def main():
-        full_pcap_packet_list = rdpcap(pcap_file)
-        payload_array = []
-        for sess_key in full_pcap_packet_list.sessions().keys():
-            orderedby_seqnum = scapy_orderby_seqnum(full_pcap_packet_list.sessions()[sess_key])
-            # print( scapyget_payload(orderedby_seqnum) )
-            payload_array.append( scapyget_payload(orderedby_seqnum) )
-        # print(''.join(payload_array))
+        stream_chunks = {}
+        for session_key, direction_key, stream_offset, data in scapystream_tcp_reassemble(pcap_file):
+            stream_chunks.setdefault(direction_key, []).append(data)
+        payload_array = [ b"".join(chunks).decode(errors='replace') for chunks in stream_chunks.values() ]
         return payload_array
 #        
     finalresults = main()
@@ -50,13 +50,12 @@ def scapyremove_bad_checksum_packets(packet_list: scapy.plist.PacketList):
         scapy.plist.PacketList: Returns a PacketList object
     """
     def return_good_checksum_packets_only(packet):
-        from copy import deepcopy
-#        
-        temp_packet = deepcopy(packet)
-        orig_checksum = temp_packet['TCP'].chksum
-        del temp_packet['TCP'].chksum
-        temp_packet = IP(bytes(temp_packet[IP]))
-        recalc_checksum = temp_packet['TCP'].chksum
+        # Comparing the checksum in the raw bytes of the packet with the correct one (see 'scapyraw_transport_checksum'), without copying or re-dissecting the packet
+        linktype = conf.l2types.layer2num.get(type(packet), 1)
+        checksum_result = scapyraw_transport_checksum(bytes(packet), linktype)
+        if checksum_result is None:
+            return packet
+        protocol_name, orig_checksum, recalc_checksum = checksum_result
         comparison = orig_checksum == recalc_checksum
         if comparison:
             return packet
@@ -72,4 +71,3 @@ def scapyremove_bad_checksum_packets(packet_list: scapy.plist.PacketList):
             final_packet_array.append( eachpacket )
 #            
     return PacketList(final_packet_array)
-
@@ -1,111 +1,40 @@
 # %%
 #######################################
-def scapyremove_duplicate_and_badsum_packets(packet_list: scapy.plist.PacketList):
-    """Takes a given PacketList, evaluates each packet, looks for TCP packets that have bad checksums and the TCP packets that have duplicate sequence numbers, and omits the bad checksum and duplicate TCP packets from the returned PacketList.  This tool is simply a combination of "scapyremove_bad_checksum_packets" and then "scapyremove_duplicate_packets".
+def scapyremove_duplicate_and_badsum_packets(packet_list: scapy.plist.PacketList, window=None, tcp_only=True):
+    """Takes a given PacketList, evaluates each packet, looks for TCP packets that have bad checksums and the TCP packets that are duplicates of an earlier packet, and omits the bad checksum and duplicate TCP packets from the returned PacketList.  This tool gives the same results as "scapyremove_bad_checksum_packets" and then "scapyremove_duplicate_packets" (a bad IPv4 header checksum is dropped too, see 'scapyraw_checksum_valid'), but in a single pass: each packet is converted to bytes once, for both checks, and the packets stay in their original order.  See 'scapyclean_pcap' to clean a .pcap file straight to disk.
     
     Examples:
-        >>> from pprint import pprint
-        
-        >>> frag3_pcap = rdpcap('fragments3.pcap')\n
-        >>> frag3_pcap_badsum_removed = scapyremove_bad_checksum_packets(frag3_pcap)\n
-        >>> frag3_pcap_badsum_duplicates_removed = scapyremove_duplicate_packets(frag3_pcap_badsum_removed)\n
-
-        >>> frag3_pcap_badsum_removed\n
-        <PacketList: TCP:9 UDP:0 ICMP:0 Other:114>
-        >>> frag3_pcap_badsum_duplicates_removed\n
-        <PacketList: TCP:6 UDP:0 ICMP:0 Other:114>
-
-        >>> pprint([p[TCP].seq for p in frag3_pcap_badsum_removed if p.haslayer(TCP)])\n
-        [1611997371,\n
-        703601939,\n
-        1611997372,\n
-        703601940,\n
-        703601940,\n
-        1611997826,\n
-        703601940,\n
-        703601940,\n
-        1611997827]\n
-        
-        >>> pprint([p[TCP].seq for p in frag3_pcap_badsum_duplicates_removed if p.haslayer(TCP)])\n
-        [1611997371, 703601939, 1611997372, 1611997826, 703601940, 1611997827]\n
-
-        >>> pprint([scapy_convert_time(p) for p in frag3_pcap_badsum_removed if p.haslayer(TCP)])\n
-        ['2012-05-01 02:37:47.858950',\n
-        '2012-05-01 02:37:47.859186',\n
-        '2012-05-01 02:37:47.859270',\n
-        '2012-05-01 02:37:47.859354',\n
-        '2012-05-01 02:37:47.866939',\n
-        '2012-05-01 02:37:51.519281',\n
-        '2012-05-01 02:37:51.519904',\n
-        '2012-05-01 02:37:51.520007',\n
-        '2012-05-01 02:37:51.520196']\n
-        
-        >>> pprint([scapy_convert_time(p) for p in frag3_pcap_badsum_duplicates_removed if p.haslayer(TCP)])\n
-        ['2012-05-01 02:37:47.858950',\n
-        '2012-05-01 02:37:47.859186',\n
-        '2012-05-01 02:37:47.859270',\n
-        '2012-05-01 02:37:51.519281',\n
-        '2012-05-01 02:37:51.520007',\n
-        '2012-05-01 02:37:51.520196']\n
+        >>> packet_list = PacketList([Ether()/IP(src='10.1.1.1', dst='10.1.1.100')/TCP(sport=1046, dport=22, seq=100)/b'hello',\n
+        ...                           Ether()/IP(src='10.1.1.1', dst='10.1.1.100')/TCP(sport=1046, dport=22, seq=100)/b'hello',\n
+        ...                           Ether()/IP(src='10.1.1.1', dst='10.1.1.100')/TCP(sport=1046, dport=22, seq=105, chksum=0x1234)/b'world',\n
+        ...                           Ether()/IP(src='10.1.1.1', dst='10.1.1.100')/UDP(sport=53, dport=53)])\n
+        >>> cleaned = scapyremove_duplicate_and_badsum_packets(packet_list)\n
+        >>> cleaned\n
+        <PacketList: TCP:1 UDP:1 ICMP:0 Other:0>
+        >>> [p.summary() for p in cleaned]\n
+        ['Ether / IP / TCP 10.1.1.1:1046 > 10.1.1.100:ssh S / Raw', 'Ether / IP / UDP 10.1.1.1:domain > 10.1.1.100:domain']
 
     Args:
         packet_list (scapy.plist.PacketList): Reference a given PacketList object
+        window (float, optional): Reference how many seconds apart two copies of a packet can be and still be duplicates. Defaults to None (anywhere in the PacketList).
+        tcp_only (bool, optional): Set this to False to also remove the bad checksum and duplicate packets of other protocols. Defaults to True.
         
     Returns:
         scapy.plist.PacketList: Returns a PacketList object
-    """    
-    my_packet_list = packet_list
-#    
-    def scapyremove_bad_checksum_packets(packet_list: scapy.plist.PacketList):
-#        
-        def return_good_checksum_packets_only(packet):
-            from copy import deepcopy
-#            
-            temp_packet = deepcopy(packet)
-            orig_checksum = temp_packet['TCP'].chksum
-            del temp_packet['TCP'].chksum
-            temp_packet = IP(bytes(temp_packet[IP]))
-            recalc_checksum = temp_packet['TCP'].chksum
-            comparison = orig_checksum == recalc_checksum
-            if comparison:
-                return packet
-#                
-        final_packet_array = []
-#                
+    """
+    # Each record is yielded (or dropped) by 'scapyraw_remove_duplicates' as soon as it is read, so the packet checked last is the one a yielded record came from
+    current_packet = [None]
+    def checked_records():
         for eachpacket in packet_list:
-            if eachpacket.haslayer('TCP'):
-                temp_results = return_good_checksum_packets_only(eachpacket)
-                if temp_results:
-                    final_packet_array.append( eachpacket )
-            else:
-                final_packet_array.append( eachpacket )
-#                
-        return PacketList(final_packet_array)
-#    
-#
-    def scapyremove_duplicate_packets(packet_list: scapy.plist.PacketList):
-#    
-        temp_dict = {}
-        non_tcp_packets = []
-#        
-        for pckt in packet_list:
-            if pckt.haslayer(TCP):
-                temp_dict[pckt[TCP].seq] = pckt
-            else:
-                non_tcp_packets.append(pckt)
-#            
-        deduplicated_tcp_packets = list(temp_dict.values())
-#        
-        rejoin_deduplicated = non_tcp_packets + deduplicated_tcp_packets
-        packetlist_obj = PacketList(rejoin_deduplicated)
-        time_sorted_deduplicated_array = sorted(packetlist_obj, key=lambda x: x.time)
-#        
-        return PacketList(time_sorted_deduplicated_array)
-#
-#
-    packet_list_no_bad_checksum = scapyremove_bad_checksum_packets(my_packet_list)
+            linktype = conf.l2types.layer2num.get(type(eachpacket), 1)
+            frame = bytes(eachpacket)
+            headers = scapyraw_parse_headers(frame, linktype)
+            if (headers['ip_proto'] == 6 or not tcp_only) and not scapyraw_checksum_valid(frame, linktype, headers):
+                continue
+            current_packet[0] = eachpacket
+            yield (int(Decimal(str(eachpacket.time)) * 1000000000), None, frame, None, linktype)
 #    
-    packet_list_deduped_no_badsum = scapyremove_duplicate_packets(packet_list_no_bad_checksum)
+    final_packet_array = [ current_packet[0] for record in scapyraw_remove_duplicates(checked_records(), window=window, max_entries=len(packet_list) + 1, tcp_only=tcp_only) ]
 #    
-    return packet_list_deduped_no_badsum
+    return PacketList(final_packet_array)
 
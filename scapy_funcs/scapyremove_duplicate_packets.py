@@ -1,73 +1,32 @@
 # %%
 #######################################
-def scapyremove_duplicate_packets(packet_list: scapy.plist.PacketList):
-    """Takes a given PacketList, evaluates each packet, looks for TCP packets that have duplicate sequence numbers, and omits the TCP packets with the duplicate sequence numbers from the returned PacketList.
+def scapyremove_duplicate_packets(packet_list: scapy.plist.PacketList, window=None, tcp_only=True):
+    """Takes a given PacketList, evaluates each packet, looks for TCP packets that are duplicates of an earlier packet (the same flow, TCP sequence number, acknowledgment number, flags and payload), and omits the duplicate TCP packets from the returned PacketList.  The first copy of each packet is kept, and the packets stay in their original order.  Packets from unrelated flows that happen to share a sequence number are not duplicates.  See 'scapystream_remove_duplicates' for streaming over a PcapReader.
     
     Examples:
         >>> from pprint import pprint
-        
-        >>> frag3_pcap = rdpcap('fragments3.pcap')\n
-        >>> frag3_pcap_badsum_removed = scapyremove_bad_checksum_packets(frag3_pcap)\n
-        >>> frag3_pcap_badsum_duplicates_removed = scapyremove_duplicate_packets(frag3_pcap_badsum_removed)\n
-
-        >>> frag3_pcap_badsum_removed\n
-        <PacketList: TCP:9 UDP:0 ICMP:0 Other:114>
-        >>> frag3_pcap_badsum_duplicates_removed\n
-        <PacketList: TCP:6 UDP:0 ICMP:0 Other:114>
 
-        >>> pprint([p[TCP].seq for p in frag3_pcap_badsum_removed if p.haslayer(TCP)])\n
-        [1611997371,\n
-        703601939,\n
-        1611997372,\n
-        703601940,\n
-        703601940,\n
-        1611997826,\n
-        703601940,\n
-        703601940,\n
-        1611997827]\n
-        
-        >>> pprint([p[TCP].seq for p in frag3_pcap_badsum_duplicates_removed if p.haslayer(TCP)])\n
-        [1611997371, 703601939, 1611997372, 1611997826, 703601940, 1611997827]\n
-
-        >>> pprint([scapy_convert_time(p) for p in frag3_pcap_badsum_removed if p.haslayer(TCP)])\n
-        ['2012-05-01 02:37:47.858950',\n
-        '2012-05-01 02:37:47.859186',\n
-        '2012-05-01 02:37:47.859270',\n
-        '2012-05-01 02:37:47.859354',\n
-        '2012-05-01 02:37:47.866939',\n
-        '2012-05-01 02:37:51.519281',\n
-        '2012-05-01 02:37:51.519904',\n
-        '2012-05-01 02:37:51.520007',\n
-        '2012-05-01 02:37:51.520196']\n
-        
-        >>> pprint([scapy_convert_time(p) for p in frag3_pcap_badsum_duplicates_removed if p.haslayer(TCP)])\n
-        ['2012-05-01 02:37:47.858950',\n
-        '2012-05-01 02:37:47.859186',\n
-        '2012-05-01 02:37:47.859270',\n
-        '2012-05-01 02:37:51.519281',\n
-        '2012-05-01 02:37:51.520007',\n
-        '2012-05-01 02:37:51.520196']\n
+        >>> packet_list = PacketList([Ether()/IP(src='10.1.1.1', dst='10.1.1.100')/TCP(sport=1046, dport=22, seq=100)/b'hello',\n
+        ...                           Ether()/IP(src='10.1.1.2', dst='10.1.1.100')/TCP(sport=1047, dport=22, seq=100)/b'hello',\n
+        ...                           Ether()/IP(src='10.1.1.1', dst='10.1.1.100')/TCP(sport=1046, dport=22, seq=100)/b'hello',\n
+        ...                           Ether()/IP(src='10.1.1.1', dst='10.1.1.100')/UDP(sport=53, dport=53)])\n
+        >>> deduplicated = scapyremove_duplicate_packets(packet_list)\n
+        >>> deduplicated\n
+        <PacketList: TCP:2 UDP:1 ICMP:0 Other:0>
+        >>> pprint([p.summary() for p in deduplicated])\n
+        ['Ether / IP / TCP 10.1.1.1:1046 > 10.1.1.100:ssh S / Raw',\n
+        'Ether / IP / TCP 10.1.1.2:1047 > 10.1.1.100:ssh S / Raw',\n
+        'Ether / IP / UDP 10.1.1.1:domain > 10.1.1.100:domain']\n
 
     Args:
         packet_list (scapy.plist.PacketList): Reference a given PacketList object
+        window (float, optional): Reference how many seconds apart two copies of a packet can be and still be duplicates. Defaults to None (anywhere in the PacketList).
+        tcp_only (bool, optional): Set this to False to also remove duplicates of non-TCP packets. Defaults to True.
         
     Returns:
         scapy.plist.PacketList: Returns a PacketList object
     """
-    temp_dict = {}
-    non_tcp_packets = []
-#    
-    for pckt in packet_list:
-        if pckt.haslayer(TCP):
-            temp_dict[pckt[TCP].seq] = pckt
-        else:
-            non_tcp_packets.append(pckt)
-#        
-    deduplicated_tcp_packets = list(temp_dict.values())
-#    
-    rejoin_deduplicated = non_tcp_packets + deduplicated_tcp_packets
-    packetlist_obj = PacketList(rejoin_deduplicated)
-    time_sorted_deduplicated_array = sorted(packetlist_obj, key=lambda x: x.time)
+    deduplicated_array = list(scapystream_remove_duplicates(packet_list, window=window, max_entries=len(packet_list) + 1, tcp_only=tcp_only))
 #    
-    return PacketList(time_sorted_deduplicated_array)
+    return PacketList(deduplicated_array)
 
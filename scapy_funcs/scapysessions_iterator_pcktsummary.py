@@ -26,7 +26,7 @@ def scapysessions_iterator_pcktsummary(packet_list: scapy.plist.PacketList):
     Args:
         packet_list (scapy.plist.PacketList): Reference an existing PacketList object.
     """
-    for sess_key in packet_list.sessions().keys():
-        session_packet_list = packet_list.sessions()[sess_key]
+    # Calling sessions() once, as every call re-groups the whole PacketList
+    for sess_key, session_packet_list in packet_list.sessions().items():
         [print(pckt.summary()) for pckt in session_packet_list]
 
@@ -0,0 +1,64 @@
+# %%
+#######################################
+def scapysessions_table(packet_list: scapy.plist.PacketList, rebuild=False):
+    """Groups the packets of a PacketList into bidirectional sessions in a single pass, and returns a dict of session key -> NumPy array of the indexes of that session's packets in the PacketList.  Both directions of a conversation share one key, written in the direction of the first packet seen, e.g. 'TCP 172.20.10.14:58662 <> 172.20.10.10:8000'.  Packets without an IP layer are grouped under 'Other'.
+
+    The table is cached on the PacketList object, so calling this again (or calling 'scapysessions_table_packets' / 'scapysessions_table_iterator') does not re-group the capture, unlike PacketList.sessions() which re-groups the whole capture on every call.  The cache is rebuilt if the PacketList has changed length.
+
+    Example:
+        >>> sessions_pcap = rdpcap('sessions.pcap')\n
+        >>> table = scapysessions_table(sessions_pcap)\n
+        >>> list(table)[:2]\n
+        ['TCP 172.20.10.14:58662 <> 172.20.10.10:8000', 'TCP 172.20.10.14:58664 <> 172.20.10.10:8000']
+        >>> table['TCP 172.20.10.14:58662 <> 172.20.10.10:8000'][:5]\n
+        array([0, 1, 2, 3, 4])
+
+    Args:
+        packet_list (scapy.plist.PacketList): Reference an existing PacketList object
+        rebuild (bool, optional): If you want to ignore the cached table and re-group the packets, set rebuild=True. Defaults to False.
+
+    Returns:
+        dict: Returns a dict of session key -> numpy.ndarray of packet indexes
+    """
+    import numpy as np
+#    
+    cached = getattr(packet_list, '_scapysessions_table', None)
+    if cached and cached[0] == len(packet_list) and not rebuild:
+        return cached[1]
+#    
+    proto_names = {1: 'ICMP', 6: 'TCP', 17: 'UDP', 58: 'ICMPv6'}
+    session_keys = {}
+    session_indexes = {}
+#    
+    for packet_index, pckt in enumerate(packet_list):
+        headers = scapyraw_parse_headers(bytes(pckt), conf.l2types.layer2num.get(type(pckt), 1))
+        if headers['ip_version'] is None:
+            session_indexes.setdefault('Other', []).append(packet_index)
+            continue
+#        
+        # The same canonical (sorted) endpoints for both directions of the conversation
+        src_endpoint = (headers['ip_src'], headers['sport'])
+        dst_endpoint = (headers['ip_dst'], headers['dport'])
+        canonical_key = (headers['ip_proto'],) + tuple(sorted((src_endpoint, dst_endpoint), key=lambda e: (e[0], e[1] or 0)))
+        session_key = session_keys.get(canonical_key)
+        if session_key is None:
+            proto_name = proto_names.get(headers['ip_proto'], f"IP proto={headers['ip_proto']}")
+            src_ip = scapyraw_format_address(headers['ip_src'])
+            dst_ip = scapyraw_format_address(headers['ip_dst'])
+            if headers['sport'] is not None:
+                session_key = f"{proto_name} {src_ip}:{headers['sport']} <> {dst_ip}:{headers['dport']}"
+            else:
+                session_key = f"{proto_name} {src_ip} <> {dst_ip}"
+            session_keys[canonical_key] = session_key
+        session_indexes.setdefault(session_key, []).append(packet_index)
+#    
+    table = { session_key: np.array(indexes, dtype=np.int64) for session_key, indexes in session_indexes.items() }
+#    
+    try:
+        packet_list._scapysessions_table = (len(packet_list), table)
+    except AttributeError:
+        # Not every PacketList-like object accepts new attributes, those simply go uncached
+        pass
+#    
+    return table
+
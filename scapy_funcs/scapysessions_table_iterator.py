@@ -0,0 +1,22 @@
+# %%
+#######################################
+def scapysessions_table_iterator(packet_list: scapy.plist.PacketList):
+    """Lazily yields a (session_key, PacketList) tuple for each bidirectional session in a PacketList, using the (cached) session table from 'scapysessions_table'.  The capture is grouped once, and each session's PacketList is only built when the iteration reaches it, so iterating over a very large number of sessions stays linear in the number of packets.
+
+    Example:
+        >>> sessions_pcap = rdpcap('sessions.pcap')\n
+        >>> for session_key, session_packet_list in scapysessions_table_iterator(sessions_pcap):\n
+        ...     print(session_key, session_packet_list)\n
+        TCP 172.20.10.14:58662 <> 172.20.10.10:8000 <PacketList: TCP:27 UDP:0 ICMP:0 Other:0>
+        TCP 172.20.10.14:58664 <> 172.20.10.10:8000 <PacketList: TCP:27 UDP:0 ICMP:0 Other:0>
+
+    Args:
+        packet_list (scapy.plist.PacketList): Reference an existing PacketList object
+
+    Yields:
+        tuple: Yields a tuple of (session_key, PacketList) for each session
+    """
+    table = scapysessions_table(packet_list)
+    for session_key, indexes in table.items():
+        yield session_key, PacketList([ packet_list[i] for i in indexes ])
+
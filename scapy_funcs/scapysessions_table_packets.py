@@ -0,0 +1,20 @@
+# %%
+#######################################
+def scapysessions_table_packets(packet_list: scapy.plist.PacketList, session_key: str):
+    """Returns the packets of one bidirectional session as a PacketList, using the (cached) session table from 'scapysessions_table'.  Only this session's PacketList is built, so looking up a single session does not materialize every session in the capture.
+
+    Example:
+        >>> sessions_pcap = rdpcap('sessions.pcap')\n
+        >>> scapysessions_table_packets(sessions_pcap, 'TCP 172.20.10.14:58662 <> 172.20.10.10:8000')\n
+        <PacketList: TCP:27 UDP:0 ICMP:0 Other:0>
+
+    Args:
+        packet_list (scapy.plist.PacketList): Reference an existing PacketList object
+        session_key (str): Reference a session key from 'scapysessions_table'
+
+    Returns:
+        scapy.plist.PacketList: Returns a PacketList of the packets in the session
+    """
+    table = scapysessions_table(packet_list)
+    return PacketList([ packet_list[i] for i in table[session_key] ])
+
@@ -0,0 +1,119 @@
+# %%
+#######################################
+def scapysniffoffline_pipeline(packet_source, prn=None, lfilter=None, workers=4, use_processes=False, queue_size=1000, ordered=True):
+    """Pipeline version of sniff(offline=..., prn=..., lfilter=...), for callbacks too slow to run inline (e.g. lookups, enrichment, heavy parsing).  A reader thread reads the packets and feeds them to a pool of worker threads (or processes, with 'use_processes=True') that run the callbacks, and the results are lazily yielded as they come back, in the original packet order ('ordered=True') or as soon as each one is ready ('ordered=False').
+
+    At most 'queue_size' packets are in flight at once: when the workers (or the consumer of the results) fall behind, the reader waits, so memory stays bounded whatever the size of the capture.  The results of the packets 'lfilter' rejects are skipped; without a 'prn', the packets 'lfilter' accepts are yielded.  With processes, the callbacks must be picklable (defined at the top level of a module), and the packets are sent to the workers as raw bytes and dissected there.  See 'scapysniffoffline_pipeline_async' for an asyncio-friendly version.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> def scapyprocessor(packetin):\n
+        ...     return f"UDP packet sent from {packetin['IP'].src}"\n
+        >>> for result in scapysniffoffline_pipeline('temp.pcap', prn=scapyprocessor, lfilter=lambda p: p.haslayer('UDP')):\n
+        ...     print(result)\n
+        UDP packet sent from 49.22.3.9\n
+        UDP packet sent from 49.22.3.9\n
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> results = list(scapysniffoffline_pipeline('huge.pcap', prn=my_enrichment, workers=16, use_processes=True, ordered=False))\n
+
+    Args:
+        packet_source (str | iterable): Reference a .pcap (or .pcapng) file, or an iterable of scapy packets (PacketList, PcapReader, or a 'scapystream_*' generator)
+        prn (function, optional): Reference the function to run on each packet. Defaults to None.
+        lfilter (function, optional): Reference the function deciding which packets 'prn' is run on. Defaults to None.
+        workers (int, optional): Reference the number of worker threads (or processes). Defaults to 4.
+        use_processes (bool, optional): Set this to True to run the callbacks in worker processes rather than threads (for CPU-bound callbacks). Defaults to False.
+        queue_size (int, optional): Reference the maximum number of packets in flight. Defaults to 1000.
+        ordered (bool, optional): Set this to False to get the results as soon as they are ready, rather than in packet order. Defaults to True.
+
+    Yields:
+        object: Yields the result of 'prn' for each packet accepted by 'lfilter'
+    """
+    import functools
+    import queue
+    import threading
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+#    
+    if isinstance(packet_source, str):
+        if use_processes:
+            # Raw records are cheaper to send to other processes than dissected packets
+            items = scapyraw_pcap_records(packet_source)
+        else:
+            items = ( scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen) for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(packet_source) )
+    else:
+        items = packet_source
+#    
+    executor = ProcessPoolExecutor(max_workers=workers) if use_processes else ThreadPoolExecutor(max_workers=workers)
+    task = functools.partial(scapysniffoffline_pipeline_apply, prn=prn, lfilter=lfilter)
+    futures_queue = queue.Queue()
+    # A slot is taken for each packet submitted and given back once its result has been consumed, so the reader waits when the workers or the consumer fall behind
+    in_flight = threading.Semaphore(queue_size)
+    stop_reading = threading.Event()
+    end_of_packets = object()
+    # The futures submitted but not consumed yet, cancelled if the consumer stops early (the lock keeps the reader from submitting while they are being cancelled)
+    unconsumed = set()
+    submit_lock = threading.Lock()
+#    
+    def reader():
+        try:
+            for item in items:
+                while not in_flight.acquire(timeout=0.1):
+                    if stop_reading.is_set():
+                        return
+                with submit_lock:
+                    if stop_reading.is_set():
+                        return
+                    future = executor.submit(task, item)
+                    unconsumed.add(future)
+                futures_queue.put(future)
+            futures_queue.put(end_of_packets)
+        except BaseException as error:
+            futures_queue.put(error)
+#    
+    reader_thread = threading.Thread(target=reader, daemon=True)
+    reader_thread.start()
+    try:
+        if ordered:
+            while True:
+                future = futures_queue.get()
+                if future is end_of_packets:
+                    break
+                if isinstance(future, BaseException):
+                    raise future
+                kept, result = future.result()
+                unconsumed.discard(future)
+                in_flight.release()
+                if kept:
+                    yield result
+        else:
+            pending = set()
+            reading = True
+            while reading or pending:
+                # Taking every future already queued (waiting for one when nothing is pending), then yielding the finished ones; the in-flight slots keep 'pending' within queue_size
+                while reading:
+                    try:
+                        future = futures_queue.get(block=not pending)
+                    except queue.Empty:
+                        break
+                    if future is end_of_packets:
+                        reading = False
+                    elif isinstance(future, BaseException):
+                        raise future
+                    else:
+                        pending.add(future)
+                if not pending:
+                    continue
+                done, pending = wait(pending, timeout=0.1 if reading else None, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kept, result = future.result()
+                    unconsumed.discard(future)
+                    in_flight.release()
+                    if kept:
+                        yield result
+    finally:
+        with submit_lock:
+            stop_reading.set()
+            for future in list(unconsumed):
+                future.cancel()
+        executor.shutdown(wait=False)
+
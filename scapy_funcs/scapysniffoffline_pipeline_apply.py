@@ -0,0 +1,27 @@
+# %%
+#######################################
+def scapysniffoffline_pipeline_apply(item, prn=None, lfilter=None):
+    """Worker for 'scapysniffoffline_pipeline': turns a raw record into a packet (when given a record rather than a packet), then runs the 'lfilter' and 'prn' callbacks on it, like sniff() does.  Returns a tuple of (kept, result), where 'kept' is False when 'lfilter' rejected the packet, and 'result' is what 'prn' returned (or the packet itself when there is no 'prn').
+
+    Example:
+        >>> pckt = rdpcap('temp.pcap')[0]\n
+        >>> scapysniffoffline_pipeline_apply(pckt, prn=lambda p: p['IP'].src, lfilter=lambda p: p.haslayer('UDP'))\n
+        (True, '66.17.1.2')
+
+    Args:
+        item (object): Reference a packet, or a (timestamp_ns, file_offset, frame, wirelen, linktype) record
+        prn (function, optional): Reference the function to run on each packet. Defaults to None.
+        lfilter (function, optional): Reference the function deciding which packets 'prn' is run on. Defaults to None.
+
+    Returns:
+        tuple: Returns a tuple of (kept, result)
+    """
+    if isinstance(item, tuple):
+        timestamp_ns, file_offset, frame, wirelen, linktype = item
+        item = scapyraw_frame_to_packet(frame, timestamp_ns, linktype, wirelen)
+    if lfilter is not None and not lfilter(item):
+        return (False, None)
+    if prn is None:
+        return (True, item)
+    return (True, prn(item))
+
@@ -0,0 +1,38 @@
+# %%
+#######################################
+async def scapysniffoffline_pipeline_async(packet_source, prn=None, lfilter=None, workers=4, use_processes=False, queue_size=1000, ordered=True):
+    """asyncio version of 'scapysniffoffline_pipeline': an async iterator over the results of the callbacks, for consumers running in an event loop.  The pipeline runs in its own threads (or processes), and each result is awaited without blocking the event loop.
+
+    Example:
+        >>> async def main():\n
+        ...     async for result in scapysniffoffline_pipeline_async('temp.pcap', prn=lambda p: p.summary(), lfilter=lambda p: p.haslayer('UDP')):\n
+        ...         print(result)\n
+        >>> asyncio.run(main())\n
+        Ether / IP / UDP 49.22.3.9:58429 > 185.34.210.1:10001 / Raw\n
+
+    Args:
+        packet_source (str | iterable): Reference a .pcap (or .pcapng) file, or an iterable of scapy packets
+        prn (function, optional): Reference the function to run on each packet. Defaults to None.
+        lfilter (function, optional): Reference the function deciding which packets 'prn' is run on. Defaults to None.
+        workers (int, optional): Reference the number of worker threads (or processes). Defaults to 4.
+        use_processes (bool, optional): Set this to True to run the callbacks in worker processes rather than threads. Defaults to False.
+        queue_size (int, optional): Reference the maximum number of packets in flight. Defaults to 1000.
+        ordered (bool, optional): Set this to False to get the results as soon as they are ready, rather than in packet order. Defaults to True.
+
+    Yields:
+        object: Yields the result of 'prn' for each packet accepted by 'lfilter'
+    """
+    import asyncio
+#    
+    loop = asyncio.get_running_loop()
+    results = scapysniffoffline_pipeline(packet_source, prn=prn, lfilter=lfilter, workers=workers, use_processes=use_processes, queue_size=queue_size, ordered=ordered)
+    end_of_results = object()
+    try:
+        while True:
+            result = await loop.run_in_executor(None, next, results, end_of_results)
+            if result is end_of_results:
+                break
+            yield result
+    finally:
+        results.close()
+
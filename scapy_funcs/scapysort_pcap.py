@@ -0,0 +1,26 @@
+# %%
+#######################################
+def scapysort_pcap(pcap_file: str, output_file: str, run_size=1000000, temp_dir=None):
+    """Writes a copy of a .pcap file with its packets ordered by timestamp.  Unlike 'scapy_orderby_timestamp', which sorts a PacketList in memory, this is an out-of-core sort (see 'scapyraw_sorted_records') that streams the records straight to the new .pcap file, so it works on captures far larger than RAM.
+
+    Example:
+        >>> scapysort_pcap('unordered.pcap', 'ordered.pcap')\n
+        48211
+
+    Args:
+        pcap_file (str): Reference a .pcap file (libpcap format)
+        output_file (str): Reference the path of the new .pcap file
+        run_size (int, optional): Reference the number of records sorted in memory per run. Defaults to 1000000.
+        temp_dir (str, optional): Reference the directory for the temporary run files. Defaults to None (the system's temporary directory).
+
+    Returns:
+        int: Returns the number of packets written
+    """
+    import pathlib
+#    
+    with pathlib.Path(pcap_file).resolve().open('rb') as f:
+        pcap_header = scapyraw_pcap_global_header(f.read(24))
+#    
+    sorted_records = scapyraw_sorted_records(pcap_file, run_size=run_size, temp_dir=temp_dir)
+    return scapyraw_pcap_writer(sorted_records, output_file, linktype=pcap_header['linktype'], snaplen=pcap_header['snaplen'], nanosecond=pcap_header['ns_multiplier'] == 1)
+
@@ -0,0 +1,223 @@
+# %%
+#######################################
+def scapystats_pcap(packet_source, output_file=None, top=10, max_tracked=10000, interval=1.0):
+    """Computes the statistics of a capture in one streaming pass over the raw records (no scapy dissection), and returns them as a JSON-ready dict (and writes them as JSON to 'output_file', if given).  Unlike 'scapysniffoffline_summary', which prints the summary of every packet, this is meant for captures of tens of millions of packets.
+
+    The statistics are:
+        - 'capture': the number of packets and bytes, the first / last timestamps and the duration
+        - 'protocol_hierarchy': the packets and bytes of each stack of protocols (e.g. 'eth:vlan:ipv6:tcp')
+        - 'top_talkers': the ip addresses sending or receiving the most bytes / packets
+        - 'top_conversations': the conversations (both directions) with the most bytes
+        - 'ports': the most used TCP and UDP destination ports
+        - 'packets_per_second': the mean and max rate, and a histogram of how many intervals had each rate (in power-of-two buckets)
+        - 'flow_durations': the number of flows, the mean and max duration, a histogram of the durations (in power-of-ten buckets) and the longest flows
+        - 'tcp_flag_anomalies': the number of packets with flag combinations that normal TCP stacks never send (SYN+FIN, SYN+RST, FIN without ACK, null and Xmas scans)
+
+    Memory grows with the number of flows (one small entry each).  The talker and conversation counts are kept in bounded Space-Saving sketches of 'max_tracked' entries, so they stay bounded however many distinct hosts there are; their counts are exact until more than 'max_tracked' keys are seen, and can only be overestimated after that (by at most the 'error' given with each of them).
+
+    Examples:
+        >>> stats = scapystats_pcap('temp.pcap', output_file='temp_stats.json')\n
+        >>> stats['protocol_hierarchy']\n
+        {'eth:ipv4:udp': {'packets': 1, 'bytes': 60}}
+        >>> stats['top_talkers']['by_bytes']\n
+        [{'address': '66.17.1.2', 'bytes': 60, 'error': 0}, {'address': '185.34.210.1', 'bytes': 60, 'error': 0}]
+
+    Args:
+        packet_source (str | iterable): Reference a .pcap (or .pcapng) file, or an iterable of scapy packets (PacketList, PcapReader, or a 'scapystream_*' generator)
+        output_file (str, optional): Reference the path of a .json file to write the statistics to. Defaults to None.
+        top (int, optional): Reference how many entries to report in each top list. Defaults to 10.
+        max_tracked (int, optional): Reference the size of the talker and conversation sketches. Defaults to 10000.
+        interval (float, optional): Reference the length in seconds of the intervals the packet rate is measured over. Defaults to 1.0.
+
+    Returns:
+        dict: Returns a dict of the statistics
+    """
+    import json
+    import math
+    import pathlib
+#    
+    if isinstance(packet_source, str):
+        records = scapyraw_pcap_records(packet_source)
+    else:
+        records = ( (int(Decimal(str(pckt.time)) * 1000000000), None, bytes(pckt), None, conf.l2types.layer2num.get(type(pckt), 1)) for pckt in packet_source )
+#    
+    def sketch_add(sketch, key, weight):
+        # Space-Saving, pruned in batches: once the sketch holds twice its size, only the largest counts are kept, and keys seen again afterwards start from the largest count dropped (so counts are never underestimated)
+        entry = sketch['counts'].get(key)
+        if entry is None:
+            sketch['counts'][key] = [sketch['floor'] + weight, sketch['floor']]
+            if len(sketch['counts']) >= 2 * max_tracked:
+                ranked = sorted(sketch['counts'].items(), key=lambda x: x[1][0], reverse=True)
+                sketch['floor'] = ranked[max_tracked][1][0]
+                sketch['counts'] = dict(ranked[:max_tracked])
+        else:
+            entry[0] += weight
+#    
+    def sketch_top(sketch, name, value_name):
+        ranked = sorted(sketch['counts'].items(), key=lambda x: x[1][0], reverse=True)[:top]
+        return [ {name: key, value_name: count, 'error': error} for key, (count, error) in ranked ]
+#    
+    linktype_names = {1: 'eth', 101: 'raw', 228: 'raw', 229: 'raw', 12: 'raw', 14: 'raw', 113: 'sll', 276: 'sll2'}
+    ethertype_names = {0x0800: 'ipv4', 0x86DD: 'ipv6', 0x0806: 'arp', 0x8035: 'rarp', 0x88CC: 'lldp'}
+    ip_proto_names = {1: 'icmp', 2: 'igmp', 4: 'ipip', 6: 'tcp', 17: 'udp', 41: 'ipv6', 47: 'gre', 50: 'esp', 51: 'ah', 58: 'icmpv6', 132: 'sctp'}
+    FIN, SYN, RST, PSH, ACK, URG = 0x01, 0x02, 0x04, 0x08, 0x10, 0x20
+#    
+    packet_count = 0
+    byte_count = 0
+    first_timestamp_ns = None
+    last_timestamp_ns = None
+    hierarchy = {}
+    talkers_bytes = {'counts': {}, 'floor': 0}
+    talkers_packets = {'counts': {}, 'floor': 0}
+    conversations_bytes = {'counts': {}, 'floor': 0}
+    tcp_ports = {}
+    udp_ports = {}
+    interval_counts = {}
+    interval_ns = int(interval * 1000000000)
+    flows = {}
+    anomalies = {'syn_fin': 0, 'syn_rst': 0, 'fin_without_ack': 0, 'null': 0, 'xmas': 0}
+#    
+    for timestamp_ns, file_offset, frame, wirelen, linktype in records:
+        headers = scapyraw_parse_headers(frame, linktype)
+        packet_bytes = wirelen or len(frame)
+        packet_count += 1
+        byte_count += packet_bytes
+        if first_timestamp_ns is None or timestamp_ns < first_timestamp_ns:
+            first_timestamp_ns = timestamp_ns
+        if last_timestamp_ns is None or timestamp_ns > last_timestamp_ns:
+            last_timestamp_ns = timestamp_ns
+        interval_key = timestamp_ns // interval_ns
+        interval_counts[interval_key] = interval_counts.get(interval_key, 0) + 1
+#        
+        # Protocol hierarchy
+        layers = [linktype_names.get(linktype, f'linktype={linktype}')]
+        if headers['vlan']:
+            layers.append('vlan')
+        if headers['ip_version'] is not None:
+            layers.append('ipv4' if headers['ip_version'] == 4 else 'ipv6')
+            if headers['ip_fragment'] and headers['l4_offset'] is None:
+                layers.append('fragment')
+            else:
+                layers.append(ip_proto_names.get(headers['ip_proto'], f"ipproto={headers['ip_proto']}"))
+        elif headers['ethertype'] is not None:
+            layers.append(ethertype_names.get(headers['ethertype'], f"ethertype=0x{headers['ethertype']:04x}"))
+        hierarchy_key = ':'.join(layers)
+        hierarchy_entry = hierarchy.setdefault(hierarchy_key, {'packets': 0, 'bytes': 0})
+        hierarchy_entry['packets'] += 1
+        hierarchy_entry['bytes'] += packet_bytes
+#        
+        if headers['ip_src'] is None:
+            continue
+#        
+        # Talkers and conversations
+        src_ip = scapyraw_format_address(headers['ip_src'])
+        dst_ip = scapyraw_format_address(headers['ip_dst'])
+        for address in (src_ip, dst_ip):
+            sketch_add(talkers_bytes, address, packet_bytes)
+            sketch_add(talkers_packets, address, 1)
+        conversation_key = f'{src_ip} <> {dst_ip}' if headers['ip_src'] <= headers['ip_dst'] else f'{dst_ip} <> {src_ip}'
+        sketch_add(conversations_bytes, conversation_key, packet_bytes)
+#        
+        # Ports
+        ip_proto = headers['ip_proto']
+        if ip_proto == 6 and headers['dport'] is not None:
+            tcp_ports[headers['dport']] = tcp_ports.get(headers['dport'], 0) + 1
+        elif ip_proto == 17 and headers['dport'] is not None:
+            udp_ports[headers['dport']] = udp_ports.get(headers['dport'], 0) + 1
+#        
+        # Flows (both directions of a 5-tuple)
+        src_endpoint = (headers['ip_src'], headers['sport'])
+        dst_endpoint = (headers['ip_dst'], headers['dport'])
+        flow_key = (ip_proto,) + ((src_endpoint, dst_endpoint) if src_endpoint <= dst_endpoint else (dst_endpoint, src_endpoint))
+        flow = flows.get(flow_key)
+        if flow is None:
+            flows[flow_key] = [timestamp_ns, timestamp_ns, 1, packet_bytes]
+        else:
+            if timestamp_ns < flow[0]:
+                flow[0] = timestamp_ns
+            if timestamp_ns > flow[1]:
+                flow[1] = timestamp_ns
+            flow[2] += 1
+            flow[3] += packet_bytes
+#        
+        # TCP flag anomalies
+        if ip_proto == 6 and headers['tcp_flags'] is not None:
+            tcp_flags = headers['tcp_flags']
+            if tcp_flags & SYN and tcp_flags & FIN:
+                anomalies['syn_fin'] += 1
+            if tcp_flags & SYN and tcp_flags & RST:
+                anomalies['syn_rst'] += 1
+            if tcp_flags & FIN and not tcp_flags & ACK:
+                anomalies['fin_without_ack'] += 1
+            if tcp_flags & 0x3F == 0:
+                anomalies['null'] += 1
+            if tcp_flags & (FIN | PSH | URG) == (FIN | PSH | URG):
+                anomalies['xmas'] += 1
+#    
+    # Packet rate
+    interval_rates = [ count / interval for count in interval_counts.values() ]
+    if packet_count:
+        total_intervals = int((last_timestamp_ns // interval_ns) - (first_timestamp_ns // interval_ns)) + 1
+        rate_histogram = {}
+        empty_intervals = total_intervals - len(interval_counts)
+        if empty_intervals:
+            rate_histogram['0'] = empty_intervals
+        for count in sorted(interval_counts.values()):
+            bucket = 2 ** int(math.log2(count))
+            bucket_key = f'{bucket}-{2 * bucket - 1}'
+            rate_histogram[bucket_key] = rate_histogram.get(bucket_key, 0) + 1
+        packets_per_second = {'interval': interval, 'mean': packet_count / interval / total_intervals, 'max': max(interval_rates), 'histogram': rate_histogram}
+    else:
+        packets_per_second = {'interval': interval, 'mean': 0, 'max': 0, 'histogram': {}}
+#    
+    # Flow durations
+    duration_histogram = {}
+    for flow in flows.values():
+        duration = (flow[1] - flow[0]) / 1000000000
+        bucket_key = '0' if duration == 0 else f"<{10 ** math.ceil(math.log10(duration)):g}s"
+        duration_histogram[bucket_key] = duration_histogram.get(bucket_key, 0) + 1
+    longest_flows = sorted(flows.items(), key=lambda x: x[1][1] - x[1][0], reverse=True)[:top]
+    flow_durations = {
+        'flows': len(flows),
+        'mean': sum([ flow[1] - flow[0] for flow in flows.values() ]) / 1000000000 / len(flows) if flows else 0,
+        'max': (longest_flows[0][1][1] - longest_flows[0][1][0]) / 1000000000 if flows else 0,
+        'histogram': dict(sorted(duration_histogram.items(), key=lambda x: 0 if x[0] == '0' else float(x[0][1:-1]))),
+        'longest': [
+            {
+                'flow': f"{ip_proto_names.get(flow_key[0], flow_key[0])} {scapyraw_format_address(flow_key[1][0])}{'' if flow_key[1][1] is None else f':{flow_key[1][1]}'} <> {scapyraw_format_address(flow_key[2][0])}{'' if flow_key[2][1] is None else f':{flow_key[2][1]}'}",
+                'duration': (flow[1] - flow[0]) / 1000000000, 'packets': flow[2], 'bytes': flow[3],
+            }
+            for flow_key, flow in longest_flows
+        ],
+    }
+#    
+    stats = {
+        'capture': {
+            'packets': packet_count,
+            'bytes': byte_count,
+            'first_timestamp': None if first_timestamp_ns is None else first_timestamp_ns / 1000000000,
+            'last_timestamp': None if last_timestamp_ns is None else last_timestamp_ns / 1000000000,
+            'duration': 0 if first_timestamp_ns is None else (last_timestamp_ns - first_timestamp_ns) / 1000000000,
+        },
+        'protocol_hierarchy': dict(sorted(hierarchy.items(), key=lambda x: x[1]['packets'], reverse=True)),
+        'top_talkers': {
+            'by_bytes': sketch_top(talkers_bytes, 'address', 'bytes'),
+            'by_packets': sketch_top(talkers_packets, 'address', 'packets'),
+        },
+        'top_conversations': sketch_top(conversations_bytes, 'conversation', 'bytes'),
+        'ports': {
+            'tcp_dport': [ {'port': port, 'packets': count} for port, count in sorted(tcp_ports.items(), key=lambda x: x[1], reverse=True)[:top] ],
+            'udp_dport': [ {'port': port, 'packets': count} for port, count in sorted(udp_ports.items(), key=lambda x: x[1], reverse=True)[:top] ],
+            'distinct_tcp_dports': len(tcp_ports),
+            'distinct_udp_dports': len(udp_ports),
+        },
+        'packets_per_second': packets_per_second,
+        'flow_durations': flow_durations,
+        'tcp_flag_anomalies': anomalies,
+    }
+#    
+    if output_file:
+        with pathlib.Path(output_file).resolve().open('w') as f:
+            json.dump(stats, f, indent=4)
+    return stats
+
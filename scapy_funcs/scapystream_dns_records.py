@@ -0,0 +1,47 @@
+# %%
+#######################################
+def scapystream_dns_records(packet_source, responses_only=False, cache_size=10000):
+    """Lazily yields one row per DNS message sent over UDP port 53 in a .pcap file (or a PacketList), parsed straight from the raw UDP payload bytes by 'scapyraw_dns_parse' rather than dissected into scapy DNS objects.  The decoded names are kept in an LRU cache of 'cache_size' names shared across the whole capture.  Payloads that are not well-formed DNS messages are skipped.
+
+    Each row is a tuple of (ts, client, qname, qtype, rcode, answers): the timestamp (float seconds), the ip address of the client (the source of a query, the destination of a response), the first question name, the query type name (e.g. 'A', 'AAAA', or the number when it has no name), the response code name (e.g. 'NOERROR', 'NXDOMAIN'; None for a query) and the list of answer data.
+
+    Example:
+        >>> for row in scapystream_dns_records('dns.pcap', responses_only=True):\n
+        >>>     print(row)\n
+        (1629217872.080297, '192.168.0.5', 'www.example.com', 'A', 'NOERROR', ['example.com', '93.184.216.34'])
+
+    Args:
+        packet_source (str | iterable): Reference a .pcap (or .pcapng) file, or an iterable of scapy packets (PacketList, PcapReader, or a 'scapystream_*' generator)
+        responses_only (bool, optional): If you only want the responses (which carry the rcode and answers), set responses_only=True. Defaults to False.
+        cache_size (int, optional): Reference the maximum number of decoded names kept in the cache. Defaults to 10000.
+
+    Yields:
+        tuple: Yields (ts, client, qname, qtype, rcode, answers) for each DNS message
+    """
+    import collections
+#    
+    rcode_names = {0: 'NOERROR', 1: 'FORMERR', 2: 'SERVFAIL', 3: 'NXDOMAIN', 4: 'NOTIMP', 5: 'REFUSED', 6: 'YXDOMAIN', 7: 'YXRRSET', 8: 'NXRRSET', 9: 'NOTAUTH', 10: 'NOTZONE'}
+    name_cache = collections.OrderedDict()
+#    
+    if isinstance(packet_source, str):
+        records = scapyraw_pcap_records(packet_source)
+    else:
+        records = ( (int(Decimal(str(pckt.time)) * 1000000000), None, bytes(pckt), None, conf.l2types.layer2num.get(type(pckt), 1)) for pckt in packet_source )
+#    
+    for timestamp_ns, file_offset, frame, wirelen, linktype in records:
+        headers = scapyraw_parse_headers(frame, linktype)
+        if headers['ip_proto'] != 17 or headers['ip_fragment'] or (headers['sport'] != 53 and headers['dport'] != 53):
+            continue
+        payload = frame[headers['payload_offset']:headers['payload_offset'] + headers['payload_len']]
+        parsed = scapyraw_dns_parse(payload, name_cache, cache_size)
+        if parsed is None:
+            continue
+        # The QR bit, not the port, tells a response apart (a resolver also sends its queries from port 53)
+        is_response = parsed['qr'] == 1
+        if responses_only and not is_response:
+            continue
+        client = scapyraw_format_address(headers['ip_dst'] if is_response else headers['ip_src'])
+        qtype = dnstypes.get(parsed['qtype'], parsed['qtype'])
+        rcode = rcode_names.get(parsed['rcode'], parsed['rcode']) if is_response else None
+        yield (timestamp_ns / 1000000000, client, parsed['qname'], qtype, rcode, [ data for name, rtype, ttl, data in parsed['answers'] ])
+
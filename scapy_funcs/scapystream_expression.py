@@ -0,0 +1,23 @@
+# %%
+#######################################
+def scapystream_expression(packets, expression: str):
+    """Streaming version of 'scapyfilter_packetlist'.  Takes an iterable of packets and a BPF-like filter expression (see 'scapyfilter_compile'), and lazily yields each packet that matches the expression.
+
+    Example:
+        >>> packet_stream = scapystream_pcapreader('huge.pcap')\n
+        >>> packet_stream = scapystream_expression(packet_stream, 'udp and port 53 and not host 8.8.8.8')\n
+        >>> scapystream_pcapwriter(packet_stream, 'dns_not_google.pcap')\n
+        1207
+
+    Args:
+        packets (iterable): Reference an iterable of packets (PacketList, PcapReader, or another 'scapystream_*' generator)
+        expression (str): Reference a filter expression
+
+    Yields:
+        scapy.layers.l2.Ether: Yields each matching packet
+    """
+    predicate = scapyfilter_compile(expression)
+    for pckt in packets:
+        if predicate(scapyraw_parse_headers(bytes(pckt), conf.l2types.layer2num.get(type(pckt), 1))):
+            yield pckt
+
@@ -0,0 +1,31 @@
+# %%
+#######################################
+def scapystream_filter(packets, *predicates):
+    """Lazily yields each packet from a given iterable of packets (a PacketList, a PcapReader, or another 'scapystream_*' generator) where every one of the given predicate functions returns True.  The predicates are evaluated in the order given and stop at the first one that returns False.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> packet_stream = scapystream_pcapreader('temp.pcap')\n
+        >>> udp_from_66 = scapystream_filter(packet_stream, lambda p: p.haslayer('UDP'), lambda p: p['IP'].src.startswith('66.'))\n
+        >>> PacketList(list(udp_from_66))\n
+        <PacketList: TCP:0 UDP:1 ICMP:0 Other:0>
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> # Chaining stages, and streaming the results to a new .pcap file\n
+        >>> packet_stream = scapystream_pcapreader('huge.pcap')\n
+        >>> packet_stream = scapystream_filter(packet_stream, lambda p: p.haslayer('TCP'))\n
+        >>> packet_stream = scapystream_ip_address(packet_stream, '10.1.1.1', src=True)\n
+        >>> scapystream_pcapwriter(packet_stream, 'filtered.pcap')\n
+        1523
+
+    Args:
+        packets (iterable): Reference an iterable of packets
+        *predicates (function): Reference one or more functions that take a packet and return True (keep) or False (discard)
+
+    Yields:
+        scapy.layers.l2.Ether: Yields each packet that satisfies all of the predicates
+    """
+    for pckt in packets:
+        if all(predicate(pckt) for predicate in predicates):
+            yield pckt
+
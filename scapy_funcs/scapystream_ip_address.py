@@ -0,0 +1,39 @@
+# %%
+#######################################
+def scapystream_ip_address(packets, ip: str, dst=False, src=False, notin=False):
+    """Streaming version of 'scapyget_ip_address'.  Takes an iterable of packets and a partial/full string of an ip address and lazily yields each packet that contains that ip address (or that DOES NOT contain that ip address if the notin=True switch is turned on).
+
+    Example:
+        >>> packet_stream = scapystream_pcapreader('temp.pcap')\n
+        >>> example = scapystream_ip_address(packet_stream, '185.34.210')\n
+        >>> next(example)\n
+        <Ether  dst=b4:38:91:24:c9:d9 src=a8:81:71:e3:22:61 type=IPv4 |<IP  version=4 ihl=5 tos=0x0 len=32 id=52361 flags=DF frag=0 ttl=1 proto=udp chksum=0xf6a1 src=66.17.1.2 dst=185.34.210.1 |<UDP  sport=58429 dport=10001 len=12 chksum=0x3ce5 |<Raw  load='\x01\x00\x00\x00' |<Padding  load='\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00' |>>>>>
+
+    Args:
+        packets (iterable): Reference an iterable of packets (PacketList, PcapReader, or another 'scapystream_*' generator)
+        ip (str): Reference an ip address
+        dst (bool, optional): If you want to only search the [IP].dst field, set dst=True. Defaults to False.
+        src (bool, optional): If you want to only search the [IP].src field, set src=True. Defaults to False.
+        notin (bool, optional): If you want to get every packet that DOES NOT contain a given ip address, set notin=True. Defaults to False.
+
+    Yields:
+        scapy.layers.l2.Ether: Yields each matching packet
+    """
+    if dst and src:
+        print("The defaults of this tool will search for the given ip address in both the [IP].dst and the [IP].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return
+#    
+    if dst:
+        def is_match(pckt):
+            return ip in pckt['IP'].dst
+    elif src:
+        def is_match(pckt):
+            return ip in pckt['IP'].src
+    else:
+        def is_match(pckt):
+            return (ip in pckt['IP'].src) or (ip in pckt['IP'].dst)
+#    
+    for pckt in packets:
+        if pckt.haslayer('IP') and ( is_match(pckt) != notin ):
+            yield pckt
+
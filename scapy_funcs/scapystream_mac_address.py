@@ -0,0 +1,39 @@
+# %%
+#######################################
+def scapystream_mac_address(packets, mac: str, dst=False, src=False, notin=False):
+    """Streaming version of 'scapyget_mac_address'.  Takes an iterable of packets and a partial/full string of a mac address (in the form aa:bb:cc:dd:11:22) and lazily yields each packet that contains that mac address (or that DOES NOT contain that mac address if the notin=True switch is turned on).
+
+    Example:
+        >>> packet_stream = scapystream_pcapreader('temp.pcap')\n
+        >>> example = scapystream_mac_address(packet_stream, '64:5a', notin=True)\n
+        >>> PacketList(list(example))\n
+        <PacketList: TCP:0 UDP:2 ICMP:0 Other:0>
+
+    Args:
+        packets (iterable): Reference an iterable of packets (PacketList, PcapReader, or another 'scapystream_*' generator)
+        mac (str): Reference a mac address
+        dst (bool, optional): If you want to only search the [Ether].dst field, set dst=True. Defaults to False.
+        src (bool, optional): If you want to only search the [Ether].src field, set src=True. Defaults to False.
+        notin (bool, optional): If you want to get every packet that DOES NOT contain a given mac address, set notin=True. Defaults to False.
+
+    Yields:
+        scapy.layers.l2.Ether: Yields each matching packet
+    """
+    if dst and src:
+        print("The defaults of this tool will search for the given mac address in both the [Ether].dst and the [Ether].src fields.  If you only want to search for 'dst' field OR the 'src' field use, dst=True or src=True, respectively (but don't turn them both on).")
+        return
+#    
+    if dst:
+        def is_match(pckt):
+            return mac in pckt['Ether'].dst
+    elif src:
+        def is_match(pckt):
+            return mac in pckt['Ether'].src
+    else:
+        def is_match(pckt):
+            return (mac in pckt['Ether'].src) or (mac in pckt['Ether'].dst)
+#    
+    for pckt in packets:
+        if pckt.haslayer('Ether') and ( is_match(pckt) != notin ):
+            yield pckt
+
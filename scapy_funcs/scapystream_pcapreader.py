@@ -0,0 +1,27 @@
+# %%
+#######################################
+def scapystream_pcapreader(pcap_file: str):
+    """Lazily yields each packet from a given .pcap file, one at a time, using a PcapReader.  Nothing is held in memory other than the current packet, so this is the starting point for a streaming filter pipeline (see the 'scapystream_*' functions) over very large capture files.
+
+    Example:
+        >>> packet_stream = scapystream_pcapreader('temp.pcap')\n
+        >>> next(packet_stream)\n
+        <Ether  dst=b4:38:91:24:c9:d9 src=a8:81:71:e3:22:61 type=IPv4 |<IP  version=4 ihl=5 tos=0x0 len=32 id=52361 flags=DF frag=0 ttl=1 proto=udp chksum=0xf6a1 src=66.17.1.2 dst=185.34.210.1 |<UDP  sport=58429 dport=10001 len=12 chksum=0x3ce5 |<Raw  load='\x01\x00\x00\x00' |<Padding  load='\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00' |>>>>>
+
+    Args:
+        pcap_file (str): Reference a .pcap file
+
+    Yields:
+        scapy.layers.l2.Ether: Yields each packet in the .pcap file
+    """
+    import pathlib
+#    
+    path_obj = pathlib.Path(pcap_file).resolve().as_posix()
+    pcap_reader = PcapReader(path_obj)
+#    
+    try:
+        for pckt in pcap_reader:
+            yield pckt
+    finally:
+        pcap_reader.close()
+
@@ -0,0 +1,36 @@
+# %%
+#######################################
+def scapystream_pcapwriter(packets, output_file: str, append=False):
+    """Writes each packet from a given iterable of packets (such as the generators returned by the 'scapystream_*' functions) to a .pcap file as the packets arrive, so the full set of results never has to be held in memory.
+
+    Example:
+        >>> packet_stream = scapystream_pcapreader('huge.pcap')\n
+        >>> packet_stream = scapystream_tcp_port(packet_stream, 443)\n
+        >>> scapystream_pcapwriter(packet_stream, 'https_only.pcap')\n
+        88412
+
+    Args:
+        packets (iterable): Reference an iterable of packets
+        output_file (str): Reference the path of the .pcap file to write
+        append (bool, optional): If you want to append to an existing .pcap file instead of overwriting it, set append=True. Defaults to False.
+
+    Returns:
+        int: Returns the number of packets written
+    """
+    import pathlib
+#    
+    path_obj = pathlib.Path(output_file).resolve().as_posix()
+    pcap_writer = PcapWriter(path_obj, append=append, sync=False)
+#    
+    packet_count = 0
+    try:
+        for pckt in packets:
+            if isinstance(pckt, ScapyLazyPacket):
+                pckt = pckt.packet
+            pcap_writer.write(pckt)
+            packet_count += 1
+    finally:
+        pcap_writer.close()
+#    
+    return packet_count
+
@@ -0,0 +1,42 @@
+# %%
+#######################################
+def scapystream_port(packets, port: int, sport=False, dport=False, notin=False):
+    """Streaming version of 'scapyget_port'.  Takes an iterable of packets and a port number and lazily yields each TCP or UDP packet that has that port in the sport or dport field (or that DOES NOT have that port if the notin=True switch is turned on).
+
+    Example:
+        >>> packet_stream = scapystream_pcapreader('huge.pcap')\n
+        >>> packet_stream = scapystream_ip_address(packet_stream, '10.1.1.1')\n
+        >>> packet_stream = scapystream_port(packet_stream, 53)\n
+        >>> scapystream_pcapwriter(packet_stream, 'dns_for_host.pcap')\n
+        318
+
+    Args:
+        packets (iterable): Reference an iterable of packets (PacketList, PcapReader, or another 'scapystream_*' generator)
+        port (int): Reference a port number
+        sport (bool, optional): If you want to only search the [TCP/UDP].sport field, set sport=True. Defaults to False.
+        dport (bool, optional): If you want to only search the [TCP/UDP].dport field, set dport=True. Defaults to False.
+        notin (bool, optional): If you want to get every TCP/UDP packet that DOES NOT contain the given port, set notin=True. Defaults to False.
+
+    Yields:
+        scapy.layers.l2.Ether: Yields each matching packet
+    """
+    if sport and dport:
+        print("The defaults of this tool will search for the given port in both the [TCP/UDP].sport and the [TCP/UDP].dport fields.  If you only want to search for 'sport' field OR the 'dport' field use, sport=True or dport=True, respectively (but don't turn them both on).")
+        return
+#    
+    if sport:
+        def is_match(layer):
+            return layer.sport == port
+    elif dport:
+        def is_match(layer):
+            return layer.dport == port
+    else:
+        def is_match(layer):
+            return (layer.sport == port) or (layer.dport == port)
+#    
+    for pckt in packets:
+        for proto in ('TCP', 'UDP'):
+            if pckt.haslayer(proto) and ( is_match(pckt[proto]) != notin ):
+                yield pckt
+                break
+
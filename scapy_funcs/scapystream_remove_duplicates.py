@@ -0,0 +1,30 @@
+# %%
+#######################################
+def scapystream_remove_duplicates(packets, window=1.0, max_entries=100000, tcp_only=True):
+    """Streaming version of 'scapyremove_duplicate_packets'.  Takes an iterable of packets and lazily yields each packet, in the original order, unless a packet with the same flow, TCP sequence number and payload (see 'scapyraw_duplicate_key') was already seen in the last 'window' seconds.  Only the keys of the recent packets are held (in an LRU of at most 'max_entries' keys), so it can stream from a PcapReader straight into a PcapWriter.
+
+    Example:
+        >>> packet_stream = scapystream_pcapreader('span_port.pcap')\n
+        >>> packet_stream = scapystream_remove_duplicates(packet_stream)\n
+        >>> scapystream_pcapwriter(packet_stream, 'span_port_deduplicated.pcap')\n
+        48211
+
+    Args:
+        packets (iterable): Reference an iterable of packets (PacketList, PcapReader, or another 'scapystream_*' generator)
+        window (float, optional): Reference how many seconds a packet is remembered for. Use None to remember packets for the whole capture (bounded by 'max_entries' only). Defaults to 1.0.
+        max_entries (int, optional): Reference the maximum number of packet keys remembered. Defaults to 100000.
+        tcp_only (bool, optional): Set this to False to also remove duplicates of non-TCP packets. Defaults to True.
+
+    Yields:
+        scapy.layers.l2.Ether: Yields each packet that is not a duplicate
+    """
+    # Each record is yielded (or dropped) by 'scapyraw_remove_duplicates' as soon as it is read, so the packet read last is the one a yielded record came from
+    current_packet = [None]
+    def packet_records():
+        for pckt in packets:
+            current_packet[0] = pckt
+            yield (int(Decimal(str(pckt.time)) * 1000000000), None, bytes(pckt), None, conf.l2types.layer2num.get(type(pckt), 1))
+#    
+    for record in scapyraw_remove_duplicates(packet_records(), window=window, max_entries=max_entries, tcp_only=tcp_only):
+        yield current_packet[0]
+
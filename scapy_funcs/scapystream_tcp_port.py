@@ -0,0 +1,39 @@
+# %%
+#######################################
+def scapystream_tcp_port(packets, port: int, sport=False, dport=False, notin=False):
+    """Streaming version of 'scapyget_tcp_port'.  Takes an iterable of packets and a port number and lazily yields each TCP packet that has that port in the [TCP].sport or [TCP].dport field (or that DOES NOT have that port if the notin=True switch is turned on).
+
+    Example:
+        >>> packet_stream = scapystream_pcapreader('huge.pcap')\n
+        >>> packet_stream = scapystream_tcp_port(packet_stream, 53, dport=True)\n
+        >>> scapystream_pcapwriter(packet_stream, 'tcp_53.pcap')\n
+        1207
+
+    Args:
+        packets (iterable): Reference an iterable of packets (PacketList, PcapReader, or another 'scapystream_*' generator)
+        port (int): Reference a port number
+        sport (bool, optional): If you want to only search the [TCP].sport field, set sport=True. Defaults to False.
+        dport (bool, optional): If you want to only search the [TCP].dport field, set dport=True. Defaults to False.
+        notin (bool, optional): If you want to get every TCP packet that DOES NOT contain the given port, set notin=True. Defaults to False.
+
+    Yields:
+        scapy.layers.l2.Ether: Yields each matching packet
+    """
+    if sport and dport:
+        print("The defaults of this tool will search for the given port in both the [TCP].sport and the [TCP].dport fields.  If you only want to search for 'sport' field OR the 'dport' field use, sport=True or dport=True, respectively (but don't turn them both on).")
+        return
+#    
+    if sport:
+        def is_match(pckt):
+            return pckt['TCP'].sport == port
+    elif dport:
+        def is_match(pckt):
+            return pckt['TCP'].dport == port
+    else:
+        def is_match(pckt):
+            return (pckt['TCP'].sport == port) or (pckt['TCP'].dport == port)
+#    
+    for pckt in packets:
+        if pckt.haslayer('TCP') and ( is_match(pckt) != notin ):
+            yield pckt
+
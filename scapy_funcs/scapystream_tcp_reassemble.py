@@ -0,0 +1,149 @@
+# %%
+#######################################
+def scapystream_tcp_reassemble(packet_source, idle_timeout=300, max_buffer=1048576, check_every=10000, end_markers=False):
+    """Streaming, bidirectional TCP stream reassembly.  Follows every TCP connection in a .pcap file (or in an iterable of packets) and lazily yields the contiguous bytes of each direction of each stream as they become available, so multi-GB captures can be followed stream-by-stream in bounded memory.
+
+    Each direction tracks its initial sequence number and works with relative stream offsets (so sequence number wraparound is handled), drops retransmitted data, trims overlapping segments, and holds out-of-order segments in a buffer of at most 'max_buffer' bytes until the gap before them is filled.  If the buffer fills up, the missing bytes are given up on and the stream continues from the first buffered segment.  Connections are forgotten once both sides have sent a FIN (or either side a RST), or after 'idle_timeout' seconds (capture time) without a packet.
+
+    Each chunk is yielded as a tuple of (session_key, direction_key, stream_offset, data), where 'session_key' names the connection in both directions (in the direction of the first packet seen, e.g. 'TCP 10.1.1.1:1046 <> 10.1.1.100:22'), 'direction_key' names the sending side ('TCP 10.1.1.1:1046 > 10.1.1.100:22') and 'stream_offset' is the position of 'data' in that direction's stream.  With 'end_markers=True', an empty chunk (data == b'') is also yielded for each direction when its connection is flushed and forgotten, at the offset where that direction ended, so consumers holding per-direction state can let it go.
+
+    Examples:
+        >>> ##### EXAMPLE 1 #####\n
+        >>> for session_key, direction_key, stream_offset, data in scapystream_tcp_reassemble('ncat.pcap'):\n
+        ...     print(direction_key, stream_offset, data)\n
+        TCP 127.0.0.1:52253 > 127.0.0.1:9898 0 b'Hello\\n'
+        TCP 127.0.0.1:52253 > 127.0.0.1:9898 6 b'Howareyou\\n'
+        TCP 127.0.0.1:52253 > 127.0.0.1:9898 16 b'haveyoubeenalright\\n'
+
+        >>> ##### EXAMPLE 2 #####\n
+        >>> # Following the streams of an already filtered packet stream\n
+        >>> packet_stream = scapystream_tcp_port(scapystream_pcapreader('huge.pcap'), 80)\n
+        >>> http_chunks = scapystream_tcp_reassemble(packet_stream)\n
+
+    Args:
+        packet_source (str | iterable): Reference a .pcap file, or an iterable of scapy packets (PacketList, PcapReader, or a 'scapystream_*' generator)
+        idle_timeout (int, optional): Reference the number of seconds (in capture time) after which an idle connection is flushed and forgotten. Defaults to 300.
+        max_buffer (int, optional): Reference the maximum number of out-of-order bytes to hold per direction. Defaults to 1048576.
+        check_every (int, optional): Reference how many packets to process between checks for idle connections. Defaults to 10000.
+        end_markers (bool, optional): Set this to True to get an empty chunk for each direction of a connection when the connection is flushed. Defaults to False.
+
+    Yields:
+        tuple: Yields a tuple of (session_key, direction_key, stream_offset, data) for each contiguous chunk of stream data
+    """
+    import heapq
+#    
+    if isinstance(packet_source, str):
+        records = scapyraw_pcap_records(packet_source)
+    else:
+        records = ( (int(Decimal(str(pckt.time)) * 1000000000), None, bytes(pckt), None, conf.l2types.layer2num.get(type(pckt), 1)) for pckt in packet_source )
+#    
+    FIN, SYN, RST = 0x01, 0x02, 0x04
+    connections = {}
+#    
+    def new_direction():
+        return {'next_seq': None, 'next_offset': 0, 'pending': [], 'pending_bytes': 0, 'closed': False}
+#    
+    def drain(session_key, direction_key, direction, force=False):
+        # Emitting the buffered segments that are now contiguous (or, when forced, skipping any gap before them)
+        pending = direction['pending']
+        while pending and (force or pending[0][0] <= direction['next_offset']):
+            segment_start, segment_data = heapq.heappop(pending)
+            direction['pending_bytes'] -= len(segment_data)
+            if segment_start > direction['next_offset']:
+                direction['next_offset'] = segment_start
+            segment_end = segment_start + len(segment_data)
+            if segment_end <= direction['next_offset']:
+                continue
+            chunk = segment_data[direction['next_offset'] - segment_start:]
+            yield (session_key, direction_key, direction['next_offset'], chunk)
+            direction['next_offset'] = segment_end
+#    
+    def flush(connection_key):
+        connection = connections.pop(connection_key)
+        for direction_key, direction in connection['directions'].items():
+            yield from drain(connection['session_key'], direction_key, direction, force=True)
+            if end_markers:
+                yield (connection['session_key'], direction_key, direction['next_offset'], b'')
+#    
+    packet_count = 0
+    for timestamp_ns, file_offset, frame, wirelen, linktype in records:
+        headers = scapyraw_parse_headers(frame, linktype)
+        if headers['ip_proto'] != 6 or headers['sport'] is None:
+            continue
+        packet_count += 1
+#        
+        src_endpoint = (headers['ip_src'], headers['sport'])
+        dst_endpoint = (headers['ip_dst'], headers['dport'])
+        connection_key = (src_endpoint, dst_endpoint) if src_endpoint <= dst_endpoint else (dst_endpoint, src_endpoint)
+        connection = connections.get(connection_key)
+        if connection is None:
+            src_ip = scapyraw_format_address(headers['ip_src'])
+            dst_ip = scapyraw_format_address(headers['ip_dst'])
+            connection = {
+                'session_key': f"TCP {src_ip}:{headers['sport']} <> {dst_ip}:{headers['dport']}",
+                'directions': {},
+                'direction_keys': {
+                    src_endpoint: f"TCP {src_ip}:{headers['sport']} > {dst_ip}:{headers['dport']}",
+                    dst_endpoint: f"TCP {dst_ip}:{headers['dport']} > {src_ip}:{headers['sport']}",
+                },
+                'last_seen': timestamp_ns,
+            }
+            connections[connection_key] = connection
+        connection['last_seen'] = timestamp_ns
+        direction_key = connection['direction_keys'][src_endpoint]
+        direction = connection['directions'].setdefault(direction_key, new_direction())
+#        
+        tcp_seq = headers['tcp_seq']
+        tcp_flags = headers['tcp_flags']
+        payload = frame[headers['payload_offset']:headers['payload_offset'] + headers['payload_len']]
+#        
+        if tcp_flags & SYN:
+            # The SYN consumes one sequence number, the stream data starts right after it
+            if direction['next_seq'] is None:
+                direction['next_seq'] = (tcp_seq + 1) & 0xFFFFFFFF
+            tcp_seq = (tcp_seq + 1) & 0xFFFFFFFF
+        elif direction['next_seq'] is None:
+            # Joined mid-stream, the first segment seen starts the stream
+            direction['next_seq'] = tcp_seq
+#        
+        if payload:
+            # Signed 32 bit distance from the next expected sequence number, which handles wraparound
+            delta = (tcp_seq - direction['next_seq']) & 0xFFFFFFFF
+            if delta >= 0x80000000:
+                delta -= 0x100000000
+            segment_start = direction['next_offset'] + delta
+            segment_end = segment_start + len(payload)
+#            
+            if segment_end > direction['next_offset']:
+                if segment_start <= direction['next_offset']:
+                    # In order (or overlapping data already delivered, which is trimmed)
+                    chunk = bytes(payload[direction['next_offset'] - segment_start:])
+                    yield (connection['session_key'], direction_key, direction['next_offset'], chunk)
+                    direction['next_offset'] = segment_end
+                    yield from drain(connection['session_key'], direction_key, direction)
+                else:
+                    # Out of order, held until the gap before it is filled
+                    heapq.heappush(direction['pending'], (segment_start, bytes(payload)))
+                    direction['pending_bytes'] += len(payload)
+                    if direction['pending_bytes'] > max_buffer:
+                        yield from drain(connection['session_key'], direction_key, direction, force=True)
+                # Keeping next_seq in step with next_offset, whichever way the offset moved
+                direction['next_seq'] = (tcp_seq - (segment_start - direction['next_offset'])) & 0xFFFFFFFF
+#        
+        if tcp_flags & RST:
+            yield from flush(connection_key)
+            continue
+        if tcp_flags & FIN:
+            direction['closed'] = True
+            if len(connection['directions']) == 2 and all(d['closed'] for d in connection['directions'].values()):
+                yield from flush(connection_key)
+                continue
+#        
+        if packet_count % check_every == 0:
+            idle_cutoff = timestamp_ns - idle_timeout * 1000000000
+            for idle_key in [ k for k, c in connections.items() if c['last_seen'] < idle_cutoff ]:
+                yield from flush(idle_key)
+#    
+    for connection_key in list(connections):
+        yield from flush(connection_key)
+
@@ -0,0 +1,32 @@
+# %%
+#######################################
+def scapystream_tcp_search_buffers(packet_source, overlap):
+    """Lazily yields the reassembled TCP stream data of a .pcap file (or of an iterable of packets) as buffers to search for patterns, where each buffer is the new chunk of a direction (see 'scapystream_tcp_reassemble') with the last 'overlap' bytes of the previous chunk in front of it, so a pattern spanning the two chunks is found.  Used by 'scapypayload_contains_patterns' and 'scapypayload_extract_between_patterns' with 'streams=True'.
+
+    The tail of the previous chunk is only carried over when the new chunk follows on from it: it is dropped when the stream skips a gap (a forced drain of the reassembly buffer), and when the connection is flushed, so a later connection that reuses the same addresses and ports never starts with the bytes of an earlier one, and the tails of finished connections are not kept.
+
+    Example:
+        >>> for direction_key, buffer_offset, buffer, carry_length in scapystream_tcp_search_buffers('web.pcap', 16):\n
+        ...     hits = [ m.start() for m in re.finditer(b'green%20button', buffer) if m.end() > carry_length ]\n
+
+    Args:
+        packet_source (str | iterable): Reference a .pcap file, or an iterable of scapy packets (PacketList, PcapReader, or a 'scapystream_*' generator)
+        overlap (int): Reference how many bytes at the end of each chunk are carried over to the next chunk of the same direction
+
+    Yields:
+        tuple: Yields (direction_key, buffer_offset, buffer, carry_length) for each chunk, where 'buffer_offset' is the stream offset of the start of the buffer and 'carry_length' is how many of its bytes were carried over (matches that end within them were already found in the previous buffer)
+    """
+    carries = {}
+    for session_key, direction_key, stream_offset, data in scapystream_tcp_reassemble(packet_source, end_markers=True):
+        if not data:
+            # The connection was flushed
+            carries.pop(direction_key, None)
+            continue
+        carry_end, carry = carries.get(direction_key, (None, b''))
+        if carry_end != stream_offset:
+            carry = b''
+        buffer = carry + data
+        yield (direction_key, stream_offset - len(carry), buffer, len(carry))
+        if overlap:
+            carries[direction_key] = (stream_offset + len(data), buffer[-overlap:])
+
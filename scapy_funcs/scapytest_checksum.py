@@ -38,23 +38,29 @@ def scapytest_checksum(packet_list: scapy.plist.PacketList):
     Returns:
         tuple: Returns a tuple of the results
     """
-    from copy import deepcopy
-    
+    # Reading the checksums straight from the raw bytes of each packet (see 'scapyraw_transport_checksum'), instead of a deepcopy and a re-dissection of every packet
     def verify_checksum(packet):
+        # Falling back to scapy's recalculation on a copy of the packet (e.g. for IP fragments or truncated frames)
+        packet = packet.copy()
         orig_checksum = packet['TCP'].chksum
         del packet['TCP'].chksum
         packet = IP(bytes(packet[IP]))
         recalc_checksum = packet['TCP'].chksum
         comparison = orig_checksum == recalc_checksum
         return (orig_checksum, recalc_checksum, comparison)
-        
-    temp_copy = deepcopy(packet_list)
-    temp_copy = PacketList([p for p in temp_copy if p.haslayer(TCP)])
     
     results_array = []
     
-    for eachpacket in temp_copy:
-        results_array.append(verify_checksum(eachpacket))
+    for eachpacket in packet_list:
+        if eachpacket.haslayer(TCP):
+            frame = bytes(eachpacket)
+            linktype = conf.l2types.layer2num.get(type(eachpacket), 1)
+            checksum_result = scapyraw_transport_checksum(frame, linktype)
+            if checksum_result and checksum_result[0] == 'TCP':
+                protocol_name, orig_checksum, recalc_checksum = checksum_result
+                results_array.append((orig_checksum, recalc_checksum, orig_checksum == recalc_checksum))
+            else:
+                results_array.append(verify_checksum(eachpacket))
     
     return results_array
 
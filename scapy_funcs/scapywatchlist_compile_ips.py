@@ -0,0 +1,44 @@
+# %%
+#######################################
+def scapywatchlist_compile_ips(entries):
+    """Compiles a watchlist of ip addresses and CIDR ranges (IPv4 and IPv6, e.g. a threat-intel list of tens of thousands of entries) into sorted arrays of merged integer intervals, one per ip version.  An address is then looked up with a binary search ('scapywatchlist_ip_match'), so the cost of a lookup barely grows with the size of the watchlist, and a whole capture is checked against all the entries in one pass.
+
+    Unlike the partial string matching of 'scapyget_ip_address', addresses are matched exactly (10.1.1.1 does not match 10.1.1.100) and ranges by their prefix.  Blank entries and '#' comments are ignored, so the lines of a watchlist file can be given as is.
+
+    Example:
+        >>> watchlist = scapywatchlist_compile_ips(['10.1.1.1', '192.168.0.0/16', '192.168.4.0/24', '2001:db8::/32'])\n
+        >>> watchlist[4]\n
+        {'starts': [167837953, 3232235520], 'ends': [167837953, 3232301055]}
+        >>> scapywatchlist_ip_match(watchlist, '10.1.1.100'), scapywatchlist_ip_match(watchlist, '192.168.4.20')\n
+        (False, True)
+
+    Args:
+        entries (iterable): Reference an iterable of ip addresses and CIDR ranges (str), e.g. a list, or an open watchlist file
+
+    Returns:
+        dict: Returns the compiled watchlist, with the 'starts' and 'ends' of the intervals for each ip version (4 and 6)
+    """
+    import ipaddress
+#    
+    intervals = {4: [], 6: []}
+    for entry in entries:
+        entry = entry.split('#', 1)[0].strip()
+        if not entry:
+            continue
+        network = ipaddress.ip_network(entry, strict=False)
+        intervals[network.version].append((int(network.network_address), int(network.broadcast_address)))
+#    
+    watchlist = {}
+    for version, version_intervals in intervals.items():
+        # Merging the overlapping (and touching) intervals, so the intervals left are disjoint and sorted
+        starts = []
+        ends = []
+        for start, end in sorted(version_intervals):
+            if ends and start <= ends[-1] + 1:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        watchlist[version] = {'starts': starts, 'ends': ends}
+    return watchlist
+
@@ -0,0 +1,42 @@
+# %%
+#######################################
+def scapywatchlist_compile_macs(entries):
+    """Compiles a watchlist of mac addresses and OUI / vendor prefixes into 48 bit integers, held in a hashed set of full addresses and one hashed set of prefixes per prefix length, so a mac address is looked up with a few dict lookups ('scapywatchlist_mac_match') whatever the size of the watchlist.
+
+    Each entry is a full mac address ('00:0c:29:64:3b:e1', '00-0C-29-64-3B-E1', '000c.2964.3be1'), an OUI ('00:0c:29', the first 24 bits), or a prefix with its length in bits ('70:b3:d5:0e:30:00/36', e.g. the MA-S blocks of the IEEE registry).  Entries can be given a label (e.g. a vendor or an asset name) by passing a dict of entries to labels, otherwise the entry itself is the label.  Blank entries and '#' comments are ignored.
+
+    Example:
+        >>> watchlist = scapywatchlist_compile_macs({'00:0c:29': 'VMware', '00:50:56:c0:00:08': 'vmnet8 host', '70:b3:d5:0e:30:00/36': 'PLC'})\n
+        >>> scapywatchlist_mac_match(watchlist, '00:0c:29:64:3b:e1'), scapywatchlist_mac_match(watchlist, '00:50:56:c0:00:01')\n
+        ('VMware', None)
+
+    Args:
+        entries (iterable | dict): Reference an iterable of mac addresses and prefixes (str), or a dict of them to their labels
+
+    Returns:
+        dict: Returns the compiled watchlist, with the 'macs' (a dict of 48 bit integers to labels) and the 'prefixes' (a dict of prefix lengths to dicts of prefixes to labels, longest prefixes first)
+    """
+    import re
+#    
+    labelled_entries = entries.items() if isinstance(entries, dict) else [ (entry, None) for entry in entries ]
+    macs = {}
+    prefixes = {}
+    for entry, label in labelled_entries:
+        entry_text = entry.split('#', 1)[0].strip()
+        if not entry_text:
+            continue
+        if label is None:
+            label = entry_text
+        address_text, slash, bits_text = entry_text.partition('/')
+        hex_digits = re.sub(r'[:\-. ]', '', address_text).lower()
+        if not re.fullmatch(r'[0-9a-f]{1,12}', hex_digits):
+            raise ValueError(f"Not a mac address or prefix: '{entry}'")
+        bits = int(bits_text) if slash else len(hex_digits) * 4
+        value = int(hex_digits.ljust(12, '0'), 16)
+        if bits >= 48:
+            macs[value] = label
+        else:
+            prefixes.setdefault(bits, {})[value >> (48 - bits)] = label
+#    
+    return {'macs': macs, 'prefixes': dict(sorted(prefixes.items(), reverse=True))}
+
@@ -0,0 +1,29 @@
+# %%
+#######################################
+def scapywatchlist_ip_match(watchlist: dict, address):
+    """Tells whether an ip address is in a watchlist compiled with 'scapywatchlist_compile_ips', with a binary search over the watchlist's intervals.
+
+    Example:
+        >>> watchlist = scapywatchlist_compile_ips(['10.1.1.1', '192.168.0.0/16', '2001:db8::/32'])\n
+        >>> scapywatchlist_ip_match(watchlist, '2001:db8::1'), scapywatchlist_ip_match(watchlist, b'\\n\\x01\\x01\\x01')\n
+        (True, True)
+
+    Args:
+        watchlist (dict): Reference a watchlist compiled with 'scapywatchlist_compile_ips'
+        address (str | bytes): Reference an ip address, as a string or as its 4 / 16 raw bytes (e.g. the 'ip_src' of 'scapyraw_parse_headers')
+
+    Returns:
+        bool: Returns True when the address is in the watchlist
+    """
+    import bisect
+    import ipaddress
+#    
+    if isinstance(address, str):
+        address = ipaddress.ip_address(address).packed
+    if address is None:
+        return False
+    intervals = watchlist[4 if len(address) == 4 else 6]
+    address_int = int.from_bytes(address, 'big')
+    position = bisect.bisect_right(intervals['starts'], address_int) - 1
+    return position >= 0 and address_int <= intervals['ends'][position]
+
@@ -0,0 +1,35 @@
+# %%
+#######################################
+def scapywatchlist_mac_match(watchlist: dict, mac):
+    """Looks up a mac address in a watchlist compiled with 'scapywatchlist_compile_macs'.  Returns the label of the full address entry that matches, or else of the longest prefix that matches, or None.
+
+    Example:
+        >>> watchlist = scapywatchlist_compile_macs(['00:0c:29', '00:50:56:c0:00:08'])\n
+        >>> scapywatchlist_mac_match(watchlist, b'\\x00\\x0c\\x29\\x64\\x3b\\xe1')\n
+        '00:0c:29'
+
+    Args:
+        watchlist (dict): Reference a watchlist compiled with 'scapywatchlist_compile_macs'
+        mac (str | bytes | int): Reference a mac address, as a string, as its 6 raw bytes (e.g. the 'eth_src' of 'scapyraw_parse_headers'), or as a 48 bit integer
+
+    Returns:
+        str: Returns the label of the matching entry, or None
+    """
+    if mac is None:
+        return None
+    if isinstance(mac, str):
+        mac_int = int(mac.replace(':', '').replace('-', '').replace('.', ''), 16)
+    elif isinstance(mac, int):
+        mac_int = mac
+    else:
+        mac_int = int.from_bytes(mac, 'big')
+#    
+    label = watchlist['macs'].get(mac_int)
+    if label is not None:
+        return label
+    for bits, bits_prefixes in watchlist['prefixes'].items():
+        label = bits_prefixes.get(mac_int >> (48 - bits))
+        if label is not None:
+            return label
+    return None
+
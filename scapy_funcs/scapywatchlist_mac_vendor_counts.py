@@ -0,0 +1,50 @@
+# %%
+#######################################
+def scapywatchlist_mac_vendor_counts(packet_source, watchlist=None, top=None):
+    """Builds an asset inventory of a capture in one streaming pass: for each vendor, the number of distinct mac addresses seen (as [Ether].src or [Ether].dst) and the number of packets they sent.  The vendor of each mac address is the label of the watchlist entry it matches (see 'scapywatchlist_compile_macs'), or when no watchlist is given, the short manufacturer name from scapy's manuf database (conf.manufdb).  The vendor is looked up once per distinct mac address.  Addresses with no known vendor are counted under 'Unknown'.
+
+    Example:
+        >>> scapywatchlist_mac_vendor_counts('office.pcap', top=3)\n
+        {'Dell': {'macs': 212, 'packets': 1820446}, 'Apple': {'macs': 97, 'packets': 520115}, 'Cisco': {'macs': 12, 'packets': 98011}}
+
+    Args:
+        packet_source (str | iterable): Reference a .pcap (or .pcapng) file, or an iterable of scapy packets (PacketList, PcapReader, or a 'scapystream_*' generator)
+        watchlist (list | dict, optional): Reference a list (or dict of labels) of mac addresses and prefixes, or a watchlist compiled with 'scapywatchlist_compile_macs'. Defaults to None (scapy's manuf database).
+        top (int, optional): Reference how many vendors to return (by number of packets). Defaults to None (every vendor).
+
+    Returns:
+        dict: Returns a dict of each vendor to the number of distinct 'macs' and the number of 'packets' sent, by number of packets
+    """
+    if watchlist is not None and (not isinstance(watchlist, dict) or 'macs' not in watchlist):
+        watchlist = scapywatchlist_compile_macs(watchlist)
+#    
+    if isinstance(packet_source, str):
+        frames = ( (frame, linktype) for timestamp_ns, file_offset, frame, wirelen, linktype in scapyraw_pcap_records(packet_source) )
+    else:
+        frames = ( (bytes(pckt), conf.l2types.layer2num.get(type(pckt), 1)) for pckt in packet_source )
+#    
+    # Counting per distinct mac address first, the vendors are only looked up at the end
+    sent_packets = {}
+    for frame, linktype in frames:
+        headers = scapyraw_parse_headers(frame, linktype)
+        if headers['eth_src'] is None:
+            continue
+        sent_packets[headers['eth_src']] = sent_packets.get(headers['eth_src'], 0) + 1
+        sent_packets.setdefault(headers['eth_dst'], 0)
+#    
+    vendor_counts = {}
+    for mac_bytes, packet_count in sent_packets.items():
+        if watchlist is not None:
+            vendor = scapywatchlist_mac_match(watchlist, mac_bytes)
+        else:
+            mac_text = scapyraw_format_address(mac_bytes)
+            vendor = conf.manufdb._get_short_manuf(mac_text)
+            if vendor == mac_text:
+                vendor = None
+        vendor_entry = vendor_counts.setdefault(vendor or 'Unknown', {'macs': 0, 'packets': 0})
+        vendor_entry['macs'] += 1
+        vendor_entry['packets'] += packet_count
+#    
+    ranked = sorted(vendor_counts.items(), key=lambda x: x[1]['packets'], reverse=True)
+    return dict(ranked[:top] if top else ranked)
+